@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import datetime
+import gc
+import platform
+import statistics
+import time
+from typing import Any, Callable
+
+import rabbitizer
+
+import spimdisasm
+from spimdisasm import common
+
+
+RESULTS_FORMAT_VERSION = 1
+"Bumped every time the layout of the results json changes"
+
+
+class Benchmark:
+    """A single timed operation over a synthetic input.
+
+    `setup` receives the scale of the input and returns the function to be
+    timed and the amount of operations it performs. It is called again before
+    every repetition, so the timed function can freely modify its input.
+    """
+
+    def __init__(self, name: str, setup: Callable[[int], tuple[Callable[[], Any], int]], globalConfig: dict[str, Any]|None=None):
+        self.name = name
+        self.setup = setup
+        self.globalConfig: dict[str, Any] = globalConfig if globalConfig is not None else dict()
+        "`GlobalConfig` attributes set while running the benchmark, restored afterwards"
+
+
+def runBenchmark(benchmark: Benchmark, scale: int, repeat: int) -> dict[str, Any]:
+    previousConfig = {attr: getattr(common.GlobalConfig, attr) for attr in benchmark.globalConfig}
+
+    timings: list[float] = []
+    operations = 0
+    try:
+        for attr, value in benchmark.globalConfig.items():
+            setattr(common.GlobalConfig, attr, value)
+
+        for _ in range(repeat):
+            func, operations = benchmark.setup(scale)
+
+            gc.collect()
+            gcWasEnabled = gc.isenabled()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+            finally:
+                if gcWasEnabled:
+                    gc.enable()
+    finally:
+        for attr, value in previousConfig.items():
+            setattr(common.GlobalConfig, attr, value)
+
+    best = min(timings)
+    return {
+        "operations": operations,
+        "best": best,
+        "median": statistics.median(timings),
+        "timings": timings,
+        "bestPerOperationNs": best / max(operations, 1) * 1e9,
+    }
+
+def runBenchmarks(benchmarks: list[Benchmark], scale: int, repeat: int, progress: Callable[[str, dict[str, Any]], None]|None=None) -> dict[str, Any]:
+    """Runs every benchmark and returns the results on a json-serializable
+    dictionary, together with information about the environment they were
+    run on."""
+
+    results: dict[str, Any] = {
+        "formatVersion": RESULTS_FORMAT_VERSION,
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "spimdisasmVersion": spimdisasm.__version__,
+        "rabbitizerVersion": rabbitizer.__version__,
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "platform": platform.platform(),
+        "scale": scale,
+        "repeat": repeat,
+        "benchmarks": dict(),
+    }
+
+    for benchmark in benchmarks:
+        result = runBenchmark(benchmark, scale, repeat)
+        results["benchmarks"][benchmark.name] = result
+        if progress is not None:
+            progress(benchmark.name, result)
+
+    return results
+
+
+def compareResults(previous: dict[str, Any], current: dict[str, Any]) -> list[tuple[str, float, float, float]]:
+    """Returns a (name, previous best, current best, ratio) tuple for every
+    benchmark present on both results. A ratio greater than 1 means the
+    current results are slower.
+
+    Only results run with the same scale can be compared."""
+
+    if previous.get("formatVersion") != RESULTS_FORMAT_VERSION:
+        raise RuntimeError(f"Unsupported benchmark results format version: {previous.get('formatVersion')}")
+    if previous.get("scale") != current.get("scale"):
+        raise RuntimeError(f"Can't compare results with different scales ({previous.get('scale')} vs {current.get('scale')})")
+
+    comparison: list[tuple[str, float, float, float]] = []
+    for name, currentResult in current["benchmarks"].items():
+        previousResult = previous["benchmarks"].get(name)
+        if previousResult is None:
+            continue
+        previousBest: float = previousResult["best"]
+        currentBest: float = currentResult["best"]
+        comparison.append((name, previousBest, currentBest, currentBest / previousBest if previousBest > 0 else 1.0))
+    return comparison
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+"""Benchmarks for the hot paths of the analysis, using synthetic inputs whose
+size grows linearly with the scale.
+
+Every input is generated from a fixed seed, so the same scale always produces
+the same input."""
+
+from __future__ import annotations
+
+import copy
+import random
+import struct
+from typing import Any, Callable
+
+import rabbitizer
+
+from spimdisasm import common
+from spimdisasm import mips
+
+from .Benchmark import Benchmark
+
+
+SEED = 0
+
+TEXT_VRAM = 0x80000400
+OVERLAYS_VRAM = 0x80800000
+
+
+#
+# SortedDict
+#
+
+def _sortedDictKeys(scale: int) -> list[int]:
+    rng = random.Random(SEED)
+    return rng.sample(range(0, 0x10000000, 4), 200_000 * scale)
+
+def setupSortedDictAdd(scale: int) -> tuple[Callable[[], Any], int]:
+    keys = _sortedDictKeys(scale)
+    d: common.SortedDict[int] = common.SortedDict()
+
+    def run() -> None:
+        for key in keys:
+            d.add(key, key)
+    return run, len(keys)
+
+def setupSortedDictGetKeyRight(scale: int) -> tuple[Callable[[], Any], int]:
+    keys = _sortedDictKeys(scale)
+    d: common.SortedDict[int] = common.SortedDict({key: key for key in keys})
+    lookups = [key + 2 for key in keys]
+
+    def run() -> None:
+        for key in lookups:
+            d.getKeyRight(key)
+    return run, len(lookups)
+
+def setupSortedDictGetRange(scale: int) -> tuple[Callable[[], Any], int]:
+    keys = _sortedDictKeys(scale)
+    d: common.SortedDict[int] = common.SortedDict({key: key for key in keys})
+    starts = keys[:len(keys)//10]
+
+    def run() -> None:
+        for start in starts:
+            for _ in d.getRange(start, start + 0x1000):
+                pass
+    return run, len(starts)
+
+def setupSortedDictRemove(scale: int) -> tuple[Callable[[], Any], int]:
+    keys = _sortedDictKeys(scale)
+    d: common.SortedDict[int] = common.SortedDict({key: key for key in keys})
+
+    def run() -> None:
+        for key in keys:
+            d.remove(key)
+    return run, len(keys)
+
+
+#
+# Symbols lookups
+#
+
+def setupSymbolsSegmentGetSymbol(scale: int) -> tuple[Callable[[], Any], int]:
+    symbolsCount = 100_000 * scale
+    vramEnd = TEXT_VRAM + symbolsCount * 0x10
+
+    context = common.Context()
+    context.changeGlobalSegmentRanges(0, symbolsCount * 0x10, TEXT_VRAM, vramEnd)
+    segment = context.globalSegment
+    for i in range(symbolsCount):
+        contextSym = segment.addSymbol(TEXT_VRAM + i * 0x10)
+        contextSym.userDeclaredSize = 0x8
+
+    rng = random.Random(SEED)
+    # Mix of exact matches, addresses in the middle of a symbol and addresses past the size of a symbol
+    lookups = [rng.randrange(TEXT_VRAM, vramEnd) for _ in range(2 * symbolsCount)]
+
+    def run() -> None:
+        for address in lookups:
+            segment.getSymbol(address)
+    return run, len(lookups)
+
+def setupContextIsAddressBanned(scale: int) -> tuple[Callable[[], Any], int]:
+    rangesCount = 5_000 * scale
+    vramEnd = TEXT_VRAM + rangesCount * 0x40
+
+    rng = random.Random(SEED)
+    context = common.Context()
+    for i in range(rangesCount):
+        context.addBannedSymbolRangeBySize(TEXT_VRAM + i * 0x40, rng.choice([0x4, 0x10, 0x40]))
+
+    lookups = [rng.randrange(TEXT_VRAM, vramEnd) for _ in range(20 * rangesCount)]
+
+    def run() -> None:
+        for address in lookups:
+            context.isAddressBanned(address)
+    return run, len(lookups)
+
+def setupElementBaseGetSymbolOverlays(scale: int) -> tuple[Callable[[], Any], int]:
+    categoriesCount = 16
+    segmentsPerCategory = 8
+    segmentSize = 0x4000
+    symbolsPerSegment = 256
+
+    context = common.Context()
+    vrom = 0x100000
+    context.changeGlobalSegmentRanges(0, vrom, TEXT_VRAM, TEXT_VRAM + vrom)
+    for category in range(categoriesCount):
+        for segmentIndex in range(segmentsPerCategory):
+            # Segments of the same category overlap in vram, like the overlays of a game do
+            vram = OVERLAYS_VRAM + (segmentIndex % 2) * segmentSize
+            segment = context.addOverlaySegment(f"ovl{category}", vrom, vrom + segmentSize, vram, vram + segmentSize)
+            for i in range(symbolsPerSegment):
+                # Only odd categories have symbols, so the lookups from the even ones need to walk the other categories
+                if category % 2 == 1:
+                    segment.addSymbol(vram + i * (segmentSize // symbolsPerSegment), vromAddress=vrom + i * (segmentSize // symbolsPerSegment))
+            vrom += segmentSize
+
+    elements: list[common.ElementBase] = []
+    for segmentsPerVrom in context.overlaySegments.values():
+        for segmentVrom, segment in segmentsPerVrom.items():
+            elements.append(common.ElementBase(context, segmentVrom, segmentVrom + 0x10, 0, segment.vramStart, "", [], common.FileSectionType.Text, segmentVrom, segment.overlayCategory))
+
+    rng = random.Random(SEED)
+    lookups = [(rng.choice(elements), rng.randrange(OVERLAYS_VRAM, OVERLAYS_VRAM + 2 * segmentSize)) for _ in range(10_000 * scale)]
+
+    def run() -> None:
+        for element, address in lookups:
+            element.getSymbol(address)
+    return run, len(lookups)
+
+
+#
+# Bytes handling
+#
+
+def setupDecodeBytesToStrings(scale: int) -> tuple[Callable[[], Any], int]:
+    rng = random.Random(SEED)
+    alphabet = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 .,:%\n\t\""
+
+    buffer = bytearray()
+    offsets: list[int] = []
+    for _ in range(20_000 * scale):
+        offsets.append(len(buffer))
+        buffer += bytes(rng.choice(alphabet) for _ in range(rng.randrange(1, 48)))
+        buffer += b"\0" * (4 - len(buffer) % 4)
+    buf = bytes(buffer)
+
+    def run() -> None:
+        for offset in offsets:
+            common.Utils.decodeBytesToStrings(buf, offset, "EUC-JP")
+    return run, len(offsets)
+
+def setupStringCandidates(scale: int) -> tuple[Callable[[], Any], int]:
+    rng = random.Random(SEED)
+    alphabet = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 .,:%\n\t\""
+
+    # Strings mixed with the kind of words usually found on data sections
+    buffer = bytearray()
+    for _ in range(20_000 * scale):
+        if rng.random() < 0.25:
+            buffer += bytes(rng.choice(alphabet) for _ in range(rng.randrange(1, 48)))
+            buffer += b"\0" * (4 - len(buffer) % 4)
+        else:
+            buffer += struct.pack(">I", rng.choice([0, rng.randrange(0x100), 0x80000000 | rng.randrange(0x100000), rng.getrandbits(32)]))
+    buf = bytes(buffer)
+
+    def run() -> None:
+        candidates = common.Utils.StringCandidates(buf)
+        for offset in range(0, len(buf), 4):
+            candidates.getStringLength(offset)
+    return run, len(buf) // 4
+
+def setupSymbolDataAnalyze(scale: int) -> tuple[Callable[[], Any], int]:
+    rng = random.Random(SEED)
+    wordsCount = 100_000 * scale
+    vramEnd = TEXT_VRAM + wordsCount * 4
+
+    context = common.Context()
+    context.changeGlobalSegmentRanges(0, wordsCount * 4, TEXT_VRAM, vramEnd)
+    # A few big symbols with data mixed with pointers to them
+    for i in range(0, wordsCount, 10_000):
+        context.globalSegment.addSymbol(TEXT_VRAM + i * 4)
+    words = [rng.choice([0, rng.getrandbits(32), rng.randrange(TEXT_VRAM, vramEnd)]) for _ in range(wordsCount)]
+    array_of_bytes = struct.pack(f">{wordsCount}I", *words)
+    section = mips.sections.SectionData(context, 0, len(array_of_bytes), TEXT_VRAM, "data", array_of_bytes, 0, None)
+    section.analyze()
+
+    def run() -> None:
+        for sym in section.symbolList:
+            sym.analyze()
+    return run, wordsCount
+
+def setupSectionDataAnalyze(scale: int) -> tuple[Callable[[], Any], int]:
+    rng = random.Random(SEED)
+    wordsCount = 50_000 * scale
+    vramEnd = TEXT_VRAM + wordsCount * 4
+
+    # Data mixed with pointers to this same section, both forwards and backwards
+    words = [rng.choice([0, rng.getrandbits(32), rng.randrange(TEXT_VRAM, vramEnd) & ~3]) for _ in range(wordsCount)]
+    array_of_bytes = struct.pack(f">{wordsCount}I", *words)
+
+    def run() -> None:
+        context = common.Context()
+        context.changeGlobalSegmentRanges(0, wordsCount * 4, TEXT_VRAM, vramEnd)
+        section = mips.sections.SectionData(context, 0, len(array_of_bytes), TEXT_VRAM, "data", array_of_bytes, 0, None)
+        section.analyze()
+    return run, wordsCount
+
+def setupEndianessBytesToWords(scale: int) -> tuple[Callable[[], Any], int]:
+    rng = random.Random(SEED)
+    wordsCount = 1_000_000 * scale
+    buf = rng.getrandbits(wordsCount * 32).to_bytes(wordsCount * 4, "big")
+
+    def run() -> None:
+        common.Utils.endianessBytesToWords(common.InputEndian.BIG, buf)
+        common.Utils.endianessBytesToWords(common.InputEndian.LITTLE, buf)
+    return run, 2 * wordsCount
+
+def setupWordsComparison(scale: int) -> tuple[Callable[[], Any], int]:
+    rng = random.Random(SEED)
+    wordsCount = 200_000 * scale
+    words = common.Utils.bytesToWordsArray(rng.getrandbits(wordsCount * 32).to_bytes(wordsCount * 4, "big"))
+    otherWords = copy.copy(words)
+    for i in rng.sample(range(wordsCount), wordsCount // 10):
+        otherWords[i] = rng.getrandbits(32)
+
+    def run() -> None:
+        # Each run works on its own copy since the words are modified
+        runWords = copy.copy(words)
+        runOtherWords = copy.copy(otherWords)
+        common.WordsComparison.countDifferences(runWords, runOtherWords)
+        common.WordsComparison.blankOutUpperBytes(runWords, runOtherWords, {0x80})
+        common.WordsComparison.nukePointers(runWords)
+    return run, wordsCount
+
+
+#
+# Instructions
+#
+
+def _syntheticFunctionWords(targetVram: int) -> list[int]:
+    "A small function loading an address, branching and calling another function"
+    return [
+        0x27BDFFE8, # addiu   $sp, $sp, -0x18
+        0xAFBF0014, # sw      $ra, 0x14($sp)
+        0x3C048010, # lui     $a0, 0x8010
+        0x24841234, # addiu   $a0, $a0, 0x1234
+        0x8C820000, # lw      $v0, 0x0($a0)
+        0x10400002, # beqz    $v0, .L
+        0x00000000, # nop
+        0x0C000000 | ((targetVram >> 2) & 0x3FFFFFF), # jal target
+        0x00000000, # nop
+        0x8FBF0014, # lw      $ra, 0x14($sp)
+        0x27BD0018, # addiu   $sp, $sp, 0x18
+        0x03E00008, # jr      $ra
+        0x00000000, # nop
+    ]
+
+def _syntheticTextBytes(scale: int) -> bytes:
+    words: list[int] = []
+    for _ in range(2_000 * scale):
+        # Call the previous function
+        words += _syntheticFunctionWords(TEXT_VRAM + max(len(words) - 13, 0) * 4)
+    return struct.pack(f">{len(words)}I", *words)
+
+def _syntheticTextSection(scale: int) -> mips.sections.SectionText:
+    array_of_bytes = _syntheticTextBytes(scale)
+
+    context = common.Context()
+    context.changeGlobalSegmentRanges(0, len(array_of_bytes), TEXT_VRAM, TEXT_VRAM + len(array_of_bytes))
+    return mips.sections.SectionText(context, 0, len(array_of_bytes), TEXT_VRAM, "text", array_of_bytes, 0, None)
+
+def setupSectionTextFindFunctions(scale: int) -> tuple[Callable[[], Any], int]:
+    section = _syntheticTextSection(scale)
+    # Decode the instructions ahead of time, so only the function search is measured
+    instrsList = section.wordListToInstructions(section.words, section.getVramOffset(0), section.instrCat)
+
+    def run() -> None:
+        section._findFunctions(instrsList)
+    return run, len(instrsList)
+
+def setupInstrAnalyzerProcessInstr(scale: int) -> tuple[Callable[[], Any], int]:
+    section = _syntheticTextSection(scale)
+    instrsList = section.wordListToInstructions(section.words, section.getVramOffset(0), section.instrCat)
+    functionSize = len(_syntheticFunctionWords(0))
+
+    def run() -> None:
+        # Same loop as `SymbolFunction._runInstructionAnalyzer`, without the parts unrelated to the analyzer
+        for funcStart in range(0, len(instrsList), functionSize):
+            funcVram = TEXT_VRAM + funcStart * 4
+            instrAnalyzer = mips.symbols.analysis.InstrAnalyzer(funcVram, section.context)
+            regsTracker = rabbitizer.RegistersTracker()
+            prevInstr = instrsList[funcStart + functionSize - 1]
+            for i in range(functionSize):
+                instr = instrsList[funcStart + i]
+                instrOffset = i * 4
+                if not prevInstr.isBranchLikely() and not prevInstr.isUnconditionalBranch():
+                    instrAnalyzer.processInstr(regsTracker, instr, instrOffset, funcVram + instrOffset, prevInstr)
+                instrAnalyzer.processPrevFuncCall(regsTracker, instr, prevInstr, funcVram + instrOffset)
+                prevInstr = instr
+    return run, len(instrsList)
+
+
+HOT_PATHS: list[Benchmark] = [
+    Benchmark("SortedDict.add", setupSortedDictAdd),
+    Benchmark("SortedDict.getKeyRight", setupSortedDictGetKeyRight),
+    Benchmark("SortedDict.getRange", setupSortedDictGetRange),
+    Benchmark("SortedDict.remove", setupSortedDictRemove),
+    Benchmark("SymbolsSegment.getSymbol", setupSymbolsSegmentGetSymbol, {"PRODUCE_SYMBOLS_PLUS_OFFSET": False}),
+    Benchmark("SymbolsSegment.getSymbol[plusOffset]", setupSymbolsSegmentGetSymbol, {"PRODUCE_SYMBOLS_PLUS_OFFSET": True}),
+    Benchmark("ElementBase.getSymbol[overlays]", setupElementBaseGetSymbolOverlays),
+    Benchmark("ElementBase.getSymbol[overlays, exact]", setupElementBaseGetSymbolOverlays, {"PRODUCE_SYMBOLS_PLUS_OFFSET": False}),
+    Benchmark("Context.isAddressBanned", setupContextIsAddressBanned),
+    Benchmark("Utils.decodeBytesToStrings", setupDecodeBytesToStrings),
+    Benchmark("Utils.StringCandidates", setupStringCandidates),
+    Benchmark("SymbolBase.analyze[data]", setupSymbolDataAnalyze),
+    Benchmark("SectionData.analyze", setupSectionDataAnalyze),
+    Benchmark("Utils.endianessBytesToWords", setupEndianessBytesToWords),
+    Benchmark("WordsComparison", setupWordsComparison),
+    Benchmark("SectionText._findFunctions", setupSectionTextFindFunctions),
+    Benchmark("InstrAnalyzer.processInstr", setupInstrAnalyzerProcessInstr),
+]
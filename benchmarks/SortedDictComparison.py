@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+"""Benchmarks comparing `spimdisasm.common.SortedDict` against its previous
+implementation, which was backed by a single sorted list of keys.
+
+Every operation is run on both implementations with the same keys and with
+10k, 100k and 1M keys already on the dictionary, the `[list, ...]` benchmarks
+use the previous implementation and the `[chunked, ...]` ones use the current
+one. A single size can be picked with `-k` (i.e. `-k "chunked, 1M"`), and
+`--scale` multiplies the amount of operations run over each dictionary. The
+removals on the previous implementation walk the whole list of keys, so the
+`[list, 1M]` benchmarks take several seconds each."""
+
+from __future__ import annotations
+
+import bisect
+import random
+from typing import Any, Callable
+
+from spimdisasm import common
+
+from .Benchmark import Benchmark
+
+
+SEED = 0
+
+
+class ListSortedDict:
+    """The previous implementation of `SortedDict`, backed by a single sorted list of keys.
+
+    Only the operations being benchmarked are kept."""
+
+    def __init__(self) -> None:
+        self.map: dict[int, Any] = dict()
+        self.sortedKeys: list[int] = list()
+
+    def add(self, key: int, value: Any) -> None:
+        if key not in self.map:
+            bisect.insort(self.sortedKeys, key)
+        self.map[key] = value
+
+    def remove(self, key: int) -> None:
+        del self.map[key]
+        self.sortedKeys.remove(key)
+
+    def getKeyRight(self, key: int, inclusive: bool=True) -> tuple[int, Any]|None:
+        if inclusive:
+            index = bisect.bisect_right(self.sortedKeys, key)
+        else:
+            index = bisect.bisect_left(self.sortedKeys, key)
+        if index == 0:
+            return None
+        currentKey = self.sortedKeys[index - 1]
+        return currentKey, self.map[currentKey]
+
+    def getRangeAndPop(self, startKey: int, endKey: int):
+        keyIndexStart = bisect.bisect_left(self.sortedKeys, startKey)
+        keyIndexEnd = bisect.bisect_left(self.sortedKeys, endKey)
+        for index in range(keyIndexEnd-1, keyIndexStart-1, -1):
+            key = self.sortedKeys[index]
+            value = self.map[key]
+            self.remove(key)
+            yield (key, value)
+
+    def index(self, key: int) -> int|None:
+        if key not in self.map:
+            return None
+        return bisect.bisect_left(self.sortedKeys, key)
+
+
+SIZES: list[tuple[str, int]] = [
+    ("10k", 10_000),
+    ("100k", 100_000),
+    ("1M", 1_000_000),
+]
+
+
+def _keys(size: int, scale: int) -> tuple[list[int], list[int]]:
+    """Returns the keys preloaded on each dictionary and the keys used by the
+    operations.
+
+    Even keys are preloaded, odd keys are the ones inserted and removed by the
+    benchmarks."""
+    rng = random.Random(SEED)
+    initialKeys = list(range(0, size * 2, 2))
+    operationKeys = rng.sample(range(1, size * 2, 2), 2_000 * scale)
+    return initialKeys, operationKeys
+
+def _buildDict(factory: Callable[[], Any], keys: list[int]) -> Any:
+    d = factory()
+    for key in keys:
+        d.add(key, key)
+    return d
+
+
+def _runInsert(d: Any, keys: list[int]) -> None:
+    for key in keys:
+        d.add(key, key)
+
+def _runGetKeyRight(d: Any, keys: list[int]) -> None:
+    for key in keys:
+        d.getKeyRight(key)
+
+def _runIndex(d: Any, keys: list[int]) -> None:
+    for key in keys:
+        d.index(key)
+
+def _runGetRangeAndPop(d: Any, keys: list[int]) -> None:
+    for key in keys:
+        for _ in d.getRangeAndPop(key, key + 1):
+            pass
+
+def _runRemove(d: Any, keys: list[int]) -> None:
+    for key in keys:
+        d.remove(key)
+
+
+OPERATIONS: list[tuple[str, Callable[[Any, list[int]], None], bool]] = [
+    # name, function, whether the operation keys are preloaded or not
+    ("insert", _runInsert, False),
+    ("getKeyRight", _runGetKeyRight, True),
+    ("index", _runIndex, True),
+    ("getRangeAndPop", _runGetRangeAndPop, True),
+    ("remove", _runRemove, True),
+]
+
+IMPLEMENTATIONS: list[tuple[str, Callable[[], Any]]] = [
+    ("list", ListSortedDict),
+    ("chunked", common.SortedDict),
+]
+
+
+def _makeSetup(factory: Callable[[], Any], operation: Callable[[Any, list[int]], None], preload: bool, size: int) -> Callable[[int], tuple[Callable[[], Any], int]]:
+    def setup(scale: int) -> tuple[Callable[[], Any], int]:
+        initialKeys, operationKeys = _keys(size, scale)
+        d = _buildDict(factory, sorted(initialKeys + operationKeys) if preload else initialKeys)
+
+        def run() -> None:
+            operation(d, operationKeys)
+        return run, len(operationKeys)
+    return setup
+
+
+SORTED_DICT_COMPARISON: list[Benchmark] = [
+    Benchmark(f"SortedDictComparison.{operationName}[{implName}, {sizeName}]", _makeSetup(factory, operation, preload, size))
+    for sizeName, size in SIZES
+    for operationName, operation, preload in OPERATIONS
+    for implName, factory in IMPLEMENTATIONS
+]
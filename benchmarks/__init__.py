@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+"""Microbenchmarks for the hot paths of the analysis.
+
+Run from the root of the repository:
+
+    python3 -m benchmarks --output results.json
+
+And compare against the results of another version with:
+
+    python3 -m benchmarks --compare results.json
+
+The `SortedDictComparison` benchmarks time `SortedDict` against its previous
+implementation:
+
+    python3 -m benchmarks -k SortedDictComparison
+"""
+
+from __future__ import annotations
+
+from .Benchmark import Benchmark as Benchmark
+from .Benchmark import runBenchmark as runBenchmark
+from .Benchmark import runBenchmarks as runBenchmarks
+from .Benchmark import compareResults as compareResults
+
+from .HotPaths import HOT_PATHS as HOT_PATHS
+from .SortedDictComparison import SORTED_DICT_COMPARISON as SORTED_DICT_COMPARISON
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+from typing import Any
+
+from .Benchmark import runBenchmarks, compareResults
+from .HotPaths import HOT_PATHS
+from .SortedDictComparison import SORTED_DICT_COMPARISON
+
+
+def printResult(name: str, result: dict[str, Any]) -> None:
+    print(f"{name:>52}: {result['best']*1000:10.3f} ms (median {result['median']*1000:10.3f} ms, {result['bestPerOperationNs']:9.1f} ns/op)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="benchmarks", description="Times the hot paths of the analysis against synthetic inputs")
+    parser.add_argument("-k", "--filter", help="Only run the benchmarks whose name contains any of the given strings", nargs="+", metavar="NAME")
+    parser.add_argument("--list", help="List the available benchmarks and exit", action="store_true")
+    parser.add_argument("--scale", help="Multiplier for the size of the synthetic inputs. Defaults to 1", type=int, default=1)
+    parser.add_argument("--repeat", help="How many times each benchmark is run. The best time is the one used for comparisons. Defaults to 5", type=int, default=5)
+    parser.add_argument("-o", "--output", help="Write the results as json to the given path", metavar="PATH")
+    parser.add_argument("--compare", help="Compare the results against a json file produced by a previous run", metavar="PATH")
+    parser.add_argument("--max-slowdown", help="Exit with an error if any benchmark is slower than the compared results by more than the given ratio (i.e. 1.10 allows being 10%% slower)", type=float, metavar="RATIO")
+
+    args = parser.parse_args()
+
+    benchmarks = HOT_PATHS + SORTED_DICT_COMPARISON
+    if args.filter is not None:
+        benchmarks = [benchmark for benchmark in benchmarks if any(name in benchmark.name for name in args.filter)]
+
+    if args.list:
+        for benchmark in benchmarks:
+            print(benchmark.name)
+        return 0
+
+    previous = None
+    if args.compare is not None:
+        with Path(args.compare).open() as f:
+            previous = json.load(f)
+
+    print(f"Running {len(benchmarks)} benchmarks, scale {args.scale}, {args.repeat} repetitions")
+    results = runBenchmarks(benchmarks, args.scale, args.repeat, printResult)
+
+    if args.output is not None:
+        outputPath = Path(args.output)
+        outputPath.parent.mkdir(parents=True, exist_ok=True)
+        with outputPath.open("w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if previous is None:
+        return 0
+
+    print()
+    print(f"Compared against spimdisasm {previous.get('spimdisasmVersion')} ({previous.get('date')})")
+    slowdowns = 0
+    for name, previousBest, currentBest, ratio in compareResults(previous, results):
+        marker = ""
+        if args.max_slowdown is not None and ratio > args.max_slowdown:
+            marker = " <-- slower"
+            slowdowns += 1
+        print(f"{name:>52}: {previousBest*1000:10.3f} ms -> {currentBest*1000:10.3f} ms ({ratio:5.2f}x){marker}")
+
+    if slowdowns > 0:
+        print(f"{slowdowns} benchmarks got slower than the allowed ratio ({args.max_slowdown})", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+from typing import Any
+
+
+class LazyPackage(types.ModuleType):
+    """
+    A package whose public attributes are imported the first time they are
+    accessed, instead of when the package itself is imported.
+
+    `_lazyAttributes` maps each attribute name to the relative name of the
+    module defining it and the name of the attribute on that module, or
+    `None` if the attribute is the module itself.
+    """
+
+    _lazyAttributes: dict[str, tuple[str, str|None]]
+
+    def __getattr__(self, name: str) -> Any:
+        entry = self._lazyAttributes.get(name)
+        if entry is None:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {name!r}")
+        moduleName, attribute = entry
+        module = importlib.import_module(moduleName, self.__name__)
+        value = module if attribute is None else getattr(module, attribute)
+        # Stored directly on the dict, so later accesses don't reach this method
+        self.__dict__[name] = value
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # The import system sets every submodule as an attribute of its
+        # package once it is imported, which would shadow an attribute with
+        # the same name (i.e. the `GlobalConfig` object with the
+        # `GlobalConfig` module)
+        entry = self._lazyAttributes.get(name)
+        if entry is not None and entry[1] is not None and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+    def __dir__(self) -> list[str]:
+        return sorted(set(self.__dict__) | set(self._lazyAttributes))
+
+
+def makePackageLazy(packageName: str, lazyAttributes: dict[str, tuple[str, str|None]]) -> None:
+    """
+    Turns the already imported package into a `LazyPackage` with the given
+    attributes. Meant to be called from the `__init__.py` of the package.
+    """
+    package = sys.modules[packageName]
+    package.__dict__["_lazyAttributes"] = lazyAttributes
+    package.__class__ = LazyPackage
@@ -9,13 +9,40 @@ __version_info__: tuple[int, int, int] = (1, 20, 1)
 __version__ = ".".join(map(str, __version_info__))
 __author__ = "Decompollaborate"
 
-from . import common as common
-from . import elf32 as elf32
-from . import mips as mips
-
-# Front-end scripts
-from . import frontendCommon as frontendCommon
-from . import disasmdis as disasmdis
-from . import rspDisasm as rspDisasm
-from . import elfObjDisasm as elfObjDisasm
-from . import singleFileDisasm as singleFileDisasm
+from typing import TYPE_CHECKING
+
+from .LazyPackage import makePackageLazy
+
+if TYPE_CHECKING:
+    from . import common as common
+    from . import elf32 as elf32
+    from . import mips as mips
+
+    # Front-end scripts
+    from . import frontendCommon as frontendCommon
+    from . import disasmdis as disasmdis
+    from . import rspDisasm as rspDisasm
+    from . import elfObjDisasm as elfObjDisasm
+    from . import singleFileDisasm as singleFileDisasm
+    from . import batch as batch
+    from . import serve as serve
+    from . import match as match
+else:
+    # The subpackages are imported the first time they are accessed instead
+    # of when importing `spimdisasm`, so a front-end only pays for the parts
+    # of the library it uses
+    makePackageLazy(__name__, {
+        "common": (".common", None),
+        "elf32": (".elf32", None),
+        "mips": (".mips", None),
+
+        # Front-end scripts
+        "frontendCommon": (".frontendCommon", None),
+        "disasmdis": (".disasmdis", None),
+        "rspDisasm": (".rspDisasm", None),
+        "elfObjDisasm": (".elfObjDisasm", None),
+        "singleFileDisasm": (".singleFileDisasm", None),
+        "batch": (".batch", None),
+        "serve": (".serve", None),
+        "match": (".match", None),
+    })
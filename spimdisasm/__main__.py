@@ -9,4 +9,4 @@ import spimdisasm
 
 
 if __name__ == "__main__":
-    exit(spimdisasm.frontendCommon.FrontendUtilities.cliMain())
+    exit(spimdisasm.frontendCommon.Cli.cliMain())
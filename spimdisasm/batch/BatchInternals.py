@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import multiprocessing
+from pathlib import Path
+import traceback
+from typing import Any, Callable, Iterator
+
+import rabbitizer
+
+from .. import common
+from .. import singleFileDisasm
+from .. import elfObjDisasm
+from .. import rspDisasm
+from .. import frontendCommon as fec
+
+from .. import __version__
+
+PROGNAME = "batch"
+
+
+class BatchTool:
+    def __init__(self, getArgsParser: Callable[[], argparse.ArgumentParser], processArguments: Callable[[argparse.Namespace], int]):
+        self.getArgsParser = getArgsParser
+        self.processArguments = processArguments
+
+BATCH_TOOLS: dict[str, BatchTool] = {
+    "singleFileDisasm": BatchTool(singleFileDisasm.getArgsParser, singleFileDisasm.processArguments),
+    "elfObjDisasm": BatchTool(elfObjDisasm.getArgsParser, elfObjDisasm.processArguments),
+    "rspDisasm": BatchTool(rspDisasm.getArgsParser, rspDisasm.processArguments),
+}
+
+
+class BatchJob:
+    def __init__(self, index: int, tool: str, inputPath: str, outputPath: str, args: argparse.Namespace):
+        self.index = index
+        self.tool = tool
+        self.inputPath = inputPath
+        self.outputPath = outputPath
+        self.args = args
+
+    def getDescription(self) -> str:
+        return f"job {self.index} ({self.tool} {self.inputPath})"
+
+
+def getToolDescription() -> str:
+    return "Runs many disassembly jobs listed on a manifest in a single process"
+
+def addOptionsToParser(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("-V", "--version", action="version", version=f"%(prog)s {__version__}")
+
+    parser.add_argument("manifest", help="""\
+Path to a json manifest listing the jobs to run. It has the following layout:
+
+{
+    "tool": "singleFileDisasm",
+    "options": ["--libultra-syms", "--hardware-regs"],
+    "jobs": [
+        {"input": "baserom.z64", "output": "asm/code", "options": ["--vram", "0x80000400"]},
+        {"tool": "elfObjDisasm", "input": "build/boot.o", "output": "asm/boot"}
+    ]
+}
+
+`tool` is one of """ + ", ".join(BATCH_TOOLS) + """. The top-level `tool` is used by the jobs which do not specify one.
+The top-level `options` are passed to every job, before the job's own `options`, using the same syntax as the command line of each tool.
+Relative paths are relative to the current working directory.""")
+
+    parser.add_argument("-j", "--jobs", help="Amount of worker processes to spread the jobs over. Jobs run by the workers ignore their own `--jobs` option. Only available on platforms supporting `fork`. Defaults to 1", type=int, default=1, metavar="N")
+    parser.add_argument("--keep-going", help="Keep running the rest of the jobs after a job fails. Defaults to True", action=common.Utils.BooleanOptionalAction, default=True)
+
+    return parser
+
+def getArgsParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=getToolDescription(), prog=PROGNAME, formatter_class=common.Utils.PreserveWhiteSpaceWrapRawTextHelpFormatter)
+    return addOptionsToParser(parser)
+
+
+def _getStringList(value: Any, what: str) -> list[str]:
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(x, str) for x in value):
+        raise RuntimeError(f"Error: {what} must be a list of strings")
+    return value
+
+def readManifest(manifestPath: Path) -> list[BatchJob]:
+    """
+    Reads the manifest and parses the options of every job with the argument
+    parser of its tool, so an invalid manifest is reported before running any
+    job.
+    """
+    with manifestPath.open() as f:
+        manifest = json.load(f)
+
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("jobs"), list):
+        raise RuntimeError(f"Error: the manifest '{manifestPath}' must be a json object with a `jobs` list")
+
+    defaultTool = manifest.get("tool")
+    commonOptions = _getStringList(manifest.get("options"), "the top-level `options` of the manifest")
+
+    parsers: dict[str, argparse.ArgumentParser] = dict()
+    jobs: list[BatchJob] = []
+    for index, jobEntry in enumerate(manifest["jobs"]):
+        if not isinstance(jobEntry, dict):
+            raise RuntimeError(f"Error: job {index} of the manifest must be a json object")
+
+        tool = jobEntry.get("tool", defaultTool)
+        if tool not in BATCH_TOOLS:
+            raise RuntimeError(f"Error: job {index} of the manifest has an unknown tool '{tool}'. Expected one of: {', '.join(BATCH_TOOLS)}")
+
+        inputPath = jobEntry.get("input")
+        outputPath = jobEntry.get("output")
+        if not isinstance(inputPath, str) or not isinstance(outputPath, str):
+            raise RuntimeError(f"Error: job {index} of the manifest must have an `input` and an `output` path")
+
+        argv = [inputPath, outputPath] + commonOptions + _getStringList(jobEntry.get("options"), f"the `options` of job {index}")
+
+        parser = parsers.get(tool)
+        if parser is None:
+            parser = BATCH_TOOLS[tool].getArgsParser()
+            parsers[tool] = parser
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit as e:
+            # argparse already printed the reason to stderr
+            raise RuntimeError(f"Error: invalid options for job {index} of the manifest ({tool} {inputPath}): {' '.join(argv)}") from e
+
+        jobs.append(BatchJob(index, tool, inputPath, outputPath, args))
+
+    return jobs
+
+
+def _getGlobalStateSnapshot() -> tuple[dict[str, Any], list[tuple[str, Any]]]:
+    # Every tool configures the disassembler by modifying the global
+    # configurations, which must not leak into the jobs that follow it
+    globalConfig = copy.deepcopy(vars(common.GlobalConfig))
+    rabbitizerConfig = [(attr, getattr(rabbitizer.config, attr)) for attr in dir(rabbitizer.config) if not attr.startswith("_")]
+    return globalConfig, rabbitizerConfig
+
+def _restoreGlobalStateSnapshot(snapshot: tuple[dict[str, Any], list[tuple[str, Any]]]) -> None:
+    globalConfig, rabbitizerConfig = snapshot
+    configDict = vars(common.GlobalConfig)
+    configDict.clear()
+    configDict.update(copy.deepcopy(globalConfig))
+    for attr, value in rabbitizerConfig:
+        setattr(rabbitizer.config, attr, value)
+
+def _getExitCode(e: SystemExit) -> int:
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    # `exit` prints the message when it is not an integer
+    common.Utils.eprint(e.code)
+    return 1
+
+def runJob(job: BatchJob) -> int:
+    """
+    Runs a single job on the current process and returns its exit code, `0`
+    if it succeeded. The global configuration is restored afterwards,
+    regardless of how the job ended.
+    """
+    snapshot = _getGlobalStateSnapshot()
+    try:
+        # Each job gets its own copy, since the tools modify the parsed arguments
+        return BATCH_TOOLS[job.tool].processArguments(copy.copy(job.args))
+    except SystemExit as e:
+        # Don't let a job end the whole batch or kill a worker process
+        exitCode = _getExitCode(e)
+        if exitCode != 0:
+            common.Utils.eprint(f"Error: {job.getDescription()} exited with code {exitCode}")
+        return exitCode
+    except Exception:
+        common.Utils.eprint(f"Error: {job.getDescription()} failed:")
+        common.Utils.eprint(traceback.format_exc())
+        return 1
+    finally:
+        _restoreGlobalStateSnapshot(snapshot)
+
+
+_sForkedJobs: list[BatchJob] = []
+
+def _runForkedJob(index: int) -> tuple[int, int]:
+    job = _sForkedJobs[index]
+    # Worker processes can't spawn workers of their own
+    if hasattr(job.args, "jobs"):
+        job.args.jobs = 1
+    return index, runJob(job)
+
+def runJobs(jobs: list[BatchJob], workersCount: int=1, keepGoing: bool=True) -> Iterator[tuple[BatchJob, int]]:
+    """
+    Runs every job and yields each one of them together with its exit code,
+    once they have finished.
+
+    If `workersCount` is greater than 1 and the platform supports `fork` then
+    the jobs are spread over that amount of worker processes and are yielded
+    in the order they finish. Otherwise they are run on the current process,
+    in the order they were listed.
+    """
+    global _sForkedJobs
+
+    if not fec.FrontendUtilities._canForkWorkers(workersCount) or len(jobs) <= 1:
+        for job in jobs:
+            exitCode = runJob(job)
+            yield job, exitCode
+            if exitCode != 0 and not keepGoing:
+                return
+        return
+
+    _sForkedJobs = jobs
+    try:
+        with multiprocessing.get_context("fork").Pool(min(workersCount, len(jobs))) as pool:
+            for index, exitCode in pool.imap_unordered(_runForkedJob, range(len(jobs))):
+                yield jobs[index], exitCode
+                if exitCode != 0 and not keepGoing:
+                    return
+    finally:
+        _sForkedJobs = []
+
+
+def processArguments(args: argparse.Namespace) -> int:
+    try:
+        jobs = readManifest(Path(args.manifest))
+    except RuntimeError as e:
+        common.Utils.eprint(e)
+        return 1
+    except (OSError, ValueError) as e:
+        # Missing file or invalid json
+        common.Utils.eprint(f"Error: could not read the manifest '{args.manifest}': {e}")
+        return 1
+
+    failedJobs: list[tuple[BatchJob, int]] = []
+    for job, exitCode in runJobs(jobs, args.jobs, args.keep_going):
+        if exitCode != 0:
+            failedJobs.append((job, exitCode))
+
+    if len(failedJobs) > 0:
+        failedJobs.sort(key=lambda x: x[0].index)
+        common.Utils.eprint(f"{len(failedJobs)} of {len(jobs)} jobs failed:")
+        for job, exitCode in failedJobs:
+            common.Utils.eprint(f"    {job.getDescription()}: exit code {exitCode}")
+        return 1
+    return 0
+
+def addSubparser(subparser: argparse._SubParsersAction[argparse.ArgumentParser]):
+    parser = subparser.add_parser("batch", help=getToolDescription(), formatter_class=common.Utils.PreserveWhiteSpaceWrapRawTextHelpFormatter)
+
+    addOptionsToParser(parser)
+
+    parser.set_defaults(func=processArguments)
+
+
+def batchMain():
+    args = getArgsParser().parse_args()
+
+    return processArguments(args)
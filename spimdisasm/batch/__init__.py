@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+
+from .BatchInternals import BatchJob as BatchJob
+from .BatchInternals import getToolDescription as getToolDescription
+from .BatchInternals import addOptionsToParser as addOptionsToParser
+from .BatchInternals import getArgsParser as getArgsParser
+from .BatchInternals import readManifest as readManifest
+from .BatchInternals import runJob as runJob
+from .BatchInternals import runJobs as runJobs
+from .BatchInternals import processArguments as processArguments
+from .BatchInternals import addSubparser as addSubparser
+from .BatchInternals import batchMain as batchMain
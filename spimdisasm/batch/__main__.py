@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+from . import batchMain
+
+
+if __name__ == "__main__":
+    batchMain()
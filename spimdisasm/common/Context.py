@@ -6,14 +6,17 @@
 from __future__ import annotations
 
 import argparse
+import bisect
 import dataclasses
 from pathlib import Path
+from typing import ClassVar, Iterable
 
 from . import Utils
 from .ContextSymbols import ContextSymbol
 from .SymbolsSegment import SymbolsSegment
 from .GpAccesses import GpAccessContainer
 from .Relocation import RelocationInfo, RelocType
+from . import ContextBinaryFile
 
 
 @dataclasses.dataclass
@@ -21,6 +24,13 @@ class AddressRange:
     start: int
     end: int
 
+    _generation: ClassVar[int] = 0
+    "Bumped every time any range is created or modified, used to know when the cached merged ranges are stale"
+
+    def __setattr__(self, name: str, value: int) -> None:
+        super().__setattr__(name, value)
+        AddressRange._generation += 1
+
     def isInRange(self, address: int) -> bool:
         return self.start <= address < self.end
 
@@ -34,20 +44,98 @@ class AddressRange:
             self.end = address
         return None
 
+class AddressRangeSet:
+    """
+    Set of half-open address ranges, kept merged and sorted so checking if an
+    address is part of any of them is a binary search instead of a walk over
+    every range.
+
+    Added ranges are merged lazily, the first time the set is queried after
+    adding them, so adding many ranges one by one is not quadratic.
+    """
+
+    def __init__(self, ranges: Iterable[tuple[int, int]]=()):
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        self._pending: list[tuple[int, int]] = []
+        self.addRanges(ranges)
+
+    def add(self, start: int, end: int) -> None:
+        if end > start:
+            self._pending.append((start, end))
+
+    def addRanges(self, ranges: Iterable[tuple[int, int]]) -> None:
+        self._pending += [(start, end) for start, end in ranges if end > start]
+
+    def clear(self) -> None:
+        self._starts = []
+        self._ends = []
+        self._pending = []
+
+    def _merge(self) -> None:
+        ranges = sorted(list(zip(self._starts, self._ends)) + self._pending)
+        self._pending = []
+
+        starts: list[int] = []
+        ends: list[int] = []
+        for start, end in ranges:
+            if len(ends) > 0 and start <= ends[-1]:
+                if end > ends[-1]:
+                    ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+        self._starts = starts
+        self._ends = ends
+
+    def getRanges(self) -> list[tuple[int, int]]:
+        """
+        Returns the merged ranges, sorted by address.
+        """
+        if len(self._pending) > 0:
+            self._merge()
+        return list(zip(self._starts, self._ends))
+
+    def isInRange(self, address: int) -> bool:
+        if len(self._pending) > 0:
+            self._merge()
+        i = bisect.bisect_right(self._starts, address) - 1
+        return i >= 0 and address < self._ends[i]
+
+class _AddressRangeListIndex:
+    """
+    Caches an `AddressRangeSet` built from a list of `AddressRange`s.
+
+    The set is rebuilt when the list is replaced, when its length changes or
+    when any `AddressRange` is created or modified, so the list (and the
+    ranges in it) can be freely modified.
+    """
+
+    def __init__(self):
+        self._ranges: list[AddressRange]|None = None
+        self._length: int = -1
+        self._generation: int = -1
+        self._rangeSet = AddressRangeSet()
+
+    def isInRange(self, ranges: list[AddressRange], address: int) -> bool:
+        if ranges is not self._ranges or len(ranges) != self._length or AddressRange._generation != self._generation:
+            self._rangeSet = AddressRangeSet((addrRange.start, addrRange.end) for addrRange in ranges)
+            self._ranges = ranges
+            self._length = len(ranges)
+            self._generation = AddressRange._generation
+        return self._rangeSet.isInRange(address)
+
 class SymbolsRanges:
     def __init__(self, start: int, end: int):
         self.mainAddressRange = AddressRange(start, end)
         self.specialRanges: list[AddressRange] = list()
+        self._specialRangesIndex = _AddressRangeListIndex()
 
     def isInRange(self, address: int) -> bool:
         if self.mainAddressRange.isInRange(address):
             return True
 
-        for spRange in self.specialRanges:
-            if spRange.isInRange(address):
-                return True
-
-        return False
+        return self._specialRangesIndex.isInRange(self.specialRanges, address)
 
     def decreaseStart(self, address: int) -> None:
         self.mainAddressRange.decreaseStart(address)
@@ -63,6 +151,114 @@ class SymbolsRanges:
         self.specialRanges.append(addrRange)
         return addrRange
 
+    def clearSpecialRanges(self) -> None:
+        self.specialRanges = list()
+
+class OverlaySegmentsIndex:
+    """
+    Index over the vram and vrom ranges of every overlay segment, allowing to
+    find the segments containing an address without walking every overlay
+    category.
+
+    Segments are returned in the same order they have on `Context.overlaySegments`.
+
+    The index stores, for every interval between the start and end addresses
+    of the segments, the list of segments covering it. Building it takes
+    O(n*k) time and memory, where n is the amount of overlay segments and k is
+    the most segments overlapping at a single address.
+
+    It also stores, for every vram with a symbol in any overlay segment, the
+    segments which have a symbol there, so looking up a symbol at an exact
+    address only visits the segments that define it, even if a lot of
+    overlays share the same vram range. Looking up a symbol plus an offset
+    still visits every segment containing the address, since the symbol found
+    depends on the size of the symbols of each segment.
+    """
+
+    def __init__(self, overlaySegments: dict[str, dict[int, SymbolsSegment]]):
+        vramRanges: list[tuple[int, int, tuple[str, int, SymbolsSegment]]] = []
+        vromRanges: list[tuple[int, int, tuple[str, int, SymbolsSegment]]] = []
+
+        self._segmentsOrder: dict[int, tuple[int, tuple[str, int, SymbolsSegment]]] = dict()
+        "key: id of the segment"
+        self._symbolsSegments: dict[int, list[tuple[int, tuple[str, int, SymbolsSegment]]]] = dict()
+        "key: vram of the symbol. The segments defining it, sorted by their order"
+
+        for overlayCategory, segmentsPerVrom in overlaySegments.items():
+            for segmentVrom, overlaySegment in segmentsPerVrom.items():
+                entry = (overlayCategory, segmentVrom, overlaySegment)
+                vramRanges.append((overlaySegment.vramStart, overlaySegment.vramEnd, entry))
+                if overlaySegment.vromStart is not None and overlaySegment.vromEnd is not None:
+                    vromRanges.append((overlaySegment.vromStart, overlaySegment.vromEnd, entry))
+
+                order = len(self._segmentsOrder)
+                self._segmentsOrder[id(overlaySegment)] = (order, entry)
+                for symbolVram in overlaySegment.symbols:
+                    self._symbolsSegments.setdefault(symbolVram, []).append((order, entry))
+
+        self._vramBounds, self._vramEntries = self._buildIndex(vramRanges)
+        self._vromBounds, self._vromEntries = self._buildIndex(vromRanges)
+
+    @staticmethod
+    def _buildIndex(ranges: list[tuple[int, int, tuple[str, int, SymbolsSegment]]]) -> tuple[list[int], list[list[tuple[str, int, SymbolsSegment]]]]:
+        # Split the address space into the elementary intervals delimited by
+        # every range's start and end, and store which ranges cover each one
+        bounds = sorted({start for start, end, _ in ranges if start < end} | {end for start, end, _ in ranges if start < end})
+        entriesPerInterval: list[list[tuple[str, int, SymbolsSegment]]] = [[] for _ in bounds]
+
+        for start, end, entry in ranges:
+            if end <= start:
+                continue
+            for i in range(bisect.bisect_left(bounds, start), bisect.bisect_left(bounds, end)):
+                entriesPerInterval[i].append(entry)
+
+        return bounds, entriesPerInterval
+
+    @staticmethod
+    def _query(bounds: list[int], entriesPerInterval: list[list[tuple[str, int, SymbolsSegment]]], address: int) -> list[tuple[str, int, SymbolsSegment]]:
+        i = bisect.bisect_right(bounds, address) - 1
+        if i < 0:
+            return []
+        return entriesPerInterval[i]
+
+    def getSegmentsForVram(self, vram: int) -> list[tuple[str, int, SymbolsSegment]]:
+        """
+        Returns the overlay segments which contain the given vram, as tuples of
+        the overlay category, the segment's vrom key and the segment itself.
+        """
+        return self._query(self._vramBounds, self._vramEntries, vram)
+
+    def getSegmentsForVrom(self, vrom: int) -> list[tuple[str, int, SymbolsSegment]]:
+        """
+        Returns the overlay segments which contain the given vrom, as tuples of
+        the overlay category, the segment's vrom key and the segment itself.
+        """
+        return self._query(self._vromBounds, self._vromEntries, vrom)
+
+    def getSegmentsWithSymbolAt(self, vram: int) -> list[tuple[str, int, SymbolsSegment]]:
+        """
+        Returns the overlay segments which have a symbol at exactly the given
+        vram, as tuples of the overlay category, the segment's vrom key and the
+        segment itself. The segments may not contain the vram.
+        """
+        return [entry for _, entry in self._symbolsSegments.get(vram, [])]
+
+    def symbolAdded(self, segment: SymbolsSegment, vram: int) -> None:
+        "Registers a new symbol of the given overlay segment"
+        segmentOrder = self._segmentsOrder.get(id(segment))
+        if segmentOrder is None:
+            return
+        # Orders are unique, so the segments themselves are never compared
+        bisect.insort(self._symbolsSegments.setdefault(vram, []), segmentOrder)
+
+    def symbolRemoved(self, segment: SymbolsSegment, vram: int) -> None:
+        "Unregisters a removed symbol of the given overlay segment"
+        segments = self._symbolsSegments.get(vram)
+        if segments is None:
+            return
+        self._symbolsSegments[vram] = [segmentOrder for segmentOrder in segments if segmentOrder[1][2] is not segment]
+
+
 class Context:
     N64DefaultBanned = {
         0x7FFFFFE0, # osInvalICache
@@ -81,6 +277,7 @@ class Context:
 
         self.overlaySegments: dict[str, dict[int, SymbolsSegment]] = dict()
         "Outer key is overlay type, inner key is the vrom of the overlay's segment"
+        self._overlaySegmentsIndex: OverlaySegmentsIndex|None = None
 
         self.totalVramRange: SymbolsRanges = SymbolsRanges(self.globalSegment.vramStart, self.globalSegment.vramEnd)
         self._defaultVramRanges: bool = True
@@ -88,6 +285,7 @@ class Context:
         # Stuff that looks like pointers, but the disassembler shouldn't count it as a pointer
         self.bannedSymbols: set[int] = set()
         self.bannedRangedSymbols: list[AddressRange] = list()
+        self._bannedRangesIndex = _AddressRangeListIndex()
 
         self.globalRelocationOverrides: dict[int, RelocationInfo] = dict()
         "key: vrom address"
@@ -101,6 +299,7 @@ class Context:
         if vramStart == vramEnd:
             Utils.eprint(f"Warning: globalSegment's will has its vramStart equal to the vramEnd (0x{vramStart:X})")
         self.globalSegment.changeRanges(vromStart, vromEnd, vramStart, vramEnd)
+        self.invalidateOverlaySegmentsIndex()
         if self._defaultVramRanges:
             self.totalVramRange.mainAddressRange.start = vramStart
             self.totalVramRange.mainAddressRange.end = vramEnd
@@ -113,6 +312,7 @@ class Context:
             self.overlaySegments[overlayCategory] = dict()
         segment = SymbolsSegment(self, segmentVromStart, segmentVromEnd, segmentVramStart, segmentVramEnd, overlayCategory=overlayCategory)
         self.overlaySegments[overlayCategory][segmentVromStart] = segment
+        self.invalidateOverlaySegmentsIndex()
 
         if self._defaultVramRanges:
             self.totalVramRange.mainAddressRange.start = segmentVramStart
@@ -123,6 +323,27 @@ class Context:
 
         return segment
 
+    def getOverlaySegmentsIndex(self) -> OverlaySegmentsIndex:
+        if self._overlaySegmentsIndex is None:
+            self._overlaySegmentsIndex = OverlaySegmentsIndex(self.overlaySegments)
+        return self._overlaySegmentsIndex
+
+    def invalidateOverlaySegmentsIndex(self) -> None:
+        """
+        Forces the overlay segments index to be rebuilt the next time it is
+        needed. Must be called if `overlaySegments` or the `symbols` of an
+        overlay segment are modified directly.
+        """
+        self._overlaySegmentsIndex = None
+
+    def overlaySymbolAdded(self, segment: SymbolsSegment, vram: int) -> None:
+        if self._overlaySegmentsIndex is not None:
+            self._overlaySegmentsIndex.symbolAdded(segment, vram)
+
+    def overlaySymbolRemoved(self, segment: SymbolsSegment, vram: int) -> None:
+        if self._overlaySegmentsIndex is not None:
+            self._overlaySegmentsIndex.symbolRemoved(segment, vram)
+
     def isInTotalVramRange(self, address: int) -> bool:
         return self.totalVramRange.isInRange(address)
 
@@ -157,15 +378,22 @@ class Context:
         self.bannedRangedSymbols.append(AddressRange(rangeStart, rangeEnd))
 
     def addBannedSymbolRangeBySize(self, rangeStart: int, size: int):
-        self.bannedRangedSymbols.append(AddressRange(rangeStart, rangeStart + size))
+        self.addBannedSymbolRange(rangeStart, rangeStart + size)
+
+    def addBannedSymbolRanges(self, ranges: Iterable[tuple[int, int]]):
+        """
+        Bans every range of addresses of the list, each one given as a tuple
+        of its start and its end.
+        """
+        self.bannedRangedSymbols += [AddressRange(rangeStart, rangeEnd) for rangeStart, rangeEnd in ranges]
+
+    def clearBannedSymbolRanges(self):
+        self.bannedRangedSymbols = list()
 
     def isAddressBanned(self, address: int) -> bool:
         if address in self.bannedSymbols:
             return True
-        for ranged in self.bannedRangedSymbols:
-            if ranged.isInRange(address):
-                return True
-        return False
+        return self._bannedRangesIndex.isInRange(self.bannedRangedSymbols, address)
 
     def addGlobalReloc(self, vromAddres: int, relocType: RelocType, symbol: ContextSymbol|str, addend: int=0) -> RelocationInfo:
         reloc = RelocationInfo(relocType, symbol, addend, globalReloc=True)
@@ -189,12 +417,31 @@ class Context:
                 with ovlPath.open("w") as f:
                     overlaySegment.saveContextToFile(f)
 
+    def saveContextToBinaryFile(self, contextPath: Path):
+        """
+        Saves the whole context to a compact binary file, which can be loaded
+        back with `loadContextFromBinaryFile`.
+        """
+        with contextPath.open("wb") as f:
+            ContextBinaryFile.saveContext(self, f)
+
+    def loadContextFromBinaryFile(self, contextPath: Path):
+        """
+        Replaces the segments, symbols, banned symbols, relocation overrides
+        and vram ranges of this context with the ones from a file written by
+        `saveContextToBinaryFile`.
+        """
+        with contextPath.open("rb") as f:
+            ContextBinaryFile.loadContext(self, f)
+
 
     @staticmethod
     def addParametersToArgParse(parser: argparse.ArgumentParser):
         contextParser = parser.add_argument_group("Context configuration")
 
         contextParser.add_argument("--save-context", help="Saves the context to a file", metavar="FILENAME")
+        contextParser.add_argument("--save-context-binary", help="Saves the whole context to a binary file after analyzing the input, which can be loaded back with --load-context", metavar="FILENAME")
+        contextParser.add_argument("--load-context", help="Loads a context saved with --save-context-binary instead of filling the built-in symbols and reading the symbols csvs. Running again with the same arguments gives the same output as the run which saved it", metavar="FILENAME")
 
 
         csvConfig = parser.add_argument_group("Context .csv input files")
@@ -215,6 +462,11 @@ class Context:
 
 
     def parseArgs(self, args: argparse.Namespace):
+        if args.load_context is not None:
+            # The saved context already has the built-in symbols and the ones from the csvs
+            self.loadContextFromBinaryFile(Path(args.load_context))
+            return
+
         if args.default_banned != False:
             self.fillDefaultBannedSymbols()
         if args.libultra_syms != False:
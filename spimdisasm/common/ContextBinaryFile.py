@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+"""
+Compact binary format for saving and loading a whole `Context`.
+
+The file is columnar: every property of the symbols is stored as its own
+little-endian integer array, using the narrowest item type that fits the
+values of the column, so it can be written and read back in bulk without
+parsing any text. Symbols reference each other by their index on the file.
+Optional integers are stored as their value plus one, 0 meaning `None`.
+
+Layout:
+- Magic and format version.
+- String table. Every string is referenced by its index plus one, 0 meaning
+  `None`.
+- Segments table, followed by the `newPointersInData` of every segment.
+- Symbols columns. The symbols of each segment are stored in the same order as
+  the segments table, first the symbols and then the constants. Symbols which
+  are referenced by others but are not part of any segment are stored at the
+  end.
+- Relocation overrides, banned symbols, vram ranges and $gp accesses.
+
+The `nameGetCallback` of the symbols is not saved. The reference counter and
+the failed string decoding flags of the symbols, and the `newPointersInData`
+of the segments, are reset when loading, since the analysis fills them again
+and they would accumulate otherwise.
+"""
+
+from __future__ import annotations
+
+from array import array
+import sys
+from typing import BinaryIO, TYPE_CHECKING
+
+import rabbitizer
+
+from .SortedDict import SortedDict
+from .FileSectionType import FileSectionType
+from .ContextSymbols import SymbolSpecialType, ContextSymbol
+from .Relocation import RelocType, RelocationInfo, RelocationStaticReference
+from .GpAccesses import SmallSection
+
+if TYPE_CHECKING:
+    from .Context import Context
+    from .SymbolsSegment import SymbolsSegment
+
+
+MAGIC = b"SPIMDISASM_CTX\0\0"
+FORMAT_VERSION = 1
+
+_SEGMENT_GLOBAL = 0
+_SEGMENT_UNKNOWN = 1
+_SEGMENT_OVERLAY = 2
+
+_accessTypesByValue: dict[int, rabbitizer.Enum] = {
+    accessType.value: accessType
+    for accessType in (getattr(rabbitizer.AccessType, attr) for attr in dir(rabbitizer.AccessType) if not attr.startswith("_"))
+    if isinstance(accessType, rabbitizer.Enum)
+}
+
+assert array("i").itemsize == 4 and array("q").itemsize == 8
+
+
+class _Writer:
+    def __init__(self, f: BinaryIO):
+        self.f = f
+
+        self.strings: list[str] = list()
+        self._stringsIndices: dict[str, int] = dict()
+
+    def getStringIndex(self, string: str|None) -> int:
+        if string is None:
+            return 0
+        index = self._stringsIndices.get(string)
+        if index is None:
+            self.strings.append(string)
+            index = len(self.strings)
+            self._stringsIndices[string] = index
+        return index
+
+    def writeArray(self, values: list[int]) -> None:
+        # Use the narrowest item type that fits every value of the column
+        typecode = "q"
+        if len(values) != 0:
+            low = min(values)
+            high = max(values)
+            for candidate, bits in (("b", 8), ("h", 16), ("i", 32)):
+                if -(1 << (bits - 1)) <= low and high < (1 << (bits - 1)):
+                    typecode = candidate
+                    break
+        arr = array(typecode, values)
+        if sys.byteorder == "big":
+            arr.byteswap()
+        self.f.write(typecode.encode("ascii"))
+        self.f.write(len(arr).to_bytes(8, "little"))
+        self.f.write(arr.tobytes())
+
+    def writeStrings(self) -> None:
+        self.writeArray([len(string) for string in self.strings])
+        blob = "".join(self.strings).encode("utf-8")
+        self.f.write(len(blob).to_bytes(8, "little"))
+        self.f.write(blob)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.offset = 0
+
+        self.strings: list[str|None] = [None]
+
+    def readBytes(self, size: int) -> memoryview:
+        if self.offset + size > len(self.data):
+            raise RuntimeError("Unexpected end of file")
+        result = self.data[self.offset:self.offset+size]
+        self.offset += size
+        return result
+
+    def readCount(self) -> int:
+        return int.from_bytes(self.readBytes(8), "little")
+
+    def readArray(self) -> array:
+        typecode = str(self.readBytes(1), "ascii")
+        if typecode not in {"b", "h", "i", "q"}:
+            raise RuntimeError(f"Invalid column type '{typecode}'")
+        arr = array(typecode)
+        count = self.readCount()
+        arr.frombytes(self.readBytes(count * arr.itemsize))
+        if sys.byteorder == "big":
+            arr.byteswap()
+        return arr
+
+    def readStrings(self) -> None:
+        lengths = self.readArray()
+        blob = str(self.readBytes(self.readCount()), "utf-8")
+        offset = 0
+        for length in lengths:
+            self.strings.append(blob[offset:offset+length])
+            offset += length
+
+
+def _optional(value: int|None) -> int:
+    return 0 if value is None else value + 1
+
+def _fromOptional(value: int) -> int|None:
+    return None if value == 0 else value - 1
+
+
+def _getSegments(context: Context) -> list[tuple[int, SymbolsSegment]]:
+    segments = [(_SEGMENT_GLOBAL, context.globalSegment), (_SEGMENT_UNKNOWN, context.unknownSegment)]
+    for segmentsPerVrom in context.overlaySegments.values():
+        for segment in segmentsPerVrom.values():
+            segments.append((_SEGMENT_OVERLAY, segment))
+    return segments
+
+
+def saveContext(context: Context, f: BinaryIO) -> None:
+    writer = _Writer(f)
+
+    segments = _getSegments(context)
+
+    symbolsList: list[ContextSymbol] = list()
+    # Symbols compare equal by their address, so index them by their identity instead
+    symbolsIndices: dict[int, int] = dict()
+
+    def getSymbolIndex(contextSym: ContextSymbol|None) -> int:
+        if contextSym is None:
+            return -1
+        index = symbolsIndices.get(id(contextSym))
+        if index is None:
+            index = len(symbolsList)
+            symbolsList.append(contextSym)
+            symbolsIndices[id(contextSym)] = index
+        return index
+
+    segmentsColumns: list[list[int]] = [[] for _ in range(9)]
+    pointersInData: list[int] = list()
+    for segmentKind, segment in segments:
+        for contextSym in segment.symbols.values():
+            getSymbolIndex(contextSym)
+        for contextSym in segment.constants.values():
+            getSymbolIndex(contextSym)
+        pointersInData.extend(segment.newPointersInData)
+
+        for column, value in zip(segmentsColumns, (
+            segmentKind, writer.getStringIndex(segment.overlayCategory),
+            _optional(segment.vromStart), _optional(segment.vromEnd), segment.vramStart, segment.vramEnd,
+            len(segment.symbols), len(segment.constants), len(segment.newPointersInData),
+        )):
+            column.append(value)
+
+    relocsColumns: list[list[int]] = [[] for _ in range(8)]
+    for vrom, relocInfo in context.globalRelocationOverrides.items():
+        if isinstance(relocInfo.symbol, ContextSymbol):
+            relocSymIndex = getSymbolIndex(relocInfo.symbol)
+            relocSymName = 0
+        else:
+            relocSymIndex = -1
+            relocSymName = writer.getStringIndex(relocInfo.symbol)
+        staticReference = relocInfo.staticReference
+        for column, value in zip(relocsColumns, (
+            vrom, relocInfo.relocType.value, relocSymIndex, relocSymName, relocInfo.addend,
+            0 if staticReference is None else staticReference.sectionType.value,
+            0 if staticReference is None else staticReference.sectionVram,
+            int(relocInfo.globalReloc),
+        )):
+            column.append(value)
+
+    def getTypeValue(symType: SymbolSpecialType|str|None) -> int:
+        if isinstance(symType, SymbolSpecialType):
+            return -symType.value
+        return writer.getStringIndex(symType)
+
+    symbolsColumns: list[list[int]] = [[] for _ in range(20)]
+    relationsCounts: list[list[int]] = [[] for _ in range(4)]
+    relationsIndices: list[int] = list()
+
+    # Referenced symbols which are not part of any segment are appended to the list while iterating it
+    i = 0
+    while i < len(symbolsList):
+        contextSym = symbolsList[i]
+        i += 1
+
+        accessType = contextSym.accessType
+        for column, value in zip(symbolsColumns, (
+            contextSym.address,
+            writer.getStringIndex(contextSym.name),
+            writer.getStringIndex(contextSym.nameEnd),
+            _optional(contextSym.userDeclaredSize),
+            _optional(contextSym.autodetectedSize),
+            getTypeValue(contextSym.userDeclaredType),
+            getTypeValue(contextSym.autodetectedType),
+            -1 if accessType is None else accessType.value,
+            -1 if contextSym.unsignedAccessType is None else int(contextSym.unsignedAccessType),
+            _optional(contextSym.vromAddress),
+            contextSym.sectionType.value,
+            contextSym.referenceCounter,
+            getSymbolIndex(contextSym.parentFunction),
+            writer.getStringIndex(contextSym.parentFileName),
+            _optional(contextSym.inFileOffset),
+            writer.getStringIndex(contextSym.overlayCategory),
+            _optional(contextSym.gotIndex),
+            getSymbolIndex(contextSym.autoCreatedPadMainSymbol),
+            _optional(contextSym.firstLoAccess),
+            contextSym._flags,
+        )):
+            column.append(value)
+
+        for counts, relation in zip(relationsCounts, (
+            contextSym._referenceFunctions, contextSym._referenceSymbols,
+            None if contextSym._branchLabels is None else contextSym._branchLabels.values(),
+            None if contextSym._jumpTables is None else contextSym._jumpTables.values(),
+        )):
+            if relation is None:
+                # Keep the difference between a container which was never allocated and an empty one
+                counts.append(0)
+                continue
+            indices = [getSymbolIndex(relatedSym) for relatedSym in relation]
+            if isinstance(relation, set):
+                # The iteration order of sets depends on their history, sort them so the output is reproducible
+                indices.sort()
+            relationsIndices.extend(indices)
+            counts.append(len(indices) + 1)
+
+    f.write(MAGIC)
+    f.write(FORMAT_VERSION.to_bytes(4, "little"))
+
+    # Strings go first so they can be resolved while reading everything else
+    writer.writeStrings()
+
+    for column in segmentsColumns:
+        writer.writeArray(column)
+    writer.writeArray(pointersInData)
+
+    for column in symbolsColumns:
+        writer.writeArray(column)
+    for counts in relationsCounts:
+        writer.writeArray(counts)
+    writer.writeArray(relationsIndices)
+
+    for column in relocsColumns:
+        writer.writeArray(column)
+
+    writer.writeArray(sorted(context.bannedSymbols))
+    writer.writeArray([bannedRange.start for bannedRange in context.bannedRangedSymbols])
+    writer.writeArray([bannedRange.end for bannedRange in context.bannedRangedSymbols])
+
+    totalVramRange = context.totalVramRange
+    writer.writeArray([totalVramRange.mainAddressRange.start, totalVramRange.mainAddressRange.end, int(context._defaultVramRanges)])
+    writer.writeArray([specialRange.start for specialRange in totalVramRange.specialRanges])
+    writer.writeArray([specialRange.end for specialRange in totalVramRange.specialRanges])
+
+    got = context.gpAccesses.got
+    writer.writeArray([_optional(got.tableAddress)])
+    writer.writeArray(got.localsTable)
+    writer.writeArray(got.globalsTable)
+    writer.writeArray([smallSection.address for smallSection in context.gpAccesses.smallSections.values()])
+    writer.writeArray([smallSection.size for smallSection in context.gpAccesses.smallSections.values()])
+
+
+def loadContext(context: Context, f: BinaryIO) -> None:
+    data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise RuntimeError("Not a context file: wrong magic")
+    reader = _Reader(data)
+    reader.offset = len(MAGIC)
+    version = int.from_bytes(reader.readBytes(4), "little")
+    if version != FORMAT_VERSION:
+        raise RuntimeError(f"Unsupported context file version {version}, expected {FORMAT_VERSION}")
+
+    reader.readStrings()
+    strings = reader.strings
+
+    segmentsColumns = [reader.readArray() for _ in range(9)]
+    # The `newPointersInData` of the segments are not loaded
+    reader.readArray()
+
+    symbolsColumns = [reader.readArray() for _ in range(20)]
+    relationsCounts = [reader.readArray() for _ in range(4)]
+    relationsIndices = reader.readArray()
+
+    def getType(value: int) -> SymbolSpecialType|str|None:
+        if value < 0:
+            return SymbolSpecialType(-value)
+        return strings[value]
+
+    # Create every symbol first, so they can reference each other
+    symbolsList: list[ContextSymbol] = list()
+    for (address, name, nameEnd, userDeclaredSize, autodetectedSize, userDeclaredType, autodetectedType, accessType, unsignedAccessType,
+         vromAddress, sectionType, _, _, parentFileName, inFileOffset, overlayCategory, gotIndex, _, firstLoAccess, flags) in zip(*symbolsColumns):
+        contextSym = ContextSymbol(
+            address,
+            name=strings[name],
+            nameEnd=strings[nameEnd],
+            userDeclaredSize=_fromOptional(userDeclaredSize),
+            autodetectedSize=_fromOptional(autodetectedSize),
+            userDeclaredType=getType(userDeclaredType),
+            autodetectedType=getType(autodetectedType),
+            accessType=None if accessType < 0 else _accessTypesByValue[accessType],
+            unsignedAccessType=None if unsignedAccessType < 0 else bool(unsignedAccessType),
+            vromAddress=_fromOptional(vromAddress),
+            sectionType=FileSectionType(sectionType),
+            referenceCounter=0,
+            parentFileName=strings[parentFileName],
+            inFileOffset=_fromOptional(inFileOffset),
+            overlayCategory=strings[overlayCategory],
+            gotIndex=_fromOptional(gotIndex),
+            firstLoAccess=_fromOptional(firstLoAccess),
+        )
+        contextSym._flags = flags
+        contextSym.failedStringDecoding = False
+        contextSym.failedPascalStringDecoding = False
+        symbolsList.append(contextSym)
+
+    parentFunctions = symbolsColumns[12]
+    padMainSymbols = symbolsColumns[17]
+    referenceFunctionsCounts, referenceSymbolsCounts, branchLabelsCounts, jumpTablesCounts = relationsCounts
+    relationIndex = 0
+    for i, contextSym in enumerate(symbolsList):
+        if parentFunctions[i] >= 0:
+            contextSym.parentFunction = symbolsList[parentFunctions[i]]
+        if padMainSymbols[i] >= 0:
+            contextSym.autoCreatedPadMainSymbol = symbolsList[padMainSymbols[i]]
+
+        count = referenceFunctionsCounts[i]
+        if count != 0:
+            contextSym.referenceFunctions = {symbolsList[index] for index in relationsIndices[relationIndex:relationIndex+count-1]}
+            relationIndex += count - 1
+        count = referenceSymbolsCounts[i]
+        if count != 0:
+            contextSym.referenceSymbols = {symbolsList[index] for index in relationsIndices[relationIndex:relationIndex+count-1]}
+            relationIndex += count - 1
+        count = branchLabelsCounts[i]
+        if count != 0:
+            contextSym.branchLabels = SortedDict()
+            for index in relationsIndices[relationIndex:relationIndex+count-1]:
+                contextSym.branchLabels[symbolsList[index].address] = symbolsList[index]
+            relationIndex += count - 1
+        count = jumpTablesCounts[i]
+        if count != 0:
+            contextSym.jumpTables = SortedDict()
+            for index in relationsIndices[relationIndex:relationIndex+count-1]:
+                contextSym.jumpTables[symbolsList[index].address] = symbolsList[index]
+            relationIndex += count - 1
+
+    context.overlaySegments = dict()
+    symbolIndex = 0
+    for segmentKind, overlayCategory, vromStart, vromEnd, vramStart, vramEnd, symbolsCount, constantsCount, _ in zip(*segmentsColumns):
+        segmentVromStart = _fromOptional(vromStart)
+        segmentVromEnd = _fromOptional(vromEnd)
+        if segmentKind == _SEGMENT_OVERLAY:
+            category = strings[overlayCategory]
+            assert category is not None and segmentVromStart is not None and segmentVromEnd is not None
+            segment = context.addOverlaySegment(category, segmentVromStart, segmentVromEnd, vramStart, vramEnd)
+        else:
+            segment = context.globalSegment if segmentKind == _SEGMENT_GLOBAL else context.unknownSegment
+            segment.vromStart = segmentVromStart
+            segment.vromEnd = segmentVromEnd
+            segment.vramStart = vramStart
+            segment.vramEnd = vramEnd
+
+        segment.symbols = SortedDict()
+        for contextSym in symbolsList[symbolIndex:symbolIndex+symbolsCount]:
+            segment.symbols[contextSym.address] = contextSym
+        symbolIndex += symbolsCount
+
+        segment.constants = dict()
+        for contextSym in symbolsList[symbolIndex:symbolIndex+constantsCount]:
+            segment.constants[contextSym.address] = contextSym
+        symbolIndex += constantsCount
+
+        segment.newPointersInData = SortedDict()
+    context.invalidateOverlaySegmentsIndex()
+
+    context.globalRelocationOverrides = dict()
+    for vrom, relocType, relocSymIndex, relocSymName, addend, staticSectionType, staticSectionVram, globalReloc in zip(*(reader.readArray() for _ in range(8))):
+        relocSym: ContextSymbol|str|None = symbolsList[relocSymIndex] if relocSymIndex >= 0 else strings[relocSymName]
+        assert relocSym is not None
+        staticReference = None
+        # There's no section type with a value of 0
+        if staticSectionType != 0:
+            staticReference = RelocationStaticReference(FileSectionType(staticSectionType), staticSectionVram)
+        context.globalRelocationOverrides[vrom] = RelocationInfo(RelocType(relocType), relocSym, addend, staticReference, bool(globalReloc))
+
+    context.bannedSymbols = set(reader.readArray())
+    context.clearBannedSymbolRanges()
+    context.addBannedSymbolRanges(zip(reader.readArray(), reader.readArray()))
+
+    mainStart, mainEnd, defaultVramRanges = reader.readArray()
+    totalVramRange = context.totalVramRange
+    totalVramRange.mainAddressRange.start = mainStart
+    totalVramRange.mainAddressRange.end = mainEnd
+    context._defaultVramRanges = bool(defaultVramRanges)
+    totalVramRange.clearSpecialRanges()
+    for start, end in zip(reader.readArray(), reader.readArray()):
+        totalVramRange.addSpecialRange(start, end)
+
+    got = context.gpAccesses.got
+    got.tableAddress = _fromOptional(reader.readArray()[0])
+    got.localsTable = list(reader.readArray())
+    got.globalsTable = list(reader.readArray())
+    context.gpAccesses.smallSections = SortedDict()
+    for address, size in zip(reader.readArray(), reader.readArray()):
+        context.gpAccesses.smallSections[address] = SmallSection(address, size)
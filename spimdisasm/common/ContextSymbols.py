@@ -7,7 +7,7 @@ from __future__ import annotations
 
 import dataclasses
 import enum
-from typing import Callable
+from typing import Callable, Generator
 import rabbitizer
 
 from .GlobalConfig import GlobalConfig, Compiler
@@ -97,109 +97,263 @@ for kind in gAccessKinds.values():
     gKnownTypes |= kind.getAllTypes()
 
 
-@dataclasses.dataclass
-class ContextSymbol:
-    address: int
-    name: str|None = None
-    nameEnd: str|None = None
-    userDeclaredSize: int|None = None
-    autodetectedSize: int|None = None
-    userDeclaredType: SymbolSpecialType|str|None = None
-    autodetectedType: SymbolSpecialType|str|None = None
-
-    accessType: rabbitizer.Enum|None = None
-    unsignedAccessType: bool|None = None
-
-    vromAddress: int|None = None
-
-    sectionType: FileSectionType = FileSectionType.Unknown
-
-    isDefined: bool = False
-    "This symbol exists in any of the analyzed sections"
-    isUserDeclared: bool = False
-    "Declared externally by the user, but it may have not been found yet"
-    isAutogenerated: bool = False
-    "This symbol was automatically generated by the disassembler"
-
-    isMaybeString: bool = False
-    failedStringDecoding: bool = False
-
-    isMaybePascalString: bool = False
-    failedPascalStringDecoding: bool = False
+def _flagProperty(flag: int, doc: str|None=None) -> property:
+    def getter(self: ContextSymbol) -> bool:
+        return (self._flags & flag) != 0
 
-    referenceCounter: int = 0
-    "How much this symbol is referenced by something else"
-
-    referenceFunctions: set[ContextSymbol] = dataclasses.field(default_factory=set)
-    "Which functions reference this symbol"
-    referenceSymbols: set[ContextSymbol] = dataclasses.field(default_factory=set)
-    "Which symbols reference this symbol"
-
-    parentFunction: ContextSymbol|None = None
-    "Parent function for branch labels, jump tables, and jump table labels"
-    branchLabels: SortedDict[ContextSymbol] = dataclasses.field(default_factory=SortedDict)
-    "For functions, the branch and jump table labels which are contained in this function"
-    jumpTables: SortedDict[ContextSymbol] = dataclasses.field(default_factory=SortedDict)
-    "For functions, the jump tables which are contained in this function"
+    def setter(self: ContextSymbol, value: bool) -> None:
+        if value:
+            self._flags |= flag
+        else:
+            self._flags &= ~flag
 
-    parentFileName: str|None = None
-    "Name of the file containing this symbol"
-    inFileOffset: int|None = None
-    "Offset relative to the start of the file"
+    return property(getter, setter, doc=doc)
 
-    overlayCategory: str|None = None
 
-    nameGetCallback: Callable[[ContextSymbol], str]|None = None
-    """Used to register a name of a symbol which may change in the future outside of here
+class ContextSymbol:
+    # Slotted to reduce the memory usage of each symbol, since the context
+    # may hold a lot of them.
+    # The boolean flags are packed on the `_flags` bitfield and the containers
+    # which are only used by a few kinds of symbols are allocated on first use.
+    __slots__ = (
+        "address",
+        "name",
+        "nameEnd",
+        "userDeclaredSize",
+        "autodetectedSize",
+        "userDeclaredType",
+        "autodetectedType",
+        "accessType",
+        "unsignedAccessType",
+        "vromAddress",
+        "sectionType",
+        "referenceCounter",
+        "_referenceFunctions",
+        "_referenceSymbols",
+        "parentFunction",
+        "_branchLabels",
+        "_jumpTables",
+        "parentFileName",
+        "inFileOffset",
+        "overlayCategory",
+        "nameGetCallback",
+        "gotIndex",
+        "autoCreatedPadMainSymbol",
+        "firstLoAccess",
+        "_flags",
+    )
+
+    def __init__(
+        self,
+        address: int,
+        name: str|None = None,
+        nameEnd: str|None = None,
+        userDeclaredSize: int|None = None,
+        autodetectedSize: int|None = None,
+        userDeclaredType: SymbolSpecialType|str|None = None,
+        autodetectedType: SymbolSpecialType|str|None = None,
+        accessType: rabbitizer.Enum|None = None,
+        unsignedAccessType: bool|None = None,
+        vromAddress: int|None = None,
+        sectionType: FileSectionType = FileSectionType.Unknown,
+        isDefined: bool = False,
+        isUserDeclared: bool = False,
+        isAutogenerated: bool = False,
+        isMaybeString: bool = False,
+        failedStringDecoding: bool = False,
+        isMaybePascalString: bool = False,
+        failedPascalStringDecoding: bool = False,
+        referenceCounter: int = 0,
+        referenceFunctions: set[ContextSymbol]|None = None,
+        referenceSymbols: set[ContextSymbol]|None = None,
+        parentFunction: ContextSymbol|None = None,
+        branchLabels: SortedDict[ContextSymbol]|None = None,
+        jumpTables: SortedDict[ContextSymbol]|None = None,
+        parentFileName: str|None = None,
+        inFileOffset: int|None = None,
+        overlayCategory: str|None = None,
+        nameGetCallback: Callable[[ContextSymbol], str]|None = None,
+        unknownSegment: bool = False,
+        isGot: bool = False,
+        isGotGlobal: bool = False,
+        isGotLocal: bool = False,
+        gotIndex: int|None = None,
+        accessedAsGpRel: bool = False,
+        _isStatic: bool = False,
+        isAutoCreatedPad: bool = False,
+        autoCreatedPadMainSymbol: ContextSymbol|None = None,
+        firstLoAccess: int|None = None,
+        isElfNotype: bool = False,
+        forceMigration: bool = False,
+        forceNotMigration: bool = False,
+        allowedToReferenceAddends: bool = False,
+        notAllowedToReferenceAddends: bool = False,
+        allowedToReferenceConstants: bool = False,
+        notAllowedToReferenceConstants: bool = False,
+        isAutocreatedSymFromOtherSizedSym: bool = False,
+        isMips1Double: bool = False,
+    ):
+        self.address: int = address
+        self.name: str|None = name
+        self.nameEnd: str|None = nameEnd
+        self.userDeclaredSize: int|None = userDeclaredSize
+        self.autodetectedSize: int|None = autodetectedSize
+        self.userDeclaredType: SymbolSpecialType|str|None = userDeclaredType
+        self.autodetectedType: SymbolSpecialType|str|None = autodetectedType
+
+        self.accessType: rabbitizer.Enum|None = accessType
+        self.unsignedAccessType: bool|None = unsignedAccessType
+
+        self.vromAddress: int|None = vromAddress
+
+        self.sectionType: FileSectionType = sectionType
+
+        self.referenceCounter: int = referenceCounter
+        "How much this symbol is referenced by something else"
+
+        self._referenceFunctions: set[ContextSymbol]|None = referenceFunctions
+        self._referenceSymbols: set[ContextSymbol]|None = referenceSymbols
+
+        self.parentFunction: ContextSymbol|None = parentFunction
+        "Parent function for branch labels, jump tables, and jump table labels"
+        self._branchLabels: SortedDict[ContextSymbol]|None = branchLabels
+        self._jumpTables: SortedDict[ContextSymbol]|None = jumpTables
+
+        self.parentFileName: str|None = parentFileName
+        "Name of the file containing this symbol"
+        self.inFileOffset: int|None = inFileOffset
+        "Offset relative to the start of the file"
+
+        self.overlayCategory: str|None = overlayCategory
+
+        self.nameGetCallback: Callable[[ContextSymbol], str]|None = nameGetCallback
+        """Used to register a name of a symbol which may change in the future outside of here
+
+        The only parameter is the ContextSymbol itself, and it should return a string containing the name of the symbol.
+
+        Used by .getName() instead of using the setted name or the default generated name.
+        """
+
+        self.gotIndex: int|None = gotIndex
+
+        self.autoCreatedPadMainSymbol: ContextSymbol|None = autoCreatedPadMainSymbol
+
+        self.firstLoAccess: int|None = firstLoAccess
+
+        self._flags: int = 0
+        flagValues = (
+            isDefined, isUserDeclared, isAutogenerated,
+            isMaybeString, failedStringDecoding, isMaybePascalString, failedPascalStringDecoding,
+            unknownSegment, isGot, isGotGlobal, isGotLocal, accessedAsGpRel, _isStatic,
+            isAutoCreatedPad, isElfNotype, forceMigration, forceNotMigration,
+            allowedToReferenceAddends, notAllowedToReferenceAddends,
+            allowedToReferenceConstants, notAllowedToReferenceConstants,
+            isAutocreatedSymFromOtherSizedSym, isMips1Double,
+        )
+        for i, value in enumerate(flagValues):
+            if value:
+                self._flags |= 1 << i
+
+
+    isDefined = _flagProperty(1 << 0, "This symbol exists in any of the analyzed sections")
+    isUserDeclared = _flagProperty(1 << 1, "Declared externally by the user, but it may have not been found yet")
+    isAutogenerated = _flagProperty(1 << 2, "This symbol was automatically generated by the disassembler")
+
+    isMaybeString = _flagProperty(1 << 3)
+    failedStringDecoding = _flagProperty(1 << 4)
+
+    isMaybePascalString = _flagProperty(1 << 5)
+    failedPascalStringDecoding = _flagProperty(1 << 6)
+
+    unknownSegment = _flagProperty(1 << 7)
+
+    isGot = _flagProperty(1 << 8)
+    isGotGlobal = _flagProperty(1 << 9)
+    isGotLocal = _flagProperty(1 << 10)
+
+    accessedAsGpRel = _flagProperty(1 << 11)
+
+    _isStatic = _flagProperty(1 << 12)
 
-    The only parameter is the ContextSymbol itself, and it should return a string containing the name of the symbol.
+    isAutoCreatedPad = _flagProperty(1 << 13)
 
-    Used by .getName() instead of using the setted name or the default generated name.
-    """
+    isElfNotype = _flagProperty(1 << 14)
 
-    unknownSegment: bool = False
+    forceMigration = _flagProperty(1 << 15, """Ignore rules for migrating rodata and force migration of this symbol to any
+    function which references it.
 
-    isGot: bool = False
-    isGotGlobal: bool = False
-    isGotLocal: bool = False
-    gotIndex: int|None = None
+    Enabling both forceMigration and forceNotMigration on the same symbol is
+    undefined behaviour.
+    """)
+    forceNotMigration = _flagProperty(1 << 16, """Ignore rules for migrating rodata and prevent migration of this symbol to any
+    function which references it.
 
-    accessedAsGpRel: bool = False
+    Enabling both forceMigration and forceNotMigration on the same symbol is
+    undefined behaviour.
+    """)
 
-    _isStatic: bool = False
+    allowedToReferenceAddends = _flagProperty(1 << 17)
+    notAllowedToReferenceAddends = _flagProperty(1 << 18)
 
-    isAutoCreatedPad: bool = False
-    autoCreatedPadMainSymbol: ContextSymbol|None = None
+    allowedToReferenceConstants = _flagProperty(1 << 19)
+    notAllowedToReferenceConstants = _flagProperty(1 << 20)
 
-    firstLoAccess: int|None = None
+    isAutocreatedSymFromOtherSizedSym = _flagProperty(1 << 21)
+    isMips1Double = _flagProperty(1 << 22)
 
-    isElfNotype: bool = False
+    referencesAnalyzed = _flagProperty(1 << 23, "The words of this symbol were already checked for references to other symbols")
 
-    forceMigration: bool = False
-    """Ignore rules for migrating rodata and force migration of this symbol to any
-    function which references it.
 
-    Enabling both forceMigration and forceNotMigration on the same symbol is
-    undefined behaviour.
-    """
-    forceNotMigration: bool = False
-    """Ignore rules for migrating rodata and prevent migration of this symbol to any
-    function which references it.
+    @property
+    def referenceFunctions(self) -> set[ContextSymbol]:
+        "Which functions reference this symbol"
+        if self._referenceFunctions is None:
+            self._referenceFunctions = set()
+        return self._referenceFunctions
 
-    Enabling both forceMigration and forceNotMigration on the same symbol is
-    undefined behaviour.
-    """
+    @referenceFunctions.setter
+    def referenceFunctions(self, value: set[ContextSymbol]) -> None:
+        self._referenceFunctions = value
 
-    allowedToReferenceAddends: bool = False
-    notAllowedToReferenceAddends: bool = False
+    @property
+    def referenceSymbols(self) -> set[ContextSymbol]:
+        "Which symbols reference this symbol"
+        if self._referenceSymbols is None:
+            self._referenceSymbols = set()
+        return self._referenceSymbols
 
-    allowedToReferenceConstants: bool = False
-    notAllowedToReferenceConstants: bool = False
+    @referenceSymbols.setter
+    def referenceSymbols(self, value: set[ContextSymbol]) -> None:
+        self._referenceSymbols = value
 
-    isAutocreatedSymFromOtherSizedSym: bool = False
+    @property
+    def branchLabels(self) -> SortedDict[ContextSymbol]:
+        "For functions, the branch and jump table labels which are contained in this function"
+        if self._branchLabels is None:
+            self._branchLabels = SortedDict()
+        return self._branchLabels
 
-    isMips1Double: bool = False
+    @branchLabels.setter
+    def branchLabels(self, value: SortedDict[ContextSymbol]) -> None:
+        self._branchLabels = value
 
+    @property
+    def jumpTables(self) -> SortedDict[ContextSymbol]:
+        "For functions, the jump tables which are contained in this function"
+        if self._jumpTables is None:
+            self._jumpTables = SortedDict()
+        return self._jumpTables
+
+    @jumpTables.setter
+    def jumpTables(self, value: SortedDict[ContextSymbol]) -> None:
+        self._jumpTables = value
+
+    def iterReferencingSymbols(self) -> Generator[ContextSymbol, None, None]:
+        "Iterates every function and symbol which references this symbol, without allocating the reference sets"
+        if self._referenceFunctions is not None:
+            yield from self._referenceFunctions
+        if self._referenceSymbols is not None:
+            yield from self._referenceSymbols
 
     @property
     def vram(self) -> int:
@@ -418,11 +572,11 @@ class ContextSymbol:
     def _defaultName_uniqueIdentifier(self, symType: SymbolSpecialType|str|None) -> str:
         if GlobalConfig.SEQUENTIAL_LABEL_NAMES and self.parentFunction is not None:
             if symType in {SymbolSpecialType.branchlabel, SymbolSpecialType.jumptablelabel}:
-                index = self.parentFunction.branchLabels.index(self.vram)
+                index = self.parentFunction._branchLabels.index(self.vram) if self.parentFunction._branchLabels is not None else None
                 if index is not None:
                     return f"{self.parentFunction.getName()}_{index + 1}"
             elif symType == SymbolSpecialType.jumptable:
-                index = self.parentFunction.jumpTables.index(self.vram)
+                index = self.parentFunction._jumpTables.index(self.vram) if self.parentFunction._jumpTables is not None else None
                 if index is not None:
                     return f"{self.parentFunction.getName()}_{index + 1}"
 
@@ -626,15 +780,15 @@ class ContextSymbol:
         if not GlobalConfig.ASM_COMMENT or not GlobalConfig.ASM_REFERENCEE_SYMBOLS:
             return ""
 
-        if len(self.referenceFunctions):
+        if self._referenceFunctions:
             output = "/* Functions referencing this symbol:"
-            for sym in self.referenceFunctions:
+            for sym in self._referenceFunctions:
                 output += f" {sym.getName()}"
             return f"{output} */{GlobalConfig.LINE_ENDS}"
 
-        if len(self.referenceSymbols):
+        if self._referenceSymbols:
             output = "/* Symbols referencing this symbol:"
-            for sym in self.referenceSymbols:
+            for sym in self._referenceSymbols:
                 output += f" {sym.getName()}"
             return f"{output} */{GlobalConfig.LINE_ENDS}"
         return ""
@@ -711,6 +865,9 @@ class ContextSymbol:
         return output
 
 
+    def __repr__(self) -> str:
+        return f"ContextSymbol(address=0x{self.address:08X}, name={self.name!r}, vromAddress={self.vromAddress}, sectionType={self.sectionType})"
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, ContextSymbol):
             return False
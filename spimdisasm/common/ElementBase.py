@@ -5,6 +5,7 @@
 
 from __future__ import annotations
 
+from array import array
 from typing import Generator
 
 from .GlobalConfig import GlobalConfig
@@ -18,7 +19,7 @@ class ElementBase:
     """Represents the base class used for most file sections and symbols.
     """
 
-    def __init__(self, context: Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, name: str, words: list[int], sectionType: FileSectionType, segmentVromStart: int, overlayCategory: str|None):
+    def __init__(self, context: Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, name: str, words: list[int]|array[int]|memoryview, sectionType: FileSectionType, segmentVromStart: int, overlayCategory: str|None):
         """Constructor
 
         Args:
@@ -28,7 +29,7 @@ class ElementBase:
             inFileOffset (int): The offset of this element relative to the start of its file. It is also used to generate the first column of the disassembled line comment
             vram (int): The VRAM address of this element
             name (str): The name of this element
-            words (list[int]): A list of words (4 bytes) corresponding to this element
+            words (list[int]|array[int]|memoryview): The words (4 bytes) corresponding to this element. May be a view of the words of its parent
             sectionType (FileSectionType): The section type this element corresponds to
         """
 
@@ -38,7 +39,7 @@ class ElementBase:
         self.inFileOffset: int = inFileOffset
         self.vram: int = vram
         self.name: str = name
-        self.words: list[int] = words
+        self.words: list[int]|array[int]|memoryview = words
         self.sectionType: FileSectionType = sectionType
         self.customSectionName: str|None = None
 
@@ -131,6 +132,16 @@ class ElementBase:
         """
         return ""
 
+    def iterDisassembly(self, migrate: bool=False, useGlobalLabel: bool=True) -> Generator[str, None, None]:
+        """Same as `disassemble`, but yields the disassembly in chunks instead
+        of returning a single string, so it can be written to a file without
+        building the whole output in memory.
+
+        Subclasses overriding this method should make `disassemble` join its
+        chunks.
+        """
+        yield self.disassemble(migrate=migrate, useGlobalLabel=useGlobalLabel)
+
 
     def getSegment(self) -> SymbolsSegment:
         if self.overlayCategory is not None:
@@ -196,13 +207,11 @@ class ElementBase:
                         return overlaySegment
 
             # If the vrom was not part of that segment, then check for every other overlay category
-            for overlayCategory, segmentsPerVrom in self.context.overlaySegments.items():
+            for overlayCategory, segmentVrom, overlaySegment in self.context.getOverlaySegmentsIndex().getSegmentsForVrom(vrom):
                 if self.overlayCategory != overlayCategory:
-                    for segmentVrom, overlaySegment in segmentsPerVrom.items():
-                        if vrom < segmentVrom:
-                            continue
-                        if overlaySegment.isVromInRange(vrom):
-                            return overlaySegment
+                    if vrom < segmentVrom:
+                        continue
+                    return overlaySegment
 
         return self.context.unknownSegment
 
@@ -232,14 +241,17 @@ class ElementBase:
                         return contextSym
 
             # If the vram was not part of that segment, then check for every other overlay category
-            for overlayCategory, segmentsPerVrom in self.context.overlaySegments.items():
+            overlaySegmentsIndex = self.context.getOverlaySegmentsIndex()
+            if GlobalConfig.PRODUCE_SYMBOLS_PLUS_OFFSET and tryPlusOffset:
+                candidateSegments = overlaySegmentsIndex.getSegmentsForVram(vramAddress)
+            else:
+                # Only the segments with a symbol at this address can have it
+                candidateSegments = [entry for entry in overlaySegmentsIndex.getSegmentsWithSymbolAt(vramAddress) if entry[2].isVramInRange(vramAddress)]
+            for overlayCategory, _, overlaySegment in candidateSegments:
                 if self.overlayCategory != overlayCategory:
-                    for overlaySegment in segmentsPerVrom.values():
-                        if not overlaySegment.isVramInRange(vramAddress):
-                            continue
-                        contextSym = overlaySegment.getSymbol(vramAddress, tryPlusOffset=tryPlusOffset, checkUpperLimit=checkUpperLimit)
-                        if contextSym is not None:
-                            return contextSym
+                    contextSym = overlaySegment.getSymbol(vramAddress, tryPlusOffset=tryPlusOffset, checkUpperLimit=checkUpperLimit)
+                    if contextSym is not None:
+                        return contextSym
 
         if not checkGlobalSegment:
             return None
@@ -292,6 +292,8 @@ class GlobalConfigType:
     """Ignores words that starts in 0xXX"""
     WRITE_BINARY: bool = False
     """write to files splitted binaries"""
+    ONLY_WRITE_CHANGED_FILES: bool = False
+    """Don't rewrite output files which already have the same contents, keeping their modification time"""
 
 
     def addParametersToArgParse(self, parser: argparse.ArgumentParser):
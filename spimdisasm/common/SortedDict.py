@@ -7,6 +7,7 @@ from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
 import bisect
+import itertools
 from typing import Any, Generator, TypeVar
 
 # typing.Mapping and typing.MutableMapping are deprecated since Python 3.9.
@@ -24,24 +25,116 @@ ValueType = TypeVar("ValueType")
 
 
 class SortedDict(MutableMapping[int, ValueType]):
+    """A dictionary which keeps its keys sorted, allowing to search for the
+    closest keys to an arbitrary value.
+
+    The sorted keys are stored as a list of sorted chunks instead of a single
+    list, so inserting or removing a key only needs to shift the elements of a
+    single small chunk instead of the whole list of keys.
+    """
+
+    _CHUNK_SIZE: int = 512
+    "Chunks are splitted when they grow past twice this size"
+
     def __init__(self, other: Mapping[int, ValueType]|None=None):
         self.map: dict[int, ValueType] = dict()
-        self.sortedKeys: list[int] = list()
+        self._chunks: list[list[int]] = list()
+        self._maxes: list[int] = list()
+        "The greatest key of each chunk"
+        self._offsets: list[int]|None = None
+        "Amount of keys before each chunk. Computed lazily by `index` and discarded when the keys change"
 
         if other is not None:
             for key, value in other.items():
                 self.add(key, value)
 
+    @property
+    def sortedKeys(self) -> list[int]:
+        """Every key, in order.
+
+        Deprecated, kept for compatibility. A new list is built every time this
+        is accessed, so modifying it does not modify the dictionary. Iterate
+        the dictionary instead."""
+        return list(self)
+
+
+    def _bisectLeft(self, key: int) -> tuple[int, int]:
+        """Returns the (chunk, position) pair of the first key which is greater or equal to `key`.
+
+        If there's no such key then the pair points to the end of the chunk list."""
+        chunkIndex = bisect.bisect_left(self._maxes, key)
+        if chunkIndex == len(self._maxes):
+            return chunkIndex, 0
+        return chunkIndex, bisect.bisect_left(self._chunks[chunkIndex], key)
+
+    def _bisectRight(self, key: int) -> tuple[int, int]:
+        """Returns the (chunk, position) pair of the first key which is strictly greater than `key`.
+
+        If there's no such key then the pair points to the end of the chunk list."""
+        chunkIndex = bisect.bisect_right(self._maxes, key)
+        if chunkIndex == len(self._maxes):
+            return chunkIndex, 0
+        return chunkIndex, bisect.bisect_right(self._chunks[chunkIndex], key)
+
+    def _iterKeys(self, start: tuple[int, int], end: tuple[int, int]) -> Generator[int, None, None]:
+        chunkIndex, pos = start
+        endChunkIndex, endPos = end
+        while chunkIndex < endChunkIndex:
+            yield from self._chunks[chunkIndex][pos:]
+            chunkIndex += 1
+            pos = 0
+        if chunkIndex == endChunkIndex and chunkIndex < len(self._chunks):
+            yield from self._chunks[chunkIndex][pos:endPos]
+
 
     def add(self, key: int, value: ValueType) -> None:
         if key not in self.map:
             # Avoid adding the key twice if it is already on the map
-            bisect.insort(self.sortedKeys, key)
+            self._offsets = None
+            if len(self._maxes) == 0:
+                self._chunks.append([key])
+                self._maxes.append(key)
+            else:
+                chunkIndex = bisect.bisect_left(self._maxes, key)
+                if chunkIndex == len(self._maxes):
+                    # Greater than every other key, append it to the last chunk
+                    chunkIndex -= 1
+                    self._chunks[chunkIndex].append(key)
+                    self._maxes[chunkIndex] = key
+                else:
+                    bisect.insort(self._chunks[chunkIndex], key)
+
+                chunk = self._chunks[chunkIndex]
+                if len(chunk) > 2 * self._CHUNK_SIZE:
+                    newChunk = chunk[self._CHUNK_SIZE:]
+                    del chunk[self._CHUNK_SIZE:]
+                    self._maxes[chunkIndex] = chunk[-1]
+                    self._chunks.insert(chunkIndex + 1, newChunk)
+                    self._maxes.insert(chunkIndex + 1, newChunk[-1])
         self.map[key] = value
 
     def remove(self, key: int) -> None:
         del self.map[key]
-        self.sortedKeys.remove(key)
+        self._offsets = None
+
+        chunkIndex, pos = self._bisectLeft(key)
+        chunk = self._chunks[chunkIndex]
+        del chunk[pos]
+
+        if len(chunk) == 0:
+            del self._chunks[chunkIndex]
+            del self._maxes[chunkIndex]
+            return
+
+        self._maxes[chunkIndex] = chunk[-1]
+        if len(chunk) < self._CHUNK_SIZE // 2 and chunkIndex + 1 < len(self._chunks):
+            # Merge small chunks with the next one to avoid ending up with lots of tiny chunks
+            nextChunk = self._chunks[chunkIndex + 1]
+            if len(chunk) + len(nextChunk) <= 2 * self._CHUNK_SIZE:
+                chunk += nextChunk
+                self._maxes[chunkIndex] = chunk[-1]
+                del self._chunks[chunkIndex + 1]
+                del self._maxes[chunkIndex + 1]
 
 
     def getKeyRight(self, key: int, inclusive: bool=True) -> tuple[int, ValueType]|None:
@@ -50,12 +143,15 @@ class SortedDict(MutableMapping[int, ValueType]):
         If `inclusive` is `False`, then the returned pair will be strictly less than the passed `key`.
         """
         if inclusive:
-            index = bisect.bisect_right(self.sortedKeys, key)
+            chunkIndex, pos = self._bisectRight(key)
+        else:
+            chunkIndex, pos = self._bisectLeft(key)
+        if pos > 0:
+            currentKey = self._chunks[chunkIndex][pos - 1]
+        elif chunkIndex > 0:
+            currentKey = self._chunks[chunkIndex - 1][-1]
         else:
-            index = bisect.bisect_left(self.sortedKeys, key)
-        if index == 0:
             return None
-        currentKey = self.sortedKeys[index - 1]
         return currentKey, self.map[currentKey]
 
     def getKeyLeft(self, key: int, inclusive: bool=True) -> tuple[int, ValueType]|None:
@@ -64,12 +160,12 @@ class SortedDict(MutableMapping[int, ValueType]):
         If `inclusive` is `False`, then the returned pair will be strictly greater than the passed `key`.
         """
         if inclusive:
-            index = bisect.bisect_left(self.sortedKeys, key)
+            chunkIndex, pos = self._bisectLeft(key)
         else:
-            index = bisect.bisect_right(self.sortedKeys, key)
-        if index == len(self.sortedKeys):
+            chunkIndex, pos = self._bisectRight(key)
+        if chunkIndex == len(self._chunks):
             return None
-        key = self.sortedKeys[index]
+        key = self._chunks[chunkIndex][pos]
         return key, self.map[key]
 
 
@@ -78,17 +174,16 @@ class SortedDict(MutableMapping[int, ValueType]):
 
         By default the `startKey` is inclusive but the `endKey` isn't, this can be changed with the `startInclusive` and `endInclusive` parameters"""
         if startInclusive:
-            keyIndexStart = bisect.bisect_left(self.sortedKeys, startKey)
+            start = self._bisectLeft(startKey)
         else:
-            keyIndexStart = bisect.bisect_right(self.sortedKeys, startKey)
+            start = self._bisectRight(startKey)
 
         if endInclusive:
-            keyIndexEnd = bisect.bisect_right(self.sortedKeys, endKey)
+            end = self._bisectRight(endKey)
         else:
-            keyIndexEnd = bisect.bisect_left(self.sortedKeys, endKey)
+            end = self._bisectLeft(endKey)
 
-        for index in range(keyIndexStart, keyIndexEnd):
-            key = self.sortedKeys[index]
+        for key in self._iterKeys(start, end):
             yield (key, self.map[key])
 
     def getRangeAndPop(self, startKey: int, endKey: int, startInclusive: bool=True, endInclusive: bool=False) -> Generator[tuple[int, ValueType], None, None]:
@@ -96,17 +191,17 @@ class SortedDict(MutableMapping[int, ValueType]):
 
         Please note this generator iterates in reverse/descending order"""
         if startInclusive:
-            keyIndexStart = bisect.bisect_left(self.sortedKeys, startKey)
+            start = self._bisectLeft(startKey)
         else:
-            keyIndexStart = bisect.bisect_right(self.sortedKeys, startKey)
+            start = self._bisectRight(startKey)
 
         if endInclusive:
-            keyIndexEnd = bisect.bisect_right(self.sortedKeys, endKey)
+            end = self._bisectRight(endKey)
         else:
-            keyIndexEnd = bisect.bisect_left(self.sortedKeys, endKey)
+            end = self._bisectLeft(endKey)
 
-        for index in range(keyIndexEnd-1, keyIndexStart-1, -1):
-            key = self.sortedKeys[index]
+        keys = list(self._iterKeys(start, end))
+        for key in reversed(keys):
             value = self.map[key]
             self.remove(key)
             yield (key, value)
@@ -115,7 +210,10 @@ class SortedDict(MutableMapping[int, ValueType]):
         """Returns the index of the passed `key` in the sorted dictionary, or None if the key is not present."""
         if key not in self.map:
             return None
-        return bisect.bisect_left(self.sortedKeys, key)
+        if self._offsets is None:
+            self._offsets = [0] + list(itertools.accumulate(len(chunk) for chunk in self._chunks[:-1]))
+        chunkIndex, pos = self._bisectLeft(key)
+        return self._offsets[chunkIndex] + pos
 
     def __getitem__(self, key: int) -> ValueType:
         return self.map[key]
@@ -128,8 +226,8 @@ class SortedDict(MutableMapping[int, ValueType]):
 
     def __iter__(self) -> Generator[int, None, None]:
         "Iteration is sorted by keys"
-        for key in self.sortedKeys:
-            yield key
+        for chunk in self._chunks:
+            yield from chunk
 
     def __len__(self) -> int:
         return len(self.map)
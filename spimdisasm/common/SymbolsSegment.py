@@ -5,7 +5,7 @@
 
 from __future__ import annotations
 
-from typing import TextIO, Generator, TYPE_CHECKING
+from typing import Iterable, TextIO, Generator, TYPE_CHECKING
 from pathlib import Path
 
 from . import Utils
@@ -76,6 +76,8 @@ class SymbolsSegment:
         self.vramStart = vramStart
         self.vramEnd = vramEnd
 
+        self.context.invalidateOverlaySegmentsIndex()
+
 
     def vromToVram(self, vrom: int) -> int|None:
         if self.vromStart is None:
@@ -91,6 +93,8 @@ class SymbolsSegment:
             contextSym.sectionType = sectionType
             contextSym.overlayCategory = self.overlayCategory
             self.symbols[address] = contextSym
+            if self.overlayCategory is not None:
+                self.context.overlaySymbolAdded(self, address)
 
         if contextSym.sectionType == FileSectionType.Unknown:
             contextSym.sectionType = sectionType
@@ -135,6 +139,8 @@ class SymbolsSegment:
             return
 
         self.symbols.remove(address)
+        if self.overlayCategory is not None:
+            self.context.overlaySymbolRemoved(self, address)
 
 
     def addConstant(self, constantValue: int, name: str, isAutogenerated: bool=False) -> ContextSymbol:
@@ -501,64 +507,69 @@ class SymbolsSegment:
             return
 
         with filepath.open() as f:
-            for line in f:
-                info, *extra = line.strip().split("//")
-                colonSeparatedPairs = "//".join(extra)
-
-                info = info.strip().strip(";")
-
-                if "=" not in info:
-                    continue
-
-                name, addressStr = info.split("=")
-                address = int(addressStr.strip(), 0)
-                name = name.strip()
-
-                pairs = Utils.parseColonSeparatedPairLine(colonSeparatedPairs)
-
-                symSize = Utils.getMaybeIntFromMaybeStr(pairs.get("size"))
-
-                if Utils.getMaybeBooleyFromMaybeStr(pairs.get("ignore")):
-                    if symSize is not None and symSize > 0:
-                        self.context.addBannedSymbolRangeBySize(address, symSize)
-                    else:
-                        self.context.addBannedSymbol(address)
-                    continue
-
-                symType = pairs.get("type")
-                rom = Utils.getMaybeIntFromMaybeStr(pairs.get("rom"))
-                if symType == "func":
-                    contextSym = self.addFunction(address, isAutogenerated=False, vromAddress=rom)
-                elif symType == "jtbl":
-                    contextSym = self.addJumpTable(address, isAutogenerated=False, vromAddress=rom)
-                elif symType == "jtbl_label":
-                    contextSym = self.addJumpTableLabel(address, isAutogenerated=False, vromAddress=rom)
-                elif symType == "label":
-                    contextSym = self.addBranchLabel(address, isAutogenerated=False, vromAddress=rom)
+            self.readSplatSymbolAddrsLines(f)
+
+    def readSplatSymbolAddrsLines(self, lines: Iterable[str]):
+        """Same as `readSplatSymbolAddrs`, but reading each line of the
+        symbol_addrs format from the given iterable instead of a file."""
+        for line in lines:
+            info, *extra = line.strip().split("//")
+            colonSeparatedPairs = "//".join(extra)
+
+            info = info.strip().strip(";")
+
+            if "=" not in info:
+                continue
+
+            name, addressStr = info.split("=")
+            address = int(addressStr.strip(), 0)
+            name = name.strip()
+
+            pairs = Utils.parseColonSeparatedPairLine(colonSeparatedPairs)
+
+            symSize = Utils.getMaybeIntFromMaybeStr(pairs.get("size"))
+
+            if Utils.getMaybeBooleyFromMaybeStr(pairs.get("ignore")):
+                if symSize is not None and symSize > 0:
+                    self.context.addBannedSymbolRangeBySize(address, symSize)
                 else:
-                    contextSym = self.addSymbol(address, isAutogenerated=False, vromAddress=rom)
-                    if symType is not None:
-                        contextSym.setTypeSpecial(symType, isAutogenerated=False)
+                    self.context.addBannedSymbol(address)
+                continue
 
-                contextSym.name = name
-                contextSym.isUserDeclared = True
-                contextSym.nameEnd = pairs.get("name_end")
-                contextSym.userDeclaredSize = Utils.getMaybeIntFromMaybeStr(pairs.get("size"))
-
-                defined = Utils.getMaybeBooleyFromMaybeStr(pairs.get("defined"))
-                if defined is not None:
-                    contextSym.isDefined = defined
-
-                forceMigration = Utils.getMaybeBooleyFromMaybeStr(pairs.get("force_migration"))
-                if forceMigration is not None:
-                    contextSym.forceMigration = forceMigration
-                forceNotMigration = Utils.getMaybeBooleyFromMaybeStr(pairs.get("force_not_migration"))
-                if forceNotMigration is not None:
-                    contextSym.forceNotMigration = forceNotMigration
-
-                allowAddend = Utils.getMaybeBooleyFromMaybeStr(pairs.get("allow_addend"))
-                if allowAddend is not None:
-                    contextSym.allowedToReferenceAddends = allowAddend
-                dontAllowAddend = Utils.getMaybeBooleyFromMaybeStr(pairs.get("dont_allow_addend"))
-                if dontAllowAddend is not None:
-                    contextSym.notAllowedToReferenceAddends = dontAllowAddend
+            symType = pairs.get("type")
+            rom = Utils.getMaybeIntFromMaybeStr(pairs.get("rom"))
+            if symType == "func":
+                contextSym = self.addFunction(address, isAutogenerated=False, vromAddress=rom)
+            elif symType == "jtbl":
+                contextSym = self.addJumpTable(address, isAutogenerated=False, vromAddress=rom)
+            elif symType == "jtbl_label":
+                contextSym = self.addJumpTableLabel(address, isAutogenerated=False, vromAddress=rom)
+            elif symType == "label":
+                contextSym = self.addBranchLabel(address, isAutogenerated=False, vromAddress=rom)
+            else:
+                contextSym = self.addSymbol(address, isAutogenerated=False, vromAddress=rom)
+                if symType is not None:
+                    contextSym.setTypeSpecial(symType, isAutogenerated=False)
+
+            contextSym.name = name
+            contextSym.isUserDeclared = True
+            contextSym.nameEnd = pairs.get("name_end")
+            contextSym.userDeclaredSize = Utils.getMaybeIntFromMaybeStr(pairs.get("size"))
+
+            defined = Utils.getMaybeBooleyFromMaybeStr(pairs.get("defined"))
+            if defined is not None:
+                contextSym.isDefined = defined
+
+            forceMigration = Utils.getMaybeBooleyFromMaybeStr(pairs.get("force_migration"))
+            if forceMigration is not None:
+                contextSym.forceMigration = forceMigration
+            forceNotMigration = Utils.getMaybeBooleyFromMaybeStr(pairs.get("force_not_migration"))
+            if forceNotMigration is not None:
+                contextSym.forceNotMigration = forceNotMigration
+
+            allowAddend = Utils.getMaybeBooleyFromMaybeStr(pairs.get("allow_addend"))
+            if allowAddend is not None:
+                contextSym.allowedToReferenceAddends = allowAddend
+            dontAllowAddend = Utils.getMaybeBooleyFromMaybeStr(pairs.get("dont_allow_addend"))
+            if dontAllowAddend is not None:
+                contextSym.notAllowedToReferenceAddends = dontAllowAddend
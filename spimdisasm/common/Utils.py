@@ -6,14 +6,23 @@
 from __future__ import annotations
 
 import argparse
+from array import array
+import bisect
+import contextlib
 import csv
+import gc
 import hashlib
 import json
+import locale
+import mmap
+import os
 from pathlib import Path
 import rabbitizer
+import re
+import stat
 import struct
-import subprocess
 import sys
+from typing import Generator, Sequence
 
 from .GlobalConfig import GlobalConfig, InputEndian
 
@@ -47,9 +56,29 @@ def getStrHash(byte_array: bytes) -> str:
     return str(hashlib.md5(byte_array).hexdigest())
 
 def writeBytesToFile(filepath: Path, array_of_bytes: bytes):
+    if GlobalConfig.ONLY_WRITE_CHANGED_FILES and _fileHasContents(filepath, array_of_bytes):
+        return
     with filepath.open(mode="wb") as f:
         f.write(array_of_bytes)
 
+def writeTextToFile(filepath: Path, contents: str, encoding: str|None=None) -> None:
+    if GlobalConfig.ONLY_WRITE_CHANGED_FILES:
+        # Text mode translates newlines when writing, so compare against the translated contents
+        encodedContents = contents.replace("\n", os.linesep).encode(encoding if encoding is not None else locale.getpreferredencoding(False))
+        if _fileHasContents(filepath, encodedContents):
+            return
+    with filepath.open(mode="w", encoding=encoding) as f:
+        f.write(contents)
+
+def _fileHasContents(filepath: Path, contents: bytes) -> bool:
+    try:
+        if filepath.stat().st_size != len(contents):
+            return False
+        with filepath.open(mode="rb") as f:
+            return f.read() == contents
+    except OSError:
+        return False
+
 #! deprecated
 writeBytearrayToFile = writeBytesToFile
 
@@ -59,6 +88,58 @@ def readFileAsBytearray(filepath: Path) -> bytearray:
     with filepath.open(mode="rb") as f:
         return bytearray(f.read())
 
+def readFileAsMemoryview(filepath: Path) -> memoryview:
+    """
+    Maps the file into memory instead of reading it, so slicing the returned
+    read-only view doesn't copy the file contents. Files which can't be
+    mapped, like pipes, are read instead.
+
+    The file is kept mapped until every view referencing it is released. Use
+    `mapFileAsMemoryview` to unmap it at a known point instead.
+    """
+    if not filepath.exists():
+        return memoryview(b"")
+    with filepath.open(mode="rb") as f:
+        fileStat = os.fstat(f.fileno())
+        # Only regular files can be mapped, pipes, fifos and devices (i.e.
+        # `/dev/stdin`) are read instead. Empty files can't be mapped either
+        if stat.S_ISREG(fileStat.st_mode) and fileStat.st_size > 0:
+            try:
+                # The mapping stays valid after closing the file
+                return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            except (OSError, ValueError):
+                # Some filesystems don't support mapping files
+                pass
+        return memoryview(f.read())
+
+@contextlib.contextmanager
+def mapFileAsMemoryview(filepath: Path) -> Generator[memoryview, None, None]:
+    """
+    Same as `readFileAsMemoryview`, but unmaps the file when the context is
+    exited instead of leaving it to the garbage collector.
+
+    Every object created from the view (i.e. the sections) should be
+    released before exiting the context. If any of them is still alive then
+    the file stays mapped until it is freed.
+    """
+    view = readFileAsMemoryview(filepath)
+    try:
+        yield view
+    finally:
+        mapping = view.obj
+        view.release()
+        if isinstance(mapping, mmap.mmap):
+            try:
+                mapping.close()
+            except BufferError:
+                # Sections and their symbols reference each other, so they
+                # may only be freed by the cycle collector
+                gc.collect()
+                try:
+                    mapping.close()
+                except BufferError:
+                    pass
+
 def readFile(filepath: Path) -> list[str]:
     with filepath.open() as f:
         return [x.strip() for x in f.readlines()]
@@ -70,7 +151,7 @@ def readJson(filepath: Path):
 def removeExtraWhitespace(line: str) -> str:
     return " ".join(line.split())
 
-def endianessBytesToWords(endian: InputEndian, array_of_bytes: bytes, offset: int=0, offsetEnd: int|None=None) -> list[int]:
+def endianessBytesToWords(endian: InputEndian, array_of_bytes: bytes|memoryview, offset: int=0, offsetEnd: int|None=None) -> list[int]:
     totalBytesCount = len(array_of_bytes)
     if totalBytesCount == 0:
         return list()
@@ -101,23 +182,61 @@ def endianessBytesToWords(endian: InputEndian, array_of_bytes: bytes, offset: in
         endian_format = f"<{words}I"
     return list(struct.unpack_from(endian_format, array_of_bytes, offset))
 
-def bytesToWords(array_of_bytes: bytes, offset: int=0, offsetEnd: int|None=None) -> list[int]:
+def bytesToWords(array_of_bytes: bytes|memoryview, offset: int=0, offsetEnd: int|None=None) -> list[int]:
     return endianessBytesToWords(GlobalConfig.ENDIAN, array_of_bytes, offset, offsetEnd)
 
+WORDS_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+"Typecode of the `array`s used to store words"
+
+def _needsByteswap(endian: InputEndian) -> bool:
+    return (endian == InputEndian.BIG) != (sys.byteorder == "big")
+
+def endianessBytesToWordsArray(endian: InputEndian, array_of_bytes: bytes|memoryview, offset: int=0, offsetEnd: int|None=None) -> array[int]:
+    """
+    Same as `endianessBytesToWords`, but returns a typed array instead of a
+    list, which takes 4 bytes per word and can be viewed without copying it.
+    """
+    if endian == InputEndian.MIDDLE or len(array_of_bytes) == 0:
+        return array(WORDS_TYPECODE, endianessBytesToWords(endian, array_of_bytes, offset, offsetEnd))
+
+    bytesCount = len(array_of_bytes)
+    if offsetEnd is not None and offsetEnd > 0:
+        bytesCount = offsetEnd
+    bytesCount -= offset
+    assert 0 <= bytesCount and offset + bytesCount <= len(array_of_bytes), f"{offset:X}, {offsetEnd}, {bytesCount:X}, {len(array_of_bytes):X}"
+
+    words = array(WORDS_TYPECODE)
+    words.frombytes(memoryview(array_of_bytes)[offset:offset + bytesCount//4*4])
+    if _needsByteswap(endian):
+        words.byteswap()
+    return words
+
+def bytesToWordsArray(array_of_bytes: bytes|memoryview, offset: int=0, offsetEnd: int|None=None) -> array[int]:
+    return endianessBytesToWordsArray(GlobalConfig.ENDIAN, array_of_bytes, offset, offsetEnd)
+
 #! deprecated
 bytesToBEWords = bytesToWords
 
-def endianessWordsToBytes(endian: InputEndian, words_list: list[int]) -> bytes:
+def endianessWordsToBytes(endian: InputEndian, words_list: Sequence[int]) -> bytes:
     if endian == InputEndian.MIDDLE:
         raise BufferError("TODO: wordsToBytesEndianess: GlobalConfig.ENDIAN == InputEndian.MIDDLE")
 
+    if isinstance(words_list, (array, memoryview)) and (words_list.typecode if isinstance(words_list, array) else words_list.format) == WORDS_TYPECODE:
+        # Typed words can be converted in bulk
+        if not _needsByteswap(endian):
+            return memoryview(words_list).tobytes()
+        wordsArray = array(WORDS_TYPECODE)
+        wordsArray.frombytes(memoryview(words_list).cast("B"))
+        wordsArray.byteswap()
+        return wordsArray.tobytes()
+
     words = len(words_list)
     endian_format = f">{words}I"
     if endian == InputEndian.LITTLE:
         endian_format = f"<{words}I"
     return struct.pack(endian_format, *words_list)
 
-def wordsToBytes(words_list: list[int]) -> bytes:
+def wordsToBytes(words_list: Sequence[int]) -> bytes:
     return endianessWordsToBytes(GlobalConfig.ENDIAN, words_list)
 
 #! deprecated
@@ -158,6 +277,9 @@ def qwordToCurrenEndian(word: int) -> int:
     return (first << 48) | (second << 32) | (third << 16) | fourth
 
 def runCommandGetOutput(command: str, args: list[str]) -> list[str] | None:
+    # Only imported when needed since it is rarely used and slow to import
+    import subprocess
+
     try:
         output = subprocess.check_output([command, *args]).decode("utf-8")
         return output.strip().split("\n")
@@ -259,7 +381,7 @@ escapeCharactersMaybeRealLookAhead = {
     0x8D,
 }
 
-def decodeBytesToStrings(buf: bytes, offset: int, stringEncoding: str, terminator: int=0) -> tuple[list[str], int]:
+def decodeBytesToStrings(buf: bytes|memoryview, offset: int, stringEncoding: str, terminator: int=0) -> tuple[list[str], int]:
     result = []
 
     dst = bytearray()
@@ -344,7 +466,62 @@ def decodeBytesToStrings(buf: bytes, offset: int, stringEncoding: str, terminato
 
     return result, i
 
-def decodeBytesToPascalStrings(buf: bytes, offset: int, stringEncoding: str, terminator: int=0x20) -> tuple[list[str], int]:
+# Bytes which end a NUL terminated string, either because they are the
+# terminator or because the string can't be decoded if it contains them
+_stringStoppersRegex = re.compile(b"[" + re.escape(bytes(sorted(bannedEscapeCharacters))) + b"]+")
+
+class StringCandidates:
+    """
+    Precomputes, in a single pass over a buffer, where the NUL terminated
+    string starting at any offset of it would end, so offsets which can't be
+    the start of a string can be rejected without decoding them.
+
+    Only the runs of bytes that end a string (a NUL or any of the
+    `bannedEscapeCharacters`) are stored, so looking up an offset is a binary
+    search over them.
+    """
+
+    def __init__(self, buf: bytes|memoryview):
+        self.buf = buf
+
+        self.stoppersStarts: list[int] = []
+        self.stoppersEnds: list[int] = []
+        for match in _stringStoppersRegex.finditer(buf):
+            start, end = match.span()
+            self.stoppersStarts.append(start)
+            self.stoppersEnds.append(end)
+
+    def getStringLength(self, offset: int) -> int:
+        """
+        Returns the amount of bytes between `offset` and the NUL terminating
+        the string starting there, or -1 if there can't be a string starting
+        at `offset`.
+
+        A string rejected by this method is always rejected by
+        `decodeBytesToStrings` too, but the opposite is not true since the
+        bytes of the string are not decoded.
+        """
+        i = bisect.bisect_right(self.stoppersEnds, offset)
+        if i >= len(self.stoppersEnds):
+            # There's no NUL after this offset
+            return -1
+
+        stopper = self.stoppersStarts[i]
+        if stopper < offset:
+            stopper = offset
+        if self.buf[stopper] != 0:
+            # A banned character is found before the NUL
+            return -1
+
+        # The rest of the word containing the NUL must be NULs too
+        alignedEnd = min((stopper & ~3) + 4, len(self.buf))
+        for j in range(stopper + 1, alignedEnd):
+            if self.buf[j] != 0:
+                return -1
+
+        return stopper - offset
+
+def decodeBytesToPascalStrings(buf: bytes|memoryview, offset: int, stringEncoding: str, terminator: int=0x20) -> tuple[list[str], int]:
     result = []
 
     dst = bytearray()
@@ -410,6 +587,44 @@ def decodeBytesToPascalStrings(buf: bytes, offset: int, stringEncoding: str, ter
     return result, i
 
 
+class StringsCache:
+    """
+    Remembers the strings decoded from a buffer, so a string is decoded only
+    once even if it is requested by both the string guessers and the
+    disassembly.
+
+    The returned lists of strings are shared between every caller, so they
+    must not be modified.
+    """
+
+    def __init__(self, buf: bytes|memoryview):
+        self.buf = buf
+
+        self.decoded: dict[tuple[int, str, int, bool], tuple[list[str], int]] = dict()
+        "key: (offset, string encoding, terminator, is a pascal string)"
+
+    def decodeStrings(self, offset: int, stringEncoding: str, terminator: int=0) -> tuple[list[str], int]:
+        "Same as `decodeBytesToStrings`"
+        key = (offset, stringEncoding, terminator, False)
+        result = self.decoded.get(key)
+        if result is None:
+            result = decodeBytesToStrings(self.buf, offset, stringEncoding, terminator=terminator)
+            self.decoded[key] = result
+        return result
+
+    def decodePascalStrings(self, offset: int, stringEncoding: str, terminator: int=0x20) -> tuple[list[str], int]:
+        "Same as `decodeBytesToPascalStrings`"
+        key = (offset, stringEncoding, terminator, True)
+        result = self.decoded.get(key)
+        if result is None:
+            result = decodeBytesToPascalStrings(self.buf, offset, stringEncoding, terminator=terminator)
+            self.decoded[key] = result
+        return result
+
+    def clear(self) -> None:
+        self.decoded.clear()
+
+
 #! @deprecated
 def decodeString(buf: bytes, offset: int, stringEncoding: str) -> tuple[list[str], int]:
     result = []
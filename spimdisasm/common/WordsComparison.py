@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+"""
+Operations used when comparing two builds (`--nuke-pointers`), done over whole
+sections of words at once.
+
+If NumPy is installed and the sections are big enough then they are done as
+NumPy array operations, otherwise they fall back to plain Python loops. Both
+give the same results.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any, Iterable
+
+from . import Utils
+
+
+NUMPY_MIN_WORDS = 256
+"Sections with fewer words than this are not worth converting to NumPy arrays"
+
+_sNumpy: Any = None
+_sNumpyChecked = False
+
+def getNumpy() -> Any:
+    """
+    Returns the `numpy` module, or `None` if it is not installed.
+
+    It is only imported the first time it is needed, since importing it is
+    slow.
+    """
+    global _sNumpy
+    global _sNumpyChecked
+
+    if not _sNumpyChecked:
+        _sNumpyChecked = True
+        try:
+            import numpy
+            _sNumpy = numpy
+        except ImportError:
+            _sNumpy = None
+    return _sNumpy
+
+
+def _getNumpyIfWorth(*wordsLists: list[int]|array[int]|memoryview) -> Any:
+    if min(len(words) for words in wordsLists) < NUMPY_MIN_WORDS:
+        return None
+    return getNumpy()
+
+def _wordsToNumpy(np: Any, words: list[int]|array[int]|memoryview) -> tuple[Any, bool]:
+    """
+    Returns the words as a NumPy array and whether it is a view of them.
+
+    Typed words are viewed instead of copied, so modifying the returned array
+    modifies them too.
+    """
+    if isinstance(words, array) and words.typecode == Utils.WORDS_TYPECODE:
+        return np.frombuffer(words, dtype=np.uint32), True
+    if isinstance(words, memoryview) and words.format == Utils.WORDS_TYPECODE and not words.readonly:
+        return np.frombuffer(words, dtype=np.uint32), True
+    return np.array(words, dtype=np.uint32), False
+
+def _copyBackFromNumpy(words: list[int]|array[int]|memoryview, npWords: Any) -> None:
+    for i, w in enumerate(npWords.tolist()):
+        words[i] = w
+
+
+def nukePointers(words: list[int]|array[int]|memoryview) -> bool:
+    """
+    Replaces every word that looks like a pointer, because its upper byte is
+    either 0x80 or between 0x01 and 0x0F, with just its upper byte.
+
+    Returns `True` if any word was replaced.
+    """
+    np = _getNumpyIfWorth(words)
+    if np is not None:
+        npWords, isView = _wordsToNumpy(np, words)
+        topBytes = npWords >> 24
+        mask = (topBytes == 0x80) | (((topBytes & 0xF0) == 0x00) & ((topBytes & 0x0F) != 0x00))
+        if not mask.any():
+            return False
+        npWords[mask] = topBytes[mask] << 24
+        if not isView:
+            _copyBackFromNumpy(words, npWords)
+        return True
+
+    was_updated = False
+    for i in range(len(words)):
+        top_byte = (words[i] >> 24) & 0xFF
+        if top_byte == 0x80 or ((top_byte & 0xF0) == 0x00 and (top_byte & 0x0F) != 0x00):
+            words[i] = top_byte << 24
+            was_updated = True
+    return was_updated
+
+def blankOutUpperBytes(words: list[int]|array[int]|memoryview, otherWords: list[int]|array[int]|memoryview, upperBytes: Iterable[int]) -> bool:
+    """
+    Replaces every pair of words at the same index of both lists which have
+    the same upper byte, if it is one of `upperBytes`, with just that upper
+    byte.
+
+    Returns `True` if any word was replaced.
+    """
+    upperBytesSet = set(upperBytes)
+    if len(upperBytesSet) == 0:
+        return False
+    minLen = min(len(words), len(otherWords))
+
+    np = _getNumpyIfWorth(words, otherWords)
+    if np is not None:
+        npWords, isView = _wordsToNumpy(np, words)
+        npOtherWords, isOtherView = _wordsToNumpy(np, otherWords)
+        topBytes = npWords[:minLen] >> 24
+        mask = (topBytes == (npOtherWords[:minLen] >> 24)) & np.isin(topBytes, list(upperBytesSet))
+        if not mask.any():
+            return False
+        blankedWords = topBytes[mask] << 24
+        npWords[:minLen][mask] = blankedWords
+        npOtherWords[:minLen][mask] = blankedWords
+        if not isView:
+            _copyBackFromNumpy(words, npWords)
+        if not isOtherView:
+            _copyBackFromNumpy(otherWords, npOtherWords)
+        return True
+
+    was_updated = False
+    for i in range(minLen):
+        upperByte = (words[i] >> 24) & 0xFF
+        if upperByte in upperBytesSet and ((otherWords[i] >> 24) & 0xFF) == upperByte:
+            words[i] = upperByte << 24
+            otherWords[i] = upperByte << 24
+            was_updated = True
+    return was_updated
+
+def countDifferences(words: list[int]|array[int]|memoryview, otherWords: list[int]|array[int]|memoryview) -> tuple[int, int]:
+    """
+    Compares the words at the same index of both lists, up to the length of
+    the shortest one.
+
+    Returns the amount of different bytes and the amount of different words.
+    """
+    minLen = min(len(words), len(otherWords))
+
+    np = _getNumpyIfWorth(words, otherWords)
+    if np is not None:
+        xored = _wordsToNumpy(np, words)[0][:minLen] ^ _wordsToNumpy(np, otherWords)[0][:minLen]
+        diffBytes = 0
+        for j in range(4):
+            diffBytes += int(np.count_nonzero((xored >> (j * 8)) & 0xFF))
+        return diffBytes, int(np.count_nonzero(xored))
+
+    diffBytes = 0
+    diffWords = 0
+    for i in range(minLen):
+        xored = words[i] ^ otherWords[i]
+        if xored != 0:
+            diffWords += 1
+            for j in range(4):
+                if xored & (0xFF << (j * 8)):
+                    diffBytes += 1
+    return diffBytes, diffWords
@@ -1,28 +1,69 @@
 # SPDX-FileCopyrightText: © 2022-2024 Decompollaborate
 # SPDX-License-Identifier: MIT
 
-from . import Utils
+from __future__ import annotations
 
-from .SortedDict import SortedDict as SortedDict
-from .GlobalConfig import GlobalConfig as GlobalConfig
-from .GlobalConfig import InputEndian as InputEndian
-from .GlobalConfig import Compiler as Compiler
-from .GlobalConfig import Abi as Abi
-from .GlobalConfig import ArchLevel as ArchLevel
-from .GlobalConfig import InputFileType as InputFileType
-from .FileSectionType import FileSectionType as FileSectionType
-from .FileSectionType import FileSections_ListBasic as FileSections_ListBasic
-from .FileSectionType import FileSections_ListAll as FileSections_ListAll
-from .ContextSymbols import SymbolSpecialType as SymbolSpecialType
-from .ContextSymbols import ContextSymbol as ContextSymbol
-from .ContextSymbols import gKnownTypes as gKnownTypes
-from .SymbolsSegment import SymbolsSegment as SymbolsSegment
-from .Context import Context as Context
-from .FileSplitFormat import FileSplitFormat as FileSplitFormat
-from .FileSplitFormat import FileSplitEntry as FileSplitEntry
-from .ElementBase import ElementBase as ElementBase
-from .GpAccesses import GlobalOffsetTable as GlobalOffsetTable
-from .OrderedEnum import OrderedEnum as OrderedEnum
-from .Relocation import RelocType as RelocType
-from .Relocation import RelocationInfo as RelocationInfo
-from .Relocation import RelocationStaticReference as RelocationStaticReference
+from typing import TYPE_CHECKING
+
+from ..LazyPackage import makePackageLazy
+
+if TYPE_CHECKING:
+    from .SortedDict import SortedDict as SortedDict
+    from .GlobalConfig import GlobalConfig as GlobalConfig
+    from .GlobalConfig import InputEndian as InputEndian
+    from .GlobalConfig import Compiler as Compiler
+    from .GlobalConfig import Abi as Abi
+    from .GlobalConfig import ArchLevel as ArchLevel
+    from .GlobalConfig import InputFileType as InputFileType
+    from .FileSectionType import FileSectionType as FileSectionType
+    from .FileSectionType import FileSections_ListBasic as FileSections_ListBasic
+    from .FileSectionType import FileSections_ListAll as FileSections_ListAll
+    from .ContextSymbols import SymbolSpecialType as SymbolSpecialType
+    from .ContextSymbols import ContextSymbol as ContextSymbol
+    from .ContextSymbols import gKnownTypes as gKnownTypes
+    from .SymbolsSegment import SymbolsSegment as SymbolsSegment
+    from .Context import Context as Context
+    from .Context import OverlaySegmentsIndex as OverlaySegmentsIndex
+    from .Context import AddressRangeSet as AddressRangeSet
+    from .FileSplitFormat import FileSplitFormat as FileSplitFormat
+    from .FileSplitFormat import FileSplitEntry as FileSplitEntry
+    from .ElementBase import ElementBase as ElementBase
+    from .GpAccesses import GlobalOffsetTable as GlobalOffsetTable
+    from .OrderedEnum import OrderedEnum as OrderedEnum
+    from .Relocation import RelocType as RelocType
+    from .Relocation import RelocationInfo as RelocationInfo
+    from .Relocation import RelocationStaticReference as RelocationStaticReference
+    from . import WordsComparison as WordsComparison
+else:
+    makePackageLazy(__name__, {
+        "SortedDict": (".SortedDict", "SortedDict"),
+        "GlobalConfig": (".GlobalConfig", "GlobalConfig"),
+        "InputEndian": (".GlobalConfig", "InputEndian"),
+        "Compiler": (".GlobalConfig", "Compiler"),
+        "Abi": (".GlobalConfig", "Abi"),
+        "ArchLevel": (".GlobalConfig", "ArchLevel"),
+        "InputFileType": (".GlobalConfig", "InputFileType"),
+        "FileSectionType": (".FileSectionType", "FileSectionType"),
+        "FileSections_ListBasic": (".FileSectionType", "FileSections_ListBasic"),
+        "FileSections_ListAll": (".FileSectionType", "FileSections_ListAll"),
+        "SymbolSpecialType": (".ContextSymbols", "SymbolSpecialType"),
+        "ContextSymbol": (".ContextSymbols", "ContextSymbol"),
+        "gKnownTypes": (".ContextSymbols", "gKnownTypes"),
+        "SymbolsSegment": (".SymbolsSegment", "SymbolsSegment"),
+        "Context": (".Context", "Context"),
+        "OverlaySegmentsIndex": (".Context", "OverlaySegmentsIndex"),
+        "AddressRangeSet": (".Context", "AddressRangeSet"),
+        "FileSplitFormat": (".FileSplitFormat", "FileSplitFormat"),
+        "FileSplitEntry": (".FileSplitFormat", "FileSplitEntry"),
+        "ElementBase": (".ElementBase", "ElementBase"),
+        "GlobalOffsetTable": (".GpAccesses", "GlobalOffsetTable"),
+        "OrderedEnum": (".OrderedEnum", "OrderedEnum"),
+        "RelocType": (".Relocation", "RelocType"),
+        "RelocationInfo": (".Relocation", "RelocationInfo"),
+        "RelocationStaticReference": (".Relocation", "RelocationStaticReference"),
+        "WordsComparison": (".WordsComparison", None),
+    })
+
+# Not lazy, since every other module needs it and it must be imported before
+# `GlobalConfig` to avoid a circular import between them
+from . import Utils as Utils
@@ -8,8 +8,9 @@ from __future__ import annotations
 
 # a.k.a. strtab (string table)
 class Elf32StringTable:
-    def __init__(self, array_of_bytes: bytes, offset: int, rawsize: int):
-        self.strings: bytes = array_of_bytes[offset:offset+rawsize]
+    def __init__(self, array_of_bytes: bytes|memoryview, offset: int, rawsize: int):
+        # Copied, so the table does not keep the input file mapped
+        self.strings: bytes = bytes(array_of_bytes[offset:offset+rawsize])
         self.offset: int = offset
         self.rawsize: int = rawsize
 
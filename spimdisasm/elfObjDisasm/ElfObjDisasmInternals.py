@@ -37,6 +37,12 @@ def addOptionsToParser(parser: argparse.ArgumentParser) -> argparse.ArgumentPars
     parser.add_argument("--instr-category", help="The instruction category to use when disassembling every passed instruction. Defaults to 'cpu'", choices=["cpu", "rsp", "r3000gte", "r5900"])
 
     parser.add_argument("--function-info", help="Specifies a path where to output a csvs sumary file of every analyzed function", metavar="PATH")
+    parser.add_argument("--fingerprint-index", help="Writes an index with the fingerprint of every analyzed function to the given path. `spimdisasm match` uses it to find the counterparts of the functions of another build", metavar="PATH")
+
+    parser.add_argument("-j", "--jobs", help="Amount of worker processes to use to speed up the analysis and the writing of the output files. The output is the same regardless of this value. Only available on platforms supporting `fork`. Defaults to 1", type=int, default=1, metavar="N")
+    parser.add_argument("--analysis-cache", help="Path to a directory where to cache the analysis and the output of every section between runs. Sections which did not change since the previous run are not re-analyzed nor rendered again. The output is the same as not using a cache", metavar="PATH")
+    parser.add_argument("--analysis-cache-max-size", help="Maximum size in MiB of the directory passed to --analysis-cache. The least recently used files are removed once it is exceeded. 0 means no limit. Defaults to 512", type=int, default=512, metavar="SIZE")
+    parser.add_argument("--incremental", help="Enables the incremental mode, keeping track of the state of each run on the given file. Only the output files affected by the changes since the previous run are rendered again, and output files whose contents did not change are not rewritten, keeping their modification time", metavar="PATH")
 
 
     readelfOptions = parser.add_argument_group("readelf-like flags")
@@ -52,6 +58,8 @@ def addOptionsToParser(parser: argparse.ArgumentParser) -> argparse.ArgumentPars
     readelfOptions.add_argument("--readelf-only", help="Exit after processing the readelf-like flags, without performing any disassembly", action="store_true")
 
 
+    fec.Timings.addParametersToArgParse(parser)
+
     common.Context.addParametersToArgParse(parser)
 
     common.GlobalConfig.addParametersToArgParse(parser)
@@ -71,6 +79,8 @@ def applyArgs(args: argparse.Namespace) -> None:
         args.hardware_regs = False
     common.GlobalConfig.parseArgs(args)
     mips.InstructionConfig.parseArgs(args)
+    if args.incremental is not None:
+        common.GlobalConfig.ONLY_WRITE_CHANGED_FILES = True
 
 def applyGlobalConfigurations() -> None:
     common.GlobalConfig.REMOVE_POINTERS = False
@@ -109,9 +119,6 @@ def applyReadelfLikeFlags(elfFile: elf32.Elf32File, args: argparse.Namespace) ->
         if args.display_got:
             elfFile.readelf_displayGot()
 
-    if args.readelf_only:
-        exit(0)
-
 SpecialSectionNames = {".text", ".data", ".rodata", ".bss"}
 
 def getOutputPath(inputPath: Path, textOutput: Path, dataOutput: Path, sectionType: common.FileSectionType, sectionName: str) -> Path:
@@ -129,7 +136,7 @@ def getOutputPath(inputPath: Path, textOutput: Path, dataOutput: Path, sectionTy
     return outputFilePath
 
 def processSection(
-        context: common.Context, array_of_bytes: bytes,
+        context: common.Context, array_of_bytes: bytes|memoryview,
         processedSections: dict[common.FileSectionType, list[mips.sections.SectionBase]],
         segmentPaths: dict[common.FileSectionType, list[Path]],
         sectionsPerName: dict[str, mips.sections.SectionBase],
@@ -167,7 +174,7 @@ def processSection(
     sectionsPerName[sectionName] = mipsSection
 
 
-def getProcessedSections(context: common.Context, elfFile: elf32.Elf32File, array_of_bytes: bytes, inputPath: Path, textOutput: Path, dataOutput: Path) -> tuple[dict[common.FileSectionType, list[mips.sections.SectionBase]], dict[common.FileSectionType, list[Path]], dict[str, mips.sections.SectionBase]]:
+def getProcessedSections(context: common.Context, elfFile: elf32.Elf32File, array_of_bytes: bytes|memoryview, inputPath: Path, textOutput: Path, dataOutput: Path) -> tuple[dict[common.FileSectionType, list[mips.sections.SectionBase]], dict[common.FileSectionType, list[Path]], dict[str, mips.sections.SectionBase]]:
     processedSections: dict[common.FileSectionType, list[mips.sections.SectionBase]] = {
         common.FileSectionType.Text: [],
         common.FileSectionType.Data: [],
@@ -381,18 +388,7 @@ def processGlobalOffsetTable(context: common.Context, elfFile: elf32.Elf32File)
     return
 
 
-def processArguments(args: argparse.Namespace) -> int:
-    applyArgs(args)
-
-    applyGlobalConfigurations()
-
-    context = common.Context()
-    context.parseArgs(args)
-
-    common.Utils.printQuietless(f"{PROGNAME} (spimdisasm {__version__})")
-
-    inputPath = Path(args.binary)
-    array_of_bytes = common.Utils.readFileAsBytearray(inputPath)
+def _disassembleInput(args: argparse.Namespace, context: common.Context, inputPath: Path, array_of_bytes: bytes|memoryview, timings: fec.Timings) -> None:
     elfFile = elf32.Elf32File(array_of_bytes)
 
     elfFile.handleHeaderIdent()
@@ -407,6 +403,8 @@ def processArguments(args: argparse.Namespace) -> int:
     processGlobalOffsetTable(context, elfFile)
 
     applyReadelfLikeFlags(elfFile, args)
+    if args.readelf_only:
+        return
 
     textOutput = Path(args.output)
     if args.data_output is None:
@@ -418,7 +416,8 @@ def processArguments(args: argparse.Namespace) -> int:
     if args.file_splits is not None:
         splits = common.FileSplitFormat()
         splits.readCsvFile(Path(args.file_splits))
-        processedSegments, segmentPaths = fec.FrontendUtilities.getSplittedSections(context, splits, array_of_bytes, inputPath, textOutput, dataOutput)
+        with timings.phase("split"):
+            processedSegments, segmentPaths = fec.FrontendUtilities.getSplittedSections(context, splits, array_of_bytes, inputPath, textOutput, dataOutput)
         sectionsPerName: dict[str, mips.sections.SectionBase] = dict()
         for sectType, subSection in processedSegments.items():
             if len(subSection) < 1:
@@ -432,44 +431,88 @@ def processArguments(args: argparse.Namespace) -> int:
             elif sectType == common.FileSectionType.Bss:
                 sectionsPerName[".bss"] = subSection[0]
     else:
-        processedSegments, segmentPaths, sectionsPerName = getProcessedSections(context, elfFile, array_of_bytes, inputPath, textOutput, dataOutput)
+        with timings.phase("split"):
+            processedSegments, segmentPaths, sectionsPerName = getProcessedSections(context, elfFile, array_of_bytes, inputPath, textOutput, dataOutput)
 
     changeGlobalSegmentRanges(context, processedSegments)
 
     fec.FrontendUtilities.configureProcessedFiles(processedSegments, instrCategory)
 
     common.Utils.printQuietless(f"{PROGNAME} {inputPath}: Injecting elf symbols...")
-    injectAllElfSymbols(context, elfFile, processedSegments, sectionsPerName)
+    with timings.phase("injectElfSymbols"):
+        injectAllElfSymbols(context, elfFile, processedSegments, sectionsPerName)
 
     processedFilesCount = 0
     for sect in processedSegments.values():
         processedFilesCount += len(sect)
 
     common.Utils.printQuietless(f"{PROGNAME} {inputPath}: Analyzing sections...")
-    fec.FrontendUtilities.analyzeProcessedFiles(processedSegments, segmentPaths, processedFilesCount)
+    analysisCache = mips.AnalysisCache(Path(args.analysis_cache), args.analysis_cache_max_size * 1024 * 1024 if args.analysis_cache_max_size > 0 else None) if args.analysis_cache is not None else None
+    with timings.phase("analyze"):
+        fec.FrontendUtilities.analyzeProcessedFiles(processedSegments, segmentPaths, processedFilesCount, jobs=args.jobs, analysisCache=analysisCache, timings=timings)
+
+    # Saved after the analysis, so loading it back skips reading the symbols inputs
+    if args.save_context_binary is not None:
+        contextPath = Path(args.save_context_binary)
+        contextPath.parent.mkdir(parents=True, exist_ok=True)
+        with timings.phase("saveContextBinary"):
+            context.saveContextToBinaryFile(contextPath)
 
     common.Utils.printQuietless(f"{PROGNAME} {inputPath}: Writing files...")
-    fec.FrontendUtilities.writeProcessedFiles(processedSegments, segmentPaths, processedFilesCount)
+    incrementalState = fec.IncrementalState(Path(args.incremental)) if args.incremental is not None else None
+    with timings.phase("write"):
+        fec.FrontendUtilities.writeProcessedFiles(processedSegments, segmentPaths, processedFilesCount, jobs=args.jobs, incrementalState=incrementalState, timings=timings, analysisCache=analysisCache)
 
     if args.split_functions is not None:
         common.Utils.printQuietless(f"{PROGNAME} {inputPath}: Migrating functions and rodata...")
         functionMigrationPath = Path(args.split_functions)
-        fec.FrontendUtilities.migrateFunctions(processedSegments, functionMigrationPath)
+        with timings.phase("migrateFunctions"):
+            fec.FrontendUtilities.migrateFunctions(processedSegments, functionMigrationPath, jobs=args.jobs, timings=timings, analysisCache=analysisCache)
 
         common.Utils.printQuietless(f"{PROGNAME} {inputPath}: Generating functions list...")
         mips.FilesHandlers.writeMigratedFunctionsList(processedSegments, functionMigrationPath, inputPath.stem)
 
+    if analysisCache is not None:
+        with timings.phase("pruneAnalysisCache"):
+            analysisCache.prune()
+
     if args.save_context is not None:
         common.Utils.printQuietless(f"{PROGNAME} {inputPath}: Writing context...")
         contextPath = Path(args.save_context)
         contextPath.parent.mkdir(parents=True, exist_ok=True)
-        context.saveContextToFile(contextPath)
+        with timings.phase("saveContext"):
+            context.saveContextToFile(contextPath)
 
     if args.function_info is not None:
-        fec.FrontendUtilities.writeFunctionInfoCsv(processedSegments, Path(args.function_info))
+        with timings.phase("writeFunctionInfo"):
+            fec.FrontendUtilities.writeFunctionInfoCsv(processedSegments, Path(args.function_info))
+
+    if args.fingerprint_index is not None:
+        with timings.phase("writeFingerprintIndex"):
+            fec.FrontendUtilities.writeFingerprintIndex(processedSegments, Path(args.fingerprint_index))
 
     common.Utils.printQuietless(f"{PROGNAME} {inputPath}: Done!")
 
+
+def processArguments(args: argparse.Namespace) -> int:
+    timings = fec.Timings.fromArgs(args)
+    timings.start()
+
+    try:
+        applyArgs(args)
+
+        applyGlobalConfigurations()
+
+        context = common.Context()
+        context.parseArgs(args)
+
+        common.Utils.printQuietless(f"{PROGNAME} (spimdisasm {__version__})")
+
+        inputPath = Path(args.binary)
+        with common.Utils.mapFileAsMemoryview(inputPath) as array_of_bytes:
+            _disassembleInput(args, context, inputPath, array_of_bytes, timings)
+    finally:
+        timings.finish()
     return 0
 
 def addSubparser(subparser: argparse._SubParsersAction[argparse.ArgumentParser]):
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2022-2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+import spimdisasm
+
+from .. import __version__
+
+
+gFrontendsNames = [
+    "disasmdis",
+    "singleFileDisasm",
+    "elfObjDisasm",
+    "rspDisasm",
+    "batch",
+    "serve",
+    "match",
+]
+
+def cliMain():
+    parser = argparse.ArgumentParser(description="Interface to call any of the spimdisasm's CLI utilities", prog="spimdisasm")
+
+    parser.add_argument("-V", "--version", action="version", version=f"%(prog)s {__version__}")
+
+    subparsers = parser.add_subparsers(description="action", help="The CLI utility to run", required=True)
+
+    # Only import the requested front-end, every front-end is needed to list them on the help
+    frontends = [name for name in gFrontendsNames if sys.argv[1:2] == [name]]
+    if len(frontends) == 0:
+        frontends = gFrontendsNames
+    for name in frontends:
+        getattr(spimdisasm, name).addSubparser(subparsers)
+
+    args = parser.parse_args()
+    return args.func(args)
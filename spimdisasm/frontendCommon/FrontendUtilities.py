@@ -5,17 +5,25 @@
 
 from __future__ import annotations
 
-import argparse
+import contextlib
+import functools
+import io
+import multiprocessing
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable, ContextManager, Iterator, TYPE_CHECKING
 
-import spimdisasm
 import rabbitizer
 
 from .. import common
 from .. import mips
 
-from .. import __version__
+# Kept here for compatibility, the CLI lives on its own module so it can be imported without importing the rest of the library
+from .Cli import cliMain as cliMain
+
+from .IncrementalState import IncrementalState
+
+if TYPE_CHECKING:
+    from .Timings import Timings
 
 
 ProgressCallbackType = Callable[[int, str, int], None]
@@ -24,7 +32,7 @@ ProgressCallbackType = Callable[[int, str, int], None]
 _sLenLastLine = 80
 
 
-def getSplittedSections(context: common.Context, splits: common.FileSplitFormat, array_of_bytes: bytes, inputPath: Path, textOutput: Path, dataOutput: Path) -> tuple[dict[common.FileSectionType, list[mips.sections.SectionBase]], dict[common.FileSectionType, list[Path]]]:
+def getSplittedSections(context: common.Context, splits: common.FileSplitFormat, array_of_bytes: bytes|memoryview, inputPath: Path, textOutput: Path, dataOutput: Path) -> tuple[dict[common.FileSectionType, list[mips.sections.SectionBase]], dict[common.FileSectionType, list[Path]]]:
     processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]] = {
         common.FileSectionType.Text: [],
         common.FileSectionType.Data: [],
@@ -48,8 +56,7 @@ def getSplittedSections(context: common.Context, splits: common.FileSplitFormat,
             # Ignore dummy sections
             continue
         else:
-            common.Utils.eprint("Error! Section not set!")
-            exit(1)
+            raise RuntimeError(f"Error! Section not set for '{row.fileName}'!")
 
         outputFilePath = outputPath
         if str(outputPath) != "-":
@@ -91,18 +98,163 @@ def configureProcessedFiles(processedFiles: dict[common.FileSectionType, list[mi
         textFile.instrCat = instrCat
 
 
-def analyzeProcessedFiles(processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]], processedFilesOutputPaths: dict[common.FileSectionType, list[Path]], processedFilesCount: int, progressCallback: ProgressCallbackType|None=None):
-    i = 0
-    for sectionType, filesInSection in sorted(processedFiles.items()):
-        pathLists = processedFilesOutputPaths[sectionType]
-        for fileIndex, f in enumerate(filesInSection):
-            if progressCallback is not None:
+_sForkedTasks: list[Callable[[], None]] = []
+_sForkedTasksChanges: list[list[tuple[common.ContextSymbol, str, Any]]] = []
+
+def _applyContextChanges(changes: list[tuple[common.ContextSymbol, str, Any]]) -> None:
+    for contextSym, attribute, value in changes:
+        setattr(contextSym, attribute, value)
+
+def _runForkedTasksChunk(chunk: tuple[int, int]) -> tuple[int, int]:
+    start, end = chunk
+    # Bring the context to the same state it would have if every previous task had been run by this process
+    for changes in _sForkedTasksChanges[:start]:
+        _applyContextChanges(changes)
+    for i in range(start, end):
+        _sForkedTasks[i]()
+    return chunk
+
+def _runTasksOnWorkers(tasks: list[Callable[[], None]], jobs: int, tasksChanges: list[list[tuple[common.ContextSymbol, str, Any]]]|None=None) -> Iterator[int]:
+    """
+    Runs every task and yields the index of each one of them in order, once
+    they have finished.
+
+    The tasks are run by forked worker processes, in contiguous chunks. Any
+    change a task does to the state of the program is lost, except for the
+    ones listed in `tasksChanges`, which are applied before running the chunk
+    of tasks that follows them and on the main process once every task has
+    finished.
+    """
+    global _sForkedTasks
+    global _sForkedTasksChanges
+
+    chunksCount = max(min(len(tasks), jobs * 4), 1)
+    chunks = [(len(tasks) * i // chunksCount, len(tasks) * (i + 1) // chunksCount) for i in range(chunksCount)]
+
+    _sForkedTasks = tasks
+    _sForkedTasksChanges = tasksChanges if tasksChanges is not None else []
+    try:
+        with multiprocessing.get_context("fork").Pool(jobs) as pool:
+            # Only task indices travel between processes, each worker renders
+            # and writes its own files, so memory usage does not grow with the
+            # amount of output
+            for start, end in pool.imap(_runForkedTasksChunk, chunks):
+                yield from range(start, end)
+    finally:
+        _sForkedTasks = []
+        _sForkedTasksChanges = []
+
+    if tasksChanges is not None:
+        for changes in tasksChanges:
+            _applyContextChanges(changes)
+
+
+_sPrecomputeTextSections: list[mips.sections.SectionText] = []
+
+def _precomputeTextSectionInstrAnalysis(index: int) -> dict[tuple[int, int, bool], mips.symbols.PrecomputedInstrAnalysis]:
+    # Runs on a forked worker, so it works on a copy of the context from before the analysis started
+    try:
+        return _sPrecomputeTextSections[index].precomputeInstrAnalysis()
+    except Exception:
+        # The results are only a speculative hint, the main process will do the analysis by itself
+        return dict()
+
+def _sectionTimer(timings: Timings|None, phase: str, sectionName: str) -> ContextManager[None]:
+    if timings is None or not timings.enabled:
+        return contextlib.nullcontext()
+    return timings.section(phase, sectionName)
+
+def _canForkWorkers(jobs: int) -> bool:
+    if jobs <= 1:
+        return False
+    return "fork" in multiprocessing.get_all_start_methods()
+
+def analyzeProcessedFiles(processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]], processedFilesOutputPaths: dict[common.FileSectionType, list[Path]], processedFilesCount: int, progressCallback: ProgressCallbackType|None=None, jobs: int=1, analysisCache: mips.AnalysisCache|None=None, timings: Timings|None=None):
+    """
+    Analyzes every section in order.
+
+    If `jobs` is greater than 1 then the instruction analysis of every
+    function is precomputed by a pool of worker processes while the sections
+    are being analyzed. Sections are still analyzed one at a time on the main
+    process, the precomputed results are only used for functions which got the
+    same boundaries, so the output is the same as a serial run.
+
+    If `analysisCache` is passed then the functions of the text sections and
+    their instruction analysis are loaded from it when available, and stored
+    on it otherwise.
+
+    If `timings` is passed then the time spent analyzing each section and
+    each function is recorded on it.
+    """
+    global _sPrecomputeTextSections
+
+    textSections: list[mips.sections.SectionText] = []
+    for textFile in processedFiles.get(common.FileSectionType.Text, []):
+        assert isinstance(textFile, mips.sections.SectionText)
+        textSections.append(textFile)
+
+    # Key of every text section on the cache
+    cacheKeys: dict[int, str] = dict()
+    # Text sections found on the cache, alongside the functions that were cached
+    cacheHits: dict[int, set[tuple[int, int, bool]]] = dict()
+    if analysisCache is not None:
+        for textFile in textSections:
+            key = analysisCache.getSectionKey(textFile)
+            cacheKeys[id(textFile)] = key
+            cached = analysisCache.load(key)
+            if cached is not None:
+                cachedResults, textFile.precomputedFunctionBoundaries = cached
+                textFile.precomputedInstrAnalysis = cachedResults
+                cacheHits[id(textFile)] = set(cachedResults)
+            # Keep the results, so the cache can be updated if they changed
+            textFile.instrAnalysisResults = dict()
+        sectionsToPrecompute = [textFile for textFile in textSections if id(textFile) not in cacheHits]
+    else:
+        sectionsToPrecompute = textSections
+
+    pool = None
+    precomputedIter: Iterator[dict[tuple[int, int, bool], mips.symbols.PrecomputedInstrAnalysis]]|None = None
+    printsDebugInfo = common.GlobalConfig.PRINT_FUNCTION_ANALYSIS_DEBUG_INFO or common.GlobalConfig.PRINT_UNPAIRED_LUIS_DEBUG_INFO
+    if len(sectionsToPrecompute) > 1 and not printsDebugInfo and _canForkWorkers(jobs):
+        # Workers must be forked before any section is analyzed
+        _sPrecomputeTextSections = sectionsToPrecompute
+        pool = multiprocessing.get_context("fork").Pool(jobs)
+        precomputedIter = pool.imap(_precomputeTextSectionInstrAnalysis, range(len(sectionsToPrecompute)))
+
+    try:
+        i = 0
+        for sectionType, filesInSection in sorted(processedFiles.items()):
+            pathLists = processedFilesOutputPaths[sectionType]
+            for fileIndex, f in enumerate(filesInSection):
                 filePath = pathLists[fileIndex]
-                progressCallback(i, str(filePath), processedFilesCount)
-            f.analyze()
-            f.printAnalyzisResults()
-
-            i += 1
+                if progressCallback is not None:
+                    progressCallback(i, str(filePath), processedFilesCount)
+                if precomputedIter is not None and isinstance(f, mips.sections.SectionText) and id(f) not in cacheHits:
+                    f.precomputedInstrAnalysis = next(precomputedIter)
+                if timings is not None and timings.enabled and isinstance(f, mips.sections.SectionText):
+                    f.functionAnalysisTimes = []
+                with _sectionTimer(timings, "analyze", str(filePath)):
+                    f.analyze()
+                f.printAnalyzisResults()
+
+                if timings is not None and isinstance(f, mips.sections.SectionText) and f.functionAnalysisTimes is not None:
+                    for func, (wall, cpu) in zip(f.symbolList, f.functionAnalysisTimes):
+                        timings.recordFunction(str(filePath), func.getName(), func.vram, wall, cpu)
+                    f.functionAnalysisTimes = None
+
+                if analysisCache is not None and isinstance(f, mips.sections.SectionText) and f.instrAnalysisResults is not None:
+                    # Cached sections are only stored again if the context made them find different functions
+                    if id(f) not in cacheHits or f.functionBoundariesResult is not None or cacheHits[id(f)] != f.instrAnalysisResults.keys():
+                        analysisCache.store(cacheKeys[id(f)], f.instrAnalysisResults, f.functionBoundariesResult)
+                    f.instrAnalysisResults = None
+                    f.functionBoundariesResult = None
+
+                i += 1
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        _sPrecomputeTextSections = []
     return
 
 def progressCallback_analyzeProcessedFiles(i: int, filePath: str, processedFilesCount: int) -> None:
@@ -115,15 +267,16 @@ def progressCallback_analyzeProcessedFiles(i: int, filePath: str, processedFiles
     common.Utils.printVerbose("")
 
 
-def nukePointers(processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]], processedFilesOutputPaths: dict[common.FileSectionType, list[Path]], processedFilesCount: int, progressCallback: ProgressCallbackType|None=None):
+def nukePointers(processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]], processedFilesOutputPaths: dict[common.FileSectionType, list[Path]], processedFilesCount: int, progressCallback: ProgressCallbackType|None=None, timings: Timings|None=None):
     i = 0
     for sectionType, filesInSection in processedFiles.items():
         pathLists = processedFilesOutputPaths[sectionType]
         for fileIndex, f in enumerate(filesInSection):
+            filePath = pathLists[fileIndex]
             if progressCallback is not None:
-                filePath = pathLists[fileIndex]
                 progressCallback(i, str(filePath), processedFilesCount)
-            f.removePointers()
+            with _sectionTimer(timings, "nukePointers", str(filePath)):
+                f.removePointers()
             i += 1
     return
 
@@ -137,19 +290,111 @@ def progressCallback_nukePointers(i: int, filePath: str, processedFilesCount: in
     common.Utils.printQuietless(progressStr, end="")
 
 
-def writeProcessedFiles(processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]], processedFilesOutputPaths: dict[common.FileSectionType, list[Path]], processedFilesCount: int, progressCallback: ProgressCallbackType|None=None):
+def _getRenderedName(section: mips.sections.SectionBase) -> str:
+    # Unlike the output path, the name of the section is part of its output
+    return section.getName() + section.sectionType.toStr()
+
+def _writeSectionWithCache(filePath: Path, f: mips.sections.SectionBase, analysisCache: mips.AnalysisCache, renderedKey: str) -> None:
+    renderedAsm = None
+    if len(f.symbolList) > 0:
+        cachedOutputs = analysisCache.loadRendered(renderedKey)
+        if cachedOutputs is not None and len(cachedOutputs) == 1:
+            renderedAsm = cachedOutputs[0]
+        else:
+            renderedAsm = f.disassembleToString()
+            analysisCache.storeRendered(renderedKey, [renderedAsm])
+    mips.FilesHandlers.writeSection(filePath, f, renderedAsm)
+
+def writeProcessedFiles(processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]], processedFilesOutputPaths: dict[common.FileSectionType, list[Path]], processedFilesCount: int, progressCallback: ProgressCallbackType|None=None, jobs: int=1, incrementalState: IncrementalState|None=None, timings: Timings|None=None, analysisCache: mips.AnalysisCache|None=None):
+    """
+    Writes the disassembly of every section.
+
+    If `jobs` is greater than 1 then the sections are rendered and written by
+    forked worker processes. Printing to stdout (`-` paths) is always done on
+    the main process.
+
+    If `incrementalState` is passed then the sections which are not affected
+    by the changes since the previous run are not rendered nor written again.
+
+    If `analysisCache` is passed then the rendered output of each section is
+    loaded from it when available, and stored on it otherwise.
+
+    If `timings` is passed then the time spent writing each section is
+    recorded on it. Sections written by worker processes are not recorded.
+    """
     common.Utils.printVerbose("Writing files...")
-    i = 0
+
+    filesToWrite: list[tuple[Path, mips.sections.SectionBase]] = []
     for section, filesInSection in processedFiles.items():
         pathLists = processedFilesOutputPaths[section]
         for fileIndex, f in enumerate(filesInSection):
-            filePath = pathLists[fileIndex]
+            filesToWrite.append((pathLists[fileIndex], f))
+
+    writesToStdout = any(str(filePath) == "-" for filePath, _ in filesToWrite)
+
+    upToDate: list[bool] = [False] * len(filesToWrite)
+    renderedKeys: list[str]|None = None
+    tasksChanges: list[list[tuple[common.ContextSymbol, str, Any]]]|None = None
+    if (incrementalState is not None or analysisCache is not None) and not writesToStdout:
+        tasksChanges = [f.getDisassemblyContextChanges() for _, f in filesToWrite]
+
+        # Fingerprints are computed with every change applied, like the context
+        # has once every file has been written
+        previousValues: list[tuple[common.ContextSymbol, str, Any]] = []
+        for changes in tasksChanges:
+            for contextSym, attribute, value in changes:
+                previousValues.append((contextSym, attribute, getattr(contextSym, attribute)))
+                setattr(contextSym, attribute, value)
+        if len(filesToWrite) > 0:
+            context = filesToWrite[0][1].context
+            if incrementalState is not None:
+                incrementalState.computeFingerprints(context, filesToWrite)
+            if analysisCache is not None:
+                fingerprints = IncrementalState.computeSectionsFingerprints(context, [(_getRenderedName(f), f) for _, f in filesToWrite])
+                renderedKeys = [mips.AnalysisCache.getRenderedKey("section", [fingerprint]) for fingerprint in fingerprints]
+        for contextSym, attribute, value in reversed(previousValues):
+            setattr(contextSym, attribute, value)
+
+        if incrementalState is not None:
+            upToDate = [incrementalState.isUpToDate(filePath, f) for filePath, f in filesToWrite]
+
+    if not _canForkWorkers(jobs) or writesToStdout:
+        for i, (filePath, f) in enumerate(filesToWrite):
             if progressCallback is not None:
                 progressCallback(i, str(filePath), processedFilesCount)
 
+            if upToDate[i]:
+                assert tasksChanges is not None
+                # Skipping the file must leave the context as if it had been written
+                _applyContextChanges(tasksChanges[i])
+                continue
             common.Utils.printVerbose(f"Writing {filePath}")
-            mips.FilesHandlers.writeSection(filePath, f)
-            i += 1
+            with _sectionTimer(timings, "write", str(filePath)):
+                if analysisCache is not None and renderedKeys is not None:
+                    _writeSectionWithCache(filePath, f, analysisCache, renderedKeys[i])
+                else:
+                    mips.FilesHandlers.writeSection(filePath, f)
+            if tasksChanges is not None:
+                # Output loaded from the cache did not change the context
+                _applyContextChanges(tasksChanges[i])
+    else:
+        if tasksChanges is None:
+            tasksChanges = [f.getDisassemblyContextChanges() for _, f in filesToWrite]
+        tasks: list[Callable[[], None]] = []
+        for i, (filePath, f) in enumerate(filesToWrite):
+            if upToDate[i]:
+                tasks.append(functools.partial(_applyContextChanges, tasksChanges[i]))
+            elif analysisCache is not None and renderedKeys is not None:
+                tasks.append(functools.partial(_writeSectionWithCache, filePath, f, analysisCache, renderedKeys[i]))
+            else:
+                tasks.append(functools.partial(mips.FilesHandlers.writeSection, filePath, f))
+        for i in _runTasksOnWorkers(tasks, jobs, tasksChanges):
+            filePath = filesToWrite[i][0]
+            if progressCallback is not None:
+                progressCallback(i, str(filePath), processedFilesCount)
+
+    if incrementalState is not None and not writesToStdout:
+        incrementalState.save()
     return
 
 def progressCallback_writeProcessedFiles(i: int, filePath: str, processedFilesCount: int) -> None:
@@ -165,27 +410,152 @@ def progressCallback_writeProcessedFiles(i: int, filePath: str, processedFilesCo
         common.Utils.printQuietless()
 
 
-def migrateFunctions(processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]], functionMigrationPath: Path, progressCallback: ProgressCallbackType|None=None):
-    funcTotal = sum(len(x.symbolList) for x in processedFiles.get(common.FileSectionType.Text, []))
-    rodataFileList = processedFiles.get(common.FileSectionType.Rodata, [])
-    i = 0
-    for textFile in processedFiles.get(common.FileSectionType.Text, []):
-        filePath = functionMigrationPath / textFile.getName()
-        filePath.mkdir(parents=True, exist_ok=True)
+def _renderFunctionRodataEntry(entry: mips.FunctionRodataEntry) -> str:
+    buffer = io.StringIO()
+    entry.writeToFile(buffer, writeFunction=True)
+    return buffer.getvalue()
+
+def _migrateFunctionsOfSection(textFile: mips.sections.SectionBase, functionMigrationPath: Path, rodataOwnershipMap: mips.RodataOwnershipMap, progressCallback: Callable[[mips.symbols.SymbolFunction], None]|None=None, analysisCache: mips.AnalysisCache|None=None, renderedKey: str|None=None) -> None:
+    filePath = functionMigrationPath / textFile.getName()
+    filePath.mkdir(parents=True, exist_ok=True)
+
+    cachedOutputs: list[str]|None = None
+    renderedOutputs: list[str] = []
+    if analysisCache is not None and renderedKey is not None:
+        cachedOutputs = analysisCache.loadRendered(renderedKey)
+        if cachedOutputs is not None and len(cachedOutputs) != len(textFile.symbolList):
+            cachedOutputs = None
+
+    for i, func in enumerate(textFile.symbolList):
+        assert isinstance(func, mips.symbols.SymbolFunction)
+        if progressCallback is not None:
+            progressCallback(func)
+
+        funcPath = filePath / (func.getName()+ ".s")
+        common.Utils.printVerbose(f"Writing function {funcPath}")
+        if cachedOutputs is not None:
+            common.Utils.writeTextToFile(funcPath, cachedOutputs[i])
+            continue
+
+        entry = rodataOwnershipMap.getEntryForFunc(func)
+        if analysisCache is not None:
+            renderedOutputs.append(_renderFunctionRodataEntry(entry))
+            common.Utils.writeTextToFile(funcPath, renderedOutputs[-1])
+        elif common.GlobalConfig.ONLY_WRITE_CHANGED_FILES:
+            common.Utils.writeTextToFile(funcPath, _renderFunctionRodataEntry(entry))
+        else:
+            with funcPath.open("w") as f:
+                entry.writeToFile(f, writeFunction=True)
+
+    if analysisCache is not None and renderedKey is not None and cachedOutputs is None:
+        analysisCache.storeRendered(renderedKey, renderedOutputs)
+
+def _writeOtherRodataOfSection(functionMigrationPath: Path, rodataFile: mips.sections.SectionBase, analysisCache: mips.AnalysisCache, renderedKey: str) -> None:
+    cachedOutputs = analysisCache.loadRendered(renderedKey)
+    if cachedOutputs is None or len(cachedOutputs) != sum(1 for sym in rodataFile.symbolList if not sym.shouldMigrate()):
+        cachedOutputs = mips.FilesHandlers.renderOtherRodata(rodataFile)
+        analysisCache.storeRendered(renderedKey, cachedOutputs)
+    mips.FilesHandlers.writeOtherRodata(functionMigrationPath, [rodataFile], cachedOutputs)
+
+def _getMigrationRenderedKeys(textFileList: list[mips.sections.SectionBase], rodataFileList: list[mips.sections.SectionBase], rodataOwnershipMap: mips.RodataOwnershipMap) -> tuple[list[str], list[str]]:
+    """
+    Returns the keys for the migrated functions of each text section and for
+    the rodata symbols of each rodata section which were not migrated.
+
+    The functions of a text section depend on the rodata sections their
+    migrated rodata symbols come from, so their fingerprints are part of the
+    key too.
+    """
+    allSections = textFileList + rodataFileList
+    if len(allSections) == 0:
+        return [], []
+
+    fingerprints = IncrementalState.computeSectionsFingerprints(allSections[0].context, [(_getRenderedName(f), f) for f in allSections])
+    sectionFingerprints = {id(f): fingerprint for f, fingerprint in zip(allSections, fingerprints)}
+
+    textKeys: list[str] = []
+    for textFile in textFileList:
+        entriesLayout: list[str] = [sectionFingerprints[id(textFile)]]
         for func in textFile.symbolList:
+            assert isinstance(func, mips.symbols.SymbolFunction)
+            entry = rodataOwnershipMap.getEntryForFunc(func)
+            rodataLayout = [f"{sym.vram:X}:{sectionFingerprints.get(id(sym.parent))}" for sym in entry.rodataSyms]
+            lateRodataLayout = [f"{sym.vram:X}:{sectionFingerprints.get(id(sym.parent))}" for sym in entry.lateRodataSyms]
+            entriesLayout.append(f"{' '.join(rodataLayout)} / {' '.join(lateRodataLayout)}")
+        textKeys.append(mips.AnalysisCache.getRenderedKey("migrated functions", entriesLayout))
+
+    rodataKeys: list[str] = []
+    for rodataFile in rodataFileList:
+        migratedSyms = " ".join(f"{sym.shouldMigrate():d}" for sym in rodataFile.symbolList)
+        rodataKeys.append(mips.AnalysisCache.getRenderedKey("other rodata", [sectionFingerprints[id(rodataFile)], migratedSyms]))
+
+    return textKeys, rodataKeys
+
+def migrateFunctions(processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]], functionMigrationPath: Path, progressCallback: ProgressCallbackType|None=None, jobs: int=1, timings: Timings|None=None, analysisCache: mips.AnalysisCache|None=None):
+    """
+    Writes every function and its rodata to its own file, and every rodata
+    symbol which could not be migrated to a function to its own file too.
+
+    If `jobs` is greater than 1 then the files are rendered and written by
+    forked worker processes, one text or rodata section at a time.
+
+    If `timings` is passed then the time spent migrating each text section is
+    recorded on it, unless worker processes are used.
+
+    If `analysisCache` is passed then the rendered files of each section are
+    loaded from it when available, and stored on it otherwise.
+    """
+    textFileList = processedFiles.get(common.FileSectionType.Text, [])
+    funcTotal = sum(len(x.symbolList) for x in textFileList)
+    rodataFileList = processedFiles.get(common.FileSectionType.Rodata, [])
+    rodataOwnershipMap = mips.RodataOwnershipMap(rodataFileList)
+
+    if analysisCache is not None:
+        textKeys, rodataKeys = _getMigrationRenderedKeys(textFileList, rodataFileList, rodataOwnershipMap)
+
+    def migrateTask(textIndex: int, funcProgress: Callable[[mips.symbols.SymbolFunction], None]|None=None) -> None:
+        if analysisCache is not None:
+            _migrateFunctionsOfSection(textFileList[textIndex], functionMigrationPath, rodataOwnershipMap, funcProgress, analysisCache, textKeys[textIndex])
+        else:
+            _migrateFunctionsOfSection(textFileList[textIndex], functionMigrationPath, rodataOwnershipMap, funcProgress)
+
+    def otherRodataTask(rodataIndex: int) -> None:
+        if analysisCache is not None:
+            _writeOtherRodataOfSection(functionMigrationPath, rodataFileList[rodataIndex], analysisCache, rodataKeys[rodataIndex])
+        else:
+            mips.FilesHandlers.writeOtherRodata(functionMigrationPath, [rodataFileList[rodataIndex]])
+
+    if not _canForkWorkers(jobs):
+        i = 0
+        def funcProgress(func: mips.symbols.SymbolFunction) -> None:
+            nonlocal i
             if progressCallback is not None:
                 progressCallback(i, func.getName(), funcTotal)
+            i += 1
 
-            assert isinstance(func, mips.symbols.SymbolFunction)
-            entry = mips.FunctionRodataEntry.getEntryForFuncFromPossibleRodataSections(func, rodataFileList)
+        for textIndex, textFile in enumerate(textFileList):
+            with _sectionTimer(timings, "migrateFunctions", textFile.getName()):
+                migrateTask(textIndex, funcProgress)
+        for rodataIndex in range(len(rodataFileList)):
+            otherRodataTask(rodataIndex)
+        return
 
-            funcPath = filePath / (func.getName()+ ".s")
-            common.Utils.printVerbose(f"Writing function {funcPath}")
-            with funcPath.open("w") as f:
-                entry.writeToFile(f, writeFunction=True)
+    # Every change that disassembling may do should have already been applied
+    # when the sections were written, but apply them in case they were not.
+    for sectionFile in textFileList + rodataFileList:
+        _applyContextChanges(sectionFile.getDisassemblyContextChanges())
 
+    tasks: list[Callable[[], None]] = [functools.partial(migrateTask, textIndex) for textIndex in range(len(textFileList))]
+    tasks += [functools.partial(otherRodataTask, rodataIndex) for rodataIndex in range(len(rodataFileList))]
+
+    i = 0
+    for taskIndex in _runTasksOnWorkers(tasks, jobs):
+        if taskIndex >= len(textFileList):
+            continue
+        for func in textFileList[taskIndex].symbolList:
+            if progressCallback is not None:
+                progressCallback(i, func.getName(), funcTotal)
             i += 1
-    mips.FilesHandlers.writeOtherRodata(functionMigrationPath, rodataFileList)
 
 def progressCallback_migrateFunctions(i: int, funcName: str, funcTotal: int) -> None:
     global _sLenLastLine
@@ -208,14 +578,7 @@ def writeFunctionInfoCsv(processedFiles: dict[common.FileSectionType, list[mips.
                 assert isinstance(func, mips.symbols.SymbolFunction)
                 f.write(f"0x{func.vromStart:06X},0x{func.vram:08X},{func.getName()},{textFile.getName()},0x{func.sizew*4:X},")
 
-                bitswordlist = []
-                for instr in func.instructions:
-                    topbits = instr.getRaw() & 0xFC000000
-
-                    bitswordlist.append(topbits)
-                bitbytelist = common.Utils.endianessWordsToBytes(common.Utils.InputEndian.BIG, bitswordlist)
-
-                f.write(common.Utils.getStrHash(bitbytelist))
+                f.write(mips.FunctionFingerprints.getFunctionShapeHash(func))
                 f.write(",")
 
                 calledFuncs = []
@@ -255,18 +618,7 @@ def writeFunctionInfoCsv(processedFiles: dict[common.FileSectionType, list[mips.
             # For adding new lines at the end of each file
             # f.write("\n")
 
-
-def cliMain():
-    parser = argparse.ArgumentParser(description="Interface to call any of the spimdisasm's CLI utilities", prog="spimdisasm")
-
-    parser.add_argument("-V", "--version", action="version", version=f"%(prog)s {__version__}")
-
-    subparsers = parser.add_subparsers(description="action", help="The CLI utility to run", required=True)
-
-    spimdisasm.disasmdis.addSubparser(subparsers)
-    spimdisasm.singleFileDisasm.addSubparser(subparsers)
-    spimdisasm.elfObjDisasm.addSubparser(subparsers)
-    spimdisasm.rspDisasm.addSubparser(subparsers)
-
-    args = parser.parse_args()
-    return args.func(args)
+def writeFingerprintIndex(processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]], indexPath: Path):
+    index = mips.FingerprintIndex()
+    index.addFunctionsFromSections(processedFiles.get(common.FileSectionType.Text, []))
+    index.save(indexPath)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from .. import common
+from .. import mips
+
+
+class IncrementalState:
+    """
+    Keeps track of a fingerprint of every written section between runs, so the
+    sections which are not affected by the changes to the input don't need to
+    be rendered again.
+
+    The fingerprint of a section covers its bytes, the output layout, the
+    configuration, every context symbol inside the section and every symbol
+    the section references, found through the `referenceFunctions` and
+    `referenceSymbols` of the context symbols. Renaming or retyping a symbol
+    changes the fingerprint of the section containing it and of every section
+    referencing it. When the output lists the symbols referencing each symbol
+    (`--asm-referencee-symbols`), their names are part of the fingerprint too.
+    """
+
+    def __init__(self, statePath: Path):
+        self.statePath = statePath
+
+        self.previousFingerprints: dict[str, str] = dict()
+        self.fingerprints: dict[str, str] = dict()
+
+        try:
+            with self.statePath.open() as f:
+                state = json.load(f)
+            if isinstance(state, dict) and isinstance(state.get("fingerprints"), dict):
+                self.previousFingerprints = state["fingerprints"]
+        except (OSError, ValueError):
+            # Missing or corrupted state, every section will be written
+            pass
+
+    def save(self) -> None:
+        self.statePath.parent.mkdir(parents=True, exist_ok=True)
+        tempPath = self.statePath.with_name(f"{self.statePath.name}.{os.getpid()}.tmp")
+        with tempPath.open("w") as f:
+            json.dump({"fingerprints": self.fingerprints}, f, indent=0, sort_keys=True)
+        os.replace(tempPath, self.statePath)
+
+    @staticmethod
+    def _getKey(filePath: Path, section: mips.sections.SectionBase) -> str:
+        # Sections of different types may share the same output path, since the section type is appended to it
+        return str(filePath) + section.sectionType.toStr()
+
+    @staticmethod
+    def _getSymbolRow(contextSym: common.ContextSymbol) -> str:
+        return f"{contextSym.overlayCategory},{contextSym.toCsv()}\n"
+
+    def computeFingerprints(self, context: common.Context, filesToWrite: list[tuple[Path, mips.sections.SectionBase]]) -> None:
+        """
+        Computes the fingerprint of every section, using the current state of
+        the context.
+
+        Every change disassembling the sections does to the context must have
+        been applied already, so the fingerprints match the ones computed after
+        writing the files of the previous run.
+        """
+
+        keys = [self._getKey(filePath, section) for filePath, section in filesToWrite]
+        fingerprints = self.computeSectionsFingerprints(context, [(key, section) for key, (_, section) in zip(keys, filesToWrite)])
+        self.fingerprints.update(zip(keys, fingerprints))
+
+    @staticmethod
+    def computeSectionsFingerprints(context: common.Context, sections: list[tuple[str, mips.sections.SectionBase]]) -> list[str]:
+        """
+        Returns the fingerprint of each section, in the same order.
+
+        Each section is identified by the given string, which is part of its
+        fingerprint alongside the layout of every given section.
+        """
+
+        segments = [context.globalSegment, context.unknownSegment]
+        for segmentsPerVrom in context.overlaySegments.values():
+            segments.extend(segmentsPerVrom.values())
+
+        # Invert the references, so we know which symbols are referenced by each function and symbol
+        referencedSymbols: dict[common.ContextSymbol, list[common.ContextSymbol]] = dict()
+        for segment in segments:
+            for contextSym in segment.symbols.values():
+                for referencer in contextSym.iterReferencingSymbols():
+                    referencedSymbols.setdefault(referencer, []).append(contextSym)
+
+        # Symbols are usually referenced by many sections. Symbols of different
+        # overlays may compare equal, so they are told apart by their id
+        symbolRows: dict[int, str] = dict()
+        def getSymbolRow(contextSym: common.ContextSymbol) -> str:
+            row = symbolRows.get(id(contextSym))
+            if row is None:
+                row = IncrementalState._getSymbolRow(contextSym)
+                symbolRows[id(contextSym)] = row
+            return row
+
+        globalHasher = hashlib.sha256()
+        globalHasher.update(mips.AnalysisCache.getConfigFingerprint().encode())
+        for key, section in sections:
+            globalHasher.update(f"{key},{section.vromStart:X},{section.vromEnd:X},{section.vram:X}\n".encode())
+        for segment in segments:
+            for constantSym in segment.constants.values():
+                globalHasher.update(getSymbolRow(constantSym).encode())
+
+        relocsVroms = sorted(context.globalRelocationOverrides)
+
+        # The output lists the names of the symbols referencing each symbol
+        hashReferencingNames = common.GlobalConfig.ASM_COMMENT and common.GlobalConfig.ASM_REFERENCEE_SYMBOLS
+
+        fingerprints: list[str] = []
+        for key, section in sections:
+            hasher = globalHasher.copy()
+            hasher.update(f"{key}\n".encode())
+            hasher.update(common.Utils.wordsToBytes(section.words))
+
+            for _, contextSym in section.getSymbolsRange(section.vram, section.vramEnd):
+                hasher.update(getSymbolRow(contextSym).encode())
+                if hashReferencingNames:
+                    referencingNames = sorted(referencingSym.getName() for referencingSym in contextSym.iterReferencingSymbols())
+                    hasher.update(f"{' '.join(referencingNames)}\n".encode())
+                for referencedSym in referencedSymbols.get(contextSym, []):
+                    hasher.update(getSymbolRow(referencedSym).encode())
+
+            if section.sectionType != common.FileSectionType.Text:
+                # Data may reference the middle of symbols, which is not tracked by the references
+                for word in section.words:
+                    if context.isInTotalVramRange(word):
+                        wordSym = section.getSymbol(word)
+                        if wordSym is not None:
+                            hasher.update(getSymbolRow(wordSym).encode())
+
+            for i in range(bisect.bisect_left(relocsVroms, section.vromStart), bisect.bisect_left(relocsVroms, section.vromEnd)):
+                relocInfo = context.globalRelocationOverrides[relocsVroms[i]]
+                hasher.update(f"{relocsVroms[i]:X},{relocInfo.relocType},{relocInfo.getName()},{relocInfo.addend},{relocInfo.staticReference},{relocInfo.globalReloc}\n".encode())
+
+            fingerprints.append(hasher.hexdigest())
+        return fingerprints
+
+    def isUpToDate(self, filePath: Path, section: mips.sections.SectionBase) -> bool:
+        """
+        Checks if the output of the given section from the previous run is
+        still valid, meaning it does not need to be rendered and written again.
+        """
+        key = self._getKey(filePath, section)
+        fingerprint = self.fingerprints.get(key)
+        if fingerprint is None or self.previousFingerprints.get(key) != fingerprint:
+            return False
+
+        if len(section.symbolList) == 0:
+            # Nothing gets written for empty sections
+            return True
+
+        outputPaths = [Path(str(filePath) + section.sectionType.toStr() + ".s")]
+        if common.GlobalConfig.WRITE_BINARY and section.sizew > 0:
+            outputPaths.append(Path(str(filePath) + section.sectionType.toStr()))
+        return all(outputPath.exists() for outputPath in outputPaths)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import cProfile
+import json
+from pathlib import Path
+import pstats
+import time
+from typing import Any, Iterator
+
+from .. import __version__
+
+
+class Timings:
+    """
+    Measures the wall and CPU time spent on each phase of a frontend run, on
+    each section and on the analysis of each function, and writes a json
+    report with them.
+
+    Phases are always measured since it is cheap to do so, but sections and
+    functions are only measured if a report was requested (`enabled`).
+
+    Optionally the whole run can be profiled with `cProfile`. Only the main
+    process is profiled, the work done by the worker processes of `--jobs` is
+    not part of the profile.
+    """
+
+    def __init__(self, reportPath: Path|None=None, profilePath: Path|None=None, topCount: int=20):
+        self.reportPath = reportPath
+        self.profilePath = profilePath
+        self.topCount = topCount
+
+        self.phases: list[tuple[str, float, float]] = []
+        "(name, wall time, cpu time), in the same order they were run"
+        self.sections: list[tuple[str, str, float, float]] = []
+        "(phase, section name, wall time, cpu time)"
+        self.functions: list[tuple[str, str, int, float, float]] = []
+        "(section name, function name, vram, wall time, cpu time)"
+
+        self._startWall: float|None = None
+        self._startCpu: float|None = None
+        self._profiler: cProfile.Profile|None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.reportPath is not None
+
+
+    def start(self) -> None:
+        self._startWall = time.perf_counter()
+        self._startCpu = time.process_time()
+        if self.profilePath is not None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def finish(self) -> None:
+        """Stops the profiler and writes the report and the profile, if any of
+        them were requested."""
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self.reportPath is not None:
+            self.saveReport(self.reportPath)
+        if self._profiler is not None and self.profilePath is not None:
+            self.profilePath.parent.mkdir(parents=True, exist_ok=True)
+            self._profiler.dump_stats(str(self.profilePath))
+        self._profiler = None
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        startWall = time.perf_counter()
+        startCpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - startWall, time.process_time() - startCpu))
+
+    @contextlib.contextmanager
+    def section(self, phase: str, sectionName: str) -> Iterator[None]:
+        startWall = time.perf_counter()
+        startCpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.recordSection(phase, sectionName, time.perf_counter() - startWall, time.process_time() - startCpu)
+
+    def recordSection(self, phase: str, sectionName: str, wall: float, cpu: float) -> None:
+        self.sections.append((phase, sectionName, wall, cpu))
+
+    def recordFunction(self, sectionName: str, functionName: str, vram: int, wall: float, cpu: float) -> None:
+        self.functions.append((sectionName, functionName, vram, wall, cpu))
+
+
+    def getReport(self) -> dict[str, Any]:
+        report: dict[str, Any] = {
+            "spimdisasmVersion": __version__,
+            "phases": [{"name": name, "wall": wall, "cpu": cpu} for name, wall, cpu in self.phases],
+            "sections": [{"phase": phase, "name": name, "wall": wall, "cpu": cpu} for phase, name, wall, cpu in self.sections],
+            "slowestSections": [
+                {"phase": phase, "name": name, "wall": wall, "cpu": cpu}
+                for phase, name, wall, cpu in sorted(self.sections, key=lambda x: x[2], reverse=True)[:self.topCount]
+            ],
+            "slowestFunctions": [
+                {"section": sectionName, "name": name, "vram": f"0x{vram:08X}", "wall": wall, "cpu": cpu}
+                for sectionName, name, vram, wall, cpu in sorted(self.functions, key=lambda x: x[3], reverse=True)[:self.topCount]
+            ],
+            "functionsCount": len(self.functions),
+        }
+        if self._startWall is not None and self._startCpu is not None:
+            report["total"] = {"wall": time.perf_counter() - self._startWall, "cpu": time.process_time() - self._startCpu}
+        if self._profiler is not None:
+            stats = pstats.Stats(self._profiler)
+            entries = []
+            for (filename, line, funcName), (_, callsCount, totalTime, cumulativeTime, _) in stats.stats.items(): # type: ignore[attr-defined]
+                entries.append({"function": f"{filename}:{line}({funcName})", "calls": callsCount, "tottime": totalTime, "cumtime": cumulativeTime})
+            entries.sort(key=lambda x: x["cumtime"], reverse=True)
+            report["profile"] = entries[:self.topCount]
+        return report
+
+    def saveReport(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as f:
+            json.dump(self.getReport(), f, indent=2)
+            f.write("\n")
+
+
+    @staticmethod
+    def addParametersToArgParse(parser: argparse.ArgumentParser) -> None:
+        timingsParser = parser.add_argument_group("Timings and profiling")
+
+        timingsParser.add_argument("--timings", help="Writes a json report to the given path with the wall and CPU time spent on each phase of the run, on each section and on the slowest functions", metavar="PATH")
+        timingsParser.add_argument("--timings-top", help="Amount of the slowest sections and functions listed on the timings report. Defaults to 20", type=int, default=20, metavar="N")
+        timingsParser.add_argument("--profile", help="Profiles the whole run with cProfile and writes the stats to the given path, which can be read with the `pstats` module. If --timings is passed too then the functions with the highest cumulative time are listed on its report. Worker processes spawned by --jobs are not profiled", metavar="PATH")
+
+    @staticmethod
+    def fromArgs(args: argparse.Namespace) -> Timings:
+        reportPath = Path(args.timings) if args.timings is not None else None
+        profilePath = Path(args.profile) if args.profile is not None else None
+        return Timings(reportPath, profilePath, args.timings_top)
@@ -5,5 +5,21 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
 
-from . import FrontendUtilities as FrontendUtilities
+from ..LazyPackage import makePackageLazy
+
+if TYPE_CHECKING:
+    from . import Cli as Cli
+    from . import FrontendUtilities as FrontendUtilities
+
+    from .IncrementalState import IncrementalState as IncrementalState
+    from .Timings import Timings as Timings
+else:
+    makePackageLazy(__name__, {
+        "Cli": (".Cli", None),
+        "FrontendUtilities": (".FrontendUtilities", None),
+
+        "IncrementalState": (".IncrementalState", "IncrementalState"),
+        "Timings": (".Timings", "Timings"),
+    })
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+from typing import TextIO
+
+from .. import common
+from .. import mips
+
+from .. import __version__
+
+PROGNAME = "match"
+
+
+def writeMatchesCsv(matches: list[mips.FunctionMatch], f: TextIO) -> None:
+    f.write("vrom,address,name,file,length,counterpart vrom,counterpart address,counterpart name,counterpart file,counterpart length,method,same shape\n")
+    for funcMatch in matches:
+        func = funcMatch.function
+        counterpart = funcMatch.counterpart
+        f.write(f"0x{func.vrom:06X},0x{func.vram:08X},{func.name},{func.fileName},0x{func.size:X},")
+        f.write(f"0x{counterpart.vrom:06X},0x{counterpart.vram:08X},{counterpart.name},{counterpart.fileName},0x{counterpart.size:X},")
+        f.write(f"{funcMatch.method},{funcMatch.hasSameShape}\n")
+
+def writeMatchesSymbolAddrs(matches: list[mips.FunctionMatch], f: TextIO) -> None:
+    """
+    Writes the name of every named counterpart as a symbol of the matched
+    build, in the splat's symbol_addrs format.
+    """
+    for funcMatch in matches:
+        if not funcMatch.counterpart.isNamed:
+            continue
+        func = funcMatch.function
+        f.write(f"{funcMatch.counterpart.name} = 0x{func.vram:08X}; // type:func rom:0x{func.vrom:X} size:0x{func.size:X}\n")
+
+
+def getToolDescription() -> str:
+    return "Finds the counterpart of every function of a build on another build, using the fingerprint indices written by `--fingerprint-index`"
+
+def addOptionsToParser(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("-V", "--version", action="version", version=f"%(prog)s {__version__}")
+
+    parser.add_argument("indexed", help="Fingerprint index of the build whose functions are already known")
+    parser.add_argument("new", help="Fingerprint index of the build whose functions will be matched")
+
+    parser.add_argument("-o", "--output", help="Path where to write a csv listing every matched function and its counterpart. Defaults to the standard output", metavar="PATH")
+    parser.add_argument("--symbol-addrs", help="Path where to write the names of the counterparts as symbols of the new build, in the splat's symbol_addrs format. Counterparts with names generated by the disassembler are skipped", metavar="PATH")
+
+    return parser
+
+def getArgsParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=getToolDescription(), prog=PROGNAME, formatter_class=common.Utils.PreserveWhiteSpaceWrapRawTextHelpFormatter)
+    return addOptionsToParser(parser)
+
+def processArguments(args: argparse.Namespace) -> int:
+    indices: list[mips.FingerprintIndex] = []
+    for indexPath in (args.indexed, args.new):
+        try:
+            indices.append(mips.FingerprintIndex.load(Path(indexPath)))
+        except RuntimeError as e:
+            common.Utils.eprint(e)
+            return 1
+        except (OSError, ValueError) as e:
+            # Missing file or invalid json
+            common.Utils.eprint(f"Error: could not read the fingerprint index '{indexPath}': {e}")
+            return 1
+    indexedIndex, newIndex = indices
+
+    matches = indexedIndex.match(newIndex)
+
+    if args.output is None:
+        writeMatchesCsv(matches, sys.stdout)
+    else:
+        outputPath = Path(args.output)
+        outputPath.parent.mkdir(parents=True, exist_ok=True)
+        with outputPath.open("w") as f:
+            writeMatchesCsv(matches, f)
+
+    if args.symbol_addrs is not None:
+        symbolAddrsPath = Path(args.symbol_addrs)
+        symbolAddrsPath.parent.mkdir(parents=True, exist_ok=True)
+        with symbolAddrsPath.open("w") as f:
+            writeMatchesSymbolAddrs(matches, f)
+
+    methodsCount: dict[str, int] = dict()
+    for funcMatch in matches:
+        methodsCount[funcMatch.method] = methodsCount.get(funcMatch.method, 0) + 1
+    methodsSummary = ", ".join(f"{method}: {count}" for method, count in methodsCount.items())
+    common.Utils.printQuietless(f"{PROGNAME}: Matched {len(matches)} of {len(newIndex.functions)} functions ({methodsSummary})", file=sys.stderr)
+
+    return 0
+
+def addSubparser(subparser: argparse._SubParsersAction[argparse.ArgumentParser]):
+    parser = subparser.add_parser(PROGNAME, help=getToolDescription(), formatter_class=common.Utils.PreserveWhiteSpaceWrapRawTextHelpFormatter)
+
+    addOptionsToParser(parser)
+
+    parser.set_defaults(func=processArguments)
+
+
+def matchMain():
+    args = getArgsParser().parse_args()
+
+    return processArguments(args)
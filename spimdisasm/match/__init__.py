@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+
+from .MatchInternals import writeMatchesCsv as writeMatchesCsv
+from .MatchInternals import writeMatchesSymbolAddrs as writeMatchesSymbolAddrs
+from .MatchInternals import getToolDescription as getToolDescription
+from .MatchInternals import addOptionsToParser as addOptionsToParser
+from .MatchInternals import getArgsParser as getArgsParser
+from .MatchInternals import processArguments as processArguments
+from .MatchInternals import addSubparser as addSubparser
+from .MatchInternals import matchMain as matchMain
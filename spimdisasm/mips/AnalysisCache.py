@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+from pathlib import Path
+import sys
+import time
+from typing import Any
+
+import rabbitizer
+
+from .. import common
+
+from . import sections
+from . import symbols
+
+from .. import __version__
+
+
+class AnalysisCache:
+    """
+    On-disk cache of the analysis and the rendered output of the sections.
+
+    The analysis of each text section, meaning the functions found on it and
+    the instruction analysis of every function, is stored on its own `marshal`
+    file, named after a hash of the section contents, its vram, the vram
+    ranges known by the context, the current disassembler and rabbitizer
+    configuration and the Python version (which defines the `marshal` format).
+    The cached functions are only used if the context symbols the search of
+    functions looks at are the same, and the cached analysis of a function is
+    only used if the function ends up having exactly the same boundaries on
+    the current run, so the output is the same as running without the cache.
+
+    The rendered output of the sections is stored on the `rendered`
+    subdirectory, named after a fingerprint of everything the output depends
+    on (see `IncrementalState.computeSectionsFingerprints`).
+
+    Every file used by a run gets its modification time updated. Once the
+    cache is bigger than `maxSize` bytes, `prune` removes the least recently
+    used files, except the ones used since this object was created.
+    """
+
+    DEFAULT_MAX_SIZE: int = 512 * 1024 * 1024
+
+    def __init__(self, cacheDir: Path, maxSize: int|None=DEFAULT_MAX_SIZE):
+        self.cacheDir = cacheDir
+        self.maxSize = maxSize
+        "The size in bytes `prune` shrinks the cache to. None means no limit"
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.renderedHits: int = 0
+        self.renderedMisses: int = 0
+
+        # Files used from now on are kept by `prune`. Filesystems may store
+        # timestamps with a coarse resolution, so leave some margin
+        self._startTime = time.time() - 2
+
+    @staticmethod
+    def getConfigFingerprint() -> str:
+        """
+        Returns a string describing the current disassembler and rabbitizer
+        configuration, which changes if any setting that could alter the
+        analysis or the output changes.
+        """
+        rabbitizerConfig = [(attr, getattr(rabbitizer.config, attr)) for attr in dir(rabbitizer.config) if not attr.startswith("_")]
+        return f"{__version__} {rabbitizer.__version__} {common.GlobalConfig!r} {rabbitizerConfig!r}"
+
+    def getSectionKey(self, section: sections.SectionText) -> str:
+        totalVramRange = section.context.totalVramRange
+        ranges = [(totalVramRange.mainAddressRange.start, totalVramRange.mainAddressRange.end)]
+        ranges += [(addrRange.start, addrRange.end) for addrRange in totalVramRange.specialRanges]
+
+        hasher = hashlib.sha256()
+        hasher.update(self.getConfigFingerprint().encode())
+        hasher.update(f" {sys.version_info[:2]} {marshal.version}".encode())
+        hasher.update(f" {section.getVramOffset(0):08X} {section.instrCat} {ranges!r} ".encode())
+        hasher.update(common.Utils.wordsToBytes(section.words))
+        return hasher.hexdigest()
+
+    @staticmethod
+    def getRenderedKey(kind: str, fingerprints: list[str]) -> str:
+        """
+        Returns the key for the output of the given kind, which depends on the
+        sections with the given fingerprints.
+        """
+        hasher = hashlib.sha256()
+        hasher.update(f"{kind} {sys.version_info[:2]} {marshal.version}\n".encode())
+        for fingerprint in fingerprints:
+            hasher.update(f"{fingerprint}\n".encode())
+        return hasher.hexdigest()
+
+    def _getSectionPath(self, key: str) -> Path:
+        return self.cacheDir / f"{key}.marshal"
+
+    def _getRenderedPath(self, key: str) -> Path:
+        return self.cacheDir / "rendered" / f"{key}.marshal"
+
+    def _loadFile(self, path: Path) -> Any:
+        try:
+            with path.open("rb") as f:
+                data = marshal.load(f)
+        except FileNotFoundError:
+            return None
+        except (EOFError, ValueError, TypeError):
+            # Truncated or corrupted cache files are treated as a miss
+            return None
+
+        try:
+            # Keep track of the last time the file was used, so `prune` does not remove it
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def _storeFile(self, path: Path, data: Any) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tempPath = path.with_suffix(f".{os.getpid()}.tmp")
+        with tempPath.open("wb") as f:
+            marshal.dump(data, f)
+        # Avoid leaving half-written files if there are many instances using the same cache
+        os.replace(tempPath, path)
+
+    def load(self, key: str) -> tuple[dict[tuple[int, int, bool], symbols.PrecomputedInstrAnalysis], sections.PrecomputedFunctionBoundaries|None]|None:
+        """
+        Returns the cached instruction analysis and functions for the section
+        with the given key, or None if the section is not cached.
+        """
+        data = self._loadFile(self._getSectionPath(key))
+        try:
+            functionsData, boundariesData = data
+            results = {(start, end, hasUnimplementedIntrs): symbols.PrecomputedInstrAnalysis.fromPlainData(funcData) for (start, end, hasUnimplementedIntrs), funcData in functionsData.items()}
+            boundaries = sections.PrecomputedFunctionBoundaries.fromPlainData(boundariesData) if boundariesData is not None else None
+        except (ValueError, TypeError, AttributeError):
+            # Missing or written by a different version
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return results, boundaries
+
+    def store(self, key: str, results: dict[tuple[int, int, bool], symbols.PrecomputedInstrAnalysis], boundaries: sections.PrecomputedFunctionBoundaries|None=None) -> None:
+        functionsData = {funcKey: funcAnalysis.toPlainData() for funcKey, funcAnalysis in results.items()}
+        boundariesData = boundaries.toPlainData() if boundaries is not None else None
+        self._storeFile(self._getSectionPath(key), (functionsData, boundariesData))
+
+    def loadRendered(self, key: str) -> list[str]|None:
+        "Returns the cached output with the given key, or None if it is not cached"
+        data = self._loadFile(self._getRenderedPath(key))
+        if not isinstance(data, list) or not all(isinstance(output, str) for output in data):
+            self.renderedMisses += 1
+            return None
+
+        self.renderedHits += 1
+        return data
+
+    def storeRendered(self, key: str, outputs: list[str]) -> None:
+        self._storeFile(self._getRenderedPath(key), outputs)
+
+    def prune(self) -> int:
+        """
+        Removes the least recently used files until the cache is not bigger
+        than `maxSize`. Files used since this object was created are kept.
+
+        Returns the amount of removed files.
+        """
+        if self.maxSize is None:
+            return 0
+
+        cacheFiles: list[tuple[float, int, Path]] = []
+        totalSize = 0
+        for path in list(self.cacheDir.glob("*.marshal")) + list(self.cacheDir.glob("rendered/*.marshal")):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            cacheFiles.append((stat.st_mtime, stat.st_size, path))
+            totalSize += stat.st_size
+
+        removedCount = 0
+        for mtime, size, path in sorted(cacheFiles):
+            if totalSize <= self.maxSize or mtime >= self._startTime:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            totalSize -= size
+            removedCount += 1
+        return removedCount
@@ -15,9 +15,10 @@ from .. import common
 from . import sections
 from . import symbols
 from . import FunctionRodataEntry
+from . import RodataOwnershipMap
 
 
-def createSectionFromSplitEntry(splitEntry: common.FileSplitEntry, array_of_bytes: bytes, context: common.Context, vromStart: int = 0) -> sections.SectionBase:
+def createSectionFromSplitEntry(splitEntry: common.FileSplitEntry, array_of_bytes: bytes|memoryview, context: common.Context, vromStart: int = 0) -> sections.SectionBase:
     offsetStart = splitEntry.offset
     offsetEnd = splitEntry.nextOffset
 
@@ -52,16 +53,15 @@ def createSectionFromSplitEntry(splitEntry: common.FileSplitEntry, array_of_byte
     elif splitEntry.section == common.FileSectionType.Reloc:
         f = sections.SectionRelocZ64(context, sectionStart, sectionEnd, vram, splitEntry.fileName, array_of_bytes, 0, None)
     else:
-        common.Utils.eprint("Error! Section not set!")
-        exit(-1)
+        raise RuntimeError(f"Error! Section not set for '{splitEntry.fileName}'!")
 
     f.isHandwritten = splitEntry.isHandwritten
 
     return f
 
-def writeSection(path: Path, fileSection: sections.SectionBase):
+def writeSection(path: Path, fileSection: sections.SectionBase, renderedAsm: str|None=None):
     path.parent.mkdir(parents=True, exist_ok=True)
-    fileSection.saveToFile(str(path))
+    fileSection.saveToFile(str(path), renderedAsm)
     return path
 
 
@@ -99,13 +99,33 @@ def writeSplitedFunction(path: Path, func: symbols.SymbolFunction, rodataFileLis
     with funcPath.open("w") as f:
         entry.writeToFile(f, writeFunction=True)
 
-def writeOtherRodata(path: Path, rodataFileList: list[sections.SectionBase]):
+def renderOtherRodata(rodataSection: sections.SectionBase) -> list[str]:
+    "Returns the contents `writeOtherRodata` writes for every rodata symbol of the section which is not migrated, in order"
+    outputs: list[str] = []
+    for rodataSym in rodataSection.symbolList:
+        if rodataSym.shouldMigrate():
+            continue
+        outputs.append(".section .rodata" + common.GlobalConfig.LINE_ENDS + rodataSym.disassemble(migrate=True))
+    return outputs
+
+def writeOtherRodata(path: Path, rodataFileList: list[sections.SectionBase], renderedOutputs: list[str]|None=None):
+    """
+    Writes every rodata symbol which is not migrated to a function to its own
+    file.
+
+    `renderedOutputs` may be passed if there is a single rodata section, to
+    write them instead of disassembling the symbols again. They must be what
+    `renderOtherRodata` returns.
+    """
+    assert renderedOutputs is None or len(rodataFileList) == 1
+
     for rodataSection in rodataFileList:
         assert isinstance(rodataSection, sections.SectionRodata)
 
         rodataPath = path / rodataSection.name
         rodataPath.mkdir(parents=True, exist_ok=True)
 
+        outputIndex = 0
         for rodataSym in rodataSection.symbolList:
             if rodataSym.shouldMigrate():
                 continue
@@ -113,19 +133,29 @@ def writeOtherRodata(path: Path, rodataFileList: list[sections.SectionBase]):
             rodataSymbolPath = rodataPath / (rodataSym.getName() + ".s")
             common.Utils.printVerbose(f"Writing unmigrated rodata {rodataSymbolPath}")
 
-            with rodataSymbolPath.open("w") as f:
-                f.write(".section .rodata" + common.GlobalConfig.LINE_ENDS)
-                f.write(rodataSym.disassemble(migrate=True))
+            if renderedOutputs is not None:
+                common.Utils.writeTextToFile(rodataSymbolPath, renderedOutputs[outputIndex])
+                outputIndex += 1
+            elif common.GlobalConfig.ONLY_WRITE_CHANGED_FILES:
+                common.Utils.writeTextToFile(rodataSymbolPath, ".section .rodata" + common.GlobalConfig.LINE_ENDS + rodataSym.disassemble(migrate=True))
+            else:
+                with rodataSymbolPath.open("w") as f:
+                    f.write(".section .rodata" + common.GlobalConfig.LINE_ENDS)
+                    f.writelines(rodataSym.iterDisassembly(migrate=True))
 
 
 def writeMigratedFunctionsList(processedSegments: dict[common.FileSectionType, list[sections.SectionBase]], functionMigrationPath: Path, name: str) -> None:
     funcAndRodataOrderPath = functionMigrationPath / f"{name}_migrated_functions.txt"
 
-    rodataSymbols: list[tuple[symbols.SymbolBase, symbols.SymbolFunction|None]] = []
-    for section in processedSegments.get(common.FileSectionType.Rodata, []):
-        for sym in section.symbolList:
-            rodataSymbols.append((sym, None))
-    rodataSymbolsVrams = {sym.vram for sym, _ in rodataSymbols}
+    rodataSections = processedSegments.get(common.FileSectionType.Rodata, [])
+    ownershipMap = RodataOwnershipMap(rodataSections)
+
+    rodataSymbols: list[symbols.SymbolBase] = []
+    for section in rodataSections:
+        rodataSymbols += section.symbolList
+
+    rodataOwners: dict[int, symbols.SymbolFunction] = dict()
+    "key: id of the rodata symbol. value: the first function referencing it"
 
     funcs: list[symbols.SymbolFunction] = []
     for section in processedSegments.get(common.FileSectionType.Text, []):
@@ -133,43 +163,43 @@ def writeMigratedFunctionsList(processedSegments: dict[common.FileSectionType, l
             assert isinstance(func, symbols.SymbolFunction)
             funcs.append(func)
 
-            referencedRodata = rodataSymbolsVrams & func.instrAnalyzer.referencedVrams
-            for i in range(len(rodataSymbols)):
-                if len(referencedRodata) == 0:
-                    break
-
-                rodataSym, funcReferencingThisSym = rodataSymbols[i]
-
-                if rodataSym.vram not in referencedRodata:
-                    continue
-
-                referencedRodata.remove(rodataSym.vram)
-
-                if funcReferencingThisSym is not None:
-                    # This rodata sym already has a corresponding function associated
-                    continue
-
-                rodataSymbols[i] = (rodataSym, func)
+            for vram in func.instrAnalyzer.referencedVrams:
+                # Only the first rodata symbol of each vram can be associated to a function
+                rodataSym = ownershipMap.getFirstSymbol(vram)
+                if rodataSym is not None and id(rodataSym) not in rodataOwners:
+                    rodataOwners[id(rodataSym)] = func
 
     resultingList: list[symbols.SymbolBase] = []
     alreadyAddedFuncs: set[symbols.SymbolFunction] = set()
 
+    # Every function before this index has already been added
+    funcsIndex = 0
+    funcsMaxVram = -1
+    "Highest vram of the functions before `funcsIndex`"
+
     lastFunc = None
-    for rodataSym, funcReferencingThisSym in rodataSymbols:
+    for rodataSym in rodataSymbols:
+        funcReferencingThisSym = rodataOwners.get(id(rodataSym))
         if funcReferencingThisSym is None:
             resultingList.append(rodataSym)
         elif funcReferencingThisSym not in alreadyAddedFuncs:
             alreadyAddedFuncs.add(funcReferencingThisSym)
             lastFunc = funcReferencingThisSym
 
-            for func in funcs:
-                if func.vram >= funcReferencingThisSym.vram:
-                    break
-                if func in alreadyAddedFuncs:
-                    continue
-
-                alreadyAddedFuncs.add(func)
-                resultingList.append(func)
+            # Add every function placed before the referencing one, unless a
+            # function with a higher vram was placed before them
+            if funcsMaxVram < funcReferencingThisSym.vram:
+                while funcsIndex < len(funcs):
+                    func = funcs[funcsIndex]
+                    if func.vram >= funcReferencingThisSym.vram:
+                        break
+                    funcsIndex += 1
+                    funcsMaxVram = max(funcsMaxVram, func.vram)
+                    if func in alreadyAddedFuncs:
+                        continue
+
+                    alreadyAddedFuncs.add(func)
+                    resultingList.append(func)
             resultingList.append(funcReferencingThisSym)
 
     if lastFunc is None:
@@ -32,7 +32,7 @@ class FunctionRodataEntry:
             # Write the rdata
             f.write(f".section {self.sectionRodata}{common.GlobalConfig.LINE_ENDS}")
             for sym in self.rodataSyms:
-                f.write(sym.disassemble(migrate=True, useGlobalLabel=True, isSplittedSymbol=True))
+                f.writelines(sym.iterDisassembly(migrate=True, useGlobalLabel=True, isSplittedSymbol=True))
                 f.write(common.GlobalConfig.LINE_ENDS)
 
         if len(self.lateRodataSyms) > 0:
@@ -51,7 +51,7 @@ class FunctionRodataEntry:
                     align = 8
                 f.write(f".late_rodata_alignment {align}{common.GlobalConfig.LINE_ENDS}")
             for sym in self.lateRodataSyms:
-                f.write(sym.disassemble(migrate=True, useGlobalLabel=True, isSplittedSymbol=True))
+                f.writelines(sym.iterDisassembly(migrate=True, useGlobalLabel=True, isSplittedSymbol=True))
                 f.write(common.GlobalConfig.LINE_ENDS)
 
         if self.function is not None:
@@ -60,7 +60,7 @@ class FunctionRodataEntry:
 
             if writeFunction:
                 # Write the function itself
-                f.write(self.function.disassemble(migrate=self.hasRodataSyms(), isSplittedSymbol=True))
+                f.writelines(self.function.iterDisassembly(migrate=self.hasRodataSyms(), isSplittedSymbol=True))
 
     @staticmethod
     def getEntryForFuncFromSection(func: symbols.SymbolFunction|None, rodataSection: sections.SectionRodata|None) -> FunctionRodataEntry:
@@ -109,31 +109,101 @@ class FunctionRodataEntry:
                 # We only care for the symbols which will not be migrated
                 allUnmigratedRodataSymbols.append(rodataSym)
 
+        ownershipMap = RodataOwnershipMap([rodataSection] if rodataSection is not None else [])
+
         allEntries: list[FunctionRodataEntry] = []
+        nextUnmigratedIndex = 0
 
         textSymbols = textSection.symbolList if textSection is not None else []
         for func in textSymbols:
             assert isinstance(func, symbols.SymbolFunction)
 
-            entry = FunctionRodataEntry.getEntryForFuncFromSection(func, rodataSection)
+            entry = ownershipMap.getEntryForFunc(func)
 
             if len(entry.rodataSyms) > 0:
                 firstFuncRodataSym = entry.rodataSyms[0]
 
-                while len(allUnmigratedRodataSymbols) > 0:
-                    rodataSym = allUnmigratedRodataSymbols[0]
+                while nextUnmigratedIndex < len(allUnmigratedRodataSymbols):
+                    rodataSym = allUnmigratedRodataSymbols[nextUnmigratedIndex]
 
                     if rodataSym.vram >= firstFuncRodataSym.vram:
                         # Take all the symbols up to the first rodata sym referenced by the current function
                         break
 
                     allEntries.append(FunctionRodataEntry(rodataSyms=[rodataSym]))
-                    del allUnmigratedRodataSymbols[0]
+                    nextUnmigratedIndex += 1
 
             allEntries.append(entry)
 
         # Check if there's any rodata symbol remaining and add it to the list
-        for rodataSym in allUnmigratedRodataSymbols:
+        for rodataSym in allUnmigratedRodataSymbols[nextUnmigratedIndex:]:
             allEntries.append(FunctionRodataEntry(rodataSyms=[rodataSym]))
 
         return allEntries
+
+
+class RodataOwnershipMap:
+    """
+    Index from the vram of every symbol of the given rodata sections to the
+    symbols themselves, built in a single pass over the sections.
+
+    Allows finding the rodata symbols referenced by a function by looking up
+    each of the vrams it references, instead of walking every rodata section
+    for every function.
+    """
+
+    def __init__(self, rodataSections: list[sections.SectionBase]):
+        self.symbolsByVram: dict[int, list[tuple[int, int, symbols.SymbolBase]]] = dict()
+        "key: vram. value: the index of the section, the index on the section and the symbol itself, for every rodata symbol with that vram"
+
+        for sectionIndex, rodataSection in enumerate(rodataSections):
+            for symIndex, rodataSym in enumerate(rodataSection.symbolList):
+                self.symbolsByVram.setdefault(rodataSym.vram, []).append((sectionIndex, symIndex, rodataSym))
+
+    def getFirstSymbol(self, vram: int) -> symbols.SymbolBase|None:
+        """
+        Returns the first rodata symbol with the given vram, following the
+        order of the sections.
+        """
+        owners = self.symbolsByVram.get(vram)
+        if owners is None:
+            return None
+        return owners[0][2]
+
+    def getReferencedSymbols(self, func: symbols.SymbolFunction) -> list[tuple[int, int, symbols.SymbolBase]]:
+        """
+        Returns every rodata symbol referenced by the function, in the same
+        order they are placed on the sections.
+        """
+        referenced: list[tuple[int, int, symbols.SymbolBase]] = []
+        for vram in func.instrAnalyzer.referencedVrams:
+            owners = self.symbolsByVram.get(vram)
+            if owners is not None:
+                referenced += owners
+        referenced.sort(key=lambda x: (x[0], x[1]))
+        return referenced
+
+    def getEntryForFunc(self, func: symbols.SymbolFunction) -> FunctionRodataEntry:
+        """
+        Same as `FunctionRodataEntry.getEntryForFuncFromPossibleRodataSections`
+        for the sections of this map: only the rodata of the first section
+        with any rodata symbol to be migrated to the function is used.
+        """
+        rodataList: list[symbols.SymbolBase] = []
+        lateRodataList: list[symbols.SymbolBase] = []
+
+        entrySectionIndex: int|None = None
+        for sectionIndex, _, rodataSym in self.getReferencedSymbols(func):
+            if entrySectionIndex is not None and sectionIndex != entrySectionIndex:
+                break
+
+            if not rodataSym.shouldMigrate():
+                continue
+
+            entrySectionIndex = sectionIndex
+            if rodataSym.contextSym.isLateRodata():
+                lateRodataList.append(rodataSym)
+            else:
+                rodataList.append(rodataSym)
+
+        return FunctionRodataEntry(func, rodataList, lateRodataList)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from .. import common
+
+from . import sections
+from . import symbols
+
+from .. import __version__
+
+
+def getFunctionShapeHash(func: symbols.SymbolFunction) -> str:
+    """
+    Returns a hash of the top 6 bits (the opcode) of every instruction of the
+    function, which does not change if the function is moved to another
+    address or if the addresses it references change.
+    """
+    bitswordlist = []
+    for instr in func.instructions:
+        topbits = instr.getRaw() & 0xFC000000
+
+        bitswordlist.append(topbits)
+    bitbytelist = common.Utils.endianessWordsToBytes(common.InputEndian.BIG, bitswordlist)
+    return common.Utils.getStrHash(bitbytelist)
+
+
+class FunctionFingerprint:
+    def __init__(self, vram: int, vrom: int, name: str, isNamed: bool, fileName: str, size: int, shapeHash: str, calls: list[int]):
+        self.vram = vram
+        self.vrom = vrom
+        self.name = name
+        self.isNamed = isNamed
+        "If the function has a name other than the one generated by the disassembler"
+        self.fileName = fileName
+        self.size = size
+        self.shapeHash = shapeHash
+        "See `getFunctionShapeHash`"
+        self.calls = calls
+        "vram of every function called by this function, in the same order they are called"
+
+    def getKey(self) -> tuple[str, int]:
+        return (self.shapeHash, self.size)
+
+    @staticmethod
+    def fromFunction(func: symbols.SymbolFunction, fileName: str) -> FunctionFingerprint:
+        calls = [targetVram for _, targetVram in sorted(func.instrAnalyzer.funcCallInstrOffsets.items())]
+        return FunctionFingerprint(func.vram, func.vromStart, func.getName(), func.contextSym.name is not None, fileName, func.sizew*4, getFunctionShapeHash(func), calls)
+
+    def toJson(self) -> dict[str, Any]:
+        return {
+            "vram": self.vram,
+            "vrom": self.vrom,
+            "name": self.name,
+            "isNamed": self.isNamed,
+            "file": self.fileName,
+            "size": self.size,
+            "hash": self.shapeHash,
+            "calls": self.calls,
+        }
+
+    @staticmethod
+    def fromJson(entry: dict[str, Any]) -> FunctionFingerprint:
+        return FunctionFingerprint(entry["vram"], entry["vrom"], entry["name"], entry["isNamed"], entry["file"], entry["size"], entry["hash"], entry["calls"])
+
+
+class FunctionMatch:
+    def __init__(self, function: FunctionFingerprint, counterpart: FunctionFingerprint, method: str):
+        self.function = function
+        "Function of the build being matched"
+        self.counterpart = counterpart
+        "Function of the indexed build"
+        self.method = method
+        """
+        How the match was found:
+        - `unique`: Both functions are the only ones with the same shape and size on each build, or the only ones once the shape and size of the functions they call are considered too.
+        - `calls`: Both functions are called at the same position by a pair of already matched functions which call the same amount of functions.
+        - `neighbour`: Both functions have the same shape and size, and are placed right before or right after a pair of already matched functions.
+        - `order`: Both functions have the same shape and size, and the same amount of functions with that shape and size remained unmatched on each build. They are matched in address order.
+        """
+
+    @property
+    def hasSameShape(self) -> bool:
+        return self.function.getKey() == self.counterpart.getKey()
+
+
+class FingerprintIndex:
+    """
+    Fingerprints of every function of a build, which can be stored on a file
+    and used later to find the counterpart of each function of another build
+    (i.e. another version of the same game) on this build.
+
+    Each fingerprint consists of the hash of the shape of the function (see
+    `getFunctionShapeHash`), its size and the list of the functions it calls.
+    """
+
+    VERSION = 1
+
+    def __init__(self) -> None:
+        self.functions: list[FunctionFingerprint] = []
+
+    def addFunctionsFromSections(self, textSections: list[sections.SectionBase]) -> None:
+        for textFile in textSections:
+            for func in textFile.symbolList:
+                assert isinstance(func, symbols.SymbolFunction)
+                self.functions.append(FunctionFingerprint.fromFunction(func, textFile.getName()))
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tempPath = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tempPath.open("w") as f:
+            json.dump({"version": self.VERSION, "spimdisasmVersion": __version__, "functions": [func.toJson() for func in self.functions]}, f)
+            f.write("\n")
+        os.replace(tempPath, path)
+
+    @staticmethod
+    def load(path: Path) -> FingerprintIndex:
+        with path.open() as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get("version") != FingerprintIndex.VERSION or not isinstance(data.get("functions"), list):
+            raise RuntimeError(f"Error: '{path}' is not a fingerprint index, or it was written by an incompatible version of spimdisasm")
+
+        index = FingerprintIndex()
+        index.functions = [FunctionFingerprint.fromJson(entry) for entry in data["functions"]]
+        return index
+
+
+    @staticmethod
+    def _getByVram(functions: list[FunctionFingerprint]) -> dict[int, FunctionFingerprint]:
+        # Functions from different overlays may share the same vram, in which case it is not known which one is being called
+        byVram: dict[int, FunctionFingerprint] = dict()
+        repeated: set[int] = set()
+        for func in functions:
+            if func.vram in byVram:
+                repeated.add(func.vram)
+            byVram[func.vram] = func
+        for vram in repeated:
+            del byVram[vram]
+        return byVram
+
+    @staticmethod
+    def _getByKey(functions: list[FunctionFingerprint]) -> dict[tuple[str, int], list[FunctionFingerprint]]:
+        byKey: dict[tuple[str, int], list[FunctionFingerprint]] = dict()
+        for func in functions:
+            byKey.setdefault(func.getKey(), []).append(func)
+        return byKey
+
+    @staticmethod
+    def _getByCallsKey(functions: list[FunctionFingerprint], byVram: dict[int, FunctionFingerprint]) -> dict[tuple[Any, ...], list[FunctionFingerprint]]:
+        # Like `_getByKey`, but also distinguishes the functions by the shape and size of the functions they call
+        byKey: dict[tuple[Any, ...], list[FunctionFingerprint]] = dict()
+        for func in functions:
+            calledKeys = tuple(byVram[vram].getKey() if vram in byVram else None for vram in func.calls)
+            byKey.setdefault((func.getKey(), calledKeys), []).append(func)
+        return byKey
+
+    @staticmethod
+    def _getNeighbours(functions: list[FunctionFingerprint]) -> dict[int, tuple[FunctionFingerprint|None, FunctionFingerprint|None]]:
+        # key: id of the function. value: the previous and next functions in address order
+        ordered = sorted(functions, key=lambda x: (x.vrom, x.vram))
+        neighbours: dict[int, tuple[FunctionFingerprint|None, FunctionFingerprint|None]] = dict()
+        for i, func in enumerate(ordered):
+            prevFunc = ordered[i-1] if i > 0 else None
+            nextFunc = ordered[i+1] if i + 1 < len(ordered) else None
+            neighbours[id(func)] = (prevFunc, nextFunc)
+        return neighbours
+
+    def match(self, other: FingerprintIndex) -> list[FunctionMatch]:
+        """
+        Finds the counterpart on this index of every function of the `other`
+        index, without comparing every pair of functions.
+
+        First the functions whose shape and size is unique on both indices are
+        matched, then the ones which are unique once the shape and size of the
+        functions they call are considered too. Those matches are propagated
+        to the functions called by each pair of matched functions and to their
+        neighbours, and the functions which are still ambiguous are matched by
+        their address order, propagating again the new matches. Finally the
+        matches are propagated to the called functions whose shape or size
+        differ between both builds.
+
+        Returns the matches, in the order of the functions of `other`.
+        Functions without a counterpart are not part of the result.
+        """
+
+        indexedByKey = self._getByKey(self.functions)
+        otherByKey = self._getByKey(other.functions)
+        indexedByVram = self._getByVram(self.functions)
+        otherByVram = self._getByVram(other.functions)
+        indexedNeighbours = self._getNeighbours(self.functions)
+        otherNeighbours = self._getNeighbours(other.functions)
+
+        matches: dict[int, FunctionMatch] = dict()
+        "key: id of the function of `other`"
+        matchedIndexed: set[int] = set()
+        "id of the functions of this index already matched"
+        pending: list[FunctionMatch] = []
+
+        def addMatch(func: FunctionFingerprint, counterpart: FunctionFingerprint, method: str) -> None:
+            funcMatch = FunctionMatch(func, counterpart, method)
+            matches[id(func)] = funcMatch
+            matchedIndexed.add(id(counterpart))
+            pending.append(funcMatch)
+
+        def isUnmatchedPair(func: FunctionFingerprint|None, counterpart: FunctionFingerprint|None) -> bool:
+            if func is None or counterpart is None:
+                return False
+            return id(func) not in matches and id(counterpart) not in matchedIndexed
+
+        def propagate(allowDifferentShape: bool) -> None:
+            while len(pending) > 0:
+                funcMatch = pending.pop()
+
+                if len(funcMatch.function.calls) == len(funcMatch.counterpart.calls):
+                    for calledVram, counterpartCalledVram in zip(funcMatch.function.calls, funcMatch.counterpart.calls):
+                        called = otherByVram.get(calledVram)
+                        counterpartCalled = indexedByVram.get(counterpartCalledVram)
+                        if called is None or counterpartCalled is None or not isUnmatchedPair(called, counterpartCalled):
+                            continue
+                        if not allowDifferentShape and called.getKey() != counterpartCalled.getKey():
+                            continue
+                        addMatch(called, counterpartCalled, "calls")
+
+                if allowDifferentShape:
+                    continue
+                for neighbour, counterpartNeighbour in zip(otherNeighbours[id(funcMatch.function)], indexedNeighbours[id(funcMatch.counterpart)]):
+                    if neighbour is None or counterpartNeighbour is None or not isUnmatchedPair(neighbour, counterpartNeighbour):
+                        continue
+                    if neighbour.getKey() != counterpartNeighbour.getKey():
+                        continue
+                    addMatch(neighbour, counterpartNeighbour, "neighbour")
+
+        for key, funcs in otherByKey.items():
+            counterparts = indexedByKey.get(key, [])
+            if len(funcs) == 1 and len(counterparts) == 1:
+                addMatch(funcs[0], counterparts[0], "unique")
+
+        indexedByCallsKey = self._getByCallsKey([func for func in self.functions if id(func) not in matchedIndexed], indexedByVram)
+        otherByCallsKey = self._getByCallsKey([func for func in other.functions if id(func) not in matches], otherByVram)
+        for key, funcs in otherByCallsKey.items():
+            counterparts = indexedByCallsKey.get(key, [])
+            if len(funcs) == 1 and len(counterparts) == 1:
+                addMatch(funcs[0], counterparts[0], "unique")
+        propagate(False)
+
+        for key, funcs in otherByKey.items():
+            remaining = [func for func in funcs if id(func) not in matches]
+            remainingCounterparts = [func for func in indexedByKey.get(key, []) if id(func) not in matchedIndexed]
+            if len(remaining) == 0 or len(remaining) != len(remainingCounterparts):
+                continue
+            for func, counterpart in zip(sorted(remaining, key=lambda x: (x.vrom, x.vram)), sorted(remainingCounterparts, key=lambda x: (x.vrom, x.vram))):
+                addMatch(func, counterpart, "order")
+            propagate(False)
+
+        # Functions which changed between both builds can only be found through their callers
+        pending.extend(matches.values())
+        propagate(True)
+
+        return [matches[id(func)] for func in other.functions if id(func) in matches]
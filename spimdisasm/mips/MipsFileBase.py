@@ -5,8 +5,10 @@
 
 from __future__ import annotations
 
+from array import array
+import io
 import sys
-from typing import TextIO
+from typing import Any, Generator, TextIO
 from pathlib import Path
 
 from .. import common
@@ -15,7 +17,7 @@ from . import symbols
 
 
 class FileBase(common.ElementBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, words: list[int], sectionType: common.FileSectionType, segmentVromStart: int, overlayCategory: str|None):
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, words: list[int]|array[int]|memoryview, sectionType: common.FileSectionType, segmentVromStart: int, overlayCategory: str|None, rawBytes: bytes|memoryview|None=None):
         super().__init__(context, vromStart, vromEnd, 0, vram, filename, words, sectionType, segmentVromStart, overlayCategory)
 
         self.symbolList: list[symbols.SymbolBase] = []
@@ -31,8 +33,51 @@ class FileBase(common.ElementBase):
 
         self.stringEncoding: str = common.GlobalConfig.DATA_STRING_ENCODING
 
-        self.bytes: bytes = common.Utils.wordsToBytes(self.words)
-
+        self.bytes: bytes|memoryview = rawBytes if rawBytes is not None else common.Utils.wordsToBytes(self.words)
+        "The original bytes of the file. May be a view of the input instead of a copy"
+
+        self._stringCandidates: common.Utils.StringCandidates|None = None
+
+        self.stringsCache = common.Utils.StringsCache(self.bytes)
+        "The strings decoded from `bytes`, shared between the string guessers and the symbols of this file"
+
+
+    def getWordsRange(self, start: int, end: int|None=None) -> list[int]|array[int]|memoryview:
+        """
+        Returns the words between the given indices.
+
+        If the words of this file are stored on a typed array then a view of
+        them is returned instead of a copy, allowing symbols to share the words
+        of their file.
+        """
+        if isinstance(self.words, array):
+            return memoryview(self.words)[start:end]
+        return self.words[start:end]
+
+    def getStringCandidates(self) -> common.Utils.StringCandidates:
+        """
+        Returns where the strings starting on each offset of this file would
+        end, computing it the first time it is requested.
+        """
+        if self._stringCandidates is None:
+            self._stringCandidates = common.Utils.StringCandidates(self.bytes)
+        return self._stringCandidates
+
+    def releaseStringsCaches(self) -> None:
+        """
+        Frees the string candidates and the decoded strings of this file.
+        They are computed again if they are needed later.
+        """
+        self._stringCandidates = None
+        self.stringsCache.clear()
+
+    def _unshareWords(self) -> None:
+        """
+        Makes this file own a copy of its words, so modifying them does not
+        modify the words of the symbols viewing them.
+        """
+        if isinstance(self.words, array):
+            self.words = array(self.words.typecode, self.words)
 
     def setCommentOffset(self, commentOffset: int):
         self.commentOffset = commentOffset
@@ -127,16 +172,7 @@ class FileBase(common.ElementBase):
         diff_words = 0
 
         if not result["equal"]:
-            min_len = min(self.sizew, other_file.sizew)
-            for i in range(min_len):
-                for j in range(4):
-                    if (self.words[i] & (0xFF << (j * 8))) != (other_file.words[i] & (0xFF << (j * 8))):
-                        diff_bytes += 1
-
-            min_len = min(self.sizew, other_file.sizew)
-            for i in range(min_len):
-                if self.words[i] != other_file.words[i]:
-                    diff_words += 1
+            diff_bytes, diff_words = common.WordsComparison.countDifferences(self.words, other_file.words)
 
         result["diff_bytes"] = diff_bytes
         result["diff_words"] = diff_words
@@ -156,38 +192,76 @@ class FileBase(common.ElementBase):
         return False
 
 
-    def disassemble(self, migrate: bool=False, useGlobalLabel: bool=True) -> str:
-        output = ""
-
+    def iterDisassembly(self, migrate: bool=False, useGlobalLabel: bool=True) -> Generator[str, None, None]:
         if not migrate:
-            output += self.getSpimdisasmVersionString()
+            yield self.getSpimdisasmVersionString()
 
         for i, sym in enumerate(self.symbolList):
-            output += sym.disassemble(migrate=migrate, useGlobalLabel=useGlobalLabel, isSplittedSymbol=False)
+            yield from sym.iterDisassembly(migrate=migrate, useGlobalLabel=useGlobalLabel, isSplittedSymbol=False)
             if i + 1 < len(self.symbolList):
-                output += common.GlobalConfig.LINE_ENDS
-        return output
+                yield common.GlobalConfig.LINE_ENDS
+
+    def disassemble(self, migrate: bool=False, useGlobalLabel: bool=True) -> str:
+        return "".join(self.iterDisassembly(migrate=migrate, useGlobalLabel=useGlobalLabel))
+
+    def getDisassemblyContextChanges(self) -> list[tuple[common.ContextSymbol, str, Any]]:
+        """
+        Returns the changes to the context that disassembling every symbol of
+        this file would do, in order. See `SymbolBase.getDisassemblyContextChanges`.
+        """
+        changes: list[tuple[common.ContextSymbol, str, Any]] = []
+        for sym in self.symbolList:
+            changes += sym.getDisassemblyContextChanges()
+        return changes
 
     def disassembleToFile(self, f: TextIO):
         if common.GlobalConfig.ASM_USE_PRELUDE:
             f.write(self.getAsmPrelude())
             f.write(common.GlobalConfig.LINE_ENDS)
-        f.write(self.disassemble())
+        f.writelines(self.iterDisassembly())
+
+
+    def disassembleToString(self) -> str:
+        "Returns what `disassembleToFile` would write"
+        buffer = io.StringIO()
+        self.disassembleToFile(buffer)
+        return buffer.getvalue()
+
 
+    def saveToFile(self, filepath: str, renderedAsm: str|None=None):
+        """
+        Writes the disassembly of this file to `filepath`, appending the
+        section type and the `.s` extension to it.
 
-    def saveToFile(self, filepath: str):
+        If `renderedAsm` is passed then it is written instead of disassembling
+        the file again. It must be what `disassembleToString` returns.
+        """
         if len(self.symbolList) == 0:
             return
 
         if filepath == "-":
-            self.disassembleToFile(sys.stdout)
+            if renderedAsm is not None:
+                sys.stdout.write(renderedAsm)
+            else:
+                self.disassembleToFile(sys.stdout)
         else:
             if common.GlobalConfig.WRITE_BINARY:
                 if self.sizew > 0:
                     buffer = common.Utils.wordsToBytes(self.words)
                     common.Utils.writeBytesToFile(Path(filepath + self.sectionType.toStr()), buffer)
-            with open(filepath + self.sectionType.toStr() + ".s", "w", encoding="utf-8") as f:
-                self.disassembleToFile(f)
+            asmPath = filepath + self.sectionType.toStr() + ".s"
+            if renderedAsm is not None:
+                common.Utils.writeTextToFile(Path(asmPath), renderedAsm, encoding="utf-8")
+            elif common.GlobalConfig.ONLY_WRITE_CHANGED_FILES:
+                asmBuffer = io.StringIO()
+                self.disassembleToFile(asmBuffer)
+                common.Utils.writeTextToFile(Path(asmPath), asmBuffer.getvalue(), encoding="utf-8")
+            else:
+                with open(asmPath, "w", encoding="utf-8") as f:
+                    self.disassembleToFile(f)
+
+        # The strings are not needed anymore once the file is written
+        self.releaseStringsCaches()
 
 
 def createEmptyFile() -> FileBase:
@@ -16,8 +16,8 @@ from . import FileBase, createEmptyFile
 
 
 class FileSplits(FileBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytes, segmentVromStart: int, overlayCategory: str|None, splitsData: common.FileSplitFormat|None=None, relocSection: sections.SectionRelocZ64|None=None):
-        super().__init__(context, vromStart, vromEnd, vram, filename, common.Utils.bytesToWords(array_of_bytes, vromStart, vromEnd), common.FileSectionType.Unknown, segmentVromStart, overlayCategory)
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytes|memoryview, segmentVromStart: int, overlayCategory: str|None, splitsData: common.FileSplitFormat|None=None, relocSection: sections.SectionRelocZ64|None=None):
+        super().__init__(context, vromStart, vromEnd, vram, filename, common.Utils.bytesToWordsArray(array_of_bytes, vromStart, vromEnd), common.FileSectionType.Unknown, segmentVromStart, overlayCategory)
 
         self.sectionsDict: dict[common.FileSectionType, dict[str, sections.SectionBase]] = {
             common.FileSectionType.Text: dict(),
@@ -96,7 +96,7 @@ class FileSplits(FileBase):
                 section.setVram(vram)
 
     def getHash(self) -> str:
-        words = list()
+        words: list[int] = list()
         for sectDict in self.sectionsDict.values():
             for section in sectDict.values():
                 words += section.words
@@ -178,7 +178,10 @@ class FileSplits(FileBase):
 
         return was_updated
 
-    def saveToFile(self, filepath: str):
+    def saveToFile(self, filepath: str, renderedAsm: str|None=None):
+        # Every section is written to its own file
+        assert renderedAsm is None
+
         for sectDict in self.sectionsDict.values():
             for name, section in sectDict.items():
                 if name != "" and not filepath.endswith("/"):
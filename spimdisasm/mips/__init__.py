@@ -5,14 +5,49 @@
 
 from __future__ import annotations
 
-from . import sections as sections
-from . import symbols as symbols
+from typing import TYPE_CHECKING
 
-from .FuncRodataEntry import FunctionRodataEntry as FunctionRodataEntry
+from ..LazyPackage import makePackageLazy
 
-from . import FilesHandlers as FilesHandlers
+if TYPE_CHECKING:
+    from . import sections as sections
+    from . import symbols as symbols
 
-from .InstructionConfig import InstructionConfig as InstructionConfig
-from .MipsFileBase import FileBase as FileBase
-from .MipsFileBase import createEmptyFile as createEmptyFile
-from .MipsFileSplits import FileSplits as FileSplits
+    from .FuncRodataEntry import FunctionRodataEntry as FunctionRodataEntry
+    from .FuncRodataEntry import RodataOwnershipMap as RodataOwnershipMap
+
+    from .AnalysisCache import AnalysisCache as AnalysisCache
+
+    from . import FunctionFingerprints as FunctionFingerprints
+    from .FunctionFingerprints import FunctionFingerprint as FunctionFingerprint
+    from .FunctionFingerprints import FunctionMatch as FunctionMatch
+    from .FunctionFingerprints import FingerprintIndex as FingerprintIndex
+
+    from . import FilesHandlers as FilesHandlers
+
+    from .InstructionConfig import InstructionConfig as InstructionConfig
+    from .MipsFileBase import FileBase as FileBase
+    from .MipsFileBase import createEmptyFile as createEmptyFile
+    from .MipsFileSplits import FileSplits as FileSplits
+else:
+    makePackageLazy(__name__, {
+        "sections": (".sections", None),
+        "symbols": (".symbols", None),
+
+        "FunctionRodataEntry": (".FuncRodataEntry", "FunctionRodataEntry"),
+        "RodataOwnershipMap": (".FuncRodataEntry", "RodataOwnershipMap"),
+
+        "AnalysisCache": (".AnalysisCache", "AnalysisCache"),
+
+        "FunctionFingerprints": (".FunctionFingerprints", None),
+        "FunctionFingerprint": (".FunctionFingerprints", "FunctionFingerprint"),
+        "FunctionMatch": (".FunctionFingerprints", "FunctionMatch"),
+        "FingerprintIndex": (".FunctionFingerprints", "FingerprintIndex"),
+
+        "FilesHandlers": (".FilesHandlers", None),
+
+        "InstructionConfig": (".InstructionConfig", "InstructionConfig"),
+        "FileBase": (".MipsFileBase", "FileBase"),
+        "createEmptyFile": (".MipsFileBase", "createEmptyFile"),
+        "FileSplits": (".MipsFileSplits", "FileSplits"),
+    })
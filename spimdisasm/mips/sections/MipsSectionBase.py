@@ -5,11 +5,24 @@
 
 from __future__ import annotations
 
+from array import array
+
 from ... import common
 
 from ..MipsFileBase import FileBase
 
 class SectionBase(FileBase):
+    @staticmethod
+    def getBytesView(array_of_bytes: bytes|memoryview, vromStart: int, words: list[int]|array[int]|memoryview, endian: common.InputEndian) -> memoryview|None:
+        """
+        Returns a view of the bytes of the section, so it is not needed to
+        pack the words again. Returns `None` if the bytes of the section would
+        differ from the input because of the endianness.
+        """
+        if endian != common.GlobalConfig.ENDIAN or endian == common.InputEndian.MIDDLE:
+            return None
+        return memoryview(array_of_bytes)[vromStart:vromStart+len(words)*4]
+
     def checkWordIsASymbolReference(self, word: int) -> bool:
         if not self.context.totalVramRange.isInRange(word):
             return False
@@ -71,19 +84,25 @@ class SectionBase(FileBase):
             if stringGuesserLevel < 4:
                 return False
 
-        currentVram = self.getVramOffset(localOffset)
-        currentVrom = self.getVromOffset(localOffset)
-        _, rawStringSize = common.Utils.decodeBytesToStrings(self.bytes, localOffset, self.stringEncoding)
+        # Most of the candidates are rejected here, without decoding them
+        rawStringSize = self.getStringCandidates().getStringLength(localOffset)
         if rawStringSize < 0:
-            # String can't be decoded
             return False
 
+        currentVram = self.getVramOffset(localOffset)
+        currentVrom = self.getVromOffset(localOffset)
+
         # Check if there is already another symbol after the current one and before the end of the string,
         # in which case we say this symbol should not be a string
         otherSym = self.getSymbol(currentVram + rawStringSize, vromAddress=currentVrom + rawStringSize, checkUpperLimit=False, checkGlobalSegment=False)
         if otherSym != contextSym:
             return False
 
+        _, rawStringSize = self.stringsCache.decodeStrings(localOffset, self.stringEncoding)
+        if rawStringSize < 0:
+            # String can't be decoded
+            return False
+
         return True
 
     def _pascalStringGuesser(self, contextSym: common.ContextSymbol, localOffset: int) -> bool:
@@ -113,7 +132,7 @@ class SectionBase(FileBase):
 
         currentVram = self.getVramOffset(localOffset)
         currentVrom = self.getVromOffset(localOffset)
-        _, rawStringSize = common.Utils.decodeBytesToPascalStrings(self.bytes, localOffset, self.stringEncoding, terminator=0x20)
+        _, rawStringSize = self.stringsCache.decodePascalStrings(localOffset, self.stringEncoding, terminator=0x20)
         if rawStringSize < 0:
             # String can't be decoded
             return False
@@ -133,13 +152,10 @@ class SectionBase(FileBase):
 
         was_updated = False
         if len(common.GlobalConfig.IGNORE_WORD_LIST) > 0:
-            min_len = min(self.sizew, other.sizew)
-            for i in range(min_len):
-                for upperByte in common.GlobalConfig.IGNORE_WORD_LIST:
-                    word = upperByte << 24
-                    if ((self.words[i] >> 24) & 0xFF) == upperByte and ((other.words[i] >> 24) & 0xFF) == upperByte:
-                        self.words[i] = word
-                        other.words[i] = word
-                        was_updated = True
+            # The symbols keep their original words
+            self._unshareWords()
+            other._unshareWords()
+
+            was_updated = common.WordsComparison.blankOutUpperBytes(self.words, other.words, common.GlobalConfig.IGNORE_WORD_LIST)
 
         return was_updated
@@ -5,6 +5,8 @@
 
 from __future__ import annotations
 
+import heapq
+
 from ... import common
 
 from .. import symbols
@@ -13,17 +15,43 @@ from . import SectionBase
 
 
 class SectionData(SectionBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytes, segmentVromStart: int, overlayCategory: str|None):
-        if common.GlobalConfig.ENDIAN_DATA is not None:
-            words = common.Utils.endianessBytesToWords(common.GlobalConfig.ENDIAN_DATA, array_of_bytes, vromStart, vromEnd)
-        else:
-            words = common.Utils.bytesToWords(array_of_bytes, vromStart, vromEnd)
-        super().__init__(context, vromStart, vromEnd, vram, filename, words, common.FileSectionType.Data, segmentVromStart, overlayCategory)
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytes|memoryview, segmentVromStart: int, overlayCategory: str|None):
+        endian = common.GlobalConfig.ENDIAN_DATA if common.GlobalConfig.ENDIAN_DATA is not None else common.GlobalConfig.ENDIAN
+        words = common.Utils.endianessBytesToWordsArray(endian, array_of_bytes, vromStart, vromEnd)
+        rawBytes = self.getBytesView(array_of_bytes, vromStart, words, endian)
+        super().__init__(context, vromStart, vromEnd, vram, filename, words, common.FileSectionType.Data, segmentVromStart, overlayCategory, rawBytes=rawBytes)
 
 
     def analyze(self):
         self.checkAndCreateFirstSymbol()
 
+        vramStart = self.getVramOffset(0)
+        vramEnd = self.getVramOffset(self.sizew * 4)
+
+        # Every word is looked up on the same segments, unless the section crosses segments
+        symbolsSegment: common.SymbolsSegment|None = None
+        pointersSegment: common.SymbolsSegment|None = None
+        if self.sizew > 0:
+            symbolsSegment = self.getSegmentForVrom(self.getVromOffset(0))
+            if symbolsSegment is not self.getSegmentForVrom(self.getVromOffset(self.sizew*4 - 4)):
+                symbolsSegment = None
+            pointersSegment = self.getSegmentForVram(vramStart)
+            if pointersSegment is not self.getSegmentForVram(vramEnd - 4):
+                pointersSegment = None
+
+        pendingPointers: set[int] = set()
+        "References to this section found by the analysis of any section which have not been turned into symbols yet"
+        if pointersSegment is not None:
+            pendingPointers.update(pointersSegment.getAndPopPointerInDataReferencesRange(vramStart, vramEnd))
+
+        def popPendingPointer(vram: int) -> bool:
+            if pointersSegment is None:
+                return self.popPointerInDataReference(vram) is not None
+            if vram not in pendingPointers:
+                return False
+            pendingPointers.remove(vram)
+            return True
+
         symbolList: list[tuple[int, common.ContextSymbol]] = []
         localOffset = 0
         localOffsetsWithSymbols: set[int] = set()
@@ -34,7 +62,10 @@ class SectionData(SectionBase):
             currentVram = self.getVramOffset(localOffset)
             currentVrom = self.getVromOffset(localOffset)
 
-            contextSym = self.getSymbol(currentVram, vromAddress=currentVrom, tryPlusOffset=False)
+            if symbolsSegment is not None:
+                contextSym = symbolsSegment.getSymbol(currentVram, tryPlusOffset=False)
+            else:
+                contextSym = self.getSymbol(currentVram, vromAddress=currentVrom, tryPlusOffset=False)
             if contextSym is not None:
                 symbolList.append((localOffset, contextSym))
                 localOffsetsWithSymbols.add(localOffset)
@@ -48,7 +79,7 @@ class SectionData(SectionBase):
                         extraContextSym = self.addSymbol(contextSym.vram+symDeclaredSize, sectionType=self.sectionType, isAutogenerated=True, symbolVrom=currentVrom+symDeclaredSize)
                         extraContextSym.isAutoCreatedPad = True
 
-            elif self.popPointerInDataReference(currentVram) is not None:
+            elif popPendingPointer(currentVram):
                 contextSym = self.addSymbol(currentVram, sectionType=self.sectionType, isAutogenerated=True)
                 contextSym.isMaybeString = self._stringGuesser(contextSym, localOffset)
                 contextSym.isMaybePascalString = self._pascalStringGuesser(contextSym, localOffset)
@@ -56,6 +87,11 @@ class SectionData(SectionBase):
                 localOffsetsWithSymbols.add(localOffset)
 
             if self.checkWordIsASymbolReference(w):
+                if pointersSegment is not None and vramStart <= w < vramEnd:
+                    # Keep track of the references to this section locally instead of on the segment
+                    pointersSegment.popPointerInDataReference(w)
+                    pendingPointers.add(w)
+
                 if w < currentVram and self.containsVram(w):
                     # References a data symbol from this section and it is behind this current symbol
                     needsFurtherAnalyzis = True
@@ -63,36 +99,47 @@ class SectionData(SectionBase):
             localOffset += 4
 
         if needsFurtherAnalyzis:
-            localOffset = 0
-            for w in self.words:
-                currentVram = self.getVramOffset(localOffset)
-                currentVrom = self.getVromOffset(localOffset)
+            # Only the references which were found after their word was visited are left
+            if pointersSegment is not None:
+                backwardPointers = sorted(vram for vram in pendingPointers if (vram - vramStart) % 4 == 0)
+                pendingPointers.difference_update(backwardPointers)
+            else:
+                backwardPointers = [vram for vram in range(vramStart, vramEnd, 4) if self.popPointerInDataReference(vram) is not None]
 
-                if self.popPointerInDataReference(currentVram) is not None and localOffset not in localOffsetsWithSymbols:
-                    contextSym = self.getSymbol(currentVram, vromAddress=currentVrom, tryPlusOffset=True, checkUpperLimit=True)
-                    if contextSym is None:
-                        contextSym = self.addSymbol(currentVram, sectionType=self.sectionType, isAutogenerated=True)
-                    contextSym.sectionType = self.sectionType
-                    contextSym.isMaybeString = self._stringGuesser(contextSym, localOffset)
-                    contextSym.isMaybePascalString = self._pascalStringGuesser(contextSym, localOffset)
-                    symbolList.append((localOffset, contextSym))
-                    localOffsetsWithSymbols.add(localOffset)
+            backwardSymbolList: list[tuple[int, common.ContextSymbol]] = []
+            for currentVram in backwardPointers:
+                localOffset = currentVram - vramStart
+                if localOffset in localOffsetsWithSymbols:
+                    continue
 
-                localOffset += 4
+                currentVrom = self.getVromOffset(localOffset)
+                contextSym = self.getSymbol(currentVram, vromAddress=currentVrom, tryPlusOffset=True, checkUpperLimit=True)
+                if contextSym is None:
+                    contextSym = self.addSymbol(currentVram, sectionType=self.sectionType, isAutogenerated=True)
+                contextSym.sectionType = self.sectionType
+                contextSym.isMaybeString = self._stringGuesser(contextSym, localOffset)
+                contextSym.isMaybePascalString = self._pascalStringGuesser(contextSym, localOffset)
+                backwardSymbolList.append((localOffset, contextSym))
+                localOffsetsWithSymbols.add(localOffset)
+
+            # Both lists are sorted by offset and do not share any offset
+            symbolList = list(heapq.merge(symbolList, backwardSymbolList, key=lambda x: x[0]))
 
-            # Because we appended new symbols, this list is not sorted anymore
-            symbolList.sort()
+        if pointersSegment is not None:
+            # The references which were not used remain available to other sections
+            for vram in pendingPointers:
+                pointersSegment.addPointerInDataReference(vram)
 
         self.processStaticRelocs()
 
         for i, (offset, contextSym) in enumerate(symbolList):
             if i + 1 == len(symbolList):
-                words = self.words[offset//4:]
+                words = self.getWordsRange(offset//4)
             else:
                 nextOffset = symbolList[i+1][0]
                 if offset == nextOffset:
                     continue
-                words = self.words[offset//4:nextOffset//4]
+                words = self.getWordsRange(offset//4, nextOffset//4)
 
             vrom = self.getVromOffset(offset)
             vromEnd = vrom + 4*len(words)
@@ -100,6 +147,8 @@ class SectionData(SectionBase):
             sym.parent = self
             sym.setCommentOffset(self.commentOffset)
             sym.stringEncoding = self.stringEncoding
+            sym.stringsCache = self.stringsCache
+            sym.stringsCacheOffset = offset
             sym.analyze()
             self.symbolList.append(sym)
 
@@ -110,14 +159,7 @@ class SectionData(SectionBase):
         if not common.GlobalConfig.REMOVE_POINTERS:
             return False
 
-        was_updated = False
-        for i in range(self.sizew):
-            top_byte = (self.words[i] >> 24) & 0xFF
-            if top_byte == 0x80:
-                self.words[i] = top_byte << 24
-                was_updated = True
-            if (top_byte & 0xF0) == 0x00 and (top_byte & 0x0F) != 0x00:
-                self.words[i] = top_byte << 24
-                was_updated = True
-
-        return was_updated
+        # The symbols keep their original words
+        self._unshareWords()
+
+        return common.WordsComparison.nukePointers(self.words)
@@ -43,8 +43,10 @@ class RelocEntry:
 
 
 class SectionRelocZ64(SectionBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytes, segmentVromStart: int, overlayCategory: str|None):
-        super().__init__(context, vromStart, vromEnd, vram, filename, common.Utils.bytesToWords(array_of_bytes, vromStart, vromEnd), common.FileSectionType.Reloc, segmentVromStart, overlayCategory)
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytes|memoryview, segmentVromStart: int, overlayCategory: str|None):
+        words = common.Utils.bytesToWordsArray(array_of_bytes, vromStart, vromEnd)
+        rawBytes = self.getBytesView(array_of_bytes, vromStart, words, common.GlobalConfig.ENDIAN)
+        super().__init__(context, vromStart, vromEnd, vram, filename, words, common.FileSectionType.Reloc, segmentVromStart, overlayCategory, rawBytes=rawBytes)
 
         self.seekup = self.words[-1]
 
@@ -95,7 +97,7 @@ class SectionRelocZ64(SectionBase):
         currentVram = self.getVramOffset(localOffset)
         vrom = self.getVromOffset(localOffset)
         vromEnd = vrom + 4 * 4
-        sym = symbols.SymbolData(self.context, vrom, vromEnd, localOffset + self.inFileOffset, currentVram, self.words[0:4], self.segmentVromStart, self.overlayCategory)
+        sym = symbols.SymbolData(self.context, vrom, vromEnd, localOffset + self.inFileOffset, currentVram, self.getWordsRange(0, 4), self.segmentVromStart, self.overlayCategory)
         sym.contextSym.name = f"{self.name}_OverlayInfo"
         sym.parent = self
         sym.setCommentOffset(self.commentOffset)
@@ -15,12 +15,11 @@ from . import SectionBase
 
 
 class SectionRodata(SectionBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytes, segmentVromStart: int, overlayCategory: str|None):
-        if common.GlobalConfig.ENDIAN_RODATA is not None:
-            words = common.Utils.endianessBytesToWords(common.GlobalConfig.ENDIAN_RODATA, array_of_bytes, vromStart, vromEnd)
-        else:
-            words = common.Utils.bytesToWords(array_of_bytes, vromStart, vromEnd)
-        super().__init__(context, vromStart, vromEnd, vram, filename, words, common.FileSectionType.Rodata, segmentVromStart, overlayCategory)
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytes|memoryview, segmentVromStart: int, overlayCategory: str|None):
+        endian = common.GlobalConfig.ENDIAN_RODATA if common.GlobalConfig.ENDIAN_RODATA is not None else common.GlobalConfig.ENDIAN
+        words = common.Utils.endianessBytesToWordsArray(endian, array_of_bytes, vromStart, vromEnd)
+        rawBytes = self.getBytesView(array_of_bytes, vromStart, words, endian)
+        super().__init__(context, vromStart, vromEnd, vram, filename, words, common.FileSectionType.Rodata, segmentVromStart, overlayCategory, rawBytes=rawBytes)
 
         self.stringEncoding = common.GlobalConfig.RODATA_STRING_ENCODING
 
@@ -120,10 +119,10 @@ class SectionRodata(SectionBase):
 
         for i, (offset, vram) in enumerate(symbolList):
             if i + 1 == len(symbolList):
-                words = self.words[offset//4:]
+                words = self.getWordsRange(offset//4)
             else:
                 nextOffset = symbolList[i+1][0]
-                words = self.words[offset//4:nextOffset//4]
+                words = self.getWordsRange(offset//4, nextOffset//4)
 
             vrom = self.getVromOffset(offset)
             vromEnd = vrom + len(words)*4
@@ -131,6 +130,8 @@ class SectionRodata(SectionBase):
             sym.parent = self
             sym.setCommentOffset(self.commentOffset)
             sym.stringEncoding = self.stringEncoding
+            sym.stringsCache = self.stringsCache
+            sym.stringsCacheOffset = offset
             sym.analyze()
             self.symbolList.append(sym)
 
@@ -167,13 +168,10 @@ class SectionRodata(SectionBase):
             return False
 
         was_updated = super().removePointers()
-        for i in range(self.sizew):
-            top_byte = (self.words[i] >> 24) & 0xFF
-            if top_byte == 0x80:
-                self.words[i] = top_byte << 24
-                was_updated = True
-            if (top_byte & 0xF0) == 0x00 and (top_byte & 0x0F) != 0x00:
-                self.words[i] = top_byte << 24
-                was_updated = True
+
+        # The symbols keep their original words
+        self._unshareWords()
+
+        was_updated = common.WordsComparison.nukePointers(self.words) or was_updated
 
         return was_updated
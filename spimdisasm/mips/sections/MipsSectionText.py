@@ -5,7 +5,12 @@
 
 from __future__ import annotations
 
+from array import array
+import dataclasses
+import hashlib
 import rabbitizer
+import time
+from typing import Callable
 
 from ... import common
 
@@ -15,20 +20,68 @@ from ..MipsFileBase import FileBase
 from . import SectionBase
 
 
+@dataclasses.dataclass
+class PrecomputedFunctionBoundaries:
+    """
+    Functions found on a text section by a previous analysis.
+
+    Besides the instructions of the section, finding its functions depends on
+    the context symbols placed on the section and on the ones targeted by its
+    jumps, so they are summarized on `inputsDigest`. The boundaries are only
+    reused if the digest is the same on the current run.
+    """
+
+    inputsDigest: str
+    functionRanges: list[tuple[int, int, bool]]
+    "Start instruction index, end instruction index and if it has unimplemented instructions, for every function"
+    fileBoundaries: list[int]
+    "The file boundaries detected while searching the functions"
+    autocreatedFunctionsOffsets: list[int]
+    "Offsets of the functions created because the previous function had a user-declared size"
+
+    def toPlainData(self) -> tuple[str, list[tuple[int, int, bool]], list[int], list[int]]:
+        "Returns the fields of this object as a tuple which only contains builtin types"
+        return (self.inputsDigest, self.functionRanges, self.fileBoundaries, self.autocreatedFunctionsOffsets)
+
+    @staticmethod
+    def fromPlainData(data: tuple[str, list[tuple[int, int, bool]], list[int], list[int]]) -> PrecomputedFunctionBoundaries:
+        inputsDigest, functionRanges, fileBoundaries, autocreatedFunctionsOffsets = data
+        return PrecomputedFunctionBoundaries(inputsDigest, functionRanges, fileBoundaries, autocreatedFunctionsOffsets)
+
+
 class SectionText(SectionBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytes, segmentVromStart: int, overlayCategory: str|None):
-        super().__init__(context, vromStart, vromEnd, vram, filename, common.Utils.bytesToWords(array_of_bytes, vromStart, vromEnd), common.FileSectionType.Text, segmentVromStart, overlayCategory)
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, vram: int, filename: str, array_of_bytes: bytes|memoryview, segmentVromStart: int, overlayCategory: str|None):
+        words = common.Utils.bytesToWordsArray(array_of_bytes, vromStart, vromEnd)
+        rawBytes = self.getBytesView(array_of_bytes, vromStart, words, common.GlobalConfig.ENDIAN)
+        super().__init__(context, vromStart, vromEnd, vram, filename, words, common.FileSectionType.Text, segmentVromStart, overlayCategory, rawBytes=rawBytes)
 
         self.instrCat: rabbitizer.Enum = rabbitizer.InstrCategory.CPU
         self.detectRedundantFunctionEnd: bool|None = None
 
+        self.precomputedInstrAnalysis: dict[tuple[int, int, bool], symbols.PrecomputedInstrAnalysis] = dict()
+        "key: (start instruction index, end instruction index, has unimplemented instructions)"
+
+        self.instrAnalysisResults: dict[tuple[int, int, bool], symbols.PrecomputedInstrAnalysis]|None = None
+        """If not None, then `analyze` will store here the instruction analysis of every function, with the same keys as `precomputedInstrAnalysis`.
+
+        Allows reusing the analysis of this section on a later run"""
+
+        self.precomputedFunctionBoundaries: PrecomputedFunctionBoundaries|None = None
+        "If set, `analyze` uses these functions instead of searching them again, as long as its digest is still valid"
+
+        self.functionBoundariesResult: PrecomputedFunctionBoundaries|None = None
+        "Set by `analyze` if `instrAnalysisResults` is not None. The functions it found, which can be reused on a later run"
+
+        self.functionAnalysisTimes: list[tuple[float, float]]|None = None
+        """If not None, then `analyze` will append here the wall and CPU time it took to analyze each function, in the same order as `symbolList`"""
+
 
     @property
     def nFuncs(self) -> int:
         return len(self.symbolList)
 
     @staticmethod
-    def wordListToInstructions(wordList: list[int], currentVram: int|None, instrCat: rabbitizer.Enum) -> list[rabbitizer.Instruction]:
+    def wordListToInstructions(wordList: list[int]|array[int]|memoryview, currentVram: int|None, instrCat: rabbitizer.Enum) -> list[rabbitizer.Instruction]:
         instrsList: list[rabbitizer.Instruction] = list()
         for word in wordList:
             instr = rabbitizer.Instruction(word, category=instrCat)
@@ -154,7 +207,7 @@ class SectionText(SectionBase):
 
         return functionEnded, prevFuncHadUserDeclaredSize
 
-    def _findFunctions(self, instrsList: list[rabbitizer.Instruction]) -> tuple[list[int], list[bool]]:
+    def _findFunctions(self, instrsList: list[rabbitizer.Instruction], autocreatedFunctionsOffsets: list[int]|None=None) -> tuple[list[int], list[bool]]:
         nInstr = len(instrsList)
 
         if nInstr == 0:
@@ -240,6 +293,8 @@ class SectionText(SectionBase):
                 if prevFuncHadUserDeclaredSize:
                     auxSym = self.addFunction(self.getVramOffset(instructionOffset), isAutogenerated=True, symbolVrom=self.getVromOffset(instructionOffset))
                     auxSym.isAutocreatedSymFromOtherSizedSym = True
+                    if autocreatedFunctionsOffsets is not None:
+                        autocreatedFunctionsOffsets.append(instructionOffset)
                 prevFuncHadUserDeclaredSize = False
                 instr = instrsList[index]
                 isInstrImplemented = instr.isImplemented() and instr.isValid()
@@ -265,15 +320,48 @@ class SectionText(SectionBase):
         return funcsStartsList, unimplementedInstructionsFuncList
 
 
-    def analyze(self):
-        instrsList = self.wordListToInstructions(self.words, self.getVramOffset(0), self.instrCat)
-        nInstr = len(instrsList)
+    def _getFunctionBoundariesDigest(self, instrsList: list[rabbitizer.Instruction]) -> str|None:
+        """
+        Hashes every context symbol `_findFunctions` looks at: the ones placed
+        on this section (and right after it) and the ones targeted by its
+        jumps.
 
-        funcsStartsList, unimplementedInstructionsFuncList = self._findFunctions(instrsList)
+        Returns None if the section is not placed on a single segment.
+        """
+        if len(instrsList) == 0:
+            return None
 
-        previousSymbolExtraPadding = 0
+        segment = self.getSegmentForVrom(self.getVromOffset(0))
+        if self.getSegmentForVrom(self.getVromOffset(len(instrsList)*4 - 4)) is not segment:
+            return None
 
-        i = 0
+        isRsp = self.instrCat == rabbitizer.InstrCategory.RSP
+
+        hasher = hashlib.sha256()
+        hasher.update(f"{self.isHandwritten},{self.tryDetectRedundantFunctionEnd()}\n".encode())
+        for vram, contextSym in segment.getSymbolsRange(self.getVramOffset(0), self.getVramOffset(len(instrsList)*4)):
+            hasher.update(f"{vram:X},{contextSym.vromAddress},{contextSym.userDeclaredSize},{contextSym.isTrustableFunction(isRsp)}\n".encode())
+
+        # The search looks up to two instructions past the end of the section
+        for localOffset in (len(instrsList)*4, len(instrsList)*4 + 4):
+            auxSym = self.getSymbol(self.getVramOffset(localOffset), vromAddress=self.getVromOffset(localOffset), tryPlusOffset=False, checkGlobalSegment=False)
+            if auxSym is not None:
+                hasher.update(f"{localOffset:X},{auxSym.vromAddress},{auxSym.isTrustableFunction(isRsp)}\n".encode())
+
+        jumpTargets = {instr.getInstrIndexAsVram() for instr in instrsList if instr.isJumpWithAddress()}
+        for targetVram in sorted(jumpTargets):
+            auxSym = self.getSymbol(targetVram, tryPlusOffset=False, checkGlobalSegment=False)
+            if auxSym is not None:
+                hasher.update(f"j {targetVram:X},{auxSym.isTrustableFunction(isRsp)}\n".encode())
+
+        return hasher.hexdigest()
+
+    def _getFunctionRanges(self, instrsList: list[rabbitizer.Instruction], autocreatedFunctionsOffsets: list[int]|None=None) -> list[tuple[int, int, bool]]:
+        nInstr = len(instrsList)
+
+        funcsStartsList, unimplementedInstructionsFuncList = self._findFunctions(instrsList, autocreatedFunctionsOffsets)
+
+        functionRanges: list[tuple[int, int, bool]] = list()
         startsCount = len(funcsStartsList)
         for startIndex in range(startsCount):
             start = funcsStartsList[startIndex]
@@ -285,11 +373,101 @@ class SectionText(SectionBase):
             if start >= end:
                 break
 
+            functionRanges.append((start, end, hasUnimplementedIntrs))
+        return functionRanges
+
+    def _splitFunctions(self) -> tuple[list[rabbitizer.Instruction], list[tuple[int, int, bool]]]:
+        """
+        Decodes the words of this section and splits them into functions.
+
+        Returns the decoded instructions and the start instruction index, end
+        instruction index and if it has unimplemented instructions of every
+        function.
+
+        The functions found by a previous run (`precomputedFunctionBoundaries`)
+        are used if the context symbols the search looks at did not change.
+        """
+        instrsList = self.wordListToInstructions(self.words, self.getVramOffset(0), self.instrCat)
+
+        precomputed = self.precomputedFunctionBoundaries
+        if precomputed is None and self.instrAnalysisResults is None:
+            return instrsList, self._getFunctionRanges(instrsList)
+
+        # Computed before searching the functions, since the search adds symbols to the context
+        inputsDigest = self._getFunctionBoundariesDigest(instrsList)
+        if precomputed is not None and inputsDigest is not None and precomputed.inputsDigest == inputsDigest:
+            for localOffset in precomputed.autocreatedFunctionsOffsets:
+                auxSym = self.addFunction(self.getVramOffset(localOffset), isAutogenerated=True, symbolVrom=self.getVromOffset(localOffset))
+                auxSym.isAutocreatedSymFromOtherSizedSym = True
+            self.fileBoundaries += precomputed.fileBoundaries
+            functionRanges = precomputed.functionRanges
+        else:
+            fileBoundariesCount = len(self.fileBoundaries)
+            autocreatedFunctionsOffsets: list[int] = []
+            functionRanges = self._getFunctionRanges(instrsList, autocreatedFunctionsOffsets)
+            if inputsDigest is not None and self.instrAnalysisResults is not None:
+                self.functionBoundariesResult = PrecomputedFunctionBoundaries(inputsDigest, functionRanges, self.fileBoundaries[fileBoundariesCount:], autocreatedFunctionsOffsets)
+        return instrsList, functionRanges
+
+    def _createFunction(self, instrsList: list[rabbitizer.Instruction], start: int, end: int, hasUnimplementedIntrs: bool) -> symbols.SymbolFunction:
+        localOffset = start*4
+        vram = self.getVramOffset(localOffset)
+        vrom = self.getVromOffset(localOffset)
+        vromEnd = vrom + (end - start)*4
+
+        func = symbols.SymbolFunction(self.context, vrom, vromEnd, self.inFileOffset + localOffset, vram, instrsList[start:end], self.segmentVromStart, self.overlayCategory)
+        func.hasUnimplementedIntrs = hasUnimplementedIntrs
+        func.isRsp = self.instrCat == rabbitizer.InstrCategory.RSP
+        return func
+
+
+    def _analyzeFunctionTimed(self, func: symbols.SymbolFunction) -> None:
+        assert self.functionAnalysisTimes is not None
+        startWall = time.perf_counter()
+        startCpu = time.process_time()
+        func.analyze()
+        self.functionAnalysisTimes.append((time.perf_counter() - startWall, time.process_time() - startCpu))
+
+
+    def precomputeInstrAnalysis(self) -> dict[tuple[int, int, bool], symbols.PrecomputedInstrAnalysis]:
+        """
+        Speculatively splits this section into functions and runs the
+        instruction analyzer over each one of them.
+
+        The results can be assigned to `precomputedInstrAnalysis` of a section
+        which has not been analyzed yet, and they will only be used for the
+        functions that end up having exactly the same boundaries.
+
+        This method adds symbols to the context, so it is meant to be run on a
+        throwaway copy of it, like the one a forked worker process has.
+        """
+        results: dict[tuple[int, int, bool], symbols.PrecomputedInstrAnalysis] = dict()
+
+        instrsList = self.wordListToInstructions(self.words, self.getVramOffset(0), self.instrCat)
+        functionRanges = self._getFunctionRanges(instrsList)
+        for start, end, hasUnimplementedIntrs in functionRanges:
+            if not common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS and hasUnimplementedIntrs:
+                continue
+
+            func = self._createFunction(instrsList, start, end, hasUnimplementedIntrs)
+            results[(start, end, hasUnimplementedIntrs)] = func.getPrecomputedInstrAnalysis()
+
+        return results
+
+    def analyze(self):
+        instrsList, functionRanges = self._splitFunctions()
+
+        analyzeFunction: Callable[[symbols.SymbolFunction], None] = symbols.SymbolFunction.analyze
+        if self.functionAnalysisTimes is not None:
+            analyzeFunction = self._analyzeFunctionTimed
+
+        previousSymbolExtraPadding = 0
+
+        i = 0
+        for start, end, hasUnimplementedIntrs in functionRanges:
             localOffset = start*4
             vram = self.getVramOffset(localOffset)
-
             vrom = self.getVromOffset(localOffset)
-            vromEnd = vrom + (end - start)*4
 
             if common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS or not hasUnimplementedIntrs:
                 self.addFunction(vram, isAutogenerated=True, symbolVrom=vrom)
@@ -298,14 +476,17 @@ class SectionText(SectionBase):
 
             self.symbolsVRams.add(vram)
 
-            func = symbols.SymbolFunction(self.context, vrom, vromEnd, self.inFileOffset + localOffset, vram, instrsList[start:end], self.segmentVromStart, self.overlayCategory)
+            func = self._createFunction(instrsList, start, end, hasUnimplementedIntrs)
             func.setCommentOffset(self.commentOffset)
             func.index = i
             func.pointersOffsets |= self.pointersOffsets
-            func.hasUnimplementedIntrs = hasUnimplementedIntrs
             func.parent = self
-            func.isRsp = self.instrCat == rabbitizer.InstrCategory.RSP
-            func.analyze()
+            func.precomputedInstrAnalysis = self.precomputedInstrAnalysis.get((start, end, hasUnimplementedIntrs))
+            func.keepInstrAnalysisSnapshot = self.instrAnalysisResults is not None
+            analyzeFunction(func)
+            if self.instrAnalysisResults is not None and func.instrAnalysisSnapshot is not None:
+                self.instrAnalysisResults[(start, end, hasUnimplementedIntrs)] = func.instrAnalysisSnapshot
+                func.instrAnalysisSnapshot = None
             self.symbolList.append(func)
 
             # File boundaries detection
@@ -318,6 +499,9 @@ class SectionText(SectionBase):
             previousSymbolExtraPadding = func.countExtraPadding()
             i += 1
 
+        self.precomputedInstrAnalysis.clear()
+        self.precomputedFunctionBoundaries = None
+
         # Filter out repeated values and sort
         self.fileBoundaries = sorted(set(self.fileBoundaries))
 
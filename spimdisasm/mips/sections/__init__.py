@@ -8,6 +8,7 @@ from __future__ import annotations
 from .MipsSectionBase import SectionBase as SectionBase
 
 from .MipsSectionText import SectionText as SectionText
+from .MipsSectionText import PrecomputedFunctionBoundaries as PrecomputedFunctionBoundaries
 from .MipsSectionData import SectionData as SectionData
 from .MipsSectionRodata import SectionRodata as SectionRodata
 from .MipsSectionBss import SectionBss as SectionBss
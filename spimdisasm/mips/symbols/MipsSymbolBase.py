@@ -5,14 +5,15 @@
 
 from __future__ import annotations
 
-from typing import Callable
+from array import array
+from typing import Any, Callable, Generator
 import rabbitizer
 
 from ... import common
 
 
 class SymbolBase(common.ElementBase):
-    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, words: list[int], sectionType: common.FileSectionType, segmentVromStart: int, overlayCategory: str|None):
+    def __init__(self, context: common.Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, words: list[int]|array[int]|memoryview, sectionType: common.FileSectionType, segmentVromStart: int, overlayCategory: str|None):
         super().__init__(context, vromStart, vromEnd, inFileOffset, vram, "", words, sectionType, segmentVromStart, overlayCategory)
 
         self.endOfLineComment: dict[int, str] = dict()
@@ -25,6 +26,11 @@ class SymbolBase(common.ElementBase):
 
         self.stringEncoding: str = common.GlobalConfig.DATA_STRING_ENCODING
 
+        self.stringsCache: common.Utils.StringsCache|None = None
+        "The decoded strings of the file containing this symbol, if any"
+        self.stringsCacheOffset: int = 0
+        "Offset of this symbol on the buffer of `stringsCache`"
+
         self.relocs: dict[int, common.RelocationInfo] = dict()
         "key: word offset"
 
@@ -192,32 +198,66 @@ class SymbolBase(common.ElementBase):
             self.contextSym.parentFileName = self.parent.getName()
 
         isWordSized = not self.contextSym.isByte() and not self.contextSym.isShort()
+        # Symbols loaded from an already analyzed context keep their references,
+        # since the symbols created after this one was analyzed exist already
+        checkReferences = isWordSized and not self.contextSym.referencesAnalyzed
 
         if self.sectionType != common.FileSectionType.Bss:
+            symbolsInside = self._getSymbolsInside()
+            insideIndex = 0
+
+            referencedVrams: set[int] = set()
+            "Words which already got this symbol added as a reference"
+
             for i in range(0, self.sizew):
                 localOffset = 4*i
-                for j in range(0, 4):
-                    if i == 0 and j == 0:
-                        continue
 
-                    # Possible symbols in the middle of words
-                    currentVram = self.getVramOffset(localOffset+j)
-                    currentVrom = self.getVromOffset(localOffset+j)
-                    contextSym = self.getSymbol(currentVram, vromAddress=currentVrom, tryPlusOffset=False)
-                    if contextSym is not None:
-                        contextSym.vromAddress = self.getVromOffset(localOffset+j)
-                        contextSym.isDefined = True
-                        contextSym.sectionType = self.sectionType
-                        contextSym.setTypeIfUnset(self.contextSym.getTypeSpecial(), self.contextSym.isAutogenerated)
-                        contextSym.inFileOffset = self.inFileOffset + localOffset+j
-                        if self.parent is not None:
-                            contextSym.parentFileName = self.parent.getName()
-
-                if isWordSized:
+                # Possible symbols in the middle of words
+                while insideIndex < len(symbolsInside) and symbolsInside[insideIndex][0] < localOffset + 4:
+                    symOffset, contextSym = symbolsInside[insideIndex]
+                    insideIndex += 1
+
+                    contextSym.vromAddress = self.getVromOffset(symOffset)
+                    contextSym.isDefined = True
+                    contextSym.sectionType = self.sectionType
+                    contextSym.setTypeIfUnset(self.contextSym.getTypeSpecial(), self.contextSym.isAutogenerated)
+                    contextSym.inFileOffset = self.inFileOffset + symOffset
+                    if self.parent is not None:
+                        contextSym.parentFileName = self.parent.getName()
+
+                if checkReferences:
                     word = self.words[i]
+                    if word in referencedVrams:
+                        continue
                     referencedSym = self.getSymbol(word, tryPlusOffset=False)
                     if referencedSym is not None:
                         referencedSym.referenceSymbols.add(self.contextSym)
+                        referencedVrams.add(word)
+
+            if isWordSized:
+                self.contextSym.referencesAnalyzed = True
+
+    def _getSymbolsInside(self) -> list[tuple[int, common.ContextSymbol]]:
+        """
+        Returns the symbols placed after the start of this symbol and before
+        its end, paired with their offset relative to the start of this
+        symbol and sorted by it.
+        """
+        localEnd = self.sizew * 4
+        if localEnd <= 1:
+            return []
+
+        segment = self.getSegmentForVrom(self.getVromOffset(1))
+        if segment is not self.getSegmentForVrom(self.getVromOffset(localEnd - 1)):
+            # The symbol crosses segments, so every offset has to be looked up on its own segment
+            symbolsInside: list[tuple[int, common.ContextSymbol]] = []
+            for symOffset in range(1, localEnd):
+                contextSym = self.getSymbol(self.getVramOffset(symOffset), vromAddress=self.getVromOffset(symOffset), tryPlusOffset=False)
+                if contextSym is not None:
+                    symbolsInside.append((symOffset, contextSym))
+            return symbolsInside
+
+        return [(symVram - self.vram, contextSym) for symVram, contextSym in segment.getSymbolsRange(self.getVramOffset(1), self.getVramOffset(localEnd))]
 
 
     def getEndOfLineComment(self, wordIndex: int) -> str:
@@ -430,11 +470,32 @@ class SymbolBase(common.ElementBase):
 
         return output, 1
 
+    def _decodeStrings(self, localOffset: int) -> tuple[list[str], int]:
+        symbolSize = len(self.words) * 4
+        if self.stringsCache is not None:
+            decodedStrings, rawStringSize = self.stringsCache.decodeStrings(self.stringsCacheOffset + localOffset, self.stringEncoding)
+            # The file may have decoded a string which ends after this symbol
+            if rawStringSize >= 0 and localOffset + rawStringSize < symbolSize:
+                return decodedStrings, rawStringSize
+
+        buffer = common.Utils.wordsToBytes(self.words)
+        return common.Utils.decodeBytesToStrings(buffer, localOffset, self.stringEncoding)
+
+    def _decodePascalStrings(self, localOffset: int) -> tuple[list[str], int]:
+        symbolSize = len(self.words) * 4
+        if self.stringsCache is not None:
+            decodedStrings, rawStringSize = self.stringsCache.decodePascalStrings(self.stringsCacheOffset + localOffset, self.stringEncoding, terminator=0x20)
+            # The file may have decoded a string which ends after this symbol
+            if rawStringSize >= 0 and localOffset + rawStringSize < symbolSize:
+                return decodedStrings, rawStringSize
+
+        buffer = common.Utils.wordsToBytes(self.words)
+        return common.Utils.decodeBytesToPascalStrings(buffer, localOffset, self.stringEncoding, terminator=0x20)
+
     def getNthWordAsString(self, i: int) -> tuple[str, int]:
         localOffset = 4*i
 
-        buffer = common.Utils.wordsToBytes(self.words)
-        decodedStrings, rawStringSize = common.Utils.decodeBytesToStrings(buffer, localOffset, self.stringEncoding)
+        decodedStrings, rawStringSize = self._decodeStrings(localOffset)
         if rawStringSize < 0:
             return "", -1
 
@@ -447,7 +508,8 @@ class SymbolBase(common.ElementBase):
             commentPaddingNum = 1
 
         if rawStringSize == 0:
-            decodedStrings.append("")
+            # The decoded strings may be shared, so don't modify them
+            decodedStrings = [""]
         for decodedValue in decodedStrings[:-1]:
             result += f'.ascii "{decodedValue}"'
             result += common.GlobalConfig.LINE_ENDS + (commentPaddingNum * " ")
@@ -458,8 +520,7 @@ class SymbolBase(common.ElementBase):
     def getNthWordAsPascalString(self, i: int) -> tuple[str, int]:
         localOffset = 4*i
 
-        buffer = common.Utils.wordsToBytes(self.words)
-        decodedStrings, rawStringSize = common.Utils.decodeBytesToPascalStrings(buffer, localOffset, self.stringEncoding, terminator=0x20)
+        decodedStrings, rawStringSize = self._decodePascalStrings(localOffset)
         if rawStringSize < 0:
             return "", -1
 
@@ -472,7 +533,8 @@ class SymbolBase(common.ElementBase):
             commentPaddingNum = 1
 
         if rawStringSize == 0:
-            decodedStrings.append("")
+            # The decoded strings may be shared, so don't modify them
+            decodedStrings = [""]
         for decodedValue in decodedStrings[:-1]:
             result += f'.ascii "{decodedValue}"'
             result += common.GlobalConfig.LINE_ENDS + (commentPaddingNum * " ")
@@ -521,20 +583,30 @@ class SymbolBase(common.ElementBase):
 
         return ""
 
-    def disassembleAsData(self, useGlobalLabel: bool=True, isSplittedSymbol: bool=False) -> str:
-        output = self.contextSym.getReferenceeSymbols()
-        output += self.getPrevAlignDirective(0)
+    def _iterWordsAsData(self, renderWords: bool=True, isSplittedSymbol: bool=False) -> Generator[tuple[int, str, str], None, None]:
+        """
+        Walks the words of this symbol the same way they are disassembled as
+        data, yielding the index of every word that starts a new line, its
+        disassembly and the name of the last symbol found so far.
 
-        symName = self.getName()
-        output += self.getSymbolAsmDeclaration(symName, useGlobalLabel)
+        Failing to decode a string is recorded on the context symbol, since it
+        changes how the following words and other symbols are disassembled.
 
-        lastSymName = symName
+        If `renderWords` is False then only the strings are decoded, the rest
+        of the words are yielded as an empty string, and the walk stops as soon
+        as nothing else can change the context.
+        """
+        lastSymName = self.getName()
 
         canReferenceSymbolsWithAddends = self.canUseAddendsOnData()
         canReferenceConstants = self.canUseConstantsOnData()
 
         i = 0
         while i < self.sizew:
+            if not renderWords and not self.isString() and not self.isPascalString():
+                # Nothing else can change the decoding flags
+                break
+
             currentVram = self.getVramOffset(i*4)
             currentVrom = self.getVromOffset(i*4)
 
@@ -542,9 +614,12 @@ class SymbolBase(common.ElementBase):
             sym2 = self.getSymbol(currentVram+2, vromAddress=currentVrom, tryPlusOffset=False, checkGlobalSegment=False)
             sym3 = self.getSymbol(currentVram+3, vromAddress=currentVrom, tryPlusOffset=False, checkGlobalSegment=False)
 
+            data = ""
+            skip = 0
             # Check for symbols in the middle of this word
             if sym1 is not None or sym2 is not None or sym3 is not None or self.isByte(i) or self.isShort(i):
-                data, skip = self.getNthWordAsBytesAndShorts(i, sym1, sym2, sym3, lastSymName)
+                if renderWords:
+                    data, skip = self.getNthWordAsBytesAndShorts(i, sym1, sym2, sym3, lastSymName)
 
                 if sym3 is not None:
                     lastSymName = sym3.getName()
@@ -553,42 +628,110 @@ class SymbolBase(common.ElementBase):
                 elif sym1 is not None:
                     lastSymName = sym1.getName()
             elif self.isFloat(i):
-                data, skip = self.getNthWordAsFloat(i)
+                if renderWords:
+                    data, skip = self.getNthWordAsFloat(i)
             elif self.isDouble(i):
-                data, skip = self.getNthWordAsDouble(i)
+                if renderWords:
+                    data, skip = self.getNthWordAsDouble(i)
+                else:
+                    skip = 1
             elif self.isString():
                 data, skip = self.getNthWordAsString(i)
                 if skip < 0:
                     # Not a string
                     self.contextSym.failedStringDecoding = True
-                    data, skip = self.getNthWord(i, isSplittedSymbol=isSplittedSymbol, canReferenceSymbolsWithAddends=canReferenceSymbolsWithAddends, canReferenceConstants=canReferenceConstants)
+                    data, skip = "", 0
+                    if renderWords:
+                        data, skip = self.getNthWord(i, isSplittedSymbol=isSplittedSymbol, canReferenceSymbolsWithAddends=canReferenceSymbolsWithAddends, canReferenceConstants=canReferenceConstants)
             elif self.isPascalString():
                 data, skip = self.getNthWordAsPascalString(i)
                 if skip < 0:
                     # Not a string
                     self.contextSym.failedPascalStringDecoding = True
-                    data, skip = self.getNthWord(i, isSplittedSymbol=isSplittedSymbol, canReferenceSymbolsWithAddends=canReferenceSymbolsWithAddends, canReferenceConstants=canReferenceConstants)
-            else:
+                    data, skip = "", 0
+                    if renderWords:
+                        data, skip = self.getNthWord(i, isSplittedSymbol=isSplittedSymbol, canReferenceSymbolsWithAddends=canReferenceSymbolsWithAddends, canReferenceConstants=canReferenceConstants)
+            elif renderWords:
                 data, skip = self.getNthWord(i, isSplittedSymbol=isSplittedSymbol, canReferenceSymbolsWithAddends=canReferenceSymbolsWithAddends, canReferenceConstants=canReferenceConstants)
 
-            if i != 0:
-                output += self.getPrevAlignDirective(i)
-            output += data
-            if common.GlobalConfig.EMIT_INLINE_RELOC:
-                relocInfo = self.getReloc(i*4, None)
-                output += self.relocToInlineStr(relocInfo, isSplittedSymbol)
-            output += self.getPostAlignDirective(i)
+            yield i, data, lastSymName
 
             i += skip
             i += 1
 
-        output += self.getSizeDirective(lastSymName)
+    def iterDisassemblyAsData(self, useGlobalLabel: bool=True, isSplittedSymbol: bool=False) -> Generator[str, None, None]:
+        """Same as `disassembleAsData`, but yields the output in chunks instead
+        of building a single string."""
+        yield self.contextSym.getReferenceeSymbols()
+        yield self.getPrevAlignDirective(0)
+
+        symName = self.getName()
+        yield self.getSymbolAsmDeclaration(symName, useGlobalLabel)
+
+        lastSymName = symName
+
+        for i, data, lastSymName in self._iterWordsAsData(isSplittedSymbol=isSplittedSymbol):
+            if i != 0:
+                yield self.getPrevAlignDirective(i)
+            yield data
+            if common.GlobalConfig.EMIT_INLINE_RELOC:
+                relocInfo = self.getReloc(i*4, None)
+                yield self.relocToInlineStr(relocInfo, isSplittedSymbol)
+            yield self.getPostAlignDirective(i)
+
+        yield self.getSizeDirective(lastSymName)
 
         nameEnd = self.getNameEnd()
         if nameEnd is not None:
-            output += self.getSymbolAsmDeclaration(nameEnd, useGlobalLabel)
+            yield self.getSymbolAsmDeclaration(nameEnd, useGlobalLabel)
 
-        return output
+    def disassembleAsData(self, useGlobalLabel: bool=True, isSplittedSymbol: bool=False) -> str:
+        return "".join(self.iterDisassemblyAsData(useGlobalLabel=useGlobalLabel, isSplittedSymbol=isSplittedSymbol))
+
+    def iterDisassembly(self, migrate: bool=False, useGlobalLabel: bool=True, isSplittedSymbol: bool=False) -> Generator[str, None, None]:
+        """
+        Yields the disassembly of this symbol in chunks. Joining them produces
+        the same string `disassemble` returns.
+
+        Producing the chunks may modify the context (see
+        `getDisassemblyContextChanges`), so the generator must be consumed
+        completely.
+        """
+        yield from self.iterDisassemblyAsData(useGlobalLabel=useGlobalLabel, isSplittedSymbol=isSplittedSymbol)
 
     def disassemble(self, migrate: bool=False, useGlobalLabel: bool=True, isSplittedSymbol: bool=False) -> str:
-        return self.disassembleAsData(useGlobalLabel=useGlobalLabel, isSplittedSymbol=isSplittedSymbol)
+        return "".join(self.iterDisassembly(migrate=migrate, useGlobalLabel=useGlobalLabel, isSplittedSymbol=isSplittedSymbol))
+
+    def getDisassemblyContextChanges(self) -> list[tuple[common.ContextSymbol, str, Any]]:
+        """
+        Returns the changes `disassemble` would do to the context, as a list of
+        tuples of the context symbol, the name of the attribute and its new
+        value. The changes are not applied.
+
+        Some of those changes (i.e. failing to decode a string) affect how other
+        symbols which are disassembled afterwards look like, so applying them
+        in the right order allows to disassemble symbols out of order and still
+        get the same output.
+        """
+        changes: list[tuple[common.ContextSymbol, str, Any]] = []
+
+        if not self.contextSym.isString() and not self.contextSym.isPascalString():
+            return changes
+
+        failedStringDecoding = self.contextSym.failedStringDecoding
+        failedPascalStringDecoding = self.contextSym.failedPascalStringDecoding
+
+        # Walk the words the same way `iterDisassemblyAsData` does, but only
+        # decode the strings instead of rendering every word
+        for _ in self._iterWordsAsData(renderWords=False):
+            pass
+
+        if self.contextSym.failedStringDecoding != failedStringDecoding:
+            changes.append((self.contextSym, "failedStringDecoding", self.contextSym.failedStringDecoding))
+        if self.contextSym.failedPascalStringDecoding != failedPascalStringDecoding:
+            changes.append((self.contextSym, "failedPascalStringDecoding", self.contextSym.failedPascalStringDecoding))
+
+        self.contextSym.failedStringDecoding = failedStringDecoding
+        self.contextSym.failedPascalStringDecoding = failedPascalStringDecoding
+
+        return changes
@@ -5,6 +5,8 @@
 
 from __future__ import annotations
 
+from typing import Generator
+
 from ... import common
 
 from . import SymbolBase
@@ -70,10 +72,10 @@ Range check triggered: .bss symbol (name: {self.getName()}, address: 0x{self.con
 
         return output
 
-    def disassemble(
+    def iterDisassembly(
         self,
         migrate: bool = False,
         useGlobalLabel: bool = True,
         isSplittedSymbol: bool = False,
-    ) -> str:
-        return self.disassembleAsBss()
+    ) -> Generator[str, None, None]:
+        yield self.disassembleAsBss()
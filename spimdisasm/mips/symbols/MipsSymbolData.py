@@ -5,6 +5,8 @@
 
 from __future__ import annotations
 
+from array import array
+
 from ... import common
 
 from . import SymbolBase
@@ -18,7 +20,7 @@ class SymbolData(SymbolBase):
         vromEnd: int,
         inFileOffset: int,
         vram: int,
-        words: list[int],
+        words: list[int]|array[int]|memoryview,
         segmentVromStart: int,
         overlayCategory: str | None,
     ):
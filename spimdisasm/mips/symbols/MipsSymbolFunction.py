@@ -5,17 +5,47 @@
 
 from __future__ import annotations
 
+import dataclasses
 import rabbitizer
+from typing import Any, Generator
 
 from ... import common
 
 from . import SymbolText, analysis
 
 
+@dataclasses.dataclass
+class PrecomputedInstrAnalysis:
+    """
+    Results of running the instruction analyzer over a function.
+
+    The instruction analyzer only depends on the function's instructions, its
+    vram and the global configuration, so it can be computed ahead of time
+    (i.e. on a worker process) and applied afterwards.
+    """
+
+    instrAnalyzerState: dict[str, Any]
+    "See `InstrAnalyzer.getPlainState`"
+    branchesTaken: set[int]
+    endOfLineComment: dict[int, str]
+    isLikelyHandwritten: bool
+    hasUnimplementedIntrs: bool
+
+    def toPlainData(self) -> tuple[dict[str, Any], set[int], dict[int, str], bool, bool]:
+        "Returns the fields of this object as a tuple which only contains builtin types"
+        return (self.instrAnalyzerState, self.branchesTaken, self.endOfLineComment, self.isLikelyHandwritten, self.hasUnimplementedIntrs)
+
+    @staticmethod
+    def fromPlainData(data: tuple[dict[str, Any], set[int], dict[int, str], bool, bool]) -> PrecomputedInstrAnalysis:
+        instrAnalyzerState, branchesTaken, endOfLineComment, isLikelyHandwritten, hasUnimplementedIntrs = data
+        return PrecomputedInstrAnalysis(instrAnalyzerState, branchesTaken, endOfLineComment, isLikelyHandwritten, hasUnimplementedIntrs)
+
+
 class SymbolFunction(SymbolText):
     def __init__(self, context: common.Context, vromStart: int, vromEnd: int, inFileOffset: int, vram: int, instrsList: list[rabbitizer.Instruction], segmentVromStart: int, overlayCategory: str|None):
         super().__init__(context, vromStart, vromEnd, inFileOffset, vram, list(), segmentVromStart, overlayCategory)
-        self.instructions = list(instrsList)
+        # Not copied, sections already pass a slice of their instructions
+        self.instructions = instrsList
 
         self.instrAnalyzer = analysis.InstrAnalyzer(self.vram, context)
 
@@ -28,6 +58,14 @@ class SymbolFunction(SymbolText):
         self.isRsp: bool = False
         self.isLikelyHandwritten: bool = False
 
+        self.precomputedInstrAnalysis: PrecomputedInstrAnalysis|None = None
+        "If set then it will be used instead of running the instruction analyzer during `analyze`"
+
+        self.keepInstrAnalysisSnapshot: bool = False
+        "If set then `analyze` will keep a copy of the instruction analysis on `instrAnalysisSnapshot`"
+        self.instrAnalysisSnapshot: PrecomputedInstrAnalysis|None = None
+        "Copy of the instruction analysis, taken before the rest of `analyze` modifies it"
+
     @property
     def nInstr(self) -> int:
         return len(self.instructions)
@@ -106,6 +144,21 @@ class SymbolFunction(SymbolText):
 
         self.instrAnalyzer.printSymbolFinderDebugInfo_UnpairedLuis()
 
+    def _getInstrAnalysis(self) -> PrecomputedInstrAnalysis:
+        return PrecomputedInstrAnalysis(self.instrAnalyzer.getPlainState(), set(self.branchesTaken), dict(self.endOfLineComment), self.isLikelyHandwritten, self.hasUnimplementedIntrs)
+
+    def getPrecomputedInstrAnalysis(self) -> PrecomputedInstrAnalysis:
+        self._runInstructionAnalyzer()
+        return self._getInstrAnalysis()
+
+    def _applyPrecomputedInstrAnalysis(self, precomputed: PrecomputedInstrAnalysis):
+        self.instrAnalyzer = analysis.InstrAnalyzer(self.vram, self.context)
+        self.instrAnalyzer.setPlainState(precomputed.instrAnalyzerState, self.instructions)
+        self.branchesTaken = precomputed.branchesTaken
+        self.endOfLineComment.update(precomputed.endOfLineComment)
+        self.isLikelyHandwritten = precomputed.isLikelyHandwritten
+        self.hasUnimplementedIntrs = precomputed.hasUnimplementedIntrs
+
     def _processElfRelocSymbols(self):
         if len(self.context.globalRelocationOverrides) == 0:
             return
@@ -400,7 +453,14 @@ class SymbolFunction(SymbolText):
                 offset += 4
             return
 
-        self._runInstructionAnalyzer()
+        if self.precomputedInstrAnalysis is not None:
+            self._applyPrecomputedInstrAnalysis(self.precomputedInstrAnalysis)
+            self.precomputedInstrAnalysis = None
+        else:
+            self._runInstructionAnalyzer()
+
+        if self.keepInstrAnalysisSnapshot:
+            self.instrAnalysisSnapshot = self._getInstrAnalysis()
 
         self._postProcessGotAccesses()
         self._processElfRelocSymbols()
@@ -671,16 +731,41 @@ class SymbolFunction(SymbolText):
 
         return None
 
-    def getLabelForOffset(self, instructionOffset: int, migrate: bool=False) -> str:
+    def _getLabelSymForOffset(self, instructionOffset: int) -> common.ContextSymbol|None:
         if common.GlobalConfig.IGNORE_BRANCHES or instructionOffset == 0:
             # Skip over this function to avoid duplication
-            return ""
+            return None
 
         currentVram = self.getVramOffset(instructionOffset)
         currentVrom = self.getVromOffset(instructionOffset)
         labelSym = self.getSymbol(currentVram, vromAddress=currentVrom, tryPlusOffset=False)
 
         if labelSym is None or labelSym.overlayCategory != self.overlayCategory:
+            return None
+        return labelSym
+
+    def _iterLabelSyms(self) -> Generator[common.ContextSymbol, None, None]:
+        "Yields the symbol `_getLabelSymForOffset` finds for every instruction of this function, skipping the ones without a symbol"
+        if common.GlobalConfig.IGNORE_BRANCHES or self.sizew <= 1:
+            return
+
+        segment = self.getSegmentForVrom(self.getVromOffset(4))
+        if segment is not self.getSegmentForVrom(self.getVromOffset(self.sizew*4 - 4)):
+            # The function spans more than one segment, look up each instruction on its own
+            for instructionOffset in range(4, self.sizew*4, 4):
+                labelSym = self._getLabelSymForOffset(instructionOffset)
+                if labelSym is not None:
+                    yield labelSym
+            return
+
+        # Every instruction would be looked up on the same segment, so a single range query finds all of them
+        for labelVram, labelSym in segment.getSymbolsRange(self.getVramOffset(4), self.getVramOffset(self.sizew*4)):
+            if (labelVram - self.vram) % 4 == 0 and labelSym.overlayCategory == self.overlayCategory:
+                yield labelSym
+
+    def getLabelForOffset(self, instructionOffset: int, migrate: bool=False) -> str:
+        labelSym = self._getLabelSymForOffset(instructionOffset)
+        if labelSym is None:
             return ""
 
         labelSym.isDefined = True
@@ -731,28 +816,27 @@ class SymbolFunction(SymbolText):
             # don't emit the other instructions which are part of .cpload if the directive was emitted
         return output
 
-    def disassemble(self, migrate: bool=False, useGlobalLabel: bool=True, isSplittedSymbol: bool=False) -> str:
-        output = ""
-
-        if migrate:
-            output += self.getSpimdisasmVersionString()
-
+    def iterDisassembly(self, migrate: bool=False, useGlobalLabel: bool=True, isSplittedSymbol: bool=False) -> Generator[str, None, None]:
         if not common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS:
             if self.hasUnimplementedIntrs:
-                return self.disassembleAsData(useGlobalLabel=useGlobalLabel, isSplittedSymbol=isSplittedSymbol)
+                yield from self.iterDisassemblyAsData(useGlobalLabel=useGlobalLabel, isSplittedSymbol=isSplittedSymbol)
+                return
 
-        output += self.contextSym.getReferenceeSymbols()
+        if migrate:
+            yield self.getSpimdisasmVersionString()
+
+        yield self.contextSym.getReferenceeSymbols()
 
         if self.isLikelyHandwritten:
             if not self.isRsp:
                 # RSP functions are always handwritten, so this is redundant
-                output += "/* Handwritten function */" + common.GlobalConfig.LINE_ENDS
+                yield "/* Handwritten function */" + common.GlobalConfig.LINE_ENDS
 
         self._generateRelocsFromInstructionAnalyzer()
 
         symName = self.getName()
         symSize = self.contextSym.getSize()
-        output += self.getSymbolAsmDeclaration(symName, useGlobalLabel)
+        yield self.getSymbolAsmDeclaration(symName, useGlobalLabel)
 
         wasLastInstABranch = False
         instructionOffset = 0
@@ -773,27 +857,46 @@ class SymbolFunction(SymbolText):
                 relocInfo = self.getReloc(instructionOffset, instr)
                 currentLine += self.relocToInlineStr(relocInfo, isSplittedSymbol=isSplittedSymbol)
 
-            output += currentLine
+            yield currentLine
 
             wasLastInstABranch = instr.hasDelaySlot()
             instructionOffset += 4
 
             if instructionOffset == symSize:
                 if common.GlobalConfig.ASM_TEXT_END_LABEL:
-                    output += f"{common.GlobalConfig.ASM_TEXT_END_LABEL} {self.getName()}" + common.GlobalConfig.LINE_ENDS
+                    yield f"{common.GlobalConfig.ASM_TEXT_END_LABEL} {self.getName()}" + common.GlobalConfig.LINE_ENDS
 
-                output += self.getSizeDirective(symName)
+                yield self.getSizeDirective(symName)
 
         nameEnd = self.getNameEnd()
         if nameEnd is not None:
-            output += self.getSymbolAsmDeclaration(nameEnd, useGlobalLabel)
+            yield self.getSymbolAsmDeclaration(nameEnd, useGlobalLabel)
 
-        return output
+    def getDisassemblyContextChanges(self) -> list[tuple[common.ContextSymbol, str, Any]]:
+        if not common.GlobalConfig.DISASSEMBLE_UNKNOWN_INSTRUCTIONS:
+            if self.hasUnimplementedIntrs:
+                return super().getDisassemblyContextChanges()
+
+        changes: list[tuple[common.ContextSymbol, str, Any]] = []
+
+        # Generating the relocations marks the gp relative accesses. That
+        # information does not change how anything is disassembled, so it is
+        # fine to apply it right away.
+        self._generateRelocsFromInstructionAnalyzer()
+
+        for labelSym in self._iterLabelSyms():
+            if not labelSym.isDefined:
+                changes.append((labelSym, "isDefined", True))
+            if labelSym.sectionType != self.sectionType:
+                changes.append((labelSym, "sectionType", self.sectionType))
+
+        return changes
 
-    def disassembleAsData(self, useGlobalLabel: bool=True, isSplittedSymbol: bool=False) -> str:
-        self.words = []
+    def iterDisassemblyAsData(self, useGlobalLabel: bool=True, isSplittedSymbol: bool=False) -> Generator[str, None, None]:
+        words: list[int] = []
         for i, instr in enumerate(self.instructions):
             if not instr.isImplemented() or not instr.isValid():
                 self.endOfLineComment[i] = " /* invalid instruction */"
-            self.words.append(instr.getRaw())
-        return super().disassembleAsData(useGlobalLabel=useGlobalLabel, isSplittedSymbol=isSplittedSymbol)
+            words.append(instr.getRaw())
+        self.words = words
+        yield from super().iterDisassemblyAsData(useGlobalLabel=useGlobalLabel, isSplittedSymbol=isSplittedSymbol)
@@ -15,3 +15,4 @@ from .MipsSymbolRodata import SymbolRodata as SymbolRodata
 from .MipsSymbolBss import SymbolBss as SymbolBss
 
 from .MipsSymbolFunction import SymbolFunction as SymbolFunction
+from .MipsSymbolFunction import PrecomputedInstrAnalysis as PrecomputedInstrAnalysis
@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import dataclasses
 import rabbitizer
+from typing import Any
 
 from .... import common
 
@@ -124,6 +125,57 @@ class InstrAnalyzer:
         self.gpSets: dict[int, GpSetInfo] = dict()
         "Instructions setting the $gp register, key: offset of the low instruction"
 
+    _NON_PLAIN_STATE = {"context", "possibleSymbolTypes", "symbolTypesOffsets", "luiInstrs", "unpairedCploads", "cploads", "gpSets"}
+    "Attributes which hold something other than builtin types, see `getPlainState`"
+
+    def getPlainState(self) -> dict[str, Any]:
+        """
+        Returns the results of the analysis using only builtin types (ints,
+        strings, tuples, lists, sets and dicts), which can be stored with
+        `marshal` and do not reference this analyzer, its instructions nor the
+        context.
+
+        `setPlainState` restores them on another analyzer.
+        """
+        state: dict[str, Any] = dict()
+        for attr, value in self.__dict__.items():
+            if attr not in self._NON_PLAIN_STATE:
+                state[attr] = value.copy() if isinstance(value, (set, dict)) else value
+
+        state["possibleSymbolTypes"] = {address: [(symType.accessType.name, symType.unsignedMemoryAccess, count) for symType, count in symTypes.items()] for address, symTypes in self.possibleSymbolTypes.items()}
+        state["symbolTypesOffsets"] = {offset: (symType.accessType.name, symType.unsignedMemoryAccess) for offset, symType in self.symbolTypesOffsets.items()}
+        # The instructions are taken from the function again when restoring
+        state["luiInstrs"] = list(self.luiInstrs)
+        state["unpairedCploads"] = [(cpload.hiOffset, cpload.loOffset, cpload.adduOffset) for cpload in self.unpairedCploads]
+        state["cploads"] = {offset: (cpload.hiOffset, cpload.loOffset, cpload.adduOffset) for offset, cpload in self.cploads.items()}
+        state["gpSets"] = {offset: (gpSet.hiOffset, gpSet.loOffset, gpSet.value) for offset, gpSet in self.gpSets.items()}
+        return state
+
+    def setPlainState(self, state: dict[str, Any], instructions: list[rabbitizer.Instruction]) -> None:
+        """
+        Restores the results returned by `getPlainState`.
+
+        `instructions` must be the instructions of the analyzed function.
+        """
+        for attr, value in state.items():
+            if attr not in self._NON_PLAIN_STATE:
+                setattr(self, attr, value)
+
+        self.possibleSymbolTypes = {address: {SymbolTypeInfo(getattr(rabbitizer.AccessType, accessName), unsignedMemoryAccess): count for accessName, unsignedMemoryAccess, count in symTypes} for address, symTypes in state["possibleSymbolTypes"].items()}
+        self.symbolTypesOffsets = {offset: SymbolTypeInfo(getattr(rabbitizer.AccessType, accessName), unsignedMemoryAccess) for offset, (accessName, unsignedMemoryAccess) in state["symbolTypesOffsets"].items()}
+        self.luiInstrs = {offset: instructions[offset//4] for offset in state["luiInstrs"]}
+        self.unpairedCploads = [self._cploadFromPlainState(cploadState, instructions) for cploadState in state["unpairedCploads"]]
+        self.cploads = {offset: self._cploadFromPlainState(cploadState, instructions) for offset, cploadState in state["cploads"].items()}
+        self.gpSets = {offset: GpSetInfo(hiOffset, loOffset, value) for offset, (hiOffset, loOffset, value) in state["gpSets"].items()}
+
+    @staticmethod
+    def _cploadFromPlainState(cploadState: tuple[int, int, int|None], instructions: list[rabbitizer.Instruction]) -> CploadInfo:
+        hiOffset, loOffset, adduOffset = cploadState
+        cpload = CploadInfo(hiOffset, loOffset, adduOffset)
+        if adduOffset is not None:
+            cpload.reg = instructions[adduOffset//4].rt
+        return cpload
+
 
     def processBranch(self, instr: rabbitizer.Instruction, instrOffset: int, currentVram: int) -> None:
         if instrOffset in self.branchInstrOffsets:
@@ -11,6 +11,7 @@ from pathlib import Path
 
 from .. import common
 from .. import mips
+from .. import frontendCommon as fec
 
 from .. import __version__
 
@@ -30,6 +31,8 @@ def addOptionsToParser(parser: argparse.ArgumentParser) -> argparse.ArgumentPars
     parser.add_argument("--end", help="Offset end of the input binary file to start disassembling. Expects an hex value",  default="0xFFFFFF")
     parser.add_argument("--vram", help="Set the VRAM address. Expects an hex value", default="0x0")
 
+    fec.Timings.addParametersToArgParse(parser)
+
     common.Context.addParametersToArgParse(parser)
 
     common.GlobalConfig.addParametersToArgParse(parser)
@@ -69,13 +72,7 @@ def initializeContext(args: argparse.Namespace, fileSize: int, fileVram: int) ->
     return context
 
 
-def processArguments(args: argparse.Namespace) -> int:
-    applyArgs(args)
-
-    applyGlobalConfigurations()
-
-    binaryPath = Path(args.binary)
-    array_of_bytes = common.Utils.readFileAsBytearray(binaryPath)
+def _disassembleInput(args: argparse.Namespace, binaryPath: Path, array_of_bytes: bytes|memoryview, timings: fec.Timings) -> None:
     inputName = binaryPath.stem
 
     start = int(args.start, 16)
@@ -89,16 +86,46 @@ def processArguments(args: argparse.Namespace) -> int:
     f = mips.sections.SectionText(context, start, end, fileVram, inputName, array_of_bytes, 0, None)
     f.instrCat = rabbitizer.InstrCategory.RSP
 
-    f.analyze()
+    if timings.enabled:
+        f.functionAnalysisTimes = []
+    with timings.phase("analyze"):
+        f.analyze()
     f.printAnalyzisResults()
+    if f.functionAnalysisTimes is not None:
+        for func, (wall, cpu) in zip(f.symbolList, f.functionAnalysisTimes):
+            timings.recordFunction(inputName, func.getName(), func.vram, wall, cpu)
+
+    # Saved after the analysis, so loading it back skips reading the symbols inputs
+    if args.save_context_binary is not None:
+        contextPath = Path(args.save_context_binary)
+        contextPath.parent.mkdir(parents=True, exist_ok=True)
+        with timings.phase("saveContextBinary"):
+            context.saveContextToBinaryFile(contextPath)
 
-    mips.FilesHandlers.writeSection(Path(args.output), f)
+    with timings.phase("write"):
+        mips.FilesHandlers.writeSection(Path(args.output), f)
 
     if args.save_context is not None:
         contextPath = Path(args.save_context)
         contextPath.parent.mkdir(parents=True, exist_ok=True)
-        context.saveContextToFile(contextPath)
+        with timings.phase("saveContext"):
+            context.saveContextToFile(contextPath)
+
+
+def processArguments(args: argparse.Namespace) -> int:
+    timings = fec.Timings.fromArgs(args)
+    timings.start()
+
+    try:
+        applyArgs(args)
+
+        applyGlobalConfigurations()
 
+        binaryPath = Path(args.binary)
+        with common.Utils.mapFileAsMemoryview(binaryPath) as array_of_bytes:
+            _disassembleInput(args, binaryPath, array_of_bytes, timings)
+    finally:
+        timings.finish()
     return 0
 
 def addSubparser(subparser: argparse._SubParsersAction[argparse.ArgumentParser]):
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+from pathlib import Path
+import socket
+import stat
+import sys
+import time
+import traceback
+from typing import Any
+
+from .. import common
+from .. import mips
+from .. import singleFileDisasm
+from .. import frontendCommon as fec
+
+from .. import __version__
+
+PROGNAME = "serve"
+
+
+def _getInt(request: dict[str, Any], key: str, default: int|None=None) -> int:
+    value = request.get(key, default)
+    if isinstance(value, str):
+        return int(value, 0)
+    if not isinstance(value, int):
+        raise RuntimeError(f"Error: expected an integer or a string with an integer for `{key}`, got {value!r}")
+    return value
+
+
+class DisassemblyServer:
+    """
+    Keeps a context loaded from the symbol files passed on the command line
+    and answers disassembly requests sent to a Unix domain socket.
+
+    Every connection carries a single request, a json object on a single line,
+    and gets back a single json object on a single line. Requests are handled
+    one at a time, and a client that takes longer than `requestTimeout`
+    seconds to send its request gets an error instead.
+
+    The disassembly requests are handled by a process forked from the server,
+    so the changes the analysis makes to the context (and the symbols the
+    request itself adds) are discarded once the request is answered, and the
+    next request sees the same context as the first one.
+
+    Supported commands:
+
+    - `{"command": "ping"}`
+    - `{"command": "disassemble", "input": "baserom.z64", "sections": [{"type": ".text", "vromStart": "0x1000", "vromEnd": "0x1080", "vram": "0x80000400"}], "symbolAddrs": ["func_80000400 = 0x80000400; // type:func"]}`
+        - `sections` are analyzed in the same order as `singleFileDisasm`
+          would. `type` is one of `.text`, `.data`, `.rodata` or `.bss`, as
+          on a file splits csv, defaulting to `.text`. A section may have a
+          `name`.
+        - `vram` is optional, the vram of the start of the input, as the
+          `--vram` option of `singleFileDisasm`.
+        - Instead of `sections`, a `function` (its vram) can be requested if
+          the context knows both its rom address and its size.
+        - `symbolAddrs` are optional lines in the splat's symbol_addrs format,
+          which are added to the context only for this request.
+        - The answer has a `sections` list with the `name`, `type` and
+          `output` of each section.
+    - `{"command": "reload"}` loads again the symbol files passed on the
+      command line.
+    - `{"command": "shutdown"}`
+    """
+
+    requestTimeout: float = 10.0
+    "Seconds a client has to send its whole request before the connection is dropped"
+
+    def __init__(self, socketPath: Path, args: argparse.Namespace):
+        self.socketPath = socketPath
+        self.args = args
+        self.context = common.Context()
+        self.requestsCount = 0
+
+    def loadContext(self) -> None:
+        self.context = common.Context()
+        self.context.parseArgs(self.args)
+
+
+    def _getSections(self, request: dict[str, Any]) -> list[dict[str, Any]]:
+        if "function" in request:
+            funcVram = _getInt(request, "function")
+            contextSym = self.context.globalSegment.getSymbol(funcVram)
+            if contextSym is None or contextSym.vromAddress is None or contextSym.userDeclaredSize is None:
+                raise RuntimeError(f"Error: the rom address and the size of the function at 0x{funcVram:08X} are not known by the context")
+            return [{"type": ".text", "vromStart": contextSym.vromAddress, "vromEnd": contextSym.vromAddress + contextSym.userDeclaredSize, "vram": funcVram, "name": contextSym.getName()}]
+
+        sections = request.get("sections")
+        if not isinstance(sections, list) or len(sections) == 0:
+            raise RuntimeError(f"Error: a `disassemble` request needs either a `function` or a non-empty `sections` list")
+        return sections
+
+    def disassemble(self, request: dict[str, Any]) -> dict[str, Any]:
+        inputPath = request.get("input")
+        if not isinstance(inputPath, str):
+            raise RuntimeError(f"Error: a `disassemble` request needs an `input` path")
+
+        symbolAddrs = request.get("symbolAddrs")
+        if symbolAddrs is not None:
+            if not isinstance(symbolAddrs, list) or not all(isinstance(line, str) for line in symbolAddrs):
+                raise RuntimeError(f"Error: `symbolAddrs` must be a list of strings, got {symbolAddrs!r}")
+            self.context.globalSegment.readSplatSymbolAddrsLines(symbolAddrs)
+
+        with common.Utils.mapFileAsMemoryview(Path(inputPath)) as array_of_bytes:
+            return self._disassembleInput(request, inputPath, array_of_bytes)
+
+    def _disassembleInput(self, request: dict[str, Any], inputPath: str, array_of_bytes: bytes|memoryview) -> dict[str, Any]:
+        processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]] = {
+            common.FileSectionType.Text: [],
+            common.FileSectionType.Data: [],
+            common.FileSectionType.Rodata: [],
+            common.FileSectionType.Bss: [],
+        }
+        processedFilesOutputPaths: dict[common.FileSectionType, list[Path]] = {k: [] for k in processedFiles}
+        orderedSections: list[mips.sections.SectionBase] = []
+        for sectionEntry in self._getSections(request):
+            sectionType = common.FileSectionType.fromStr(sectionEntry.get("type", ".text"))
+            if sectionType not in processedFiles:
+                raise RuntimeError(f"Error: unsupported section type {sectionEntry.get('type')!r}")
+            vromStart = _getInt(sectionEntry, "vromStart")
+            vromEnd = _getInt(sectionEntry, "vromEnd")
+            vram = _getInt(sectionEntry, "vram")
+            name = sectionEntry.get("name", "")
+            if name == "":
+                name = f"{Path(inputPath).stem}_{vram:08X}"
+            if vromStart > vromEnd or (sectionType != common.FileSectionType.Bss and vromEnd > len(array_of_bytes)):
+                raise RuntimeError(f"Error: invalid vrom range [0x{vromStart:X}, 0x{vromEnd:X}] for an input of size 0x{len(array_of_bytes):X}")
+
+            splitEntry = common.FileSplitEntry(vromStart, vram, name, sectionType, vromEnd, False, False)
+            f = mips.FilesHandlers.createSectionFromSplitEntry(splitEntry, array_of_bytes, self.context)
+            f.setCommentOffset(vromStart)
+            processedFiles[sectionType].append(f)
+            processedFilesOutputPaths[sectionType].append(Path(name))
+            orderedSections.append(f)
+
+        singleFileDisasm.changeGlobalSegmentRanges(self.context, processedFiles, len(array_of_bytes), _getInt(request, "vram", 0))
+        fec.FrontendUtilities.analyzeProcessedFiles(processedFiles, processedFilesOutputPaths, len(orderedSections))
+
+        sectionsOutputs: list[dict[str, Any]] = []
+        for f in orderedSections:
+            output = io.StringIO()
+            f.disassembleToFile(output)
+            sectionsOutputs.append({"name": f.name, "type": f.sectionType.toStr(), "output": output.getvalue()})
+        return {"sections": sectionsOutputs}
+
+    def _handleForked(self, request: dict[str, Any]) -> dict[str, Any]:
+        readFd, writeFd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(readFd)
+            exitCode = 0
+            try:
+                with os.fdopen(writeFd, "w", encoding="utf-8") as pipe:
+                    json.dump(self._handleDisassemble(request), pipe)
+            except BaseException:
+                exitCode = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                # Don't run any cleanup inherited from the server, like closing its socket
+                os._exit(exitCode)
+
+        os.close(writeFd)
+        with os.fdopen(readFd, "r", encoding="utf-8") as pipe:
+            data = pipe.read()
+        os.waitpid(pid, 0)
+        if data == "":
+            raise RuntimeError(f"Error: the process handling the request died without answering")
+        response: dict[str, Any] = json.loads(data)
+        return response
+
+    def _handleDisassemble(self, request: dict[str, Any]) -> dict[str, Any]:
+        try:
+            return {"ok": True, **self.disassemble(request)}
+        except Exception as e:
+            common.Utils.eprint(traceback.format_exc())
+            return {"ok": False, "error": str(e)}
+
+    def handleRequest(self, request: dict[str, Any]) -> dict[str, Any]:
+        command = request.get("command")
+        if command == "ping":
+            return {"ok": True, "version": __version__}
+        if command == "disassemble":
+            return self._handleForked(request)
+        if command == "reload":
+            self.loadContext()
+            return {"ok": True}
+        if command == "shutdown":
+            return {"ok": True}
+        return {"ok": False, "error": f"Error: unknown command {command!r}"}
+
+
+    def _readRequest(self, connection: socket.socket) -> dict[str, Any]:
+        # A client that never finishes its request would block the server forever
+        connection.settimeout(self.requestTimeout)
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = connection.recv(0x10000)
+            if len(chunk) == 0:
+                break
+            data += chunk
+        request = json.loads(data)
+        if not isinstance(request, dict):
+            raise RuntimeError(f"Error: a request must be a json object")
+        return request
+
+    def serveForever(self) -> None:
+        if self.socketPath.is_symlink() or self.socketPath.exists():
+            # Only replace the socket left behind by a previous server, never an unrelated file
+            if not stat.S_ISSOCK(self.socketPath.lstat().st_mode):
+                raise RuntimeError(f"Error: '{self.socketPath}' already exists and is not a socket")
+            self.socketPath.unlink()
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            # The socket only shows up on its path once it is listening, so
+            # clients waiting for the path never get their connection refused
+            tempPath = self.socketPath.with_name(f".{self.socketPath.name}.{os.getpid()}")
+            server.bind(str(tempPath))
+            server.listen()
+            os.replace(tempPath, self.socketPath)
+            common.Utils.printQuietless(f"Listening on {self.socketPath}")
+            try:
+                running = True
+                while running:
+                    connection, _ = server.accept()
+                    with connection:
+                        start = time.perf_counter()
+                        try:
+                            request = self._readRequest(connection)
+                            response = self.handleRequest(request)
+                            running = request.get("command") != "shutdown"
+                        except Exception as e:
+                            request = dict()
+                            response = {"ok": False, "error": str(e)}
+                        response["time"] = time.perf_counter() - start
+                        try:
+                            connection.sendall(json.dumps(response).encode("utf-8") + b"\n")
+                        except OSError:
+                            common.Utils.eprint(f"Warning: the client disconnected before receiving the answer")
+                    self.requestsCount += 1
+                    common.Utils.printVerbose(f"Request {self.requestsCount}: {request.get('command')} ({response['time']*1000:.2f} ms)")
+            finally:
+                self.socketPath.unlink()
+
+
+def sendRequest(socketPath: Path, request: dict[str, Any]) -> dict[str, Any]:
+    """Sends a single request to a running server and returns its answer."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socketPath))
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = client.recv(0x10000)
+            if len(chunk) == 0:
+                break
+            data += chunk
+    response: dict[str, Any] = json.loads(data)
+    return response
+
+
+def getToolDescription() -> str:
+    return "Keeps a context loaded and answers disassembly requests sent to a Unix domain socket"
+
+def addOptionsToParser(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("-V", "--version", action="version", version=f"%(prog)s {__version__}")
+
+    parser.add_argument("socket", help="Path of the Unix domain socket to listen on. It is created when the server starts and removed when it shuts down")
+
+    common.Context.addParametersToArgParse(parser)
+
+    common.GlobalConfig.addParametersToArgParse(parser)
+
+    mips.InstructionConfig.addParametersToArgParse(parser)
+
+    return parser
+
+def getArgsParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=getToolDescription(), prog=PROGNAME, formatter_class=common.Utils.PreserveWhiteSpaceWrapRawTextHelpFormatter)
+    return addOptionsToParser(parser)
+
+def processArguments(args: argparse.Namespace) -> int:
+    if not hasattr(socket, "AF_UNIX") or not hasattr(os, "fork"):
+        common.Utils.eprint("Error: the server needs Unix domain sockets and `fork`, which are not available on this platform")
+        return 1
+
+    common.GlobalConfig.parseArgs(args)
+    mips.InstructionConfig.parseArgs(args)
+    singleFileDisasm.applyGlobalConfigurations()
+
+    server = DisassemblyServer(Path(args.socket), args)
+    server.loadContext()
+    try:
+        server.serveForever()
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        common.Utils.eprint(e)
+        return 1
+    return 0
+
+def addSubparser(subparser: argparse._SubParsersAction[argparse.ArgumentParser]):
+    parser = subparser.add_parser("serve", help=getToolDescription(), formatter_class=common.Utils.PreserveWhiteSpaceWrapRawTextHelpFormatter)
+
+    addOptionsToParser(parser)
+
+    parser.set_defaults(func=processArguments)
+
+
+def serveMain():
+    args = getArgsParser().parse_args()
+
+    return processArguments(args)
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+
+from .ServeInternals import DisassemblyServer as DisassemblyServer
+from .ServeInternals import sendRequest as sendRequest
+from .ServeInternals import getToolDescription as getToolDescription
+from .ServeInternals import addOptionsToParser as addOptionsToParser
+from .ServeInternals import getArgsParser as getArgsParser
+from .ServeInternals import processArguments as processArguments
+from .ServeInternals import addSubparser as addSubparser
+from .ServeInternals import serveMain as serveMain
@@ -50,7 +50,14 @@ def addOptionsToParser(parser: argparse.ArgumentParser) -> argparse.ArgumentPars
     parser.add_argument("--write-binary", help=f"Produce a binary from the processed file. Defaults to {common.GlobalConfig.WRITE_BINARY}", action=common.Utils.BooleanOptionalAction)
 
     parser.add_argument("--function-info", help="Specifies a path where to output a csvs sumary file of every analyzed function", metavar="PATH")
+    parser.add_argument("--fingerprint-index", help="Writes an index with the fingerprint of every analyzed function to the given path. `spimdisasm match` uses it to find the counterparts of the functions of another build", metavar="PATH")
 
+    parser.add_argument("-j", "--jobs", help="Amount of worker processes to use to speed up the analysis and the writing of the output files. The output is the same regardless of this value. Only available on platforms supporting `fork`. Defaults to 1", type=int, default=1, metavar="N")
+    parser.add_argument("--analysis-cache", help="Path to a directory where to cache the analysis and the output of every section between runs. Sections which did not change since the previous run are not re-analyzed nor rendered again. The output is the same as not using a cache", metavar="PATH")
+    parser.add_argument("--analysis-cache-max-size", help="Maximum size in MiB of the directory passed to --analysis-cache. The least recently used files are removed once it is exceeded. 0 means no limit. Defaults to 512", type=int, default=512, metavar="SIZE")
+    parser.add_argument("--incremental", help="Enables the incremental mode, keeping track of the state of each run on the given file. Only the output files affected by the changes since the previous run are rendered again, and output files whose contents did not change are not rewritten, keeping their modification time", metavar="PATH")
+
+    fec.Timings.addParametersToArgParse(parser)
 
     common.Context.addParametersToArgParse(parser)
 
@@ -78,6 +85,8 @@ def applyArgs(args: argparse.Namespace) -> None:
                 common.GlobalConfig.IGNORE_WORD_LIST.add(int(upperByte, 16))
     if args.write_binary is not None:
         common.GlobalConfig.WRITE_BINARY = args.write_binary
+    if args.incremental is not None:
+        common.GlobalConfig.ONLY_WRITE_CHANGED_FILES = True
 
 def applyGlobalConfigurations() -> None:
     common.GlobalConfig.PRODUCE_SYMBOLS_PLUS_OFFSET = True
@@ -134,17 +143,7 @@ def changeGlobalSegmentRanges(context: common.Context, processedFiles: dict[comm
     return
 
 
-def processArguments(args: argparse.Namespace) -> int:
-    applyArgs(args)
-
-    applyGlobalConfigurations()
-
-    context = common.Context()
-    context.parseArgs(args)
-
-    inputPath = Path(args.binary)
-    array_of_bytes = common.Utils.readFileAsBytearray(inputPath)
-
+def _disassembleInput(args: argparse.Namespace, context: common.Context, inputPath: Path, array_of_bytes: bytes|memoryview, timings: fec.Timings) -> None:
     fileSplitsPath = None
     if args.file_splits is not None:
         fileSplitsPath = Path(args.file_splits)
@@ -163,7 +162,8 @@ def processArguments(args: argparse.Namespace) -> int:
     else:
         dataOutput = Path(args.data_output)
 
-    processedFiles, processedFilesOutputPaths = fec.FrontendUtilities.getSplittedSections(context, splits, array_of_bytes, inputPath, textOutput, dataOutput)
+    with timings.phase("split"):
+        processedFiles, processedFilesOutputPaths = fec.FrontendUtilities.getSplittedSections(context, splits, array_of_bytes, inputPath, textOutput, dataOutput)
     changeGlobalSegmentRanges(context, processedFiles, len(array_of_bytes), int(args.vram, 16))
 
     fec.FrontendUtilities.configureProcessedFiles(processedFiles, args.instr_category)
@@ -175,36 +175,77 @@ def processArguments(args: argparse.Namespace) -> int:
     progressCallback: fec.FrontendUtilities.ProgressCallbackType
 
     progressCallback = fec.FrontendUtilities.progressCallback_analyzeProcessedFiles
-    fec.FrontendUtilities.analyzeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount, progressCallback)
+    analysisCache = mips.AnalysisCache(Path(args.analysis_cache), args.analysis_cache_max_size * 1024 * 1024 if args.analysis_cache_max_size > 0 else None) if args.analysis_cache is not None else None
+    with timings.phase("analyze"):
+        fec.FrontendUtilities.analyzeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount, progressCallback, jobs=args.jobs, analysisCache=analysisCache, timings=timings)
+
+    # Saved after the analysis, so loading it back skips reading the symbols inputs
+    if args.save_context_binary is not None:
+        contextPath = Path(args.save_context_binary)
+        contextPath.parent.mkdir(parents=True, exist_ok=True)
+        with timings.phase("saveContextBinary"):
+            context.saveContextToBinaryFile(contextPath)
 
     if args.nuke_pointers:
         common.Utils.printVerbose("Nuking pointers...")
         progressCallback = fec.FrontendUtilities.progressCallback_nukePointers
-        fec.FrontendUtilities.nukePointers(processedFiles, processedFilesOutputPaths, processedFilesCount, progressCallback)
+        with timings.phase("nukePointers"):
+            fec.FrontendUtilities.nukePointers(processedFiles, processedFilesOutputPaths, processedFilesCount, progressCallback, timings=timings)
 
     progressCallback = fec.FrontendUtilities.progressCallback_writeProcessedFiles
-    fec.FrontendUtilities.writeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount, progressCallback)
+    incrementalState = fec.IncrementalState(Path(args.incremental)) if args.incremental is not None else None
+    with timings.phase("write"):
+        fec.FrontendUtilities.writeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount, progressCallback, jobs=args.jobs, incrementalState=incrementalState, timings=timings, analysisCache=analysisCache)
 
     if args.split_functions is not None:
         common.Utils.printVerbose("\nSpliting functions...")
         progressCallback = fec.FrontendUtilities.progressCallback_migrateFunctions
-        fec.FrontendUtilities.migrateFunctions(processedFiles, Path(args.split_functions), progressCallback)
+        with timings.phase("migrateFunctions"):
+            fec.FrontendUtilities.migrateFunctions(processedFiles, Path(args.split_functions), progressCallback, jobs=args.jobs, timings=timings, analysisCache=analysisCache)
+
+    if analysisCache is not None:
+        with timings.phase("pruneAnalysisCache"):
+            analysisCache.prune()
 
     if args.save_context is not None:
         contextPath = Path(args.save_context)
         contextPath.parent.mkdir(parents=True, exist_ok=True)
-        context.saveContextToFile(contextPath)
+        with timings.phase("saveContext"):
+            context.saveContextToFile(contextPath)
 
     if args.function_info is not None:
-        fec.FrontendUtilities.writeFunctionInfoCsv(processedFiles, Path(args.function_info))
+        with timings.phase("writeFunctionInfo"):
+            fec.FrontendUtilities.writeFunctionInfoCsv(processedFiles, Path(args.function_info))
+
+    if args.fingerprint_index is not None:
+        with timings.phase("writeFingerprintIndex"):
+            fec.FrontendUtilities.writeFingerprintIndex(processedFiles, Path(args.fingerprint_index))
+
+
+def processArguments(args: argparse.Namespace) -> int:
+    timings = fec.Timings.fromArgs(args)
+    timings.start()
+
+    try:
+        applyArgs(args)
+
+        applyGlobalConfigurations()
+
+        context = common.Context()
+        context.parseArgs(args)
 
-    common.Utils.printQuietless(500*" " + "\r", end="")
-    common.Utils.printQuietless(f"Done: {args.binary}")
+        inputPath = Path(args.binary)
+        with common.Utils.mapFileAsMemoryview(inputPath) as array_of_bytes:
+            _disassembleInput(args, context, inputPath, array_of_bytes, timings)
 
-    common.Utils.printVerbose()
-    common.Utils.printVerbose("Disassembling complete!")
-    common.Utils.printVerbose("Goodbye.")
+        common.Utils.printQuietless(500*" " + "\r", end="")
+        common.Utils.printQuietless(f"Done: {args.binary}")
 
+        common.Utils.printVerbose()
+        common.Utils.printVerbose("Disassembling complete!")
+        common.Utils.printVerbose("Goodbye.")
+    finally:
+        timings.finish()
     return 0
 
 def addSubparser(subparser: argparse._SubParsersAction[argparse.ArgumentParser]):
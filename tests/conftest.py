@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import pytest
+
+from .utils import SyntheticRom
+
+
+@pytest.fixture(scope="session")
+def syntheticRom(tmp_path_factory: pytest.TempPathFactory) -> SyntheticRom:
+    return SyntheticRom(tmp_path_factory.mktemp("rom"), filesCount=6, seed=0)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from spimdisasm import common
+from spimdisasm.common.Context import AddressRange, SymbolsRanges
+
+
+def _linearIsInRange(ranges: list[tuple[int, int]], address: int) -> bool:
+    "The walk over every range `AddressRangeSet` replaces"
+    return any(start <= address < end for start, end in ranges)
+
+def _randomRange(rng: random.Random) -> tuple[int, int]:
+    start = rng.randrange(0, 0x1000)
+    # A few ranges are empty or inverted, which contain no address
+    return start, start + rng.randrange(-0x10, 0x100)
+
+def _getProbes(ranges: list[tuple[int, int]]) -> list[int]:
+    "Addresses around the edges of every range"
+    probes = {-1, 0, 0x1200}
+    for start, end in ranges:
+        probes |= {start - 1, start, start + 1, end - 1, end, end + 1}
+    return sorted(probes)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_addressRangeSetMatchesLinearWalk(seed: int) -> None:
+    rng = random.Random(seed)
+    ranges: list[tuple[int, int]] = []
+    rangeSet = common.AddressRangeSet()
+
+    # Ranges are added between queries, so they get merged with the already merged ones
+    for _ in range(10):
+        newRanges = [_randomRange(rng) for _ in range(rng.randrange(0, 10))]
+        if rng.random() < 0.5:
+            rangeSet.addRanges(newRanges)
+        else:
+            for start, end in newRanges:
+                rangeSet.add(start, end)
+        ranges += newRanges
+
+        for address in _getProbes(ranges):
+            assert rangeSet.isInRange(address) == _linearIsInRange(ranges, address), hex(address)
+
+        merged = rangeSet.getRanges()
+        assert all(start < end for start, end in merged)
+        assert all(previousEnd < start for (_, previousEnd), (start, _) in zip(merged, merged[1:]))
+
+    rangeSet.clear()
+    assert rangeSet.getRanges() == []
+    assert not any(rangeSet.isInRange(address) for address in _getProbes(ranges))
+
+def test_addressRangeSetAdjacentRanges() -> None:
+    rangeSet = common.AddressRangeSet([(0x10, 0x20), (0x20, 0x30), (0x40, 0x50), (0x45, 0x48), (0x60, 0x60)])
+
+    assert rangeSet.getRanges() == [(0x10, 0x30), (0x40, 0x50)]
+    assert rangeSet.isInRange(0x2F)
+    assert not rangeSet.isInRange(0x30)
+    assert not rangeSet.isInRange(0x60)
+
+
+def test_bannedRangesFollowModifications() -> None:
+    # Regression test: the banned ranges used to be merged only when they
+    # were added through the `Context` methods, so modifying the list or the
+    # ranges directly was ignored
+    context = common.Context()
+
+    def check() -> None:
+        ranges = [(addrRange.start, addrRange.end) for addrRange in context.bannedRangedSymbols]
+        for address in _getProbes(ranges + [(0x100, 0x200), (0x700, 0x800)]):
+            assert context.isAddressBanned(address) == _linearIsInRange(ranges, address), hex(address)
+
+    context.addBannedSymbolRange(0x100, 0x110)
+    context.addBannedSymbolRangeBySize(0x180, 0x10)
+    context.addBannedSymbolRanges([(0x400, 0x500), (0x480, 0x520)])
+    check()
+
+    context.bannedRangedSymbols[0].increaseEnd(0x150)
+    check()
+    context.bannedRangedSymbols[1].decreaseStart(0x170)
+    check()
+    context.bannedRangedSymbols[2].start = 0x410
+    check()
+    context.bannedRangedSymbols.append(AddressRange(0x700, 0x800))
+    check()
+    context.bannedRangedSymbols.pop(0)
+    check()
+    context.bannedRangedSymbols[0] = AddressRange(0x150, 0x160)
+    check()
+    context.bannedRangedSymbols = [AddressRange(0x120, 0x130)]
+    check()
+    context.clearBannedSymbolRanges()
+    check()
+
+def test_specialRangesFollowModifications() -> None:
+    symbolsRanges = SymbolsRanges(0x80000000, 0x80001000)
+
+    def check() -> None:
+        ranges = [(symbolsRanges.mainAddressRange.start, symbolsRanges.mainAddressRange.end)]
+        ranges += [(addrRange.start, addrRange.end) for addrRange in symbolsRanges.specialRanges]
+        for address in _getProbes(ranges + [(0x80002000, 0x80003000)]):
+            assert symbolsRanges.isInRange(address) == _linearIsInRange(ranges, address), hex(address)
+
+    assert symbolsRanges.addSpecialRange(0x80003000, 0x80003000) is None
+    specialRange = symbolsRanges.addSpecialRange(0x80002000, 0x80002100)
+    assert specialRange is not None
+    check()
+
+    specialRange.increaseEnd(0x80002800)
+    check()
+    symbolsRanges.increaseEnd(0x80001100)
+    check()
+    symbolsRanges.specialRanges.append(AddressRange(0x80004000, 0x80004010))
+    check()
+    symbolsRanges.clearSpecialRanges()
+    check()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import marshal
+import os
+from pathlib import Path
+import time
+
+import pytest
+
+from spimdisasm import common
+from spimdisasm import mips
+from spimdisasm import frontendCommon as fec
+
+from .utils import FUNC_WORDS, SyntheticRom, analyzeSections, disassembleSections, readTree, runSpimdisasm
+
+
+def _textSections(processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]]) -> list[mips.sections.SectionText]:
+    textSections: list[mips.sections.SectionText] = []
+    for f in processedFiles[common.FileSectionType.Text]:
+        assert isinstance(f, mips.sections.SectionText)
+        textSections.append(f)
+    return textSections
+
+
+def test_instrAnalyzerPlainStateRoundTrip(syntheticRom: SyntheticRom) -> None:
+    context, processedFiles = syntheticRom.analyze()
+
+    functionsCount = 0
+    for textSection in _textSections(processedFiles):
+        for func in textSection.symbolList:
+            assert isinstance(func, mips.symbols.SymbolFunction)
+            state = func.instrAnalyzer.getPlainState()
+
+            restored = mips.symbols.analysis.InstrAnalyzer(func.vram, context)
+            restored.setPlainState(marshal.loads(marshal.dumps(state)), func.instructions)
+
+            assert restored.getPlainState() == state
+            for attr, value in func.instrAnalyzer.__dict__.items():
+                assert getattr(restored, attr) == value, attr
+            functionsCount += 1
+
+    assert functionsCount == len(syntheticRom.functions)
+
+
+def test_precomputedAnalysisMatchesAnalysis(syntheticRom: SyntheticRom) -> None:
+    # Analysis done in place, recording the analysis of every function
+    _, analyzedFiles, analyzedPaths = syntheticRom.split()
+    for textSection in _textSections(analyzedFiles):
+        textSection.instrAnalysisResults = dict()
+    analyzeSections(analyzedFiles, analyzedPaths)
+    expectedOutputs = disassembleSections(analyzedFiles)
+
+    # Analysis precomputed on a throwaway context, as a worker process or the cache would
+    _, throwawayFiles, _ = syntheticRom.split()
+    precomputedSections = [marshal.loads(marshal.dumps({key: funcAnalysis.toPlainData() for key, funcAnalysis in textSection.precomputeInstrAnalysis().items()})) for textSection in _textSections(throwawayFiles)]
+
+    _, processedFiles, processedFilesOutputPaths = syntheticRom.split()
+    for textSection, analyzedSection, precomputed in zip(_textSections(processedFiles), _textSections(analyzedFiles), precomputedSections):
+        assert analyzedSection.instrAnalysisResults is not None
+        # Every function got the same boundaries, so every precomputed analysis is used
+        assert precomputed.keys() == analyzedSection.instrAnalysisResults.keys()
+        for key, funcAnalysis in analyzedSection.instrAnalysisResults.items():
+            assert mips.symbols.PrecomputedInstrAnalysis.fromPlainData(precomputed[key]) == funcAnalysis
+
+        textSection.precomputedInstrAnalysis = {key: mips.symbols.PrecomputedInstrAnalysis.fromPlainData(funcData) for key, funcData in precomputed.items()}
+    analyzeSections(processedFiles, processedFilesOutputPaths)
+
+    assert disassembleSections(processedFiles) == expectedOutputs
+
+
+def test_analysisCacheOutputMatchesUncachedRun(syntheticRom: SyntheticRom, tmp_path: Path) -> None:
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "uncached"))
+    expected = readTree(tmp_path / "uncached")
+
+    cacheDir = tmp_path / "cache"
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "cold") + ["--analysis-cache", str(cacheDir), "--jobs", "2"])
+    cacheFiles = readTree(cacheDir)
+    # The analysis of every text section
+    assert len(list(cacheDir.glob("*.marshal"))) == len(syntheticRom.sections) // 4
+    # The output of every section, the migrated functions of every text section and the unmigrated rodata of every rodata section
+    assert len(list(cacheDir.glob("rendered/*.marshal"))) == len(syntheticRom.sections) + 2 * len(syntheticRom.sections) // 4
+
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "warm") + ["--analysis-cache", str(cacheDir)])
+
+    assert readTree(tmp_path / "cold") == expected
+    assert readTree(tmp_path / "warm") == expected
+    # Nothing changed, so nothing was stored again
+    assert readTree(cacheDir) == cacheFiles
+
+def test_analysisCacheFollowsSymbolChanges(syntheticRom: SyntheticRom, tmp_path: Path) -> None:
+    cacheDir = tmp_path / "cache"
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "cold") + ["--analysis-cache", str(cacheDir)])
+
+    # A function with a user-declared size in the middle of another one splits
+    # it, and the instructions following it become an autocreated function
+    symbolAddrsPath = tmp_path / "symbol_addrs.txt"
+    symbolAddrsPath.write_text(syntheticRom.symbolAddrsPath.read_text() + f"splitFunction = 0x{syntheticRom.functions[1] + FUNC_WORDS * 2:08X}; // type:func size:0x10\n")
+
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "uncached", symbolAddrsPath))
+    expected = readTree(tmp_path / "uncached")
+    assert "splitFunction" in "".join(path for path in expected)
+
+    # The cached functions of the affected section are not valid anymore
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "warm", symbolAddrsPath) + ["--analysis-cache", str(cacheDir)])
+    assert readTree(tmp_path / "warm") == expected
+
+    # And the ones found instead are reused
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "warmAgain", symbolAddrsPath) + ["--analysis-cache", str(cacheDir)])
+    assert readTree(tmp_path / "warmAgain") == expected
+
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "original") + ["--analysis-cache", str(cacheDir)])
+    assert readTree(tmp_path / "original") == readTree(tmp_path / "cold")
+
+def test_analysisCacheReusesFunctions(syntheticRom: SyntheticRom, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    analysisCache = mips.AnalysisCache(tmp_path / "cache")
+    _, coldFiles, coldPaths = syntheticRom.split()
+    fec.FrontendUtilities.analyzeProcessedFiles(coldFiles, coldPaths, sum(len(files) for files in coldFiles.values()), analysisCache=analysisCache)
+    assert analysisCache.hits == 0
+
+    def findFunctions(self: mips.sections.SectionText, instrsList: list[object], autocreatedFunctionsOffsets: list[int]|None=None) -> tuple[list[int], list[bool]]:
+        raise AssertionError("The functions were searched again")
+    monkeypatch.setattr(mips.sections.SectionText, "_findFunctions", findFunctions)
+
+    _, warmFiles, warmPaths = syntheticRom.split()
+    fec.FrontendUtilities.analyzeProcessedFiles(warmFiles, warmPaths, sum(len(files) for files in warmFiles.values()), analysisCache=analysisCache)
+    assert analysisCache.hits == len(syntheticRom.sections) // 4
+
+    assert disassembleSections(warmFiles) == disassembleSections(coldFiles)
+
+def test_analysisCachePrune(tmp_path: Path) -> None:
+    cacheDir = tmp_path / "cache"
+    firstCache = mips.AnalysisCache(cacheDir)
+    for i in range(6):
+        firstCache.storeRendered(f"{i}", ["x" * 1000])
+    # Stored a while ago, in order
+    for i in range(6):
+        os.utime(cacheDir / "rendered" / f"{i}.marshal", (time.time() - 1000 + i, time.time() - 1000 + i))
+
+    fileSize = (cacheDir / "rendered" / "0.marshal").stat().st_size
+    analysisCache = mips.AnalysisCache(cacheDir, maxSize=3 * fileSize)
+    assert analysisCache.loadRendered("1") == ["x" * 1000]
+    analysisCache.storeRendered("6", ["y" * 1000])
+
+    # The least recently used files are removed first, the used ones are kept
+    assert analysisCache.prune() == 4
+    assert sorted(path.name for path in cacheDir.glob("rendered/*.marshal")) == ["1.marshal", "5.marshal", "6.marshal"]
+    assert analysisCache.loadRendered("0") is None
+
+    # The files used by this run are kept even if they do not fit
+    analysisCache.maxSize = 0
+    assert analysisCache.prune() == 1
+    assert sorted(path.name for path in cacheDir.glob("rendered/*.marshal")) == ["1.marshal", "6.marshal"]
+
+    analysisCache.maxSize = None
+    assert analysisCache.prune() == 0
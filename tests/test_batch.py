@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from .utils import SyntheticRom, readTree, runSpimdisasm
+
+
+# The jobs of a batch must not see the configuration the previous jobs used
+JOBS_OPTIONS = [
+    [],
+    ["--compiler", "GCC", "--asm-referencee-symbols", "--nuke-pointers"],
+    [],
+    ["--data-string-guesser", "9", "--name-vars-by-file"],
+]
+
+
+def _writeManifest(tmp_path: Path, jobs: list[dict[str, Any]]) -> Path:
+    manifestPath = tmp_path / "manifest.json"
+    manifestPath.write_text(json.dumps({"tool": "singleFileDisasm", "jobs": jobs}))
+    return manifestPath
+
+def _getJob(syntheticRom: SyntheticRom, outputDir: Path, options: list[str]) -> dict[str, Any]:
+    _, inputPath, outputPath, *commonOptions = syntheticRom.singleFileDisasmArgs(outputDir)
+    return {"input": inputPath, "output": outputPath, "options": commonOptions + options}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batchMatchesSeparateRuns(syntheticRom: SyntheticRom, tmp_path: Path, workers: int) -> None:
+    jobs = [_getJob(syntheticRom, tmp_path / "batch" / str(i), options) for i, options in enumerate(JOBS_OPTIONS)]
+    runSpimdisasm(["batch", str(_writeManifest(tmp_path, jobs)), "--jobs", str(workers)])
+
+    for i, options in enumerate(JOBS_OPTIONS):
+        runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "separate" / str(i)) + options)
+        assert readTree(tmp_path / "batch" / str(i)) == readTree(tmp_path / "separate" / str(i))
+
+@pytest.mark.parametrize("keepGoing", [True, False])
+def test_batchFailingJob(syntheticRom: SyntheticRom, tmp_path: Path, keepGoing: bool) -> None:
+    # The last `--file-splits` wins, so this job fails to read its splits
+    failingJob = _getJob(syntheticRom, tmp_path / "failing", ["--file-splits", str(tmp_path / "missing.csv")])
+    jobs = [failingJob, _getJob(syntheticRom, tmp_path / "ok", [])]
+
+    result = runSpimdisasm(["batch", str(_writeManifest(tmp_path, jobs)), "--keep-going" if keepGoing else "--no-keep-going"], check=False)
+
+    assert result.returncode == 1
+    assert "1 of 2 jobs failed" in result.stderr
+    assert (tmp_path / "ok").exists() == keepGoing
+
+def test_batchInvalidManifest(syntheticRom: SyntheticRom, tmp_path: Path) -> None:
+    jobs = [_getJob(syntheticRom, tmp_path / "ok", []), _getJob(syntheticRom, tmp_path / "invalid", ["--not-an-option"])]
+
+    result = runSpimdisasm(["batch", str(_writeManifest(tmp_path, jobs))], check=False)
+
+    assert result.returncode == 1
+    # The manifest is checked before running any job
+    assert not (tmp_path / "ok").exists()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import pytest
+
+from spimdisasm import common
+
+from .utils import SyntheticRom, readTree, runSpimdisasm
+
+
+@pytest.mark.parametrize("extraArgs", [
+    [],
+    ["--nuke-pointers"],
+    ["--data-string-guesser", "9", "--rodata-string-guesser", "9", "--pascal-data-string-guesser", "9", "--name-vars-by-file", "--sequential-label-names"],
+    ["--compiler", "GCC", "--asm-referencee-symbols"],
+])
+def test_contextBinaryRoundTrip(syntheticRom: SyntheticRom, tmp_path: Path, extraArgs: list[str]) -> None:
+    # Regression test: loading the saved context used to give a different
+    # output than the run which saved it
+    contextPath = tmp_path / "context.bin"
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "saved") + extraArgs + ["--save-context-binary", str(contextPath)])
+    # The symbols inputs are not read again when loading a context
+    missingPath = tmp_path / "missing_symbol_addrs.txt"
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "loaded", symbolAddrsPath=missingPath) + extraArgs + ["--load-context", str(contextPath), "--save-context-binary", str(tmp_path / "resaved.bin")])
+
+    assert readTree(tmp_path / "loaded") == readTree(tmp_path / "saved")
+    # The analysis of the loaded run leaves the context as the run which saved it
+    assert (tmp_path / "resaved.bin").read_bytes() == contextPath.read_bytes()
+
+def test_contextBinarySaveLoadedContext(syntheticRom: SyntheticRom, tmp_path: Path) -> None:
+    contextPath = tmp_path / "context.bin"
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "saved") + ["--save-context-binary", str(contextPath)])
+
+    context = common.Context()
+    context.loadContextFromBinaryFile(contextPath)
+    context.saveContextToBinaryFile(tmp_path / "resaved.bin")
+    context = common.Context()
+    context.loadContextFromBinaryFile(tmp_path / "resaved.bin")
+    context.saveContextToBinaryFile(tmp_path / "resavedTwice.bin")
+
+    # Only the reference counters and the pending pointers are reset when loading
+    assert (tmp_path / "resavedTwice.bin").read_bytes() == (tmp_path / "resaved.bin").read_bytes()
+    assert len((tmp_path / "resaved.bin").read_bytes()) <= len(contextPath.read_bytes())
+
+def test_contextBinaryLoadSkipsBuiltinSymbols(syntheticRom: SyntheticRom, tmp_path: Path) -> None:
+    contextPath = tmp_path / "context.bin"
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "saved") + ["--no-libultra-syms", "--save-context-binary", str(contextPath)])
+
+    parser = argparse.ArgumentParser()
+    common.Context.addParametersToArgParse(parser)
+    defaultContext = common.Context()
+    defaultContext.parseArgs(parser.parse_args([]))
+    loadedContext = common.Context()
+    loadedContext.parseArgs(parser.parse_args(["--load-context", str(contextPath)]))
+
+    # The libultra symbols are filled by default, but the saved context didn't have them
+    libultraVrams = list(common.SymbolsSegment.N64LibultraSyms)
+    assert all(vram in defaultContext.globalSegment.symbols for vram in libultraVrams)
+    assert not any(vram in loadedContext.globalSegment.symbols for vram in libultraVrams)
+    assert len(loadedContext.globalSegment.symbols) > 0
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import random
+import struct
+from typing import Any
+
+import pytest
+
+from spimdisasm import common
+from spimdisasm import mips
+
+
+VRAM = 0x80000000
+GLOBAL_SIZE = 0x100
+OVERLAY_SIZE = 0x100
+
+# The first two sections are inside the global segment, the last one goes from
+# the global segment into the overlay segment
+SECTIONS = [(0x40, 0x80), (0x80, 0xC0), (0xC0, 0x1A0)]
+SYMBOLS = [0x40, 0x58, 0xC0, 0x124]
+
+
+def _twoPassAnalyze(self: mips.sections.SectionData) -> None:
+    "`SectionData.analyze` before the pointers were resolved in a single pass"
+    self.checkAndCreateFirstSymbol()
+
+    symbolList: list[tuple[int, common.ContextSymbol]] = []
+    localOffset = 0
+    localOffsetsWithSymbols: set[int] = set()
+
+    needsFurtherAnalyzis = False
+
+    for w in self.words:
+        currentVram = self.getVramOffset(localOffset)
+        currentVrom = self.getVromOffset(localOffset)
+
+        contextSym = self.getSymbol(currentVram, vromAddress=currentVrom, tryPlusOffset=False)
+        if contextSym is not None:
+            symbolList.append((localOffset, contextSym))
+            localOffsetsWithSymbols.add(localOffset)
+            contextSym.isMaybeString = self._stringGuesser(contextSym, localOffset)
+            contextSym.isMaybePascalString = self._pascalStringGuesser(contextSym, localOffset)
+
+        elif self.popPointerInDataReference(currentVram) is not None:
+            contextSym = self.addSymbol(currentVram, sectionType=self.sectionType, isAutogenerated=True)
+            contextSym.isMaybeString = self._stringGuesser(contextSym, localOffset)
+            contextSym.isMaybePascalString = self._pascalStringGuesser(contextSym, localOffset)
+            symbolList.append((localOffset, contextSym))
+            localOffsetsWithSymbols.add(localOffset)
+
+        if self.checkWordIsASymbolReference(w):
+            if w < currentVram and self.containsVram(w):
+                needsFurtherAnalyzis = True
+
+        localOffset += 4
+
+    if needsFurtherAnalyzis:
+        localOffset = 0
+        for w in self.words:
+            currentVram = self.getVramOffset(localOffset)
+            currentVrom = self.getVromOffset(localOffset)
+
+            if self.popPointerInDataReference(currentVram) is not None and localOffset not in localOffsetsWithSymbols:
+                contextSym = self.getSymbol(currentVram, vromAddress=currentVrom, tryPlusOffset=True, checkUpperLimit=True)
+                if contextSym is None:
+                    contextSym = self.addSymbol(currentVram, sectionType=self.sectionType, isAutogenerated=True)
+                contextSym.sectionType = self.sectionType
+                contextSym.isMaybeString = self._stringGuesser(contextSym, localOffset)
+                contextSym.isMaybePascalString = self._pascalStringGuesser(contextSym, localOffset)
+                symbolList.append((localOffset, contextSym))
+                localOffsetsWithSymbols.add(localOffset)
+
+            localOffset += 4
+
+        symbolList.sort(key=lambda x: x[0])
+
+    self.processStaticRelocs()
+
+    for i, (offset, contextSym) in enumerate(symbolList):
+        if i + 1 == len(symbolList):
+            words = self.getWordsRange(offset//4)
+        else:
+            nextOffset = symbolList[i+1][0]
+            if offset == nextOffset:
+                continue
+            words = self.getWordsRange(offset//4, nextOffset//4)
+
+        vrom = self.getVromOffset(offset)
+        vromEnd = vrom + 4*len(words)
+        sym = mips.symbols.SymbolData(self.context, vrom, vromEnd, offset + self.inFileOffset, contextSym.vram, words, self.segmentVromStart, self.overlayCategory)
+        sym.parent = self
+        sym.setCommentOffset(self.commentOffset)
+        sym.stringEncoding = self.stringEncoding
+        sym.stringsCache = self.stringsCache
+        sym.stringsCacheOffset = offset
+        sym.analyze()
+        self.symbolList.append(sym)
+
+        self.symbolsVRams.add(contextSym.vram)
+
+
+def _analyzeSections(array_of_bytes: bytes, pendingPointers: list[int]) -> tuple[list[Any], list[Any]]:
+    context = common.Context()
+    context.changeGlobalSegmentRanges(0, GLOBAL_SIZE, VRAM, VRAM + GLOBAL_SIZE)
+    context.addOverlaySegment("ovl", GLOBAL_SIZE, GLOBAL_SIZE + OVERLAY_SIZE, VRAM + GLOBAL_SIZE, VRAM + GLOBAL_SIZE + OVERLAY_SIZE)
+    overlaySegment = context.overlaySegments["ovl"][GLOBAL_SIZE]
+    for offset in SYMBOLS:
+        (context.globalSegment if offset < GLOBAL_SIZE else overlaySegment).addSymbol(VRAM + offset)
+    # References found by the analysis of previous sections
+    for pointer in pendingPointers:
+        (context.globalSegment if pointer < VRAM + GLOBAL_SIZE else overlaySegment).addPointerInDataReference(pointer)
+
+    symbols = []
+    for vromStart, vromEnd in SECTIONS:
+        section = mips.sections.SectionData(context, vromStart, vromEnd, VRAM + vromStart, "section", array_of_bytes, GLOBAL_SIZE, "ovl")
+        section.analyze()
+        symbols.append([(sym.vram, sym.vromStart, sym.vromEnd, sym.contextSym.sectionType) for sym in section.symbolList])
+    pointers = [list(context.globalSegment.newPointersInData), list(overlaySegment.newPointersInData)]
+    return symbols, pointers
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_dataPointersMatchTwoPasses(monkeypatch: pytest.MonkeyPatch, seed: int) -> None:
+    rng = random.Random(seed)
+    size = GLOBAL_SIZE + OVERLAY_SIZE
+
+    def randomPointer() -> int:
+        # Aligned and unaligned references to either segment, so they may point forward or backward
+        return VRAM + rng.choice([rng.randrange(0, size, 4), rng.randrange(0, size, 4), rng.randrange(0, size)])
+
+    words = [rng.choice([0, rng.getrandbits(32), randomPointer(), randomPointer()]) for _ in range(size // 4)]
+    # The last word of a section referenced by the section itself
+    words[0x80 // 4] = VRAM + 0xBC
+    array_of_bytes = struct.pack(f">{len(words)}I", *words)
+    # The last word of a section referenced by a previous section
+    pendingPointers = [VRAM + 0x7C, VRAM + 0x19C] + [randomPointer() for _ in range(rng.randrange(0, 10))]
+
+    symbols, pointers = _analyzeSections(array_of_bytes, pendingPointers)
+
+    with monkeypatch.context() as m:
+        m.setattr(mips.sections.SectionData, "analyze", _twoPassAnalyze)
+        expectedSymbols, expectedPointers = _analyzeSections(array_of_bytes, pendingPointers)
+
+    # Symbols were created by the references, and some references were left for later sections
+    assert sum(len(sectionSymbols) for sectionSymbols in expectedSymbols) > len(SYMBOLS)
+    assert any(len(segmentPointers) > 0 for segmentPointers in expectedPointers)
+    assert symbols == expectedSymbols
+    assert pointers == expectedPointers
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+from pathlib import Path
+import random
+
+import pytest
+
+from spimdisasm import common
+from spimdisasm import mips
+
+from .utils import ROM_VRAM, SyntheticRom, runSpimdisasm
+
+
+VRAM_SHIFT = 0x100000
+
+
+@pytest.fixture(scope="module")
+def shiftedSyntheticRom(tmp_path_factory: pytest.TempPathFactory) -> SyntheticRom:
+    "The same rom as `syntheticRom`, but built for another vram, like another version of the same game"
+    return SyntheticRom(tmp_path_factory.mktemp("shiftedRom"), filesCount=6, seed=0, vram=ROM_VRAM + VRAM_SHIFT)
+
+
+def _getIndex(syntheticRom: SyntheticRom) -> mips.FingerprintIndex:
+    _, processedFiles = syntheticRom.analyze()
+    index = mips.FingerprintIndex()
+    index.addFunctionsFromSections(processedFiles[common.FileSectionType.Text])
+    return index
+
+def _getNaiveUniqueMatches(indexed: mips.FingerprintIndex, other: mips.FingerprintIndex) -> list[tuple[mips.FunctionFingerprint, mips.FunctionFingerprint]]:
+    "Pairs the functions whose shape and size are unique on both builds, comparing every pair of functions"
+    pairs: list[tuple[mips.FunctionFingerprint, mips.FunctionFingerprint]] = []
+    for func in other.functions:
+        sameKeyOther = [otherFunc for otherFunc in other.functions if otherFunc.getKey() == func.getKey()]
+        sameKeyIndexed = [indexedFunc for indexedFunc in indexed.functions if indexedFunc.getKey() == func.getKey()]
+        if len(sameKeyOther) == 1 and len(sameKeyIndexed) == 1:
+            pairs.append((func, sameKeyIndexed[0]))
+    return pairs
+
+def _getRandomIndices(seed: int, modifiedRatio: float, removedRatio: float) -> tuple[mips.FingerprintIndex, mips.FingerprintIndex]:
+    """Returns the index of a random build and the index of another version of
+    it, where some functions were modified (their shape changes) and some were
+    removed. Both versions of each function share the same name."""
+    rng = random.Random(seed)
+    functionsCount = 300
+    # Plenty of functions share the same shape and size
+    shapes = [(f"{rng.getrandbits(64):016X}", rng.choice([0x40, 0x80, 0x100])) for _ in range(40)]
+    vrams = [ROM_VRAM + i * 0x100 for i in range(functionsCount)]
+
+    indexed = mips.FingerprintIndex()
+    other = mips.FingerprintIndex()
+    for i, vram in enumerate(vrams):
+        shapeHash, size = rng.choice(shapes) if rng.random() < 0.7 else (f"{rng.getrandbits(64):016X}", 0x100)
+        calls = [rng.choice(vrams) for _ in range(rng.randrange(0, 4))]
+        indexed.functions.append(mips.FunctionFingerprint(vram, i * 0x100, f"func_{i}", True, "indexed", size, shapeHash, calls))
+
+        if rng.random() < removedRatio:
+            continue
+        if rng.random() < modifiedRatio:
+            shapeHash = f"{rng.getrandbits(64):016X}"
+        otherCalls = [calledVram + VRAM_SHIFT for calledVram in calls]
+        other.functions.append(mips.FunctionFingerprint(vram + VRAM_SHIFT, i * 0x100, f"func_{i}", False, "other", size, shapeHash, otherCalls))
+    return indexed, other
+
+
+def test_fingerprintIndexSelfMatch(syntheticRom: SyntheticRom) -> None:
+    index = _getIndex(syntheticRom)
+    assert len(index.functions) == len(syntheticRom.functions)
+
+    matches = index.match(_getIndex(syntheticRom))
+
+    assert [(funcMatch.function.vram, funcMatch.counterpart.vram) for funcMatch in matches] == [(vram, vram) for vram in syntheticRom.functions]
+    assert all(funcMatch.hasSameShape for funcMatch in matches)
+
+def test_fingerprintIndexMatchShiftedBuild(syntheticRom: SyntheticRom, shiftedSyntheticRom: SyntheticRom) -> None:
+    indexed = _getIndex(syntheticRom)
+    other = _getIndex(shiftedSyntheticRom)
+
+    matches = indexed.match(other)
+
+    # Most functions share the same shape, so they can only be told apart by their calls and their neighbours
+    assert [(funcMatch.function.vram, funcMatch.counterpart.vram) for funcMatch in matches] == [(vram + VRAM_SHIFT, vram) for vram in syntheticRom.functions]
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("modifiedRatio, removedRatio", [(0.0, 0.0), (0.1, 0.0), (0.1, 0.05)])
+def test_fingerprintIndexMatchAgainstPairwise(seed: int, modifiedRatio: float, removedRatio: float) -> None:
+    indexed, other = _getRandomIndices(seed, modifiedRatio, removedRatio)
+
+    matches = indexed.match(other)
+
+    assert len({id(funcMatch.function) for funcMatch in matches}) == len(matches)
+    assert len({id(funcMatch.counterpart) for funcMatch in matches}) == len(matches)
+
+    uniqueMatches = {(id(funcMatch.function), id(funcMatch.counterpart)) for funcMatch in matches if funcMatch.method == "unique"}
+    for func, counterpart in _getNaiveUniqueMatches(indexed, other):
+        assert (id(func), id(counterpart)) in uniqueMatches
+    for funcMatch in matches:
+        if funcMatch.method == "unique":
+            assert funcMatch.function.name == funcMatch.counterpart.name
+        if funcMatch.method != "calls":
+            assert funcMatch.hasSameShape
+
+    if removedRatio == 0.0:
+        # Without removed functions every function keeps its neighbours, so every match must be right
+        assert len(matches) >= len(other.functions) * (1 - modifiedRatio)
+        assert all(funcMatch.function.name == funcMatch.counterpart.name for funcMatch in matches)
+
+def test_fingerprintIndexSaveLoad(syntheticRom: SyntheticRom, shiftedSyntheticRom: SyntheticRom, tmp_path: Path) -> None:
+    indexed = _getIndex(syntheticRom)
+    other = _getIndex(shiftedSyntheticRom)
+    indexed.save(tmp_path / "indexed.json")
+    other.save(tmp_path / "other.json")
+
+    loadedIndexed = mips.FingerprintIndex.load(tmp_path / "indexed.json")
+    loadedOther = mips.FingerprintIndex.load(tmp_path / "other.json")
+
+    assert [func.toJson() for func in loadedIndexed.functions] == [func.toJson() for func in indexed.functions]
+    expectedMatches = [(funcMatch.function.toJson(), funcMatch.counterpart.toJson(), funcMatch.method) for funcMatch in indexed.match(other)]
+    assert [(funcMatch.function.toJson(), funcMatch.counterpart.toJson(), funcMatch.method) for funcMatch in loadedIndexed.match(loadedOther)] == expectedMatches
+
+def test_fingerprintIndexLoadInvalid(tmp_path: Path) -> None:
+    path = tmp_path / "invalid.json"
+    path.write_text('{"version": 0, "functions": []}')
+
+    with pytest.raises(RuntimeError):
+        mips.FingerprintIndex.load(path)
+
+def test_matchCommand(syntheticRom: SyntheticRom, shiftedSyntheticRom: SyntheticRom, tmp_path: Path) -> None:
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "indexed") + ["--fingerprint-index", str(tmp_path / "indexed.json")])
+    runSpimdisasm(shiftedSyntheticRom.singleFileDisasmArgs(tmp_path / "other") + ["--fingerprint-index", str(tmp_path / "other.json")])
+
+    runSpimdisasm(["match", str(tmp_path / "indexed.json"), str(tmp_path / "other.json"), "-o", str(tmp_path / "matches.csv"), "--symbol-addrs", str(tmp_path / "symbol_addrs.txt")])
+
+    assert len((tmp_path / "matches.csv").read_text().splitlines()) == len(syntheticRom.functions) + 1
+    symbolAddrs = (tmp_path / "symbol_addrs.txt").read_text()
+    assert symbolAddrs.startswith(f"main = 0x{shiftedSyntheticRom.functions[0]:08X}; // type:func rom:0x0 ")
+
+def test_matchCommandInvalidIndex(tmp_path: Path) -> None:
+    invalidPath = tmp_path / "invalid.json"
+    invalidPath.write_text('{"version": 0, "functions": []}')
+    notJsonPath = tmp_path / "notJson.json"
+    notJsonPath.write_text("not json")
+    missingPath = tmp_path / "missing.json"
+
+    # The errors are reported without a traceback
+    for indexed, new in [(missingPath, invalidPath), (invalidPath, missingPath), (notJsonPath, invalidPath)]:
+        result = runSpimdisasm(["match", str(indexed), str(new)], check=False)
+        assert result.returncode == 1
+        assert result.stderr.startswith("Error: "), result.stderr
+        assert "Traceback" not in result.stderr
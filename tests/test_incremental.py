@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from spimdisasm import common
+
+from .utils import SyntheticRom, readTree, runSpimdisasm
+
+
+STALE_MARKER = b"# stale\n"
+
+def _markAsStale(directory: Path) -> None:
+    """Appends a marker to every written section, which stays there unless the
+    section is written again."""
+    for path in directory.rglob("*.s"):
+        path.write_bytes(path.read_bytes() + STALE_MARKER)
+
+def _runIncrementalAndFresh(syntheticRom: SyntheticRom, tmp_path: Path, symbolAddrsPath: Path, extraArgs: list[str]) -> set[str]:
+    """Runs an incremental build on top of the previous one and a fresh one,
+    checks both have the same output and returns the sections the incremental
+    build wrote again."""
+    incrementalArgs = ["--incremental", str(tmp_path / "state.json")]
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "incremental", symbolAddrsPath) + extraArgs + incrementalArgs)
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "fresh", symbolAddrsPath) + extraArgs)
+
+    incrementalOutput = readTree(tmp_path / "incremental" / "asm")
+    freshOutput = readTree(tmp_path / "fresh" / "asm")
+    rewritten = {name for name, contents in incrementalOutput.items() if not contents.endswith(STALE_MARKER)}
+    incrementalOutput = {name: contents[:-len(STALE_MARKER)] if name not in rewritten else contents for name, contents in incrementalOutput.items()}
+    assert incrementalOutput == freshOutput
+    return rewritten
+
+def _getFileOfVram(syntheticRom: SyntheticRom, vram: int) -> str:
+    for _, name, vromStart, vromEnd, sectionVram in syntheticRom.sections:
+        if sectionVram <= vram < sectionVram + vromEnd - vromStart:
+            return name
+    assert False, f"0x{vram:08X} is not part of the rom"
+
+
+def test_incrementalUnchangedRerunKeepsFiles(syntheticRom: SyntheticRom, tmp_path: Path) -> None:
+    args = syntheticRom.singleFileDisasmArgs(tmp_path / "incremental") + ["--incremental", str(tmp_path / "state.json")]
+    runSpimdisasm(args)
+    assert (tmp_path / "state.json").exists()
+    _markAsStale(tmp_path / "incremental" / "asm")
+
+    assert _runIncrementalAndFresh(syntheticRom, tmp_path, syntheticRom.symbolAddrsPath, []) == set()
+
+def test_incrementalCorruptedStateWritesEverything(syntheticRom: SyntheticRom, tmp_path: Path) -> None:
+    args = syntheticRom.singleFileDisasmArgs(tmp_path / "incremental") + ["--incremental", str(tmp_path / "state.json")]
+    runSpimdisasm(args)
+    _markAsStale(tmp_path / "incremental" / "asm")
+    (tmp_path / "state.json").write_text("{")
+
+    rewritten = _runIncrementalAndFresh(syntheticRom, tmp_path, syntheticRom.symbolAddrsPath, [])
+    assert rewritten == {path.name for path in (tmp_path / "incremental" / "asm").rglob("*.s")}
+
+def test_incrementalRenamedSymbolMatchesFreshRun(syntheticRom: SyntheticRom, tmp_path: Path) -> None:
+    args = syntheticRom.singleFileDisasmArgs(tmp_path / "incremental") + ["--incremental", str(tmp_path / "state.json")]
+    runSpimdisasm(args)
+    _markAsStale(tmp_path / "incremental" / "asm")
+
+    # Rename the short referenced by every function of the first file
+    dataSection = next(section for section in syntheticRom.sections if section[0] == common.FileSectionType.Data)
+    symbolAddrsPath = tmp_path / "symbol_addrs.txt"
+    symbolAddrsPath.write_text(syntheticRom.symbolAddrsPath.read_text().replace("gSomeShort", "gRenamedShort"))
+
+    rewritten = _runIncrementalAndFresh(syntheticRom, tmp_path, symbolAddrsPath, [])
+    assert f"{dataSection[1]}.data.s" in rewritten
+    assert f"{dataSection[1]}.text.s" in rewritten
+    assert 0 < len(rewritten) < len(list((tmp_path / "incremental" / "asm").rglob("*.s")))
+
+def test_incrementalRenamedReferencingFunction(syntheticRom: SyntheticRom, tmp_path: Path) -> None:
+    # Regression test: with `--asm-referencee-symbols` the output of a
+    # section lists the names of the functions referencing its symbols, so
+    # renaming a function must write again the sections it references
+    extraArgs = ["--asm-referencee-symbols"]
+    args = syntheticRom.singleFileDisasmArgs(tmp_path / "incremental") + extraArgs + ["--incremental", str(tmp_path / "state.json")]
+    runSpimdisasm(args)
+    asmDir = tmp_path / "incremental" / "asm"
+    _markAsStale(asmDir)
+
+    referencingFunction: tuple[str, str]|None = None
+    for path in sorted(asmDir.glob("*.s")):
+        for line in path.read_text().splitlines():
+            if "Functions referencing this symbol:" not in line:
+                continue
+            for name in line.split(":")[1].replace("*/", "").split():
+                if name.startswith("func_") and _getFileOfVram(syntheticRom, int(name[5:], 16)) != path.name.split(".")[0]:
+                    referencingFunction = (name, path.name)
+                    break
+            if referencingFunction is not None:
+                break
+        if referencingFunction is not None:
+            break
+    assert referencingFunction is not None
+    funcName, referencedFile = referencingFunction
+
+    symbolAddrsPath = tmp_path / "symbol_addrs.txt"
+    symbolAddrsPath.write_text(syntheticRom.symbolAddrsPath.read_text() + f"renamed_func = 0x{funcName[5:]}; // type:func\n")
+
+    rewritten = _runIncrementalAndFresh(syntheticRom, tmp_path, symbolAddrsPath, extraArgs)
+    assert referencedFile in rewritten
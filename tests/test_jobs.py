@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import io
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from spimdisasm import common
+from spimdisasm import frontendCommon as fec
+
+from .utils import DATA_SYM_SIZE, RODATA_SYM_SIZE, SyntheticRom, disassembleSections, readTree, runSpimdisasm
+
+
+pytestmark = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="worker processes are only used on platforms supporting fork")
+
+
+@pytest.fixture(scope="module")
+def failingStringsRom(tmp_path_factory: pytest.TempPathFactory) -> SyntheticRom:
+    """The same rom as `syntheticRom`, but a few of its symbols are declared
+    as strings and fail to decode, which changes the context while the files
+    are being written"""
+    syntheticRom = SyntheticRom(tmp_path_factory.mktemp("failingStringsRom"), filesCount=6, seed=0)
+    with syntheticRom.symbolAddrsPath.open("a") as f:
+        for sectionType, name, _, _, vram in syntheticRom.sections:
+            if sectionType == common.FileSectionType.Data:
+                # Pointers and small words
+                f.write(f"{name}_notAString = 0x{vram + DATA_SYM_SIZE:08X}; // type:asciz\n")
+                f.write(f"{name}_notAPascalString = 0x{vram + 3 * DATA_SYM_SIZE:08X}; // type:String\n")
+            elif sectionType == common.FileSectionType.Rodata:
+                # A float
+                f.write(f"{name}_notARodataString = 0x{vram + RODATA_SYM_SIZE:08X}; // type:asciz\n")
+    return syntheticRom
+
+
+def test_analyzeProcessedFilesJobsMatchesSerial(syntheticRom: SyntheticRom, tmp_path: Path) -> None:
+    serialContext, serialFiles, serialPaths = syntheticRom.split()
+    fec.FrontendUtilities.analyzeProcessedFiles(serialFiles, serialPaths, sum(len(files) for files in serialFiles.values()), jobs=1)
+    serialContext.saveContextToFile(tmp_path / "serial.csv")
+
+    context, processedFiles, processedFilesOutputPaths = syntheticRom.split()
+    fec.FrontendUtilities.analyzeProcessedFiles(processedFiles, processedFilesOutputPaths, sum(len(files) for files in processedFiles.values()), jobs=4)
+    context.saveContextToFile(tmp_path / "jobs.csv")
+
+    assert disassembleSections(processedFiles) == disassembleSections(serialFiles)
+    assert (tmp_path / "jobs.csv").read_bytes() == (tmp_path / "serial.csv").read_bytes()
+
+def test_disassemblyContextChangesMatchRendering(failingStringsRom: SyntheticRom, tmp_path: Path) -> None:
+    renderedContext, renderedFiles = failingStringsRom.analyze()
+    predictedContext, predictedFiles = failingStringsRom.analyze()
+
+    failedDecodings = 0
+    for sectionType, filesInSection in sorted(renderedFiles.items()):
+        for renderedFile, predictedFile in zip(filesInSection, predictedFiles[sectionType]):
+            renderedFile.disassembleToFile(io.StringIO())
+            changes = predictedFile.getDisassemblyContextChanges()
+            for contextSym, attribute, value in changes:
+                setattr(contextSym, attribute, value)
+            failedDecodings += sum(1 for _, attribute, _ in changes if attribute in {"failedStringDecoding", "failedPascalStringDecoding"})
+
+            # Predicting the changes leaves the context as rendering the file does
+            renderedContext.saveContextToFile(tmp_path / "rendered.csv")
+            predictedContext.saveContextToFile(tmp_path / "predicted.csv")
+            assert (tmp_path / "predicted.csv").read_bytes() == (tmp_path / "rendered.csv").read_bytes(), predictedFile.getName()
+
+    assert failedDecodings > 0
+
+@pytest.mark.parametrize("useFailingStrings", [False, True])
+def test_jobsMatchesSerialRun(syntheticRom: SyntheticRom, failingStringsRom: SyntheticRom, tmp_path: Path, useFailingStrings: bool) -> None:
+    if useFailingStrings:
+        syntheticRom = failingStringsRom
+    # Analysis, writing the sections and migrating the functions are all done by worker processes
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "serial") + ["-j", "1"])
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "jobs") + ["-j", "4"])
+
+    serialOutput = readTree(tmp_path / "serial")
+    # The context csv is part of the output
+    assert "context.csv" in serialOutput
+    assert readTree(tmp_path / "jobs") == serialOutput
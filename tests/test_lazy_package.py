@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import ast
+import importlib
+import subprocess
+import sys
+import types
+
+import pytest
+
+import spimdisasm
+from spimdisasm.LazyPackage import LazyPackage
+
+from .utils import REPO_ROOT
+
+
+LAZY_PACKAGES = ["spimdisasm", "spimdisasm.common", "spimdisasm.mips", "spimdisasm.frontendCommon"]
+
+
+def _getTypeCheckingImports(packageName: str) -> dict[str, tuple[str, str|None]]:
+    """Returns the imports the `TYPE_CHECKING` block of the package does, with
+    the same format as `_lazyAttributes`."""
+    initPath = REPO_ROOT.joinpath(*packageName.split("."), "__init__.py")
+    tree = ast.parse(initPath.read_text())
+
+    imports: dict[str, tuple[str, str|None]] = dict()
+    for node in tree.body:
+        if not isinstance(node, ast.If) or not isinstance(node.test, ast.Name) or node.test.id != "TYPE_CHECKING":
+            continue
+        for importNode in node.body:
+            assert isinstance(importNode, ast.ImportFrom)
+            for alias in importNode.names:
+                assert alias.asname == alias.name, "explicit re-exports use `import X as X`"
+                if importNode.module is None:
+                    imports[alias.name] = ("." * importNode.level + alias.name, None)
+                else:
+                    imports[alias.name] = ("." * importNode.level + importNode.module, alias.name)
+    return imports
+
+def _runPython(code: str) -> str:
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+@pytest.mark.parametrize("packageName", LAZY_PACKAGES)
+def test_lazyAttributesMatchEagerImports(packageName: str) -> None:
+    package = importlib.import_module(packageName)
+    assert isinstance(package, LazyPackage)
+
+    # What type checkers see is what the package provides at runtime
+    assert package._lazyAttributes == _getTypeCheckingImports(packageName)
+
+    for name, (moduleName, attribute) in package._lazyAttributes.items():
+        module = importlib.import_module(moduleName, packageName)
+        expected = module if attribute is None else getattr(module, attribute)
+        assert getattr(package, name) is expected, name
+
+@pytest.mark.parametrize("packageName", LAZY_PACKAGES)
+def test_lazyPackageDir(packageName: str) -> None:
+    package = importlib.import_module(packageName)
+    assert isinstance(package, LazyPackage)
+
+    assert set(package._lazyAttributes) <= set(dir(package))
+    assert not hasattr(package, "notAnAttribute")
+    with pytest.raises(AttributeError):
+        getattr(package, "notAnAttribute")
+
+def test_lazyPackageAttributeNotShadowedBySubmodule() -> None:
+    # The `GlobalConfig` module is imported by the time the object is used
+    importlib.import_module("spimdisasm.common.GlobalConfig")
+    assert not isinstance(spimdisasm.common.GlobalConfig, types.ModuleType)
+    assert spimdisasm.common.GlobalConfig is sys.modules["spimdisasm.common.GlobalConfig"].GlobalConfig
+
+def test_lazyPackageImportsOnAccess() -> None:
+    output = _runPython("\n".join([
+        "import sys",
+        "import spimdisasm",
+        "print(sorted(name for name in sys.modules if name.startswith('spimdisasm')))",
+        "spimdisasm.mips.sections.SectionText",
+        "print('spimdisasm.singleFileDisasm' in sys.modules, 'spimdisasm.elf32' in sys.modules)",
+    ]))
+
+    importedByPackage, frontendImported = output.splitlines()
+    assert importedByPackage == str(["spimdisasm", "spimdisasm.LazyPackage"])
+    assert frontendImported == "False False"
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from spimdisasm import common
+from spimdisasm.common.SortedDict import SortedDict
+
+
+OVERLAYS_VRAM = 0x80800000
+SEGMENT_SIZE = 0x400
+
+
+def _linearGetSymbol(element: common.ElementBase, vramAddress: int, tryPlusOffset: bool, checkUpperLimit: bool) -> common.ContextSymbol|None:
+    "The walk over every overlay segment `ElementBase.getSymbol` did before the index"
+    context = element.context
+    contextSym = context.globalSegment.getSymbol(vramAddress, tryPlusOffset=tryPlusOffset, checkUpperLimit=checkUpperLimit)
+    if contextSym is not None:
+        return contextSym
+
+    overlaySegment = context.overlaySegments.get(element.overlayCategory or "", {}).get(element.segmentVromStart)
+    if overlaySegment is not None:
+        contextSym = overlaySegment.getSymbol(vramAddress, tryPlusOffset=tryPlusOffset, checkUpperLimit=checkUpperLimit)
+        if contextSym is not None:
+            return contextSym
+
+    for overlayCategory, segmentsPerVrom in context.overlaySegments.items():
+        if element.overlayCategory != overlayCategory:
+            for overlaySegment in segmentsPerVrom.values():
+                if not overlaySegment.isVramInRange(vramAddress):
+                    continue
+                contextSym = overlaySegment.getSymbol(vramAddress, tryPlusOffset=tryPlusOffset, checkUpperLimit=checkUpperLimit)
+                if contextSym is not None:
+                    return contextSym
+    return None
+
+def _linearGetSegmentForVrom(element: common.ElementBase, vrom: int) -> common.SymbolsSegment:
+    context = element.context
+    if context.globalSegment.isVromInRange(vrom):
+        return context.globalSegment
+    overlaySegment = context.overlaySegments.get(element.overlayCategory or "", {}).get(element.segmentVromStart)
+    if overlaySegment is not None and overlaySegment.isVromInRange(vrom):
+        return overlaySegment
+    for overlayCategory, segmentsPerVrom in context.overlaySegments.items():
+        if element.overlayCategory != overlayCategory:
+            for segmentVrom, overlaySegment in segmentsPerVrom.items():
+                if vrom >= segmentVrom and overlaySegment.isVromInRange(vrom):
+                    return overlaySegment
+    return context.unknownSegment
+
+
+def _randomContext(rng: random.Random) -> tuple[common.Context, list[common.ElementBase]]:
+    context = common.Context()
+    context.changeGlobalSegmentRanges(0, 0x1000, 0x80000000, 0x80001000)
+    context.globalSegment.addSymbol(0x80000400)
+
+    vrom = 0x1000
+    elements: list[common.ElementBase] = []
+    for category in range(rng.randrange(1, 6)):
+        for _ in range(rng.randrange(1, 6)):
+            # Most overlays share the same vram range, and some don't start at the usual address
+            vram = OVERLAYS_VRAM + rng.choice([0, 0, 0, SEGMENT_SIZE // 2, SEGMENT_SIZE])
+            context.addOverlaySegment(f"ovl{category}", vrom, vrom + SEGMENT_SIZE, vram, vram + SEGMENT_SIZE)
+            elements.append(common.ElementBase(context, vrom, vrom + 0x10, 0, vram, "", [], common.FileSectionType.Text, vrom, f"ovl{category}"))
+            vrom += SEGMENT_SIZE
+    return context, elements
+
+def _addRandomSymbols(rng: random.Random, context: common.Context, count: int) -> None:
+    segments = [segment for segmentsPerVrom in context.overlaySegments.values() for segment in segmentsPerVrom.values()]
+    for _ in range(count):
+        segment = rng.choice(segments)
+        # Symbols with big sizes, and symbols outside of the vram range of their segments
+        contextSym = segment.addSymbol(rng.randrange(OVERLAYS_VRAM - 0x10, OVERLAYS_VRAM + 2 * SEGMENT_SIZE + 0x10, 4))
+        if rng.random() < 0.2:
+            contextSym.userDeclaredSize = rng.randrange(0x4, 0x100, 4)
+
+def _checkLookups(rng: random.Random, context: common.Context, elements: list[common.ElementBase]) -> None:
+    addresses = [rng.randrange(OVERLAYS_VRAM - 0x20, OVERLAYS_VRAM + 2 * SEGMENT_SIZE + 0x20) for _ in range(200)]
+    addresses += [vram for segmentsPerVrom in context.overlaySegments.values() for segment in segmentsPerVrom.values() for vram in segment.symbols]
+    for element in elements:
+        for address in addresses:
+            for tryPlusOffset in (True, False):
+                for checkUpperLimit in (True, False):
+                    expected = _linearGetSymbol(element, address, tryPlusOffset, checkUpperLimit)
+                    assert element.getSymbol(address, tryPlusOffset=tryPlusOffset, checkUpperLimit=checkUpperLimit) is expected, hex(address)
+
+        for vrom in range(0xF00, 0x1000 + SEGMENT_SIZE * (len(elements) + 1), 0x80):
+            assert element.getSegmentForVrom(vrom) is _linearGetSegmentForVrom(element, vrom), hex(vrom)
+
+
+@pytest.mark.parametrize("produceSymbolsPlusOffset", [True, False])
+@pytest.mark.parametrize("seed", range(5))
+def test_overlaySymbolLookupsMatchLinearWalk(monkeypatch: pytest.MonkeyPatch, seed: int, produceSymbolsPlusOffset: bool) -> None:
+    monkeypatch.setattr(common.GlobalConfig, "PRODUCE_SYMBOLS_PLUS_OFFSET", produceSymbolsPlusOffset)
+    rng = random.Random(seed)
+    context, elements = _randomContext(rng)
+
+    _addRandomSymbols(rng, context, 100)
+    _checkLookups(rng, context, elements)
+
+    # Symbols added and removed once the index is built
+    _addRandomSymbols(rng, context, 100)
+    for segmentsPerVrom in context.overlaySegments.values():
+        for segment in segmentsPerVrom.values():
+            for vram in list(segment.symbols)[::3]:
+                segment.removeSymbol(vram)
+    _checkLookups(rng, context, elements)
+
+    # Symbols replaced directly, the way loading a binary context does
+    for segmentsPerVrom in context.overlaySegments.values():
+        for segment in segmentsPerVrom.values():
+            newSymbols: SortedDict[common.ContextSymbol] = SortedDict()
+            for _ in range(rng.randrange(0, 10)):
+                vram = rng.randrange(segment.vramStart, segment.vramEnd, 4)
+                newSymbols[vram] = common.ContextSymbol(vram)
+            segment.symbols = newSymbols
+    context.invalidateOverlaySegmentsIndex()
+    _checkLookups(rng, context, elements)
+
+def test_getSegmentsWithSymbolAt() -> None:
+    context = common.Context()
+    first = context.addOverlaySegment("a", 0x1000, 0x2000, OVERLAYS_VRAM, OVERLAYS_VRAM + 0x1000)
+    second = context.addOverlaySegment("b", 0x2000, 0x3000, OVERLAYS_VRAM, OVERLAYS_VRAM + 0x1000)
+    third = context.addOverlaySegment("a", 0x3000, 0x4000, OVERLAYS_VRAM, OVERLAYS_VRAM + 0x1000)
+    index = context.getOverlaySegmentsIndex()
+
+    third.addSymbol(OVERLAYS_VRAM + 0x10)
+    first.addSymbol(OVERLAYS_VRAM + 0x10)
+    second.addSymbol(OVERLAYS_VRAM + 0x20)
+    # Segments are returned in the same order as `overlaySegments`, regardless of the order their symbols were added
+    assert [segment for _, _, segment in index.getSegmentsWithSymbolAt(OVERLAYS_VRAM + 0x10)] == [first, third]
+    assert [segment for _, _, segment in index.getSegmentsWithSymbolAt(OVERLAYS_VRAM + 0x20)] == [second]
+    assert index.getSegmentsWithSymbolAt(OVERLAYS_VRAM + 0x30) == []
+
+    first.removeSymbol(OVERLAYS_VRAM + 0x10)
+    assert [segment for _, _, segment in index.getSegmentsWithSymbolAt(OVERLAYS_VRAM + 0x10)] == [third]
+    # The rebuilt index sees the same symbols
+    context.invalidateOverlaySegmentsIndex()
+    assert [segment for _, _, segment in context.getOverlaySegmentsIndex().getSegmentsWithSymbolAt(OVERLAYS_VRAM + 0x10)] == [third]
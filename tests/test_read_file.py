@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import mmap
+import os
+from pathlib import Path
+import subprocess
+import threading
+
+import pytest
+
+from spimdisasm import common
+
+from .utils import REPO_ROOT, SyntheticRom, _getSpimdisasmCommand, readTree, runSpimdisasm
+
+
+def test_readFileAsMemoryviewMapsRegularFiles(tmp_path: Path) -> None:
+    contents = bytes(range(256)) * 16
+    (tmp_path / "input.bin").write_bytes(contents)
+    (tmp_path / "empty.bin").write_bytes(b"")
+
+    with common.Utils.mapFileAsMemoryview(tmp_path / "input.bin") as view:
+        assert isinstance(view.obj, mmap.mmap)
+        assert view.tobytes() == contents
+    assert common.Utils.readFileAsMemoryview(tmp_path / "empty.bin").tobytes() == b""
+    assert common.Utils.readFileAsMemoryview(tmp_path / "missing.bin").tobytes() == b""
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="fifos are not supported on this platform")
+def test_readFileAsMemoryviewReadsFifos(tmp_path: Path) -> None:
+    # Regression test: fifos report a size of 0, so they used to be read as
+    # an empty file
+    contents = bytes(range(256)) * 16
+    fifoPath = tmp_path / "input.fifo"
+    os.mkfifo(fifoPath)
+
+    writer = threading.Thread(target=fifoPath.write_bytes, args=(contents,))
+    writer.start()
+    try:
+        with common.Utils.mapFileAsMemoryview(fifoPath) as view:
+            assert not isinstance(view.obj, mmap.mmap)
+            assert view.tobytes() == contents
+    finally:
+        writer.join()
+
+@pytest.mark.skipif(not Path("/dev/stdin").exists(), reason="/dev/stdin is not available on this platform")
+def test_singleFileDisasmFromPipe(syntheticRom: SyntheticRom, tmp_path: Path) -> None:
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(tmp_path / "file"))
+
+    args = syntheticRom.singleFileDisasmArgs(tmp_path / "pipe")
+    args[1] = "/dev/stdin"
+    command, env = _getSpimdisasmCommand(args)
+    # Passing the input as bytes makes the standard input of the process a pipe
+    result = subprocess.run(command, cwd=REPO_ROOT, env=env, input=syntheticRom.romPath.read_bytes(), capture_output=True)
+    assert result.returncode == 0, result.stderr.decode()
+
+    assert readTree(tmp_path / "pipe") == readTree(tmp_path / "file")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from spimdisasm import common
+from spimdisasm import mips
+
+from .utils import SyntheticRom
+
+
+if TYPE_CHECKING:
+    AnalyzedSections = tuple[list[mips.symbols.SymbolFunction], list[mips.sections.SectionBase], list[mips.sections.SectionBase]]
+
+
+@pytest.fixture(scope="module")
+def analyzedSections(syntheticRom: SyntheticRom) -> AnalyzedSections:
+    "Every function, the text sections and the rodata sections of the analyzed rom"
+    _, processedFiles = syntheticRom.analyze()
+    functions: list[mips.symbols.SymbolFunction] = []
+    for textSection in processedFiles[common.FileSectionType.Text]:
+        for func in textSection.symbolList:
+            assert isinstance(func, mips.symbols.SymbolFunction)
+            functions.append(func)
+    return functions, processedFiles[common.FileSectionType.Text], processedFiles[common.FileSectionType.Rodata]
+
+
+def _getEntryKey(entry: mips.FunctionRodataEntry) -> tuple[int, list[int], list[int]]:
+    return id(entry.function), [id(sym) for sym in entry.rodataSyms], [id(sym) for sym in entry.lateRodataSyms]
+
+
+@pytest.mark.parametrize("sectionsOrder", ["forward", "reversed", "repeated"])
+def test_rodataOwnershipMapMatchesPossibleRodataSections(analyzedSections: AnalyzedSections, sectionsOrder: str) -> None:
+    functions, _, rodataSections = analyzedSections
+    if sectionsOrder == "reversed":
+        rodataSections = rodataSections[::-1]
+    elif sectionsOrder == "repeated":
+        # Only the first section with symbols to migrate must be used
+        rodataSections = rodataSections + rodataSections
+
+    ownershipMap = mips.RodataOwnershipMap(rodataSections)
+
+    rodataCount = 0
+    lateRodataCount = 0
+    for func in functions:
+        entry = ownershipMap.getEntryForFunc(func)
+        assert _getEntryKey(entry) == _getEntryKey(mips.FunctionRodataEntry.getEntryForFuncFromPossibleRodataSections(func, rodataSections))
+        rodataCount += len(entry.rodataSyms)
+        lateRodataCount += len(entry.lateRodataSyms)
+    assert rodataCount > 0
+    assert lateRodataCount > 0
+
+def test_rodataOwnershipMapMatchesSection(analyzedSections: AnalyzedSections) -> None:
+    functions, _, rodataSections = analyzedSections
+
+    for rodataSection in rodataSections:
+        assert isinstance(rodataSection, mips.sections.SectionRodata)
+        ownershipMap = mips.RodataOwnershipMap([rodataSection])
+        for func in functions:
+            assert _getEntryKey(ownershipMap.getEntryForFunc(func)) == _getEntryKey(mips.FunctionRodataEntry.getEntryForFuncFromSection(func, rodataSection))
+
+def test_rodataOwnershipMapLookups(analyzedSections: AnalyzedSections) -> None:
+    functions, _, rodataSections = analyzedSections
+    ownershipMap = mips.RodataOwnershipMap(rodataSections)
+
+    allSymbols = [(sectionIndex, symIndex, sym) for sectionIndex, rodataSection in enumerate(rodataSections) for symIndex, sym in enumerate(rodataSection.symbolList)]
+    for _, _, sym in allSymbols:
+        assert ownershipMap.getFirstSymbol(sym.vram) is next(other for _, _, other in allSymbols if other.vram == sym.vram)
+    assert ownershipMap.getFirstSymbol(0) is None
+
+    for func in functions:
+        expected = [(sectionIndex, symIndex, id(sym)) for sectionIndex, symIndex, sym in allSymbols if sym.vram in func.instrAnalyzer.referencedVrams]
+        assert [(sectionIndex, symIndex, id(sym)) for sectionIndex, symIndex, sym in ownershipMap.getReferencedSymbols(func)] == expected
+
+def test_getAllEntriesFromSections(analyzedSections: AnalyzedSections) -> None:
+    _, textSections, rodataSections = analyzedSections
+
+    for textSection, rodataSection in zip(textSections, rodataSections):
+        assert isinstance(textSection, mips.sections.SectionText)
+        assert isinstance(rodataSection, mips.sections.SectionRodata)
+        entries = mips.FunctionRodataEntry.getAllEntriesFromSections(textSection, rodataSection)
+
+        functionEntries = [entry for entry in entries if entry.function is not None]
+        assert [_getEntryKey(entry) for entry in functionEntries] == [_getEntryKey(mips.FunctionRodataEntry.getEntryForFuncFromSection(func, rodataSection)) for func in textSection.symbolList if isinstance(func, mips.symbols.SymbolFunction)]
+
+        # Every rodata symbol is written exactly once
+        writtenSymbols = [id(sym) for entry in entries for sym in entry.rodataSyms + entry.lateRodataSyms]
+        assert sorted(writtenSymbols) == sorted(id(sym) for sym in rodataSection.symbolList)
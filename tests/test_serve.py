@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+from pathlib import Path
+import socket
+import subprocess
+import time
+from typing import Any, Iterator
+
+import pytest
+
+from spimdisasm import serve
+from spimdisasm import __version__
+
+from .utils import SyntheticRom, readTree, runSpimdisasm, startSpimdisasm
+
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="the server needs Unix domain sockets")
+
+
+def _waitForSocket(process: subprocess.Popen[str], socketPath: Path) -> None:
+    deadline = time.monotonic() + 30
+    while not socketPath.exists():
+        assert process.poll() is None, process.communicate()[1]
+        assert time.monotonic() < deadline, "the server didn't start"
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def socketPath(tmp_path: Path) -> Iterator[Path]:
+    "Starts a server with no symbols and stops it once the test is done"
+    socketPath = tmp_path / "server.sock"
+    process = startSpimdisasm(["serve", str(socketPath), "-q"])
+    try:
+        _waitForSocket(process, socketPath)
+        yield socketPath
+        assert serve.sendRequest(socketPath, {"command": "shutdown"})["ok"]
+        process.wait(timeout=30)
+        assert process.returncode == 0
+        assert not socketPath.exists()
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.communicate()
+
+
+def _getDisassembleRequest(syntheticRom: SyntheticRom, symbolAddrs: list[str]|None) -> dict[str, Any]:
+    request: dict[str, Any] = {
+        "command": "disassemble",
+        "input": str(syntheticRom.romPath),
+        "vram": f"0x{syntheticRom.vram:X}",
+        "sections": [
+            {"type": sectionType.toStr(), "name": name, "vromStart": f"0x{vromStart:X}", "vromEnd": vromEnd, "vram": vram}
+            for sectionType, name, vromStart, vromEnd, vram in syntheticRom.sections
+        ],
+    }
+    if symbolAddrs is not None:
+        request["symbolAddrs"] = symbolAddrs
+    return request
+
+def _getOutputs(response: dict[str, Any]) -> dict[str, bytes]:
+    assert response["ok"], response
+    return {f"{section['name']}{section['type']}.s": section["output"].encode() for section in response["sections"]}
+
+def _getSingleFileDisasmOutputs(syntheticRom: SyntheticRom, outputDir: Path, symbolAddrsPath: Path) -> dict[str, bytes]:
+    runSpimdisasm(syntheticRom.singleFileDisasmArgs(outputDir, symbolAddrsPath))
+    return readTree(outputDir / "asm")
+
+
+def test_servePing(socketPath: Path) -> None:
+    assert serve.sendRequest(socketPath, {"command": "ping"})["version"] == __version__
+
+def test_serveUnknownCommand(socketPath: Path) -> None:
+    response = serve.sendRequest(socketPath, {"command": "not a command"})
+    assert not response["ok"]
+    # The server keeps running after a bad request
+    assert serve.sendRequest(socketPath, {"command": "ping"})["ok"]
+
+def test_serveDisassembleMatchesSingleFileDisasm(syntheticRom: SyntheticRom, socketPath: Path, tmp_path: Path) -> None:
+    symbolAddrs = syntheticRom.symbolAddrsPath.read_text().splitlines()
+    response = serve.sendRequest(socketPath, _getDisassembleRequest(syntheticRom, symbolAddrs))
+
+    assert _getOutputs(response) == _getSingleFileDisasmOutputs(syntheticRom, tmp_path / "withSymbols", syntheticRom.symbolAddrsPath)
+
+    # The symbols of a request must not leak into the next one
+    emptySymbolAddrs = tmp_path / "empty_symbol_addrs.txt"
+    emptySymbolAddrs.write_text("")
+    response = serve.sendRequest(socketPath, _getDisassembleRequest(syntheticRom, None))
+
+    assert _getOutputs(response) == _getSingleFileDisasmOutputs(syntheticRom, tmp_path / "withoutSymbols", emptySymbolAddrs)
+
+def test_serveInvalidRequest(syntheticRom: SyntheticRom, socketPath: Path) -> None:
+    request = _getDisassembleRequest(syntheticRom, None)
+    request["sections"][0]["vromEnd"] = syntheticRom.romPath.stat().st_size + 0x10
+    response = serve.sendRequest(socketPath, request)
+
+    assert not response["ok"]
+    assert "invalid vrom range" in response["error"]
+
+def test_serveRefusesToReplaceFiles(tmp_path: Path) -> None:
+    notASocket = tmp_path / "not_a_socket"
+    notASocket.write_text("contents")
+
+    result = runSpimdisasm(["serve", str(notASocket)], check=False)
+
+    assert result.returncode == 1
+    assert "is not a socket" in result.stderr
+    assert notASocket.read_text() == "contents"
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import bisect
+import random
+
+import pytest
+
+from spimdisasm import common
+
+
+class ReferenceSortedDict:
+    "The previous implementation of `SortedDict`, a dict and a single sorted list of keys"
+
+    def __init__(self) -> None:
+        self.map: dict[int, int] = dict()
+        self.sortedKeys: list[int] = list()
+
+    def add(self, key: int, value: int) -> None:
+        if key not in self.map:
+            bisect.insort(self.sortedKeys, key)
+        self.map[key] = value
+
+    def remove(self, key: int) -> None:
+        del self.map[key]
+        self.sortedKeys.remove(key)
+
+    def getKeyRight(self, key: int, inclusive: bool) -> tuple[int, int]|None:
+        keys = [other for other in self.sortedKeys if (other <= key if inclusive else other < key)]
+        if len(keys) == 0:
+            return None
+        return keys[-1], self.map[keys[-1]]
+
+    def getKeyLeft(self, key: int, inclusive: bool) -> tuple[int, int]|None:
+        keys = [other for other in self.sortedKeys if (other >= key if inclusive else other > key)]
+        if len(keys) == 0:
+            return None
+        return keys[0], self.map[keys[0]]
+
+    def getRange(self, startKey: int, endKey: int, startInclusive: bool, endInclusive: bool) -> list[tuple[int, int]]:
+        return [
+            (key, self.map[key]) for key in self.sortedKeys
+            if (key >= startKey if startInclusive else key > startKey) and (key <= endKey if endInclusive else key < endKey)
+        ]
+
+
+def _checkStructure(d: common.SortedDict[int], chunkSize: int) -> None:
+    "Checks the invariants of the chunks"
+    chunks = d._chunks
+    assert all(len(chunk) > 0 for chunk in chunks)
+    assert all(len(chunk) <= 2 * chunkSize for chunk in chunks)
+    assert d._maxes == [chunk[-1] for chunk in chunks]
+    keys = [key for chunk in chunks for key in chunk]
+    assert keys == sorted(d.map)
+
+def _checkQueries(rng: random.Random, d: common.SortedDict[int], reference: ReferenceSortedDict) -> None:
+    assert list(d) == reference.sortedKeys
+    assert list(d.items()) == [(key, reference.map[key]) for key in reference.sortedKeys]
+    assert d.sortedKeys == reference.sortedKeys
+    assert len(d) == len(reference.map)
+
+    # Present keys, absent keys and keys outside of the range of every key
+    probes = rng.sample(reference.sortedKeys, min(len(reference.sortedKeys), 20)) + [rng.randrange(-10, 1010) for _ in range(20)]
+    for key in probes:
+        assert (key in d) == (key in reference.map)
+        assert d.index(key) == (reference.sortedKeys.index(key) if key in reference.map else None)
+        for inclusive in (True, False):
+            assert d.getKeyRight(key, inclusive=inclusive) == reference.getKeyRight(key, inclusive), (key, inclusive)
+            assert d.getKeyLeft(key, inclusive=inclusive) == reference.getKeyLeft(key, inclusive), (key, inclusive)
+
+    for _ in range(20):
+        startKey = rng.randrange(-10, 1010)
+        endKey = startKey + rng.randrange(-5, 300)
+        for startInclusive in (True, False):
+            for endInclusive in (True, False):
+                assert list(d.getRange(startKey, endKey, startInclusive=startInclusive, endInclusive=endInclusive)) == reference.getRange(startKey, endKey, startInclusive, endInclusive)
+
+
+@pytest.mark.parametrize("chunkSize", [1, 2, 3, 8, common.SortedDict._CHUNK_SIZE])
+@pytest.mark.parametrize("seed", range(5))
+def test_sortedDictMatchesReference(chunkSize: int, seed: int) -> None:
+    rng = random.Random(seed)
+    d: common.SortedDict[int] = common.SortedDict()
+    # Small chunks force plenty of splits and merges
+    d._CHUNK_SIZE = chunkSize
+    reference = ReferenceSortedDict()
+
+    for step in range(60):
+        operation = rng.choice(["add", "add", "add", "remove", "getRangeAndPop", "setdefault"])
+        if operation == "add":
+            for _ in range(rng.randrange(1, 40)):
+                # Keys are added in order, in reverse order and randomly
+                key = rng.choice([rng.randrange(0, 1000), max(reference.sortedKeys, default=0) + 1, min(reference.sortedKeys, default=0) - 1])
+                value = rng.randrange(0, 100)
+                d[key] = value
+                reference.add(key, value)
+        elif operation == "remove":
+            for key in rng.sample(reference.sortedKeys, min(len(reference.sortedKeys), rng.randrange(1, 40))):
+                del d[key]
+                reference.remove(key)
+        elif operation == "getRangeAndPop":
+            startKey = rng.randrange(-10, 1010)
+            endKey = startKey + rng.randrange(0, 200)
+            startInclusive = rng.random() < 0.5
+            endInclusive = rng.random() < 0.5
+            expected = reference.getRange(startKey, endKey, startInclusive, endInclusive)
+            # Iterates in descending order
+            assert list(d.getRangeAndPop(startKey, endKey, startInclusive=startInclusive, endInclusive=endInclusive)) == expected[::-1]
+            for key, _ in expected:
+                reference.remove(key)
+        else:
+            key = rng.randrange(0, 1000)
+            assert d.setdefault(key, 7) == reference.map.get(key, 7)
+            if key not in reference.map:
+                reference.add(key, 7)
+
+        _checkStructure(d, chunkSize)
+        if step % 5 == 0:
+            _checkQueries(rng, d, reference)
+
+    # Empty it completely
+    for key in list(reference.sortedKeys):
+        d.remove(key)
+        reference.remove(key)
+        _checkStructure(d, chunkSize)
+    _checkQueries(rng, d, reference)
+    with pytest.raises(KeyError):
+        d.remove(0)
+
+def test_sortedDictFromMapping() -> None:
+    d = common.SortedDict({5: "a", 1: "b", 3: "c"})
+    assert list(d.items()) == [(1, "b"), (3, "c"), (5, "a")]
+    assert str(d) == "SortedDict({1: 'b', 3: 'c', 5: 'a'})"
+
+    keys = d.sortedKeys
+    keys.append(7)
+    # The compatibility property returns a copy
+    assert d.sortedKeys == [1, 3, 5]
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from spimdisasm import common
+
+from .utils import SyntheticRom, STRINGS
+
+
+ENCODINGS = ["ASCII", "EUC-JP", "SHIFT-JIS"]
+
+CRAFTED_BUFFERS = [
+    b"",
+    b"\0",
+    b"abc",
+    b"abc\0",
+    b"abc\0\0\0\0",
+    b"abc\0x\0\0\0",
+    b"abcd\0\0\0\0efg\0",
+    b"ab\ncd\0\0\0",
+    b"ab\x01cd\0\0\0",
+    b"ab\x7Fcd\0\0\0",
+    b"\x82\xa0\x82\xa2\0\0\0\0",
+    b"\x95\x5C\x81\x5C\0\0\0\0",
+    b"\x1B[0m\0\0\0\0",
+    b"\0\0\0\0abc\0" + b"\x01" * 4 + b"efgh\0\0\0\0",
+    b"".join(string + b"\0" * (4 - len(string) % 4) for string in STRINGS),
+]
+
+
+def _checkBuffer(buf: bytes, encoding: str) -> int:
+    "Checks every offset of the buffer and returns how many strings were decoded"
+    stringsCount = 0
+    candidates = common.Utils.StringCandidates(buf)
+    for offset in range(len(buf)):
+        length = candidates.getStringLength(offset)
+        _, decodedSize = common.Utils.decodeBytesToStrings(buf, offset, encoding)
+        if length < 0:
+            assert decodedSize < 0, offset
+        elif decodedSize >= 0:
+            assert length == decodedSize, offset
+            stringsCount += 1
+    return stringsCount
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+@pytest.mark.parametrize("buf", CRAFTED_BUFFERS)
+def test_stringCandidatesCrafted(buf: bytes, encoding: str) -> None:
+    _checkBuffer(buf, encoding)
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_stringCandidatesRandom(encoding: str) -> None:
+    rng = random.Random(0)
+    # Mostly printable characters, so there are plenty of strings
+    alphabet = list(b"abcdefghij %\\\n\t") + [0] * 8 + list(range(0x80, 0x100, 7)) + list(range(0x01, 0x20, 5))
+    stringsCount = 0
+    for _ in range(100):
+        buf = bytes(rng.choice(alphabet) for _ in range(rng.randrange(0, 0x80)))
+        stringsCount += _checkBuffer(buf, encoding)
+    assert stringsCount > 0
+
+def test_stringCandidatesSyntheticRom(syntheticRom: SyntheticRom) -> None:
+    assert _checkBuffer(syntheticRom.romPath.read_bytes(), "EUC-JP") > 0
+
+def test_stringCandidatesMemoryview() -> None:
+    buf = b"".join(CRAFTED_BUFFERS)
+    candidates = common.Utils.StringCandidates(buf)
+    viewCandidates = common.Utils.StringCandidates(memoryview(buf))
+    for offset in range(len(buf)):
+        assert viewCandidates.getStringLength(offset) == candidates.getStringLength(offset)
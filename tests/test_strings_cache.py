@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import copy
+from pathlib import Path
+
+from spimdisasm import common
+from spimdisasm import mips
+
+
+VRAM = 0x80000400
+
+SYMBOLS: list[tuple[int, str, int, bytes]] = [
+    # A string which keeps going past the end of its symbol
+    (0x00, "asciz", 0x4, b"abcdefg\0"),
+    # An empty string
+    (0x08, "asciz", 0x8, b"\0" * 8),
+    # A pascal string which keeps going past the end of its symbol
+    (0x10, "String", 0x4, b"hijklm  "),
+    (0x18, "asciz", 0x8, b"xyz\0\0\0\0\0"),
+]
+
+
+def _createSection() -> mips.sections.SectionData:
+    array_of_bytes = b"".join(contents for _, _, _, contents in SYMBOLS)
+    context = common.Context()
+    context.changeGlobalSegmentRanges(0, len(array_of_bytes), VRAM, VRAM + len(array_of_bytes))
+    for offset, symType, size, _ in SYMBOLS:
+        contextSym = context.globalSegment.addSymbol(VRAM + offset)
+        contextSym.userDeclaredType = symType
+        contextSym.userDeclaredSize = size
+
+    section = mips.sections.SectionData(context, 0, len(array_of_bytes), VRAM, "data", array_of_bytes, 0, None)
+    section.analyze()
+    return section
+
+def _getSymbol(section: mips.sections.SectionData, offset: int) -> mips.symbols.SymbolBase:
+    return next(sym for sym in section.symbolList if sym.vram == VRAM + offset)
+
+
+def test_stringsCacheMatchesSymbolWords() -> None:
+    section = _createSection()
+    encoding = section.stringEncoding
+
+    for sym in section.symbolList:
+        assert sym.stringsCache is section.stringsCache
+        buffer = common.Utils.wordsToBytes(sym.words)
+        for localOffset in range(0, len(buffer), 4):
+            # The strings are decoded from the symbol's own words even if the file decoded a longer string
+            assert sym._decodeStrings(localOffset) == common.Utils.decodeBytesToStrings(buffer, localOffset, encoding)
+            assert sym._decodePascalStrings(localOffset) == common.Utils.decodeBytesToPascalStrings(buffer, localOffset, encoding, terminator=0x20)
+
+    # The file sees the whole string, but the symbol can't hold it
+    assert section.stringsCache.decodeStrings(0x00, encoding)[1] >= 4
+    assert _getSymbol(section, 0x00)._decodeStrings(0)[1] < 0
+    assert section.stringsCache.decodePascalStrings(0x10, encoding, terminator=0x20)[1] >= 4
+    assert _getSymbol(section, 0x10)._decodePascalStrings(0)[1] < 0
+
+def test_stringsCacheRendersAsWithoutIt() -> None:
+    cachedSection = _createSection()
+    uncachedSection = _createSection()
+    for sym in uncachedSection.symbolList:
+        sym.stringsCache = None
+
+    assert cachedSection.disassemble() == uncachedSection.disassemble()
+
+def test_stringsCacheEmptyStringRenderedTwice() -> None:
+    section = _createSection()
+    sym = _getSymbol(section, 0x08)
+
+    first = sym.disassemble()
+    decoded = copy.deepcopy(section.stringsCache.decoded)
+    assert len(decoded) > 0
+    second = sym.disassemble()
+
+    assert '.asciz ""' in first
+    assert second == first
+    # Rendering an empty string doesn't modify the shared decoded strings
+    assert section.stringsCache.decoded == decoded
+
+def test_stringsCacheReleasedAfterWrite(tmp_path: Path) -> None:
+    section = _createSection()
+    # The first rendering marks the strings which failed to decode on the context
+    section.disassembleToString()
+    expected = section.disassembleToString()
+    section.getStringCandidates()
+    assert len(section.stringsCache.decoded) > 0
+
+    section.saveToFile(str(tmp_path / "data"))
+
+    assert section.stringsCache.decoded == dict()
+    assert section._stringCandidates is None
+    assert (tmp_path / "data.data.s").read_text() == expected
+    # The strings are decoded again if the file is rendered once more
+    assert section.disassembleToString() == expected
+    assert len(section.stringsCache.decoded) > 0
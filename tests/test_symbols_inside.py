@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import random
+import struct
+from typing import Any
+
+import pytest
+
+from spimdisasm import common
+from spimdisasm import mips
+
+
+VRAM = 0x80000000
+GLOBAL_SIZE = 0x100
+OVERLAY_SIZE = 0x100
+
+SECTION_START = 0xA0
+SECTION_END = 0x140
+
+# The symbol at 0xE0 goes from the global segment into the overlay segment
+ALIGNED_SYMBOLS = [0xA0, 0xB0, 0xC8, 0xE0, 0x120, 0x12C]
+# Symbols placed in the middle of the words of other symbols, on both segments,
+# including the last byte of a symbol
+MID_WORD_SYMBOLS = [0xA1, 0xA6, 0xB3, 0xCA, 0xCB, 0xDF, 0xE2, 0xF5, 0xFF, 0x101, 0x109, 0x10E, 0x11F, 0x122, 0x12B, 0x13B, 0x13F]
+
+
+def _perOffsetAnalyze(self: mips.symbols.SymbolBase) -> None:
+    "`SymbolBase.analyze` before the symbols inside were found with a range query"
+    self.contextSym.inFileOffset = self.inFileOffset
+    if self.parent is not None:
+        self.contextSym.parentFileName = self.parent.getName()
+
+    isWordSized = not self.contextSym.isByte() and not self.contextSym.isShort()
+
+    if self.sectionType != common.FileSectionType.Bss:
+        for i in range(0, self.sizew):
+            localOffset = 4*i
+            for j in range(0, 4):
+                if i == 0 and j == 0:
+                    continue
+
+                # Possible symbols in the middle of words
+                currentVram = self.getVramOffset(localOffset+j)
+                currentVrom = self.getVromOffset(localOffset+j)
+                contextSym = self.getSymbol(currentVram, vromAddress=currentVrom, tryPlusOffset=False)
+                if contextSym is not None:
+                    contextSym.vromAddress = self.getVromOffset(localOffset+j)
+                    contextSym.isDefined = True
+                    contextSym.sectionType = self.sectionType
+                    contextSym.setTypeIfUnset(self.contextSym.getTypeSpecial(), self.contextSym.isAutogenerated)
+                    contextSym.inFileOffset = self.inFileOffset + localOffset+j
+                    if self.parent is not None:
+                        contextSym.parentFileName = self.parent.getName()
+
+            if isWordSized:
+                word = self.words[i]
+                referencedSym = self.getSymbol(word, tryPlusOffset=False)
+                if referencedSym is not None:
+                    referencedSym.referenceSymbols.add(self.contextSym)
+
+
+def _getSegment(context: common.Context, offset: int) -> common.SymbolsSegment:
+    if offset < GLOBAL_SIZE:
+        return context.globalSegment
+    return context.overlaySegments["ovl"][GLOBAL_SIZE]
+
+def _analyzeSection(sectionType: common.FileSectionType, array_of_bytes: bytes) -> common.Context:
+    context = common.Context()
+    context.changeGlobalSegmentRanges(0, GLOBAL_SIZE, VRAM, VRAM + GLOBAL_SIZE)
+    context.addOverlaySegment("ovl", GLOBAL_SIZE, GLOBAL_SIZE + OVERLAY_SIZE, VRAM + GLOBAL_SIZE, VRAM + GLOBAL_SIZE + OVERLAY_SIZE)
+    for offset in ALIGNED_SYMBOLS + MID_WORD_SYMBOLS:
+        _getSegment(context, offset).addSymbol(VRAM + offset)
+
+    if sectionType == common.FileSectionType.Data:
+        section: mips.sections.SectionBase = mips.sections.SectionData(context, SECTION_START, SECTION_END, VRAM + SECTION_START, "section", array_of_bytes, GLOBAL_SIZE, "ovl")
+    else:
+        section = mips.sections.SectionRodata(context, SECTION_START, SECTION_END, VRAM + SECTION_START, "section", array_of_bytes, GLOBAL_SIZE, "ovl")
+    section.analyze()
+
+    # Make sure the symbols this test is about were created
+    symbolsVrams = [sym.vram for sym in section.symbolList]
+    assert VRAM + 0xE0 in symbolsVrams
+    crossingSym = section.symbolList[symbolsVrams.index(VRAM + 0xE0)]
+    assert crossingSym.vram + crossingSym.sizew * 4 > VRAM + GLOBAL_SIZE
+    return context
+
+def _getSymbolsFields(context: common.Context) -> list[tuple[Any, ...]]:
+    fields: list[tuple[Any, ...]] = []
+    for offset in range(SECTION_START, SECTION_END):
+        contextSym = _getSegment(context, offset).getSymbol(VRAM + offset, tryPlusOffset=False)
+        if contextSym is None:
+            continue
+        references = sorted((sym.address, sym.vromAddress) for sym in contextSym.referenceSymbols)
+        fields.append((
+            contextSym.address, contextSym.vromAddress, contextSym.inFileOffset, contextSym.parentFileName,
+            contextSym.isDefined, contextSym.sectionType, contextSym.getTypeSpecial(), references,
+        ))
+    return fields
+
+
+@pytest.mark.parametrize("sectionType", [common.FileSectionType.Data, common.FileSectionType.Rodata])
+@pytest.mark.parametrize("seed", range(5))
+def test_symbolsInsideMatchPerOffsetLookups(monkeypatch: pytest.MonkeyPatch, sectionType: common.FileSectionType, seed: int) -> None:
+    rng = random.Random(seed)
+    # Pointers to the symbols, including the ones in the middle of words and on the overlay, mixed with other data
+    targets = [VRAM + offset for offset in ALIGNED_SYMBOLS + MID_WORD_SYMBOLS]
+    words = [rng.choice([0, rng.getrandbits(32), rng.choice(targets), rng.choice(targets)]) for _ in range((GLOBAL_SIZE + OVERLAY_SIZE) // 4)]
+    array_of_bytes = struct.pack(f">{len(words)}I", *words)
+
+    fields = _getSymbolsFields(_analyzeSection(sectionType, array_of_bytes))
+
+    with monkeypatch.context() as m:
+        m.setattr(mips.symbols.SymbolBase, "analyze", _perOffsetAnalyze)
+        expected = _getSymbolsFields(_analyzeSection(sectionType, array_of_bytes))
+
+    assert len(expected) >= len(ALIGNED_SYMBOLS + MID_WORD_SYMBOLS)
+    assert all(isDefined for _, _, _, _, isDefined, *_ in expected)
+    assert any(len(references) > 0 for *_, references in expected)
+    assert fields == expected
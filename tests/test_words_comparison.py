@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+from array import array
+import random
+from typing import Any, Callable
+
+import pytest
+
+from spimdisasm import common
+
+
+WordsType = Any
+"Either a list of ints, an array of words or a memoryview of them"
+
+LENGTHS = [(0, 0), (5, 5), (300, 300), (300, 290), (1000, 1200)]
+
+WORDS_KINDS: dict[str, Callable[[list[int]], WordsType]] = {
+    "list": lambda words: list(words),
+    "array": lambda words: array(common.Utils.WORDS_TYPECODE, words),
+    "memoryview": lambda words: memoryview(array(common.Utils.WORDS_TYPECODE, words)),
+}
+
+
+def _randomWords(rng: random.Random, length: int) -> list[int]:
+    # Plenty of words look like pointers
+    upperBytes = [0x00, 0x01, 0x05, 0x0F, 0x10, 0x80, 0x80, 0x80, 0x8F, 0xFF]
+    return [(rng.choice(upperBytes) << 24) | rng.randrange(0, 1 << 24) for _ in range(length)]
+
+def _getWordsPairs(wordsKind: str) -> list[tuple[WordsType, WordsType]]:
+    rng = random.Random(0)
+    makeWords = WORDS_KINDS[wordsKind]
+    pairs: list[tuple[WordsType, WordsType]] = []
+    for length, otherLength in LENGTHS:
+        words = _randomWords(rng, length)
+        # Make both lists share most of the words
+        otherWords = [word if rng.random() < 0.7 else rng.randrange(0, 1 << 32) for word in words[:otherLength]]
+        otherWords += _randomWords(rng, otherLength - len(otherWords))
+        pairs.append((makeWords(words), makeWords(otherWords)))
+    return pairs
+
+def _runOperation(operation: str, words: WordsType, otherWords: WordsType) -> tuple[Any, list[int], list[int]]:
+    "Returns the result of the operation alongside the words after running it"
+    if operation == "nukePointers":
+        result: Any = common.WordsComparison.nukePointers(words)
+    elif operation == "blankOutUpperBytes":
+        result = common.WordsComparison.blankOutUpperBytes(words, otherWords, [0x80, 0x01, 0x10])
+    else:
+        result = common.WordsComparison.countDifferences(words, otherWords)
+    return result, list(words), list(otherWords)
+
+def _runWithoutNumpy(monkeypatch: pytest.MonkeyPatch, operation: str, wordsKind: str) -> list[tuple[Any, list[int], list[int]]]:
+    with monkeypatch.context() as m:
+        m.setattr(common.WordsComparison, "getNumpy", lambda: None)
+        return [_runOperation(operation, words, otherWords) for words, otherWords in _getWordsPairs(wordsKind)]
+
+
+OPERATIONS = ["nukePointers", "blankOutUpperBytes", "countDifferences"]
+
+
+@pytest.mark.parametrize("wordsKind", list(WORDS_KINDS))
+@pytest.mark.parametrize("operation", OPERATIONS)
+@pytest.mark.parametrize("minWords", [1, common.WordsComparison.NUMPY_MIN_WORDS])
+def test_wordsComparisonNumpyMatchesFallback(monkeypatch: pytest.MonkeyPatch, operation: str, wordsKind: str, minWords: int) -> None:
+    pytest.importorskip("numpy")
+
+    expected = _runWithoutNumpy(monkeypatch, operation, wordsKind)
+
+    monkeypatch.setattr(common.WordsComparison, "NUMPY_MIN_WORDS", minWords)
+    assert [_runOperation(operation, words, otherWords) for words, otherWords in _getWordsPairs(wordsKind)] == expected
+
+@pytest.mark.parametrize("operation", OPERATIONS)
+def test_wordsComparisonKindsMatch(monkeypatch: pytest.MonkeyPatch, operation: str) -> None:
+    # The plain Python loops don't care about the kind of the words either
+    expected = _runWithoutNumpy(monkeypatch, operation, "list")
+    for wordsKind in WORDS_KINDS:
+        assert _runWithoutNumpy(monkeypatch, operation, wordsKind) == expected
+
+def test_wordsComparisonFallback() -> None:
+    words = [0x80001234, 0x01ABCDEF, 0x10ABCDEF, 0x00000000, 0x0F000001]
+    assert common.WordsComparison.nukePointers(words)
+    assert words == [0x80000000, 0x01000000, 0x10ABCDEF, 0x00000000, 0x0F000000]
+    assert not common.WordsComparison.nukePointers([0x10000000, 0x00000000, 0xFFFFFFFF])
+
+    words = [0x80001234, 0x80001234, 0x80001234, 0x01000000]
+    otherWords = [0x80004321, 0x10004321, 0x80001234]
+    assert common.WordsComparison.blankOutUpperBytes(words, otherWords, [0x80])
+    assert words == [0x80000000, 0x80001234, 0x80000000, 0x01000000]
+    assert otherWords == [0x80000000, 0x10004321, 0x80000000]
+
+    assert common.WordsComparison.countDifferences([0x11223344, 0x11223344, 0], [0x11223344, 0x11FF33FF]) == (2, 1)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import pytest
+
+from spimdisasm import common
+from spimdisasm import mips
+
+from .utils import SyntheticRom
+
+
+def _getWordsSections(processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]]) -> list[mips.sections.SectionBase]:
+    "The sections whose symbols view the words of their section"
+    return processedFiles[common.FileSectionType.Data] + processedFiles[common.FileSectionType.Rodata]
+
+def _snapshotSymbolsWords(sections: list[mips.sections.SectionBase]) -> list[list[list[int]]]:
+    return [[list(sym.words) for sym in section.symbolList] for section in sections]
+
+
+def test_symbolsViewTheWordsOfTheirSection(syntheticRom: SyntheticRom) -> None:
+    _, processedFiles = syntheticRom.analyze()
+
+    for section in _getWordsSections(processedFiles):
+        assert len(section.symbolList) > 0
+        for sym in section.symbolList:
+            assert isinstance(sym.words, memoryview)
+            assert sym.words.obj is section.words
+            assert list(sym.words) == list(section.words[sym.inFileOffset//4 - section.inFileOffset//4:][:sym.sizew])
+
+def test_removePointersKeepsSymbolsWords(syntheticRom: SyntheticRom, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(common.GlobalConfig, "REMOVE_POINTERS", True)
+    _, processedFiles = syntheticRom.analyze()
+    sections = _getWordsSections(processedFiles)
+    originalWords = [list(section.words) for section in sections]
+    symbolsWords = _snapshotSymbolsWords(sections)
+
+    wasUpdated = [section.removePointers() for section in sections]
+
+    # The sections got their pointers nuked, but their symbols didn't
+    assert any(wasUpdated)
+    assert [list(section.words) for section in sections] != originalWords
+    assert _snapshotSymbolsWords(sections) == symbolsWords
+
+def test_blankOutDifferencesKeepsSymbolsWords(syntheticRom: SyntheticRom, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(common.GlobalConfig, "REMOVE_POINTERS", True)
+    monkeypatch.setattr(common.GlobalConfig, "IGNORE_WORD_LIST", {0x80})
+    _, processedFiles = syntheticRom.analyze()
+    _, otherProcessedFiles = syntheticRom.analyze()
+    sections = _getWordsSections(processedFiles)
+    otherSections = _getWordsSections(otherProcessedFiles)
+    originalWords = [list(section.words) for section in sections + otherSections]
+    symbolsWords = _snapshotSymbolsWords(sections + otherSections)
+
+    wasUpdated = [section.blankOutDifferences(other) for section, other in zip(sections, otherSections)]
+
+    # Both sections of every pair got their words blanked out, but their symbols didn't
+    assert any(wasUpdated)
+    assert [list(section.words) for section in sections + otherSections] != originalWords
+    assert _snapshotSymbolsWords(sections + otherSections) == symbolsWords
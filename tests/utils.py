@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: © 2024 Decompollaborate
+# SPDX-License-Identifier: MIT
+
+"""Helpers shared by the tests.
+
+The tests run against a small synthetic rom, generated from a fixed seed, with
+a file splits csv and a symbol_addrs file. Every file of the rom has a few
+functions (which reference each other, the data, the rodata and the bss of the
+file, and the first one uses a jump table), some data (strings, pointers,
+shorts and words), some rodata (strings, floats, doubles and the jump table)
+and some bss."""
+
+from __future__ import annotations
+
+import io
+import os
+from pathlib import Path
+import random
+import struct
+import subprocess
+import sys
+
+from spimdisasm import common
+from spimdisasm import mips
+from spimdisasm import singleFileDisasm
+from spimdisasm import frontendCommon as fec
+
+
+REPO_ROOT = Path(__file__).parent.parent
+
+ROM_VRAM = 0x80000400
+
+FUNC_WORDS = 40
+DATA_SYM_SIZE = 0x20
+RODATA_SYM_SIZE = 0x20
+JUMP_TABLE_SIZE = 0x20
+BSS_SYM_SIZE = 0x10
+
+STRINGS = [b"Hello world\n", b"\x82\xa0\x82\xa2 nihongo", b"abc", b"%s: %d\n", b"error!", b"x"]
+
+
+def _lui(rt: int, imm: int) -> int:
+    return (0x0F << 26) | (rt << 16) | (imm & 0xFFFF)
+
+def _iType(opcode: int, rt: int, rs: int, imm: int) -> int:
+    return (opcode << 26) | (rs << 21) | (rt << 16) | (imm & 0xFFFF)
+
+def _addiu(rt: int, rs: int, imm: int) -> int:
+    return _iType(0x09, rt, rs, imm)
+
+def _sltiu(rt: int, rs: int, imm: int) -> int:
+    return _iType(0x0B, rt, rs, imm)
+
+def _lh(rt: int, rs: int, imm: int) -> int:
+    return _iType(0x21, rt, rs, imm)
+
+def _lw(rt: int, rs: int, imm: int) -> int:
+    return _iType(0x23, rt, rs, imm)
+
+def _sw(rt: int, rs: int, imm: int) -> int:
+    return _iType(0x2B, rt, rs, imm)
+
+def _lwc1(ft: int, rs: int, imm: int) -> int:
+    return _iType(0x31, ft, rs, imm)
+
+def _beq(rs: int, rt: int, offset: int) -> int:
+    return _iType(0x04, rt, rs, offset)
+
+def _jal(target: int) -> int:
+    return (0x03 << 26) | ((target >> 2) & 0x3FFFFFF)
+
+def _addu(rd: int, rs: int, rt: int) -> int:
+    return (rs << 21) | (rt << 16) | (rd << 11) | 0x21
+
+def _sll(rd: int, rt: int, sa: int) -> int:
+    return (rt << 16) | (rd << 11) | (sa << 6)
+
+def _jr(rs: int) -> int:
+    return (rs << 21) | 0x08
+
+def _hiLo(address: int) -> tuple[int, int]:
+    lo = address & 0xFFFF
+    hi = (address >> 16) + (1 if lo >= 0x8000 else 0)
+    return hi & 0xFFFF, lo
+
+_JR_RA = _jr(31)
+_NOP = 0
+
+
+class SyntheticRom:
+    def __init__(self, directory: Path, filesCount: int, seed: int, vram: int=ROM_VRAM):
+        self.directory = directory
+        self.romPath = directory / "rom.bin"
+        self.splitsPath = directory / "splits.csv"
+        self.symbolAddrsPath = directory / "symbol_addrs.txt"
+        self.vram = vram
+
+        self.sections: list[tuple[common.FileSectionType, str, int, int, int]] = []
+        "The sections of the splits csv, in order. type, name, vromStart, vromEnd, vram"
+        self.functions: list[int] = []
+        "The vram of every function"
+
+        self._generate(filesCount, random.Random(seed))
+
+    def _generate(self, filesCount: int, rng: random.Random) -> None:
+        counts = [(rng.randint(2, 6), rng.randint(3, 8), rng.randint(2, 6), rng.randint(1, 4)) for _ in range(filesCount)]
+
+        # All the text goes first, then all the data, then the rodata and the bss
+        offset = 0
+        textOffsets: list[int] = []
+        for funcsCount, _, _, _ in counts:
+            textOffsets.append(offset)
+            offset += funcsCount * FUNC_WORDS * 4
+        dataOffsets: list[int] = []
+        for _, dataCount, _, _ in counts:
+            dataOffsets.append(offset)
+            offset += dataCount * DATA_SYM_SIZE
+        rodataOffsets: list[int] = []
+        for _, _, rodataCount, _ in counts:
+            rodataOffsets.append(offset)
+            offset += rodataCount * RODATA_SYM_SIZE + JUMP_TABLE_SIZE
+        romSize = offset
+        bssOffsets: list[int] = []
+        for _, _, _, bssCount in counts:
+            bssOffsets.append(offset)
+            offset += bssCount * BSS_SYM_SIZE
+        bssEnd = offset
+
+        for fileIndex, (funcsCount, _, _, _) in enumerate(counts):
+            for k in range(funcsCount):
+                self.functions.append(self.vram + textOffsets[fileIndex] + k * FUNC_WORDS * 4)
+
+        rom = bytearray(romSize)
+        def putWord(offset: int, word: int) -> None:
+            rom[offset:offset+4] = struct.pack(">I", word)
+
+        for fileIndex, (funcsCount, dataCount, rodataCount, _) in enumerate(counts):
+            for k in range(dataCount):
+                offset = dataOffsets[fileIndex] + k * DATA_SYM_SIZE
+                kind = k % 4
+                if kind == 0:
+                    string = rng.choice(STRINGS)
+                    rom[offset:offset+len(string)] = string
+                elif kind == 1:
+                    for j in range(0, DATA_SYM_SIZE, 4):
+                        chance = rng.random()
+                        if chance < 0.3:
+                            putWord(offset + j, rng.choice(self.functions))
+                        elif chance < 0.6:
+                            putWord(offset + j, self.vram + rng.choice(dataOffsets) + rng.randrange(0, 8) * 4)
+                        else:
+                            putWord(offset + j, rng.randrange(0, 1 << 32))
+                elif kind == 2:
+                    for j in range(0, DATA_SYM_SIZE, 2):
+                        rom[offset+j:offset+j+2] = struct.pack(">H", rng.randrange(0, 0x10000))
+                else:
+                    for j in range(0, DATA_SYM_SIZE, 4):
+                        putWord(offset + j, rng.randrange(0, 0x100))
+
+            rodataOffset = rodataOffsets[fileIndex]
+            for k in range(rodataCount):
+                offset = rodataOffset + k * RODATA_SYM_SIZE
+                kind = k % 3
+                if kind == 0:
+                    string = rng.choice(STRINGS)
+                    rom[offset:offset+len(string)] = string
+                elif kind == 1:
+                    rom[offset:offset+4] = struct.pack(">f", rng.uniform(-100, 100))
+                else:
+                    rom[offset:offset+8] = struct.pack(">d", rng.uniform(-100, 100))
+            jumpTableOffset = rodataOffset + rodataCount * RODATA_SYM_SIZE
+
+            dataVram = self.vram + dataOffsets[fileIndex]
+            rodataVram = self.vram + rodataOffset
+            for k in range(funcsCount):
+                funcOffset = textOffsets[fileIndex] + k * FUNC_WORDS * 4
+                words = [_addiu(29, 29, -0x20), _sw(31, 29, 0x14)]
+                hi, lo = _hiLo(dataVram)
+                words += [_lui(4, hi), _addiu(4, 4, lo)]
+                hi, lo = _hiLo(rodataVram + RODATA_SYM_SIZE)
+                words += [_lui(1, hi), _lwc1(0, 1, lo)]
+                hi, lo = _hiLo(rodataVram + (k % rodataCount) * RODATA_SYM_SIZE)
+                words += [_lui(5, hi), _addiu(5, 5, lo)]
+                hi, lo = _hiLo(dataVram + 2 * DATA_SYM_SIZE + 2)
+                words += [_lui(6, hi), _lh(6, 6, lo)]
+                hi, lo = _hiLo(self.vram + bssOffsets[fileIndex] + 4)
+                words += [_lui(7, hi), _lw(7, 7, lo)]
+                words += [_jal(rng.choice(self.functions)), _NOP]
+                words += [_beq(4, 0, 3), _NOP, _addiu(2, 2, 1), _NOP]
+                if k == 0:
+                    hi, lo = _hiLo(self.vram + jumpTableOffset)
+                    words += [_sltiu(1, 2, 4), _beq(1, 0, 10), _sll(14, 2, 2), _lui(1, hi), _addu(1, 1, 14), _lw(14, 1, lo), _jr(14), _NOP]
+                    casesStart = len(words)
+                    words += [_addiu(2, 0, 1), _addiu(2, 0, 2), _addiu(2, 0, 3), _addiu(2, 0, 4)]
+                    for case in range(4):
+                        putWord(jumpTableOffset + case * 4, self.vram + funcOffset + (casesStart + case) * 4)
+                while len(words) < FUNC_WORDS - 4:
+                    words.append(_addiu(2, 2, rng.randrange(1, 100)))
+                words += [_lw(31, 29, 0x14), _addiu(29, 29, 0x20), _JR_RA, _NOP]
+                for j, word in enumerate(words):
+                    putWord(funcOffset + j * 4, word)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.romPath.write_bytes(rom)
+
+        sectionsOffsets = [
+            (common.FileSectionType.Text, textOffsets),
+            (common.FileSectionType.Data, dataOffsets),
+            (common.FileSectionType.Rodata, rodataOffsets),
+            (common.FileSectionType.Bss, bssOffsets),
+        ]
+        allOffsets = textOffsets + dataOffsets + rodataOffsets + bssOffsets + [bssEnd]
+        with self.splitsPath.open("w") as f:
+            i = 0
+            for sectionType, offsets in sectionsOffsets:
+                f.write(f"offset,vram,{sectionType.toStr()}\n")
+                for fileIndex, offset in enumerate(offsets):
+                    f.write(f"{offset:X},{self.vram + offset:X},file{fileIndex}\n")
+                    self.sections.append((sectionType, f"file{fileIndex}", offset, allOffsets[i+1], self.vram + offset))
+                    i += 1
+            f.write(f"{bssEnd:X},{self.vram + bssEnd:X},.end\n")
+
+        with self.symbolAddrsPath.open("w") as f:
+            f.write(f"main = 0x{self.functions[0]:08X}; // type:func\n")
+            f.write(f"gSomeShort = 0x{self.vram + dataOffsets[0] + 2 * DATA_SYM_SIZE:08X}; // type:s16 size:0x10\n")
+
+
+    def singleFileDisasmArgs(self, outputDir: Path, symbolAddrsPath: Path|None=None) -> list[str]:
+        """Arguments to disassemble this rom with `singleFileDisasm` into `outputDir`.
+
+        `symbolAddrsPath` replaces the symbol_addrs file of this rom if passed."""
+        return [
+            "singleFileDisasm", str(self.romPath), str(outputDir / "asm"),
+            "--file-splits", str(self.splitsPath),
+            "--symbol-addrs", str(self.symbolAddrsPath if symbolAddrsPath is None else symbolAddrsPath),
+            "--vram", f"{self.vram:X}",
+            "--split-functions", str(outputDir / "nonmatchings"),
+            "--save-context", str(outputDir / "context.csv"),
+            "-q",
+        ]
+
+    def split(self) -> tuple[common.Context, dict[common.FileSectionType, list[mips.sections.SectionBase]], dict[common.FileSectionType, list[Path]]]:
+        "Splits this rom into sections on the current process, the same way `singleFileDisasm` does"
+        context = common.Context()
+        context.globalSegment.readSplatSymbolAddrs(self.symbolAddrsPath)
+
+        splits = common.FileSplitFormat()
+        splits.readCsvFile(self.splitsPath)
+
+        romBytes = self.romPath.read_bytes()
+        processedFiles, processedFilesOutputPaths = fec.FrontendUtilities.getSplittedSections(context, splits, romBytes, self.romPath, self.directory / "asm", self.directory / "asm")
+        singleFileDisasm.changeGlobalSegmentRanges(context, processedFiles, len(romBytes), self.vram)
+        return context, processedFiles, processedFilesOutputPaths
+
+    def analyze(self) -> tuple[common.Context, dict[common.FileSectionType, list[mips.sections.SectionBase]]]:
+        "Splits and analyzes this rom on the current process, the same way `singleFileDisasm` does"
+        context, processedFiles, processedFilesOutputPaths = self.split()
+        analyzeSections(processedFiles, processedFilesOutputPaths)
+        return context, processedFiles
+
+
+def analyzeSections(processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]], processedFilesOutputPaths: dict[common.FileSectionType, list[Path]]) -> None:
+    processedFilesCount = sum(len(files) for files in processedFiles.values())
+    fec.FrontendUtilities.analyzeProcessedFiles(processedFiles, processedFilesOutputPaths, processedFilesCount)
+
+def disassembleSections(processedFiles: dict[common.FileSectionType, list[mips.sections.SectionBase]]) -> list[str]:
+    "Returns the disassembly of every section, in the same order they are analyzed"
+    outputs: list[str] = []
+    for _, filesInSection in sorted(processedFiles.items()):
+        for f in filesInSection:
+            output = io.StringIO()
+            f.disassembleToFile(output)
+            outputs.append(output.getvalue())
+    return outputs
+
+def _getSpimdisasmCommand(args: list[str]) -> tuple[list[str], dict[str, str]]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(REPO_ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    return [sys.executable, "-m", "spimdisasm", *args], env
+
+def runSpimdisasm(args: list[str], check: bool=True) -> subprocess.CompletedProcess[str]:
+    """Runs `python -m spimdisasm` with the given arguments on a new process,
+    so the global configuration of the tests process is not modified."""
+    command, env = _getSpimdisasmCommand(args)
+    result = subprocess.run(command, cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    if check:
+        assert result.returncode == 0, result.stderr
+    return result
+
+def startSpimdisasm(args: list[str]) -> subprocess.Popen[str]:
+    "Same as `runSpimdisasm`, but doesn't wait for the process to finish"
+    command, env = _getSpimdisasmCommand(args)
+    return subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+def readTree(directory: Path) -> dict[str, bytes]:
+    "Returns the contents of every file inside `directory`, keyed by their relative path"
+    return {str(path.relative_to(directory)): path.read_bytes() for path in sorted(directory.rglob("*")) if path.is_file()}